@@ -0,0 +1,158 @@
+"""
+Local font bundle: report stylesheets without Google Fonts, so printing needs no network.
+
+The report CSS `@import`s its typeface from fonts.googleapis.com. Chromium
+fetches it at PDF time, which is slow on sandboxed render hosts and often times
+out. `localize_css(css)` replaces every Google Fonts `@import` whose families
+are all in the bundle with `@font-face` rules. Each rule embeds its font as a
+base64 `data:` URI, so the document is self-contained.
+
+Embedded faces are subsetted to `SUBSET_TEXT`: Latin-1 plus the punctuation
+and symbols the reports print. This needs fontTools; WOFF2 output also needs
+brotli. A subsetted face is tens of KB rather than hundreds, and the PDF embeds
+only those glyphs. Without fontTools the whole file is embedded. Subsets are
+cached on disk in `CACHE_DIR`, keyed by the font file's hash and the character
+set, and in memory per process. Each face is therefore built once per host.
+
+Bundle layout: `FONT_DIR` (env `FUEGO_FONT_DIR`, default `references/fonts/`)
+holds TTF/OTF/WOFF2 files named the way Google Fonts ships them.
+`python3 fonts/fetch_fonts.py` downloads Source Sans 3 into it (other families
+by name):
+
+    SourceSans3-Regular.ttf  SourceSans3-SemiBold.ttf  SourceSans3-Italic.ttf
+    DMSans-Bold.ttf          JetBrainsMono-Regular.ttf  SourceSans3[wght].ttf (variable)
+
+A family missing from the bundle keeps its `@import`, and the PDF renderer
+lets Google Fonts requests through (see pdf_renderer.py), so an online host
+still prints the real typeface; an offline one falls back to the next font in
+the stack.
+
+This file is shared: keep it identical in both skills' references/.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import re
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from fontTools import subset as ft_subset
+    from fontTools.ttLib import TTFont
+except ImportError:  # pip install fonttools brotli; without it fonts are embedded whole
+    ft_subset = TTFont = None
+
+FONT_DIR = os.environ.get("FUEGO_FONT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"))
+CACHE_DIR = os.environ.get("FUEGO_FONT_CACHE", os.path.expanduser("~/.cache/fuego-fonts"))
+FONT_EXTS = (".woff2", ".woff", ".ttf", ".otf")
+MIME = {".woff2": "font/woff2", ".woff": "font/woff", ".ttf": "font/ttf", ".otf": "font/otf"}
+FORMAT = {".woff2": "woff2", ".woff": "woff", ".ttf": "truetype", ".otf": "opentype"}
+WEIGHTS = {"thin": 100, "extralight": 200, "light": 300, "regular": 400, "medium": 500,
+           "semibold": 600, "bold": 700, "extrabold": 800, "black": 900}
+SUBSET_TEXT = "".join(map(chr, range(0x20, 0x7F))) + "".join(map(chr, range(0xA0, 0x100))) + "–—‘’“”•…→←↑↓▲▼★☆✓✗·€"
+
+_GOOGLE_IMPORT = re.compile(r"""@import\s*url\(\s*['"]?(https?://fonts\.googleapis\.com/[^'")]*)['"]?\s*\)[^;]*;""")
+_VARIABLE = re.compile(r"\[[^\]]*\]|-?VariableFont[^.]*", re.I)
+_faces = {}  # font path -> @font-face src value
+
+
+def _family_key(name):
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def bundle_files(font_dir=None):
+    """Every font file in the bundle, sorted (also the bundle's identity for the render manifest)."""
+    font_dir = font_dir or FONT_DIR
+    try:
+        names = sorted(os.listdir(font_dir))
+    except OSError:
+        return []
+    return [os.path.join(font_dir, n) for n in names if n.lower().endswith(FONT_EXTS)]
+
+
+def bundle(font_dir=None):
+    """{family key: [(weight, style, path)]}, from the file names (see module docstring)."""
+    faces = {}
+    for path in bundle_files(font_dir):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if _VARIABLE.search(stem):
+            family, weight, style = _VARIABLE.sub("", stem).partition("-")[0], "100 900", "italic" if "italic" in stem.lower() else "normal"
+        else:
+            family, _, variant = stem.partition("-")
+            variant = variant.lower() or "regular"
+            style = "italic" if variant.endswith("italic") else "normal"
+            variant = (variant[:-len("italic")] if style == "italic" else variant) or "regular"
+            if variant not in WEIGHTS: continue
+            weight = WEIGHTS[variant]
+        faces.setdefault(_family_key(family), []).append((weight, style, path))
+    return faces
+
+
+def _subset(path):
+    """(bytes, ext) of `path` cut down to SUBSET_TEXT, cached on disk; the whole file without fontTools."""
+    with open(path, "rb") as f:
+        data = f.read()
+    ext = os.path.splitext(path)[1].lower()
+    if ft_subset is None:
+        return data, ext
+    key = hashlib.sha256(data + SUBSET_TEXT.encode()).hexdigest()[:24]
+    formats = (("woff2", ".woff2"), (None, ext if ext in (".ttf", ".otf") else ".ttf"))
+    for _, out_ext in formats:  # the same names the save loop below writes
+        cached = os.path.join(CACHE_DIR, key + out_ext)
+        if os.path.exists(cached):
+            with open(cached, "rb") as f:
+                return f.read(), out_ext
+    font = TTFont(path)
+    options = ft_subset.Options()
+    options.layout_features = ["*"]
+    subsetter = ft_subset.Subsetter(options)
+    subsetter.populate(text=SUBSET_TEXT)
+    subsetter.subset(font)
+    for flavor, out_ext in formats:
+        buf = io.BytesIO()
+        font.flavor = flavor
+        try:
+            font.save(buf)
+        except ImportError:  # WOFF2 needs brotli
+            continue
+        data = buf.getvalue()
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = os.path.join(CACHE_DIR, f"{key}{out_ext}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(CACHE_DIR, key + out_ext))
+        except OSError:
+            pass
+        return data, out_ext
+    return data, ext
+
+
+def _src(path):
+    if path not in _faces:
+        data, ext = _subset(path)
+        _faces[path] = f"url(data:{MIME[ext]};base64,{base64.b64encode(data).decode()}) format('{FORMAT[ext]}')"
+    return _faces[path]
+
+
+def font_face_css(family, font_dir=None):
+    """`@font-face` rules embedding every bundled face of `family` ("" when none is bundled)."""
+    return "".join(f"@font-face{{font-family:'{family}';font-style:{style};font-weight:{weight};font-display:block;src:{_src(path)};}}"
+                   for weight, style, path in sorted(bundle(font_dir).get(_family_key(family), []), key=lambda f: (f[1], str(f[0]))))
+
+
+def google_families(url):
+    """Family names requested by a fonts.googleapis.com CSS URL."""
+    return [f.split(":")[0] for f in parse_qs(urlsplit(url).query).get("family", [])]
+
+
+def localize_css(css, font_dir=None):
+    """`css` with each Google Fonts @import swapped for embedded @font-face rules, when the bundle has every family."""
+    faces = bundle(font_dir)
+    def local(m):
+        families = google_families(m.group(1))
+        if not families or any(_family_key(f) not in faces for f in families):
+            return m.group(0)
+        return "".join(font_face_css(f, font_dir) for f in families)
+    return _GOOGLE_IMPORT.sub(local, css)
@@ -0,0 +1,280 @@
+"""
+One-process batch run: every location Weekly Flash, the System Weekly Flash and
+the N-week Consolidated Rack & Stack.
+
+Data is loaded once — one `QueryPlanner` run for all three report types, or the
+reference implementations' pasted sample data offline — and the weekly KPI
+structures (`WeeklyKpis`: fact store, guideline hours, `loc_weekly`, `loc_data`,
+`sys_weekly`) are built once and shared by the system flash and every location
+flash. The rack & stack builds its own `PeriodKpis` from its day_dow-aligned 2N-week
+pull, since its weekly sales and PY definitions differ from the week-grain
+consolidated pull. Renderers only read the shared structures; nothing is
+recomputed per report.
+
+Every HTML is written first; the PDFs are then printed together through one warm
+`PdfRenderer` (Playwright Chromium, falling back to the Chrome CLI, see
+pdf_renderer.py), so the browser cold start is paid once per batch, not per report.
+The same session then prints the Monday packet: the system flash and every
+location flash in one PDF behind a table of contents (see packet.py).
+
+    python batch_reports.py              # sample data, writes every HTML + PDF
+    python batch_reports.py --workers 8  # location flashes on 8 processes
+    python batch_reports.py --force      # ignore the render manifest
+
+Re-runs skip reports whose inputs and template are unchanged, and re-print a PDF
+only when its HTML or the print settings changed (see manifest.py).
+
+Every run leaves a stage trace, `.render-trace.json` in the output directory
+(Chrome trace-event format, see tracing.py), and prints its one-line summary.
+"""
+
+import functools
+import hashlib
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import assets
+import tracing
+from fact_store import DailyFacts
+import location_flash
+import packet as packet_book
+from location_flash import fm, location_inputs, pdf_filename, render_location_flash, wk_range
+from location_flash import html_path as location_html_path
+from manifest import RenderManifest, file_hash, fingerprint, kpi_fingerprint, source_hash
+from packet import write_packet
+from pdf_renderer import PDF_OPTIONS, PdfRenderer
+from query_planner import QueryPlanner, consolidated_report, period_report
+from weekly_kpis import WeeklyKpis
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PERIOD_DIR = os.path.normpath(os.path.join(HERE, "..", "..", "period-end-fuego-rack-and-stack", "references"))
+OUTPUT_DIR = "/mnt/user-data/outputs"
+TRACE_NAME = ".render-trace.json"
+
+
+def _load(name, path):
+    """Import a reference implementation by path (both are named reference_implementation.py)."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@functools.lru_cache(maxsize=None)
+def report_modules():
+    """(system flash module, rack & stack module); the period-end references join sys.path for period_kpis/periods."""
+    if PERIOD_DIR not in sys.path:
+        sys.path.append(PERIOD_DIR)  # after HERE: the shared fact_store/labor_guidelines copies are identical
+    return (_load("system_flash", os.path.join(HERE, "reference_implementation.py")),
+            _load("rack_and_stack", os.path.join(PERIOD_DIR, "reference_implementation.py")))
+
+
+def fetch_inputs(runner, week_starts, period, local_py=False, **kw):
+    """Every report's raw inputs from one merged query plan: {"weekly": ..., "period": ...}."""
+    plan = QueryPlanner([consolidated_report(week_starts, local_py, name="weekly", flash=True),
+                         period_report(period.weeks, local_py=local_py, name="period")])
+    with tracing.span("fetch"):
+        return plan.run(runner, **kw)
+
+
+def _write(name, render, html_path, filename, output_dir):
+    """Stream one report's HTML into `html_path` (`render(out)` writes it); (name, html_path, target pdf_path)."""
+    os.makedirs(os.path.dirname(html_path), exist_ok=True)
+    with tracing.span("html", report=name), open(html_path, "w") as f: render(f)
+    return name, html_path, os.path.join(output_dir, filename)
+
+
+def to_pdfs(written, renderer=None, pdf=True):
+    """
+    Print every written report through one warm renderer (a temporary one if None).
+    Reports without a PDF (failed, or `pdf=False`) get their HTML copied beside the
+    intended PDF instead. Returns [(name, html_path, pdf_path or None)].
+    """
+    if not pdf:
+        ok = [False] * len(written)
+    else:
+        own = renderer is None
+        renderer = renderer or PdfRenderer()
+        try:
+            ok = renderer.render_many((h, p) for _, h, p in written)
+        finally:
+            if own: renderer.close()
+    out = []
+    for (name, html_path, pdf_path), good in zip(written, ok):
+        if not good: shutil.copy(html_path, pdf_path.replace(".pdf", ".html"))
+        out.append((name, html_path, pdf_path if good else None))
+    return out
+
+
+def monday_packet(K, written, output_dir, renderer, manifest=None):
+    """The system flash plus every location flash as one PDF; (name, html_path, pdf_path or None)."""
+    by_name = {name: (h, p) for name, h, p in written}
+    names = ["System"] + [loc for loc in K.locations if loc in by_name]
+    reports, pdf_paths = [], []
+    for name in names:
+        h, p = by_name[name]
+        with open(h) as f: doc = f.read()
+        if name == "System":
+            label, note = "Fuego System", f"{fm(K.sys_amt)} sales · SSS {K.sys_sss:+.1f}% · Labor {K.sys_lp:.1f}%"
+        else:
+            ld = K.loc_data[name]
+            sss = f"SSS {ld['sss']:+.1f}%" if ld["has_py"] else "New store"
+            label, note = name, f"{fm(ld['amount'])} sales · {sss} · Labor {ld['labor_pct']:.1f}%"
+        reports.append((label, doc, note))
+        pdf_paths.append(p)
+    html_path = "/home/claude/monday_packet.html"
+    # The packet is built from the member reports, so their HTML (and whether each has a PDF) are its inputs
+    inputs = fingerprint([(label, hashlib.sha256(doc.encode()).hexdigest(), note) for label, doc, note in reports],
+                         [p is not None for p in pdf_paths])
+    template = source_hash(packet_book.__file__)
+    if manifest and manifest.state("Monday Packet", inputs, template, renderer is not None) == "fresh":
+        return ("Monday Packet",) + manifest.outputs("Monday Packet")
+    with tracing.span("packet", reports=len(reports)):
+        pdf_path = write_packet(reports, html_path, os.path.join(output_dir, f"Monday Packet - Fuego - {wk_range(K.ws)}.pdf"),
+                                renderer, f"Weekly Flash – {wk_range(K.ws)}", f"System flash and {len(names) - 1} location flashes",
+                                pdf_paths)
+    if pdf_path is None:
+        shutil.copy(html_path, os.path.join(output_dir, f"Monday Packet - Fuego - {wk_range(K.ws)}.html"))
+    if manifest: manifest.record("Monday Packet", inputs, template, html_path, pdf_path)
+    return "Monday Packet", html_path, pdf_path
+
+
+# ============================================================
+# PARALLEL MODE (ProcessPoolExecutor)
+# ============================================================
+# Each worker receives the detached KPI structures once (initializer, not per task)
+# and memory-maps the fact store the parent saved, so the daily arrays exist once in
+# the page cache however many workers read them. Tasks are just location names;
+# workers write HTML only, and the parent's warm browser pool prints the PDFs.
+# Each task hands its trace spans back with its result.
+_K = None
+
+
+def _init_worker(k, facts_dir):
+    global _K
+    tracing.drain()  # spans inherited from the parent on fork
+    _K = k.attach(DailyFacts.open(facts_dir))
+
+
+def _location_task(loc, today_str, output_dir):
+    written = _write(loc, lambda f: render_location_flash(_K, loc, today_str, f), location_html_path(loc),
+                     pdf_filename(loc, _K.ws), output_dir)
+    return written, tracing.drain()
+
+
+def run_batch(inputs, locations, week_starts, period, today_str, local_py=False, output_dir=OUTPUT_DIR, pdf=True,
+              workers=1, renderer=None, packet=True, force=False):
+    """
+    Render and write every report from `inputs` (see `fetch_inputs`). Returns
+    [(report, html_path, pdf_path or None)] in render order. `workers` > 1 spreads
+    the location flash renders over a process pool while this process renders the
+    system flash and the rack & stack. PDFs go through `renderer` (a `PdfRenderer`,
+    kept warm across batches by the caller) or a temporary one. `packet` adds the
+    merged Monday packet, printed in the same browser session.
+
+    Reports whose inputs and template match the render manifest in `output_dir`
+    are skipped; `force` re-renders and re-prints everything (see manifest.py).
+    The run's stage trace, including a preceding `fetch_inputs`, goes to
+    `output_dir/.render-trace.json` (see tracing.py).
+    """
+    system_flash, rack_and_stack = report_modules()
+    t0 = time.perf_counter()
+    K = WeeklyKpis(inputs["weekly"], locations, week_starts, local_py=local_py)
+    P = rack_and_stack.PeriodKpis(inputs["period"], period, locations, local_py=local_py)
+    t_build = time.perf_counter() - t0
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Where each report goes, what it is rendered from, and which template renders it
+    rack = f"{period.name} Rack & Stack"
+    targets = {loc: (location_html_path(loc), pdf_filename(loc, K.ws)) for loc in locations}
+    targets["System"] = ("/home/claude/weekly_flash_system.html", f"Weekly Flash - Fuego System - {system_flash.wk_long(K.ws)}.pdf")
+    targets[rack] = (f"/home/claude/system_{period.n_weeks}wk_consolidated.html",
+                     f"Weekly Flash - Fuego System - {period.name} Consolidated - {period.span}.pdf")
+    keys = {loc: fingerprint(location_inputs(K, loc, today_str)) for loc in locations}
+    keys["System"], keys[rack] = kpi_fingerprint(K, today_str), kpi_fingerprint(P)
+    fonts = assets.bundle_files()  # adding or replacing a bundled font re-renders everything
+    templates = dict.fromkeys(locations, source_hash(location_flash.__file__, *fonts))
+    templates["System"], templates[rack] = source_hash(system_flash.__file__, *fonts), source_hash(rack_and_stack.__file__, *fonts)
+    manifest = RenderManifest(output_dir, fingerprint(PDF_OPTIONS), force)
+    states = {name: manifest.state(name, keys[name], templates[name], pdf) for name in targets}
+    stale = [loc for loc in locations if states[loc] == "render"]
+    t_check = time.perf_counter() - t0 - t_build
+
+    def system_reports():
+        out = []
+        if states["System"] == "render":
+            out.append(_write("System", lambda f: system_flash.render_system_flash(K, today_str, f), *targets["System"], output_dir))
+        if states[rack] == "render":
+            out.append(_write(rack, lambda f: rack_and_stack.render_period_report(P, f), *targets[rack], output_dir))
+        return out
+
+    if workers > 1 and stale:
+        with tempfile.TemporaryDirectory(prefix="weekly-facts-") as facts_dir:
+            K.FACTS.save(facts_dir)
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(K.detached(), facts_dir)) as pool:
+                futures = [pool.submit(_location_task, loc, today_str, output_dir) for loc in stale]
+                rest = system_reports()
+                rendered = []
+                for f in futures:
+                    written, spans = f.result()
+                    rendered.append(written)
+                    tracing.extend(spans)
+                rendered += rest
+    else:
+        rendered = []
+        for loc in stale:
+            rendered.append(_write(loc, lambda f: render_location_flash(K, loc, today_str, f), *targets[loc], output_dir))
+        rendered += system_reports()
+    t_html = time.perf_counter() - t0 - t_build - t_check
+
+    # Print only what changed: new HTML that differs from the last printed one, or a missing/outdated PDF
+    html_hashes = {name: file_hash(h) for name, h, _ in rendered}
+    to_print = [w for w in rendered if manifest.needs_pdf(w[0], html_hashes[w[0]])] if pdf else rendered
+    to_print += [(name, targets[name][0], os.path.join(output_dir, targets[name][1])) for name in targets if states[name] == "pdf"]
+    own = pdf and renderer is None and (to_print or packet)
+    if own: renderer = PdfRenderer()
+    try:
+        printed = {name: (h, p) for name, h, p in to_pdfs(to_print, renderer, pdf)}
+        out = []
+        for name in targets:
+            if name in printed:
+                h, p = printed[name]
+                manifest.record(name, keys[name], templates[name], h, p, html_hashes.get(name))
+            elif name in html_hashes:  # re-rendered, byte-identical HTML: keep the PDF made from it
+                h, p = targets[name][0], manifest.outputs(name)[1]
+                manifest.record(name, keys[name], templates[name], h, p, html_hashes[name])
+            else:
+                h, p = manifest.outputs(name)
+            out.append((name, h, p))
+        if packet: out.append(monday_packet(K, out, output_dir, renderer if pdf else None, manifest))
+    finally:
+        if own: renderer.close()
+        manifest.save()
+    st = manifest.stats
+    print(f"✓ {len(out)} reports: KPIs built once in {t_build*1000:.0f} ms, inputs checked in {t_check*1000:.0f} ms, "
+          f"{len(rendered)} rendered and written in {t_html*1000:.0f} ms ({workers} worker{'s' if workers > 1 else ''}), "
+          f"{sum(1 for o in out if o[2])} PDFs in {(time.perf_counter() - t0 - t_build - t_check - t_html)*1000:.0f} ms "
+          f"({st['render']} rendered, {len(to_print) if pdf else 0} printed, {st['fresh']} unchanged)")
+    spans = tracing.drain()
+    print(tracing.summary(spans))
+    tracing.write(os.path.join(output_dir, TRACE_NAME), spans)
+    return out
+
+
+if __name__ == "__main__":
+    # Offline: each reference implementation's pasted sample data. The weekly sample
+    # covers the 4 weeks ending Feb 9 – 15; the rack & stack sample its own PERIOD.
+    from datetime import date
+    system_flash, rack_and_stack = report_modules()
+    weeks = sorted({date.fromisoformat(r[1]) for r in system_flash.weekly_sales_raw}, reverse=True)[:4]
+    inputs = {"weekly": system_flash.RAW, "period": rack_and_stack.RAW}
+    workers = int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else 1
+    for name, html_path, pdf_path in run_batch(inputs, system_flash.LOCATIONS, weeks, rack_and_stack.PERIOD,
+                                               system_flash.TODAY_STR, pdf="--no-pdf" not in sys.argv, workers=workers,
+                                               force="--force" in sys.argv):
+        print(f"  {name:20s} {pdf_path or html_path}")
@@ -0,0 +1,179 @@
+"""
+Pipeline benchmark: every report stage on synthetic chains of 6, 60 and 600 stores.
+
+Each size gets a seeded `SyntheticChain` (see synthetic.py) and goes through the
+batch pipeline without the warehouse: `WeeklyKpis` and `PeriodKpis` from the
+generated raw inputs, then the system flash (rankings, callouts, verification),
+every location flash and the rack & stack, each written to a scratch file. With
+`--pdf N`, the system flash, the rack & stack and N location flashes are also
+printed through one warm `PdfRenderer`. Timings come from the stage trace (see
+tracing.py): each stage's own time, with nested stages subtracted, so `html` is
+markup only and `callouts` excludes `verify`. `fetch` is not measured by
+default. With `--warehouse`, the chain is loaded into a `LocalWarehouse` (see
+warehouse.py; `load` column) and the inputs come from `fetch_inputs`, so the
+SKILL.md queries and their shaping are timed too.
+
+    python benchmark.py                         # 6, 60 and 600 stores, 4-week rack & stack
+    python benchmark.py --stores 6 60 --weeks 13
+    python benchmark.py --pdf 3                 # also print PDFs (needs Chromium or WeasyPrint)
+    python benchmark.py --warehouse             # fetch through the SKILL.md queries (needs duckdb)
+    python benchmark.py --json bench.json       # save the results...
+    python benchmark.py --compare bench.json    # ...and later fail (exit 1) on regressions
+
+The table ends with each stage's scaling exponent between the smallest and
+largest chain: 1.0 is linear in stores, 2.0 quadratic. `--compare` flags any
+stage more than `TOLERANCE` times slower than the saved run at the same size
+(ignoring stages under `NOISE_MS`). `--repeat` keeps the fastest of several runs,
+after one untimed warm-up run at the smallest size.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import tracing
+from batch_reports import fetch_inputs, report_modules
+from location_flash import render_location_flash
+from pdf_renderer import PdfRenderer
+from synthetic import HISTORY_WEEKS, PY_DAYS, SEED, SyntheticChain
+from weekly_kpis import WeeklyKpis
+
+SIZES = (6, 60, 600)
+LAST_WEEK = date(2026, 2, 16)  # the report week; the chain's "today" is the Monday after
+FLASH_WEEKS = 4  # the weekly flash and its callouts read 4 trailing weeks
+TOLERANCE = 1.25
+NOISE_MS = 5.0
+COLUMNS = ("generate", "load") + tracing.STAGES
+
+
+def run_size(n_locations, n_weeks=4, seed=SEED, pdf=0, renderer=None, warehouse=False):
+    """{stage: ms} for one chain of `n_locations` stores."""
+    system_flash, rack_and_stack = report_modules()
+    from periods import trailing_weeks  # on sys.path once report_modules() has run
+    tracing.drain()
+    t = time.perf_counter()
+    chain = SyntheticChain(n_locations, seed, today=LAST_WEEK + timedelta(weeks=1))
+    week_starts = [LAST_WEEK - timedelta(weeks=i) for i in range(FLASH_WEEKS)]
+    period = trailing_weeks(LAST_WEEK, n_weeks)
+    if warehouse:
+        from warehouse import LocalWarehouse, chain_tables
+        start = min(week_starts[-1], period.start - timedelta(weeks=len(period.weeks)))  # the rack & stack pulls 2x
+        tables = chain_tables(chain, start, LAST_WEEK + timedelta(days=6),
+                              history_start=start - timedelta(weeks=HISTORY_WEEKS, days=PY_DAYS))
+        times = {"generate": (time.perf_counter() - t) * 1000}
+        t = time.perf_counter()
+        wh = LocalWarehouse()
+        for table, rows in tables.items():
+            wh.insert(table, rows)
+        times["load"] = (time.perf_counter() - t) * 1000
+        with contextlib.redirect_stdout(io.StringIO()):
+            inputs = fetch_inputs(wh, week_starts, period)
+        wh.close()
+    else:
+        inputs = chain.inputs(week_starts, period)
+        times = {"generate": (time.perf_counter() - t) * 1000}
+    today_str = f"{LAST_WEEK + timedelta(days=8):%B %-d, %Y}"
+
+    with tempfile.TemporaryDirectory(prefix="fuego-bench-") as tmp, contextlib.redirect_stdout(io.StringIO()):
+        def write(name, render):
+            path = os.path.join(tmp, f"{len(written):04d}.html")
+            with tracing.span("html", report=name), open(path, "w") as f: render(f)
+            written.append((path, path[:-5] + ".pdf"))
+
+        written = []
+        K = WeeklyKpis(inputs["weekly"], chain.locations, week_starts)
+        P = rack_and_stack.PeriodKpis(inputs["period"], period, chain.locations)
+        write("System", lambda f: system_flash.render_system_flash(K, today_str, f))
+        write(period.name, lambda f: rack_and_stack.render_period_report(P, f))
+        for loc in chain.locations:
+            write(loc, lambda f: render_location_flash(K, loc, today_str, f))
+        if pdf and renderer is not None:
+            renderer.render_many(written[:2 + pdf])
+    for stage, (wall, _) in tracing.self_times(tracing.drain()).items():
+        times[stage] = wall / 1e6
+    return times
+
+
+def best(runs):
+    """Per stage, the fastest of several runs."""
+    return {k: min(r.get(k, math.inf) for r in runs) for k in set().union(*runs)}
+
+
+def exponent(results, stage):
+    sizes = sorted(int(n) for n in results if results[n].get(stage, 0) > 0)
+    if len(sizes) < 2: return None
+    lo, hi = sizes[0], sizes[-1]
+    return math.log(results[str(hi)][stage] / results[str(lo)][stage]) / math.log(hi / lo)
+
+
+def table(results):
+    sizes = sorted(results, key=int)
+    stages = [s for s in COLUMNS + tuple(sorted({k for r in results.values() for k in r} - set(COLUMNS)))
+              if any(s in results[n] for n in sizes)]
+    lines = [f"{'stage':<12}" + "".join(f"{n + ' stores':>14}" for n in sizes) + f"{'scaling':>10}"]
+    for stage in stages + ["total"]:
+        row = [results[n].get(stage) if stage != "total" else sum(results[n].values()) for n in sizes]
+        if stage == "total":
+            e = exponent({n: {"total": v} for n, v in zip(sizes, row)}, "total")
+        else:
+            e = exponent(results, stage)
+        lines.append(f"{stage:<12}" + "".join(f"{v:>11.1f} ms" if v is not None else f"{'—':>14}" for v in row)
+                     + (f"{f'n^{e:.2f}':>10}" if e is not None else ""))
+    return "\n".join(lines)
+
+
+def regressions(results, baseline):
+    """[(size, stage, old ms, new ms)] for stages over TOLERANCE × the baseline."""
+    out = []
+    for n, stages in results.items():
+        for stage, ms in stages.items():
+            old = baseline.get(n, {}).get(stage)
+            if old is not None and ms > NOISE_MS and ms > old * TOLERANCE:
+                out.append((n, stage, old, ms))
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--stores", type=int, nargs="+", default=list(SIZES))
+    ap.add_argument("--weeks", type=int, default=4, help="rack & stack period length (2x pulled)")
+    ap.add_argument("--seed", type=int, default=SEED)
+    ap.add_argument("--pdf", type=int, default=0, metavar="N", help="print the system reports and N location PDFs")
+    ap.add_argument("--warehouse", action="store_true", help="load a local DuckDB warehouse and fetch through the queries")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--json", help="save the results here")
+    ap.add_argument("--compare", help="a saved --json run; exit 1 on regressions")
+    args = ap.parse_args(argv)
+
+    results = {}
+    with (PdfRenderer() if args.pdf else contextlib.nullcontext()) as renderer:
+        run_size(min(args.stores), args.weeks, args.seed, warehouse=args.warehouse)  # warm-up: imports and first calls
+        for n in args.stores:
+            results[str(n)] = best([run_size(n, args.weeks, args.seed, args.pdf, renderer, args.warehouse) for _ in range(args.repeat)])
+            print(f"✓ {n} stores: {sum(results[str(n)].values()):.0f} ms", file=sys.stderr)
+        if args.pdf and renderer.error: print(f"✗ PDF: {renderer.error}", file=sys.stderr)
+    print(table(results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"weeks": args.weeks, "seed": args.seed, "warehouse": args.warehouse, "results": results}, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        slow = regressions(results, baseline)
+        for n, stage, old, new in slow:
+            print(f"✗ {n} stores · {stage}: {old:.1f} → {new:.1f} ms ({new / old:.2f}×)")
+        if slow: return 1
+        print(f"✓ no stage over {TOLERANCE:.2f}× {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Provenance-tagged numbers for the AI callouts.
+
+Each number in a callout is interpolated through a `CalloutNumbers` builder
+instead of being formatted straight into the prose:
+
+    n = CalloutNumbers(K.verify_data)
+    text = n.text("sales", f"... up {n('.1f', 'Waco_sss')}% ... a ${n('.2f', 'Burleson_avg_tkt', 'Waco_avg_tkt', calc=sub)} gap")
+
+`n(fmt, *keys, calc=None)` reads `keys` from the verification dictionary. It
+applies `calc` to them, or takes the single key's value when there is no
+`calc`. It formats the result with `fmt`, a format spec or a callable like
+`fm`, and records a `Tagged` number with its text, source keys and computation.
+`n.text(name, marked)` returns a `Callout`. That is the plain callout string,
+carrying:
+- its tagged numbers;
+- the prose left once they are removed (`residue`);
+- the set of keys it read (`sources`).
+
+Verification is then a lookup with no text parsing. `Callout.check(data)`
+recomputes each number from `data` and compares the rendered text: constant work
+per number. Derived values such as a ticket gap, a percent change or a
+system-weighted rate verify exactly, because their computation is recorded.
+Only numbers typed into the prose by hand appear in `residue`. The
+`KnownValues` search is kept for those.
+"""
+
+import re
+
+OPEN, CLOSE = "\ue000", "\ue001"  # private-use marks around each tagged number while the text is assembled
+MARKED = re.compile(f"{OPEN}[^{CLOSE}]*{CLOSE}")
+
+
+class Tagged:
+    """One interpolated number: rendered text, source keys, computation and format."""
+
+    __slots__ = ("text", "keys", "calc", "fmt")
+
+    def __init__(self, text, keys, calc, fmt):
+        self.text, self.keys, self.calc, self.fmt = text, keys, calc, fmt
+
+    def render(self, data):
+        vals = [data[k] for k in self.keys]
+        return render(self.calc(*vals) if self.calc else vals[0], self.fmt)
+
+
+def render(value, fmt):
+    return fmt(value) if callable(fmt) else format(value, fmt)
+
+
+class Callout(str):
+    """Callout text (a plain str) with its tagged numbers, untagged prose and source keys."""
+
+    def __new__(cls, marked, name, numbers):
+        self = super().__new__(cls, marked.replace(OPEN, "").replace(CLOSE, ""))
+        self.name, self.numbers = name, numbers
+        self.residue = MARKED.sub("", marked)
+        self.sources = frozenset(k for t in numbers for k in t.keys)
+        return self
+
+    def check(self, data):
+        """Error strings for tagged numbers that no longer render the same from `data`."""
+        errors = []
+        for t in self.numbers:
+            try:
+                text = t.render(data)
+            except (KeyError, TypeError, ValueError, ZeroDivisionError) as e:
+                text = f"{type(e).__name__}"
+            if text != t.text:
+                errors.append(f"[{self.name}] {t.text} does not match {' / '.join(t.keys)} (now {text})")
+        return errors
+
+
+class CalloutNumbers:
+    """
+    Builder for one report's callouts over a verification dictionary (see module docstring).
+    `cache` ({(fmt, keys, calc): Tagged}) may be shared by several builders over the same data,
+    so a number quoted twice, or again when a callout is regenerated, is computed once.
+    """
+
+    def __init__(self, data, cache=None):
+        self.data = data
+        self.cache = {} if cache is None else cache
+        self.numbers = []  # tagged since the last text()
+
+    def __call__(self, fmt, *keys, calc=None):
+        t = self.cache.get((fmt, keys, calc))
+        if t is None:
+            vals = [self.data[k] for k in keys]
+            t = self.cache[fmt, keys, calc] = Tagged(render(calc(*vals) if calc else vals[0], fmt), keys, calc, fmt)
+        self.numbers.append(t)
+        return f"{OPEN}{t.text}{CLOSE}"
+
+    def text(self, name, marked):
+        numbers, self.numbers = self.numbers, []
+        return Callout(marked, name, numbers)
@@ -0,0 +1,215 @@
+"""
+Columnar daily fact store.
+
+Holds daily measures (net sales, payable hours, pay, scheduled hours) as one
+float64 (location x day) array per measure instead of nested
+`defaultdict(dict)`s keyed by location and `date`. Rows are addressed by a
+location index and a day offset from the store's epoch (its first day), so any
+week or period is a plain slice — an O(1), zero-copy NumPy view that can be
+handed straight to the guideline engine or the KPI aggregation.
+
+Weekly-grain query results (weekly sales, catering) can live in the same store:
+load each row on its week's Monday and only read them through week-aligned
+windows. `RollingWindows` adds prefix sums for O(1) totals over any window.
+
+Prior-year values can be derived locally instead of queried: with a year of
+history in the store, `add_prior_year()` shifts CY measures forward 364 days —
+the same weekday a year earlier, matching ORDER_METRICS' `day_dow` alignment.
+
+`save()` writes the store as one `.npy` file per measure; `DailyFacts.open()`
+memory-maps it read-only, so worker processes share one copy of the arrays
+through the page cache instead of each unpickling its own.
+"""
+
+import json
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+MEASURES = ("sales", "hours", "pay", "scheduled")
+PY_SHIFT_DAYS = 364  # 52 weeks: Monday lines up with Monday
+
+
+class DailyFacts:
+    """(location x day) float64 arrays per measure over a fixed date window."""
+
+    def __init__(self, locations, start, end, measures=MEASURES):
+        self.locations = list(locations)
+        self.loc_index = {loc: i for i, loc in enumerate(self.locations)}
+        self.start = start  # epoch: day offset 0
+        self.n_days = (end - start).days + 1
+        if self.n_days <= 0:
+            raise ValueError(f"empty date window {start} – {end}")
+        self.data = {m: np.zeros((len(self.locations), self.n_days)) for m in measures}
+
+    @property
+    def end(self):
+        return self.start + timedelta(days=self.n_days - 1)
+
+    def offset(self, day):
+        """Day offset of `day` from the store epoch."""
+        return (day - self.start).days
+
+    def day(self, offset):
+        return self.start + timedelta(days=offset)
+
+    def load(self, rows, *measures):
+        """
+        Load query rows shaped (location, date, value, ...) — one trailing value per
+        measure, e.g. `load(daily_labor_raw, "hours", "pay")`. Dates may be `date`
+        objects or ISO strings. Later rows overwrite earlier ones, like dict
+        assignment. Rows for unknown locations or dates outside the window are
+        skipped, as the query's BETWEEN filter would. Returns the rows loaded.
+        """
+        for m in measures:
+            if m not in self.data:
+                self.data[m] = np.zeros((len(self.locations), self.n_days))
+        cols = [self.data[m] for m in measures]
+        n = 0
+        for loc, dt, *vals in rows:
+            li = self.loc_index.get(loc)
+            if li is None: continue
+            off = self.offset(dt if isinstance(dt, date) else date.fromisoformat(dt))
+            if not 0 <= off < self.n_days: continue
+            for col, v in zip(cols, vals):
+                col[li, off] = v or 0
+            n += 1
+        return n
+
+    def window(self, measure, start, n_days):
+        """Zero-copy (location x n_days) view beginning at `start`."""
+        off = self.offset(start)
+        if off < 0 or off + n_days > self.n_days:
+            raise KeyError(f"{start} + {n_days}d is outside {self.start} – {self.end}")
+        return self.data[measure][:, off:off + n_days]
+
+    def week(self, measure, week_start):
+        """Zero-copy (location x 7) view of one Mon–Sun week."""
+        return self.window(measure, week_start, 7)
+
+    def get(self, measure, location, day):
+        """Single value (0 when the location-day has no row)."""
+        return self.data[measure][self.loc_index[location], self.offset(day)].item()
+
+    def totals(self, start, n_days, measures=None):
+        """Per-location sums over a window: {measure: (L,) array}."""
+        return {m: self.window(m, start, n_days).sum(axis=1) for m in (measures or self.data)}
+
+    def add(self, measure, values):
+        """Attach a derived (location x day) measure, e.g. daily guideline hours."""
+        values = np.asarray(values, dtype=float)
+        if values.shape != (len(self.locations), self.n_days):
+            raise ValueError(f"{measure}: expected shape {(len(self.locations), self.n_days)}, got {values.shape}")
+        self.data[measure] = values
+
+    def shift(self, measure, days):
+        """`measure` as of `days` earlier on each day: (location x day), 0 before the epoch."""
+        src = self.data[measure]
+        out = np.zeros_like(src)
+        if 0 <= days < self.n_days:
+            out[:, days:] = src[:, :self.n_days - days]
+        elif days < 0:
+            raise ValueError(f"shift must look back, got {days} days")
+        return out
+
+    def save(self, directory):
+        """Write every measure to `directory` (<measure>.npy plus meta.json) for `DailyFacts.open`."""
+        os.makedirs(directory, exist_ok=True)
+        for m, arr in self.data.items():
+            np.save(os.path.join(directory, f"{m}.npy"), arr)
+        meta = {"locations": self.locations, "start": self.start.isoformat(), "n_days": self.n_days,
+                "measures": list(self.data)}
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        return directory
+
+    @classmethod
+    def open(cls, directory, mmap_mode="r"):
+        """A store saved by `save()`, arrays memory-mapped (read-only by default; None loads them)."""
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        facts = cls.__new__(cls)
+        facts.locations = meta["locations"]
+        facts.loc_index = {loc: i for i, loc in enumerate(facts.locations)}
+        facts.start = date.fromisoformat(meta["start"])
+        facts.n_days = meta["n_days"]
+        facts.data = {m: np.load(os.path.join(directory, f"{m}.npy"), mmap_mode=mmap_mode) for m in meta["measures"]}
+        return facts
+
+    def add_prior_year(self, pairs, days=PY_SHIFT_DAYS):
+        """
+        Derive PY measures by index shift, e.g. `{"amount": "amount_py"}`. Days whose
+        PY date falls before the store epoch get 0 — open the store at least `days`
+        before the first reported week. Returns the first day with full PY history.
+        """
+        for cy, py in dict(pairs).items():
+            self.add(py, self.shift(cy, days))
+        return self.day(days)
+
+
+class RollingWindows:
+    """
+    Prefix-sum aggregator over a `DailyFacts` store.
+
+    Cumulative sums are built once per measure (per location and for the system
+    total), after which the sum over any window — a week, 4, 13 or 52 weeks — is
+    two array reads per location, independent of window length. Totals match a
+    day-by-day sum up to float rounding (~1e-12 relative).
+    """
+
+    def __init__(self, facts):
+        self.facts = facts
+        self._cum = {}
+        self._sys_cum = {}
+        self.refresh()
+
+    def refresh(self, measures=None):
+        """(Re)build prefix sums, e.g. after loading or adding a measure."""
+        for m in measures or self.facts.data:
+            arr = self.facts.data[m]
+            cum = np.zeros((arr.shape[0], arr.shape[1] + 1))
+            np.cumsum(arr, axis=1, out=cum[:, 1:])
+            self._cum[m] = cum
+            self._sys_cum[m] = np.concatenate(([0.0], np.cumsum(arr.sum(axis=0))))
+
+    @property
+    def measures(self):
+        return tuple(self._cum)
+
+    def _bounds(self, start, n_days):
+        a = self.facts.offset(start)
+        if a < 0 or a + n_days > self.facts.n_days:
+            raise KeyError(f"{start} + {n_days}d is outside {self.facts.start} – {self.facts.end}")
+        return a, a + n_days
+
+    def total(self, measure, start, n_days):
+        """Per-location sum over one window: (L,) array."""
+        a, b = self._bounds(start, n_days)
+        cum = self._cum[measure]
+        return cum[:, b] - cum[:, a]
+
+    def totals(self, start, n_days, measures=None):
+        """{measure: (L,) array} for one window — same shape as `DailyFacts.totals`."""
+        return {m: self.total(m, start, n_days) for m in (measures or self._cum)}
+
+    def windows(self, measure, starts, n_days):
+        """Per-location sums for many equal-length windows at once: (L, len(starts))."""
+        bounds = [self._bounds(s, n_days) for s in starts]
+        a = np.array([x for x, _ in bounds], dtype=int)
+        b = np.array([y for _, y in bounds], dtype=int)
+        cum = self._cum[measure]
+        return cum[:, b] - cum[:, a]
+
+    def system(self, measure, start, n_days, locations=None):
+        """System sum over one window, optionally restricted to `locations` (e.g. comps)."""
+        if locations is not None:
+            idx = [self.facts.loc_index[loc] for loc in locations]
+            return self.total(measure, start, n_days)[idx].sum().item()
+        a, b = self._bounds(start, n_days)
+        return (self._sys_cum[measure][b] - self._sys_cum[measure][a]).item()
+
+    def trailing(self, measure, end, n_weeks):
+        """Per-location sum over the `n_weeks` weeks ending on `end` (inclusive)."""
+        start = end - timedelta(days=7 * n_weeks - 1)
+        return self.total(measure, start, 7 * n_weeks)
@@ -0,0 +1,89 @@
+"""
+Known-value index for callout verification.
+
+`KnownValues.from_kpis(K)` collects every percentage and dollar figure a weekly
+callout may quote from `K.verify_data` and the system totals. It is built once
+per report into two sorted lists. `check(name, text)` then finds each number in
+the text with a bisect range search: O(k log n) for k numbers against n known
+values. The old check rebuilt both sets for every callout in every round and
+scanned them linearly.
+
+The tolerances are unchanged. A percentage matches a known value within
+`PCT_TOLERANCE` points, compared after rounding both to 0.1. A dollar amount
+matches within `DOLLAR_TOLERANCE` of the known value. Candidates inside the
+bisected range are confirmed with the original comparison, so results agree
+exactly with a linear scan. Percentages under 1.0 and dollars under $100 are not
+checked.
+
+To verify a new metric, add its `verify_data` suffix to the key lists below.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+
+PCT_TOLERANCE = 0.2  # percentage points
+DOLLAR_TOLERANCE = 0.06  # of the known value
+MIN_PCT, MIN_DOLLARS = 1.0, 100
+EPS = 1e-9  # widens the bisect range; the exact comparison decides
+
+# verify_data suffixes: "{loc}_{key}" and "{loc}_w{wi}_{key}"
+PCT_KEYS = ("labor_pct", "vs_guide_pct", "sss", "sst", "food_addon_rate", "queso_rate", "bev_rate")
+WEEKLY_PCT_KEYS = ("labor_pct", "ovation_r")
+DOLLAR_KEYS = ("sales", "cat_amt", "cat_py_amt")
+WEEKLY_DOLLAR_KEYS = ("sales", "cat_amt")
+
+PCT_RE = re.compile(r"(\d+\.\d+)%")
+DOLLAR_RE = re.compile(r"\$([0-9,]+(?:\.\d+)?)")
+
+
+class KnownValues:
+    """Sorted known percentages (abs, rounded to 0.1) and positive dollar amounts."""
+
+    def __init__(self, pcts=(), dollars=()):
+        self.pcts = sorted(set(pcts))
+        self.dollars = sorted({d for d in dollars if d > 0})
+
+    @classmethod
+    def from_kpis(cls, K, weeks=4):
+        """Every location metric and trailing-week value in `K.verify_data`, plus the system totals."""
+        vd = K.verify_data
+        pcts, dollars = [], []
+        for loc in K.locations:
+            pcts += [vd.get(f"{loc}_{key}") for key in PCT_KEYS]
+            pcts += [vd.get(f"{loc}_w{wi}_{key}") for wi in range(weeks) for key in WEEKLY_PCT_KEYS]
+            dollars += [vd.get(f"{loc}_{key}") for key in DOLLAR_KEYS]
+            dollars += [vd.get(f"{loc}_w{wi}_{key}") for wi in range(weeks) for key in WEEKLY_DOLLAR_KEYS]
+        pcts = [round(abs(v), 1) for v in pcts if v is not None]
+        for loc in K.locations:  # catering penetration
+            s, c = vd.get(f"{loc}_sales", 0), vd.get(f"{loc}_cat_amt", 0)
+            if s > 0: pcts.append(round(c / s * 100, 1))
+        pcts += [round(abs(K.sys_sss), 1) if K.sys_sss else 0, round(abs(K.sys_sst), 1) if K.sys_sst else 0,
+                 round(K.sys_lp, 1), round(K.sys_cat / K.sys_amt * 100, 1) if K.sys_amt else 0]
+        dollars += [K.sys_amt, K.sys_cat, K.sys_pay]
+        return cls(pcts, [d for d in dollars if d])
+
+    def has_pct(self, value):
+        ks = self.pcts
+        lo = bisect_left(ks, value - PCT_TOLERANCE - EPS)
+        hi = bisect_right(ks, value + PCT_TOLERANCE + EPS, lo)
+        return any(abs(value - kv) < PCT_TOLERANCE for kv in ks[lo:hi])
+
+    def has_dollars(self, value):
+        # |value - kv| < tol * max(kv, 1)  =>  kv within value/(1+tol) .. value/(1-tol), or within tol of value below $1
+        ks = self.dollars
+        lo = bisect_left(ks, min(value / (1 + DOLLAR_TOLERANCE), value - DOLLAR_TOLERANCE) - EPS)
+        hi = bisect_right(ks, max(value / (1 - DOLLAR_TOLERANCE), value + DOLLAR_TOLERANCE) + EPS, lo)
+        return any(abs(value - kv) / max(kv, 1) < DOLLAR_TOLERANCE for kv in ks[lo:hi])
+
+    def check(self, name, text):
+        """Error strings for every percentage and dollar amount in `text` that matches no known value."""
+        errors = []
+        for pct_str in PCT_RE.findall(text):
+            pct_val = round(float(pct_str), 1)
+            if pct_val >= MIN_PCT and not self.has_pct(pct_val):
+                errors.append(f"[{name}] {pct_val}% not found in any known metric")
+        for d_str in DOLLAR_RE.findall(text):
+            d_val = float(d_str.replace(",", ""))
+            if d_val >= MIN_DOLLARS and not self.has_dollars(d_val):
+                errors.append(f"[{name}] ${d_val:,.0f} not found in any known value")
+        return errors
@@ -0,0 +1,321 @@
+"""
+Per-location Weekly Flash renderer (weekly-flash-report-skill layout).
+
+Renders one location's flash straight from a `WeeklyKpis` (see weekly_kpis.py)
+instead of re-running that skill's eleven single-location queries: the 4-week
+`loc_weekly` history, reviews and catering come from the shared structures and the
+labor daily breakdown reads the fact store's daily sales / guideline / scheduled /
+actual arrays. Disc # needs `discounts_raw` in the inputs and the GM message's
+streak and milestone lines use `history_raw` when present
+(`query_planner.consolidated_report(..., flash=True)` pulls both).
+"""
+
+from datetime import timedelta
+
+from assets import localize_css
+from html_stream import HtmlWriter, PageTemplate, RowTemplate
+
+# ============================================================
+# HELPERS (from weekly-flash-report-skill references/helpers.md)
+# ============================================================
+def fm(v, d=0):
+    if v is None or v == 0: return "$0"
+    return f"${v:,.{d}f}"
+def fn(v, d=0):
+    if v is None: return "—"
+    return f"{v:,.{d}f}"
+def fp(v, d=1):
+    return f"{v:,.{d}f}%" if v else "—"
+def pct_chg(current, prior):
+    return ((current - prior) / prior) * 100 if prior else None
+def pill_sss(v):
+    if v is None: return '<span class="pill pill-neutral">N/A</span>'
+    sign = "+" if v >= 0 else ""
+    cls = "pill-green" if v >= 0 else "pill-red"
+    return f'<span class="pill {cls}">{sign}{v:.1f}%</span>'
+def pill_labor_diff(v):
+    if v is None: return '<span class="pill pill-neutral">—</span>'
+    sign = "+" if v >= 0 else ""
+    cls = "pill-red" if v > 0.5 else ("pill-green" if v < -0.5 else "pill-yellow")
+    return f'<span class="pill {cls}">{sign}{v:.1f}</span>'
+def pill_labor_ratio(actual, guide):
+    if not guide: return '<span class="pill pill-neutral">—</span>'
+    r = (actual / guide) * 100
+    cls = "pill-red" if r > 100.5 else ("pill-green" if r < 99.5 else "pill-yellow")
+    return f'<span class="pill {cls}">{r:.1f}%</span>'
+def pill_hrs_vs_sch(v):
+    if v is None: return '<span class="pill pill-neutral">—</span>'
+    sign = "+" if v >= 0 else ""
+    cls = "pill-green" if v < -0.5 else ("pill-red" if v > 0.5 else "pill-yellow")
+    return f'<span class="pill {cls}">{sign}{v:.1f}</span>'
+def pill_labor_pct(v):
+    if not v: return '<span class="pill pill-neutral">—</span>'
+    cls = "pill-green" if v < 25 else ("pill-yellow" if v < 30 else "pill-red")
+    return f'<span class="pill {cls}">{v:.1f}%</span>'
+def pill_rating(v):
+    if v is None: return '<span class="pill pill-neutral">—</span>'
+    cls = "pill-green" if v >= 4.6 else ("pill-yellow" if v >= 4.0 else "pill-red")
+    return f'<span class="pill {cls}">{v:.1f}</span>'
+def kpi_badge(v, suffix="vs PY"):
+    if v is None: return f'<div class="kpi-change neutral">N/A {suffix}</div>'
+    cls = "positive" if v >= 0 else "negative"
+    arrow = "&#9650;" if v >= 0 else "&#9660;"
+    sign = "+" if v >= 0 else ""
+    return f'<div class="kpi-change {cls}">{arrow} {sign}{v:.1f}% {suffix}</div>'
+def wk_short(w): return w.strftime("%b %-d")
+def wk_long(w):
+    e = w + timedelta(days=6)
+    return f"{w.strftime('%B %-d')} – {e.strftime('%-d')}, {e.year}"
+def wk_range(w):
+    e = w + timedelta(days=6)
+    return f"{w.strftime('%b %-d')} – {e.strftime('%-d')}, {e.year}"
+
+def slug(location): return location.lower().replace(" ", "_")
+def html_path(location): return f"/home/claude/weekly_flash_{slug(location)}.html"
+def pdf_filename(location, week_start): return f"Weekly Flash - {location} - {wk_range(week_start)}".title() + ".pdf"
+
+# ============================================================
+# CSS (weekly-flash-report-skill references/html_template.md, compact portrait)
+# ============================================================
+CSS = """@import url('https://fonts.googleapis.com/css2?family=Source+Sans+3:ital,wght@0,300;0,400;0,500;0,600;0,700;0,800;1,400&display=swap');
+:root{--fuego-red:#DE3C00;--fuego-black:#352F2E;--fuego-charcoal:#232021;--fuego-gold:#A57E39;--fuego-tan:#DBCBBF;--fuego-teal:#86CAC7;--green:#2e7d5b;--green-bg:#e0f2eb;--red:#c13515;--red-bg:#fde8e3;--yellow:var(--fuego-gold);--yellow-bg:#faf2e4;--text-primary:#232021;--text-secondary:#7a706a;--bg:#F4F0EC;--card-bg:#ffffff;--border:#d9cfc7;}
+*{margin:0;padding:0;box-sizing:border-box;}
+body{font-family:'Source Sans 3','Myriad Pro',-apple-system,BlinkMacSystemFont,sans-serif;background:var(--bg);color:var(--text-primary);line-height:1.4;-webkit-font-smoothing:antialiased;font-size:11px;}
+.report-container{max-width:100%;margin:0 auto;padding:4px;min-height:100vh;display:flex;flex-direction:column;justify-content:space-between;}
+.header{border-radius:10px;padding:12px 20px;color:#fff;margin-bottom:0;position:relative;overflow:hidden;}
+.header-b3{background:var(--fuego-charcoal);text-align:center;padding:14px 20px 12px;position:relative;}
+.header-b3-tag{display:inline-block;font-size:8px;font-weight:700;letter-spacing:2px;text-transform:uppercase;padding:2px 10px;border-radius:3px;margin-bottom:8px;background:rgba(134,202,199,0.15);color:var(--fuego-teal);border:1px solid rgba(134,202,199,0.3);}
+.header-b3 h1{font-size:22px;font-weight:800;letter-spacing:-0.5px;margin-bottom:6px;text-shadow:0 0 40px rgba(134,202,199,0.2);}
+.header-b3-meta{display:flex;align-items:center;justify-content:center;gap:8px;font-size:10px;opacity:0.75;}
+.header-b3-pill{font-size:9px;font-weight:600;letter-spacing:0.5px;padding:2px 8px;border-radius:14px;border:1px solid rgba(134,202,199,0.5);color:var(--fuego-teal);box-shadow:0 0 8px rgba(134,202,199,0.15);}
+.header-b3-dot{color:var(--fuego-gold);font-size:14px;}
+.header-b3 .b3-bar-top,.header-b3 .b3-bar-bottom{position:absolute;left:0;right:0;}
+.header-b3 .b3-bar-top{top:0;}.header-b3 .b3-bar-bottom{bottom:0;}
+.b3-v5 .b3-bar-top{height:2px;background:var(--fuego-teal);box-shadow:0 0 12px rgba(134,202,199,0.6),0 0 30px rgba(134,202,199,0.25);}
+.b3-v5 .b3-bar-bottom{height:2px;background:var(--fuego-teal);box-shadow:0 0 12px rgba(134,202,199,0.6),0 0 30px rgba(134,202,199,0.25);}
+.kpi-row{display:grid;grid-template-columns:repeat(4,1fr);gap:6px;}
+.kpi-card{background:var(--card-bg);border-radius:8px;padding:8px 10px;border:1px solid var(--border);border-top:3px solid var(--fuego-teal);}
+.kpi-card .kpi-label{font-size:8px;font-weight:500;color:var(--text-secondary);text-transform:uppercase;letter-spacing:0.5px;margin-bottom:4px;}
+.kpi-card .kpi-value{font-size:18px;font-weight:700;color:var(--text-primary);line-height:1.1;}
+.kpi-card .kpi-change{display:inline-flex;align-items:center;gap:3px;font-size:9px;font-weight:600;margin-top:4px;padding:1px 6px;border-radius:4px;}
+.kpi-change.positive{color:var(--green);background:var(--green-bg);}
+.kpi-change.negative{color:var(--red);background:var(--red-bg);}
+.kpi-change.neutral{color:var(--yellow);background:var(--yellow-bg);}
+.section{background:var(--card-bg);border-radius:8px;border:1px solid var(--border);overflow:hidden;}
+.section-header{display:flex;align-items:center;gap:6px;padding:5px 10px;border-bottom:1px solid var(--border);background:#f9f6f3;border-left:3px solid var(--fuego-teal);}
+.section-header .icon{width:18px;height:18px;border-radius:4px;display:flex;align-items:center;justify-content:center;font-size:9px;}
+.icon-sales{background:#fde8e3;color:var(--fuego-red);}.icon-labor{background:#e8f1f0;color:#4a8e8b;}
+.icon-reviews{background:#faf2e4;color:var(--fuego-gold);}.icon-catering{background:#e0f2eb;color:var(--green);}
+.section-header h2{font-size:10px;font-weight:700;color:var(--text-primary);}
+.section-header .section-sub{font-size:8px;color:var(--text-secondary);margin-left:auto;}
+table{width:100%;border-collapse:collapse;font-size:9.5px;}
+thead th{padding:3px 4px;text-align:right;font-weight:600;font-size:7.5px;text-transform:uppercase;letter-spacing:0.3px;color:var(--text-secondary);border-bottom:2px solid var(--border);white-space:nowrap;}
+thead th:first-child{text-align:left;}
+tbody td{padding:3px 4px;text-align:right;border-bottom:1px solid #ede7e0;white-space:nowrap;}
+tbody td:first-child{text-align:left;font-weight:600;color:var(--text-primary);}
+tbody tr:last-child td{border-bottom:none;}
+tbody tr:hover{background:#faf7f4;}
+tbody tr.total-row{background:#f7f3ef;font-weight:700;}
+tbody tr.total-row td{border-top:2px solid var(--border);}
+.pill{display:inline-block;padding:1px 5px;border-radius:4px;font-weight:600;font-size:9px;}
+.pill-green{color:var(--green);background:var(--green-bg);}.pill-red{color:var(--red);background:var(--red-bg);}
+.pill-yellow{color:var(--yellow);background:var(--yellow-bg);}.pill-neutral{color:var(--text-secondary);background:#ede7e0;}
+.gm-message{background:linear-gradient(135deg,#f9f6f3,#f0ebe5);border:1px solid var(--fuego-tan);border-left:4px solid var(--fuego-teal);border-radius:8px;padding:8px 12px;font-size:9px;line-height:1.5;color:var(--fuego-charcoal);}
+.gm-message .gm-label{font-size:8px;font-weight:700;text-transform:uppercase;letter-spacing:1px;color:#5a9e9b;margin-bottom:4px;}
+.two-col{display:grid;grid-template-columns:1fr 1fr;gap:8px;}
+.footer{text-align:center;padding:2px;font-size:8px;color:var(--text-secondary);}
+@media print{body{background:var(--bg);-webkit-print-color-adjust:exact;print-color-adjust:exact;}.report-container{max-width:100%;padding:0;}.section{break-inside:avoid;}.kpi-row{break-inside:avoid;}.two-col{break-inside:avoid;}.gm-message{break-inside:avoid;}}"""
+
+CW_STYLE = ' style="background:#f5efe9;"'
+
+# ============================================================
+# GM MESSAGE (Headline → Story → Ask, see gm_message_guide.md)
+# ============================================================
+def gm_message(K, loc):
+    """Data-driven draft: trend headline, the labor/review/catering story, one ask for next week."""
+    lw, ws = K.loc_weekly[loc], K.ws
+    cw = lw[0]
+    series = dict(K.history.get(loc, {}))
+    series.update({w: lw[wi]["amount"] for wi, w in enumerate(K.week_starts)})
+    weeks = sorted(w for w in series if w <= ws)
+
+    # Headline: streak, then multi-month milestone, then the comp
+    growing = len(weeks) > 1 and series[weeks[-1]] > series[weeks[-2]]
+    streak = 0
+    for a, b in zip(weeks[-2::-1], weeks[:0:-1]):  # (prior, week) pairs walking back from ws
+        if (series[b] > series[a]) != growing: break
+        streak += 1
+    higher = [w for w in weeks[:-1] if series[w] >= cw["amount"]]
+    if streak >= 3:
+        headline = f"{streak} straight weeks of sales {'growth' if growing else 'decline'} — {'keep up the momentum!' if growing else 'time to find what changed.'}"
+    elif higher and (ws - max(higher)).days >= 56:
+        headline = f"Strongest sales week since {max(higher):%B} at {fm(cw['amount'])}."
+    elif not higher and len(weeks) > 4:
+        headline = f"Strongest sales week in the last {len(weeks)} weeks at {fm(cw['amount'])}."
+    elif cw["has_py"]:
+        headline = f"Sales of {fm(cw['amount'])} were {'up' if cw['sss'] >= 0 else 'down'} {abs(cw['sss']):.1f}% vs last year."
+    else:
+        headline = f"Sales of {fm(cw['amount'])} this week, {'up' if growing else 'down'} from last week as the store ramps."
+
+    # Story: day-level labor concentration, then reviews / catering
+    days = [ws + timedelta(days=i) for i in range(7)]
+    hrs, guide, pay = K.daily(loc, "hours"), K.daily(loc, "guide"), K.daily(loc, "pay")
+    over = [(h - g, d) for h, g, d in zip(hrs, guide, days) if g > 0]
+    worst_over, worst_day = max(over) if over else (0, None)
+    total_over = sum(x for x, _ in over if x > 0)
+    ratio = cw["vs_guide_pct"]
+    story = []
+    if worst_day and worst_over > 0.10 * guide[days.index(worst_day)]:
+        story.append(f"{worst_day:%A} alone ran {worst_over:.0f} hours over guideline"
+                     + (f" — {worst_over / total_over * 100:.0f}% of the week's overage." if total_over > worst_over else "."))
+    elif ratio and ratio < 93:
+        story.append(f"The team ran at {ratio:.0f}% of guideline hours — make sure peak periods were fully covered.")
+    ov = [lw[wi].get("ovation_r") for wi in (2, 1, 0) if wi in lw]
+    if len(ov) == 3 and None not in ov and ov[0] > ov[1] > ov[2]:
+        story.append(f"Ovation has slipped two weeks running ({ov[0]:.1f} → {ov[1]:.1f} → {ov[2]:.1f}), a pattern rather than a blip.")
+    elif cw["cat_amt"] == 0:
+        story.append("No catering orders came in this week.")
+    elif cw["cat_py_amt"] and cw["cat_amt"] < cw["cat_py_amt"] and cw["has_py"] and cw["sss"] >= 0:
+        story.append("Catering trailed last year even as store sales held up — the dine-in business is carrying the week.")
+
+    # Ask: one scheduling priority for next week
+    rate = cw["labor_pay"] / cw["labor_hrs"] if cw["labor_hrs"] else 0
+    if worst_day and worst_over > 0.10 * guide[days.index(worst_day)]:
+        ask = f"Review next {worst_day:%A}'s schedule — bringing it in line with guideline saves ~{fm(worst_over * rate)}/week."
+    elif ratio and ratio < 93:
+        under_day = min(over)[1] if over else None
+        ask = f"Check {under_day:%A} staffing against its sales when you build next week's schedule." if under_day else "Check peak-hour coverage in next week's schedule."
+    elif cw["cat_amt"] == 0:
+        ask = "Pick two local businesses to pitch catering to this week."
+    else:
+        ask = "Keep the same scheduling discipline going into next week."
+    return " ".join([headline] + story + [ask])
+
+# ============================================================
+# ROW TEMPLATES (see html_stream.py)
+# ============================================================
+SALES_ROW = RowTemplate('<tr{style}><td>{week}</td><td>{amount}</td><td>{sss}</td><td>{orders}</td><td>{sst}</td><td>{avg_tkt}</td><td>{tkt_chg}</td>'
+                        '<td>{disc_n}</td><td>{disc_pct}</td><td>{cat_ords}</td><td>{cat_amt}</td><td>{cat_py}</td></tr>')
+REVIEW_ROW = RowTemplate('<tr{style}><td>{week}</td><td>{google}</td><td>{google_n}</td><td>{ovation}</td><td>{ovation_n}</td><td>{yelp}</td><td>{yelp_n}</td></tr>')
+CATERING_ROW = RowTemplate('<tr{style}><td>{week}</td><td>{cat_ords}</td><td>{cat_amt}</td><td>{cat_py}</td><td>{cat_vs}</td></tr>')
+LABOR_ROW = RowTemplate('<tr{style}><td>{label}</td><td>{sales}</td><td>{guide}</td><td>{sch}</td><td>{hrs}</td><td>{vs_guide}</td>'
+                        '<td>{vs_guide_pct}</td><td>{hrs_vs_sch}</td><td>{pay}</td><td>{labor_pct}</td><td>{splh}</td></tr>')
+
+def week_rows(K, loc):
+    """Fields for every weekly table (sales, reviews, catering, labor trends), current week first."""
+    lw, has_py = K.loc_weekly[loc], K.loc_weekly[loc][0]["has_py"]
+    comp = (lambda v: v) if has_py else (lambda v: None)  # non-comp stores show N/A on every row
+    for wi, ws_i in enumerate(K.week_starts):
+        w = lw[wi]
+        is_cw = wi == 0
+        b = lambda x: f"<strong>{x}</strong>" if is_cw else x
+        label = b(wk_short(ws_i))
+        yield {"style": CW_STYLE if is_cw else "", "week": label, "label": label,
+               "amount": b(fm(w["amount"])), "sss": pill_sss(comp(w["sss"])), "orders": b(fn(w["orders"])), "sst": pill_sss(comp(w["sst"])),
+               "avg_tkt": b(fm(w["avg_tkt"],2)), "tkt_chg": pill_sss(comp(w["tkt_chg"])),
+               "disc_n": b(fn(w["disc_count"]) if "disc_count" in w else "—"),
+               "disc_pct": b(fp(w["discount"]/w["amount"]*100 if w["amount"] else 0)),
+               "cat_ords": b(fn(w["cat_ords"])), "cat_amt": b(fm(w["cat_amt"])), "cat_py": b(fm(w["cat_py_amt"])),
+               "cat_vs": pill_sss(pct_chg(w["cat_amt"], w["cat_py_amt"]) if w["cat_py_amt"] else None),
+               "google": pill_rating(w["google_r"]), "google_n": b(fn(w["google_n"])), "ovation": pill_rating(w["ovation_r"]),
+               "ovation_n": b(fn(w["ovation_n"])), "yelp": pill_rating(w["yelp_r"]), "yelp_n": b(fn(w["yelp_n"]) if w["yelp_n"] else "—"),
+               "sales": b(fm(w["amount"])), "guide": b(fn(w["guide_total"],1)), "sch": b(fn(w["sch_hrs"],1)), "hrs": b(fn(w["labor_hrs"],1)),
+               "vs_guide": pill_labor_diff(w["vs_guide_n"]), "vs_guide_pct": pill_labor_ratio(w["labor_hrs"],w["guide_total"]),
+               "hrs_vs_sch": pill_hrs_vs_sch(w["labor_hrs"]-w["sch_hrs"] if w["sch_hrs"] else None),
+               "pay": b(fm(w["labor_pay"])), "labor_pct": pill_labor_pct(w["labor_pct"]), "splh": b(fm(w["splh"],2))}
+
+def daily_labor_rows(K, loc):
+    """Labor daily breakdown, Mon..Sun plus the total row (Monday dimmed: closed, boundary hours only)."""
+    sales, guide, sch, hrs, pay = (K.daily(loc, m) for m in ("sales", "guide", "scheduled", "hours", "pay"))
+    for i in range(7):
+        day = K.ws + timedelta(days=i)
+        label = day.strftime("%a %-m/%-d")
+        if day.weekday() == 0:
+            yield {"style": ' style="opacity:0.5;"', "label": label, "sales": "$0", "guide": "0", "sch": "—", "hrs": fn(hrs[i],1),
+                   "vs_guide": "—", "vs_guide_pct": "—", "hrs_vs_sch": "—", "pay": fm(pay[i]), "labor_pct": "—", "splh": "—"}
+            continue
+        yield {"style": "", "label": label, "sales": fm(sales[i]), "guide": fn(guide[i],1), "sch": fn(sch[i],1), "hrs": fn(hrs[i],1),
+               "vs_guide": pill_labor_diff(hrs[i]-guide[i] if guide[i] else None), "vs_guide_pct": pill_labor_ratio(hrs[i],guide[i]),
+               "hrs_vs_sch": pill_hrs_vs_sch(hrs[i]-sch[i] if sch[i] else None), "pay": fm(pay[i]),
+               "labor_pct": pill_labor_pct(pay[i]/sales[i]*100 if sales[i] else 0), "splh": fm(sales[i]/hrs[i] if hrs[i] else 0,2)}
+    t_sales, t_guide, t_sch, t_hrs, t_pay = sum(sales), sum(guide), sum(sch), sum(hrs), sum(pay)
+    yield {"style": ' class="total-row"', "label": "Total", "sales": fm(t_sales), "guide": fn(t_guide,1), "sch": fn(t_sch,1), "hrs": fn(t_hrs,1),
+           "vs_guide": pill_labor_diff(t_hrs-t_guide), "vs_guide_pct": pill_labor_ratio(t_hrs,t_guide),
+           "hrs_vs_sch": pill_hrs_vs_sch(t_hrs-t_sch if t_sch else None), "pay": fm(t_pay),
+           "labor_pct": pill_labor_pct(t_pay/t_sales*100 if t_sales else 0), "splh": fm(t_sales/t_hrs if t_hrs else 0,2)}
+
+# ============================================================
+# PAGE TEMPLATE (compiled once, with the stylesheet and local fonts bound in)
+# ============================================================
+LABOR_HEAD = ('<thead><tr><th>{}</th><th>Sales</th><th>Guide Hrs</th><th>Sch Hrs</th><th>Actual Hrs</th><th>vs Guide #</th>'
+              '<th>vs Guide %</th><th>Hrs vs Sch</th><th>Labor $</th><th>Labor %</th><th>$ / Labor Hr</th></tr></thead>')
+LOCATION_PAGE = PageTemplate("""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>Weekly Flash Report – {loc}</title>
+<style>{css}@page{{size:A4 portrait;margin:0.2in 0.2in;}}</style></head><body>
+<div class="report-container">
+<div class="header header-b3 b3-v5"><div class="b3-bar-top"></div><div class="header-b-inner"><div class="header-b3-tag">WEEKLY FLASH REPORT</div><h1>{loc}</h1><div class="header-b3-meta"><span class="header-b3-pill">Fuego Tortilla Grill</span><span class="header-b3-dot">&bull;</span><span>{week}</span></div></div><div class="b3-bar-bottom"></div></div>
+<div class="kpi-row">
+<div class="kpi-card"><div class="kpi-label">Weekly Sales</div><div class="kpi-value">{sales}</div>{sales_badge}</div>
+<div class="kpi-card"><div class="kpi-label">Orders</div><div class="kpi-value">{orders}</div>{orders_badge}</div>
+<div class="kpi-card"><div class="kpi-label">Avg Ticket</div><div class="kpi-value">{avg_tkt}</div>{avg_tkt_badge}</div>
+<div class="kpi-card"><div class="kpi-label">Labor %</div><div class="kpi-value">{labor_pct}%</div><div class="kpi-change {labor_cls}">{labor_arrow} {labor_badge}</div></div>
+</div>
+<div class="gm-message"><div class="gm-label">Message to General Manager</div>{gm_msg}</div>
+<div class="section"><div class="section-header"><div class="icon icon-sales">&#128202;</div><h2>Sales Performance</h2><div class="section-sub">Last {n_weeks} Weeks</div></div><table><thead><tr><th>Week</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Tkt</th><th>Tkt vs PY</th><th>Disc #</th><th>Disc %</th><th>Cat #</th><th>Cat $</th><th>Cat $ PY</th></tr></thead><tbody>{*sales}</tbody></table></div>
+<div class="two-col">
+<div class="section"><div class="section-header"><div class="icon icon-reviews">&#11088;</div><h2>Ratings &amp; Reviews</h2></div><table><thead><tr><th>Week</th><th>Google</th><th>#</th><th>Ovation</th><th>#</th><th>Yelp</th><th>#</th></tr></thead><tbody>{*reviews}</tbody></table></div>
+<div class="section"><div class="section-header"><div class="icon icon-catering">&#127919;</div><h2>Catering</h2></div><table><thead><tr><th>Week</th><th>Orders</th><th>Cat $</th><th>Cat $ PY</th><th>vs PY</th></tr></thead><tbody>{*catering}</tbody></table></div>
+</div>
+<div class="section"><div class="section-header"><div class="icon icon-labor">&#128101;</div><h2>Labor | Last Week Daily Breakdown</h2><div class="section-sub">{week}</div></div><table>{labor_head_day}<tbody>{*daily_labor}</tbody></table></div>
+<div class="section"><div class="section-header"><div class="icon icon-labor">&#128200;</div><h2>Labor Trends</h2><div class="section-sub">Last {n_weeks} Weeks</div></div><table>{labor_head_week}<tbody>{*labor_trends}</tbody></table></div>
+<div class="footer">Generated on {today} &middot; Fuego Tortilla Grill – {loc} &middot; Data sourced from Chabi Analytics</div>
+</div></body></html>""", css=localize_css(CSS), labor_head_day=LABOR_HEAD.format("Day"), labor_head_week=LABOR_HEAD.format("Week"))
+
+# ============================================================
+# RENDER
+# ============================================================
+def location_inputs(K, loc, today_str):
+    """Everything render_location_flash reads for `loc` (hashed by the render manifest)."""
+    return {"loc": loc, "today": today_str, "weeks": K.week_starts, "loc_weekly": K.loc_weekly[loc],
+            "history": K.history.get(loc, {}),
+            "daily": {m: K.daily(loc, m) for m in ("sales", "guide", "scheduled", "hours", "pay")}}
+
+
+def render_location_flash(K, loc, today_str, out=None):
+    """
+    One location's flash from a WeeklyKpis: {"html", "gm_msg", "html_path", "pdf_filename"}.
+    With `out` (an open text file) the document streams there and "html" is None.
+    """
+    lw, ws, weeks = K.loc_weekly[loc], K.ws, K.week_starts
+    cw = lw[0]
+    has_py = cw["has_py"]
+
+    # KPI cards: vs PY for comps, vs the trailing average of the prior weeks for new stores
+    if has_py:
+        sss, sst, tkt_chg, kpi_suffix = cw["sss"], cw["sst"], cw["tkt_chg"], "vs PY"
+    else:
+        prior = [lw[wi] for wi in range(1, len(weeks)) if lw[wi]["amount"]]
+        trail_amt = sum(w["amount"] for w in prior) / len(prior) if prior else 0
+        trail_orders = sum(w["orders"] for w in prior) / len(prior) if prior else 0
+        sss, sst = pct_chg(cw["amount"], trail_amt), pct_chg(cw["orders"], trail_orders)
+        tkt_chg = pct_chg(cw["avg_tkt"], trail_amt / trail_orders) if trail_orders else None
+        kpi_suffix = "vs T4W Avg"
+    if cw["guide_total"] > 0:
+        labor_vs_guide_pct = cw["vs_guide_pct"]
+        labor_cls = "positive" if labor_vs_guide_pct <= 100 else "negative"
+        labor_arrow = "&#9660;" if labor_vs_guide_pct <= 100 else "&#9650;"
+        labor_badge_text = f"{labor_vs_guide_pct:.1f}% of Guide"
+    else:
+        labor_cls, labor_arrow, labor_badge_text = "neutral", "", "N/A"
+
+    gm_msg = gm_message(K, loc)
+    weeks_f = list(week_rows(K, loc))  # one field dict per week feeds all four weekly tables
+    doc = HtmlWriter(out)
+    LOCATION_PAGE.write(doc, {
+        "loc": loc, "week": wk_long(ws), "n_weeks": str(len(weeks)),
+        "sales": fm(cw["amount"]), "sales_badge": kpi_badge(sss,kpi_suffix), "orders": fn(cw["orders"]), "orders_badge": kpi_badge(sst,kpi_suffix),
+        "avg_tkt": fm(cw["avg_tkt"],2), "avg_tkt_badge": kpi_badge(tkt_chg,kpi_suffix), "labor_pct": f"{cw['labor_pct']:.1f}",
+        "labor_cls": labor_cls, "labor_arrow": labor_arrow, "labor_badge": labor_badge_text, "gm_msg": gm_msg, "today": today_str,
+    }, {"sales": (SALES_ROW, weeks_f), "reviews": (REVIEW_ROW, weeks_f), "catering": (CATERING_ROW, weeks_f),
+        "daily_labor": (LABOR_ROW, daily_labor_rows(K, loc)), "labor_trends": (LABOR_ROW, weeks_f)})
+    return {"html":doc.getvalue(),"gm_msg":gm_msg,"html_path":html_path(loc),"pdf_filename":pdf_filename(loc, ws)}
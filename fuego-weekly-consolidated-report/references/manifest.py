@@ -0,0 +1,122 @@
+"""
+Render manifest: skip re-rendering reports whose inputs have not changed.
+
+`.render-manifest.json` sits next to the outputs and keeps one entry per report
+with these hashes:
+- `inputs`: the data the renderer reads;
+- `template`: the renderer's source file, i.e. its markup and CSS;
+- `html`: the written HTML;
+- `pdf_settings`: the print options the PDF was made with.
+
+Before rendering, `state()` puts each report in one of three states:
+
+    "fresh"   same inputs and template, HTML (and PDF) still on disk: skip it
+    "pdf"     HTML is current but the PDF is missing or its print settings changed:
+              convert only
+    "render"  anything else: render the HTML
+
+A re-rendered report whose HTML comes out byte-identical (a callout tweak in
+another section, a template edit that does not touch it) keeps its PDF:
+`needs_pdf()` compares the new HTML hash with the recorded one. A re-run after
+one store's data is corrected therefore renders that store's flash and the
+system-level reports, and leaves every other location untouched.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".render-manifest.json"
+HEAVY = ("FACTS", "RW", "GUIDE", "AGM")  # fact store and indexes: their content already shows up in the KPI dicts
+
+
+def _canon(o):
+    if isinstance(o, dict):
+        return sorted(([_canon(k), _canon(v)] for k, v in o.items()), key=repr)
+    if isinstance(o, (list, tuple)):
+        return [_canon(v) for v in o]
+    if isinstance(o, (set, frozenset)):
+        return sorted((_canon(v) for v in o), key=repr)
+    if o is None or isinstance(o, (str, int, float)):
+        return o
+    if hasattr(o, "tolist"):  # numpy arrays and scalars
+        return o.tolist()
+    if hasattr(o, "isoformat"):
+        return o.isoformat()
+    if hasattr(o, "__dict__"):
+        return _canon(vars(o))
+    return repr(o)
+
+
+def fingerprint(*parts):
+    """sha256 of nested dicts/lists/dates/numpy values, independent of dict order."""
+    return hashlib.sha256(json.dumps(_canon(parts), separators=(",", ":")).encode()).hexdigest()
+
+
+def kpi_fingerprint(kpis, *extra):
+    """Fingerprint of a WeeklyKpis / PeriodKpis (every KPI dict, not the fact store) plus `extra`."""
+    return fingerprint({k: v for k, v in vars(kpis).items() if k not in HEAVY}, *extra)
+
+
+def file_hash(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def source_hash(*paths):
+    """Template version: hash of the renderer source files."""
+    return fingerprint([file_hash(p) for p in paths])
+
+
+class RenderManifest:
+    """Manifest in `output_dir`; `pdf_settings` fingerprints the print options (see pdf_renderer.PDF_OPTIONS)."""
+
+    def __init__(self, output_dir, pdf_settings=None, force=False):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.pdf_settings = pdf_settings
+        self.force = force
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        self.stats = {"fresh": 0, "pdf": 0, "render": 0}
+
+    def _pdf_current(self, e):
+        return bool(e.get("pdf_path")) and e.get("pdf_settings") == self.pdf_settings and os.path.exists(e["pdf_path"])
+
+    def state(self, name, inputs, template, pdf=True):
+        """"fresh", "pdf" or "render" (see module docstring)."""
+        e = self.entries.get(name)
+        if (self.force or not e or e["inputs"] != inputs or e["template"] != template
+                or file_hash(e["html_path"]) != e["html"]):
+            s = "render"
+        else:
+            s = "pdf" if pdf and not self._pdf_current(e) else "fresh"
+        self.stats[s] += 1
+        return s
+
+    def outputs(self, name):
+        """(html_path, pdf_path or None) recorded for a fresh report."""
+        e = self.entries[name]
+        return e["html_path"], e.get("pdf_path")
+
+    def needs_pdf(self, name, html_hash):
+        """False when a freshly rendered HTML is byte-identical to the one the current PDF was made from."""
+        e = self.entries.get(name)
+        return self.force or not e or e["html"] != html_hash or not self._pdf_current(e)
+
+    def record(self, name, inputs, template, html_path, pdf_path, html_hash=None):
+        self.entries[name] = {"inputs": inputs, "template": template, "html_path": html_path,
+                              "html": html_hash or file_hash(html_path), "pdf_path": pdf_path,
+                              "pdf_settings": self.pdf_settings if pdf_path else None}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,149 @@
+"""
+Monday packet: one PDF holding the system flash and every location flash.
+
+`build_packet` merges already-rendered report documents into a single HTML book.
+It opens with a generated table of contents. Each report starts on a new page
+and keeps its own page size and margins, through a CSS named page per
+stylesheet. One `page.pdf()` prints the whole packet in the warm browser session
+(see pdf_renderer.py), so there is no per-report Chrome launch and no separate
+PDF merge step.
+
+Every report's stylesheet is scoped to its section, so the location and system
+CSS can share one document:
+- `:root`, `html` and `body` rules apply to the section wrapper;
+- every other selector is prefixed with the section's class;
+- `@import` lines and embedded `@font-face` rules (see assets.py) move to the
+  packet head, once each, so a bundled font is carried once per packet.
+
+TOC page numbers come from the page counts of the reports' standalone PDFs,
+which the batch prints anyway. Scoped sections keep their own page boxes, so they
+paginate like those files. Without page counts, the TOC lists links only. Every
+entry links to its section in the PDF either way.
+"""
+
+import html as _html
+import os
+import re
+
+TOC_ROWS_PER_PAGE = 36
+
+_STYLE = re.compile(r"<style>(.*?)</style>", re.S)
+_TITLE = re.compile(r"<title>(.*?)</title>", re.S)
+_BODY = re.compile(r"<body[^>]*>(.*)</body>", re.S)
+_IMPORT = re.compile(r"""@import\s*(?:url\([^)]*\)|"[^"]*"|'[^']*')[^;]*;""")
+_PAGE = re.compile(r"@page\s*\{([^}]*)\}")
+_FONT_FACE = re.compile(r"@font-face\s*\{[^}]*\}")
+_ROOT = re.compile(r"^(?::root|html|body)\b")
+_PDF_PAGE = re.compile(rb"/Type\s*/Page(?![s\w])")
+
+TOC_CSS = """@page{size:A4 portrait;margin:0.4in;}
+.packet-toc{font-family:'Source Sans 3','Myriad Pro',-apple-system,BlinkMacSystemFont,sans-serif;color:#232021;-webkit-print-color-adjust:exact;print-color-adjust:exact;}
+.packet-toc .toc-head{background:#232021;color:#fff;border-radius:10px;padding:18px 24px;margin-bottom:14px;}
+.packet-toc .toc-tag{font-size:9px;font-weight:700;letter-spacing:2px;text-transform:uppercase;color:#86CAC7;}
+.packet-toc h1{font-size:22px;font-weight:700;margin-top:4px;}
+.packet-toc .toc-sub{font-size:11px;color:#DBCBBF;margin-top:2px;}
+.packet-toc table{width:100%;border-collapse:collapse;font-size:12px;}
+.packet-toc td{padding:7px 8px;border-bottom:1px solid #ede7e0;}
+.packet-toc td.toc-note{color:#7a706a;font-size:10.5px;}
+.packet-toc td.toc-page{text-align:right;font-weight:700;width:60px;}
+.packet-toc a{color:#232021;text-decoration:none;font-weight:600;}
+.packet-toc tr.toc-break{break-after:page;}
+.packet-section{break-before:page;}"""
+
+
+def pdf_page_count(path):
+    """Pages in a PDF written by Chromium or WeasyPrint (uncompressed page objects); None if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            return len(_PDF_PAGE.findall(f.read())) or None
+    except OSError:
+        return None
+
+
+def _scope_selector(sel, scope):
+    sel = sel.strip()
+    m = _ROOT.match(sel)
+    return scope + sel[m.end():] if m else f"{scope} {sel}"
+
+
+def scope_css(css, scope):
+    """Prefix every rule's selectors with `scope`, recursing into @media/@supports (strip @import/@page first)."""
+    out, i = [], 0
+    while True:
+        j = css.find("{", i)
+        if j < 0: break
+        head = css[i:j].strip()
+        if head.startswith("@"):
+            depth, k = 1, j + 1
+            while depth:
+                depth += {"{": 1, "}": -1}.get(css[k], 0); k += 1
+            body = css[j+1:k-1]
+            out.append(f"{head}{{{scope_css(body, scope) if head.startswith(('@media', '@supports')) else body}}}")
+        else:
+            k = css.index("}", j) + 1
+            out.append(",".join(_scope_selector(s, scope) for s in head.split(",")) + css[j:k])
+        i = k
+    return "\n".join(out)
+
+
+def split_report(doc):
+    """(title, css, body) of one rendered report document."""
+    title = _TITLE.search(doc)
+    return (title.group(1).strip() if title else "", "".join(_STYLE.findall(doc)), _BODY.search(doc).group(1))
+
+
+def build_packet(reports, title, subtitle="", page_counts=None):
+    """
+    Packet HTML for `reports`, a list of (toc_label, document_html, note) in print
+    order. `note` is an optional one-line TOC annotation. `page_counts` holds each
+    report's standalone page count, or None when unknown; the TOC shows page
+    numbers only when every count is known.
+    """
+    imports, page_rules, scoped, sections, scopes = [], [], [], [], {}
+    for i, (label, doc, _) in enumerate(reports):
+        _, css, body = split_report(doc)
+        if css not in scopes:  # every location flash shares one stylesheet
+            name = scopes[css] = f"pk{len(scopes)}"
+            for imp in _IMPORT.findall(css) + _FONT_FACE.findall(css):
+                if imp not in imports: imports.append(imp)
+            page = _PAGE.search(css)
+            page_rules.append(f"@page {name}{{{page.group(1) if page else 'size:A4 portrait;margin:0.3in;'}}}")
+            scoped.append(f".{name}{{page:{name};}}\n" + scope_css(_FONT_FACE.sub("", _PAGE.sub("", _IMPORT.sub("", css))), f".{name}"))
+        sections.append(f'<section class="packet-section {scopes[css]}" id="report-{i}">{body}</section>')
+
+    toc_pages = max(1, -(-len(reports) // TOC_ROWS_PER_PAGE))
+    numbers = [None] * len(reports)
+    if page_counts and all(page_counts):
+        n = toc_pages + 1
+        for i, count in enumerate(page_counts):
+            numbers[i], n = n, n + count
+    rows = []
+    for i, ((label, _, note), num) in enumerate(zip(reports, numbers)):
+        brk = ' class="toc-break"' if (i + 1) % TOC_ROWS_PER_PAGE == 0 and i + 1 < len(reports) else ""
+        rows.append(f'<tr{brk}><td><a href="#report-{i}">{_html.escape(label)}</a></td>'
+                    f'<td class="toc-note">{_html.escape(note or "")}</td><td class="toc-page">{num or ""}</td></tr>')
+
+    return f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">
+<title>{_html.escape(title)}</title>
+<style>{"".join(imports)}
+{TOC_CSS}
+{"".join(page_rules)}
+{chr(10).join(scoped)}</style></head><body style="margin:0;">
+<div class="packet-toc"><div class="toc-head"><div class="toc-tag">Fuego Tortilla Grill &middot; Monday Packet</div>
+<h1>{_html.escape(title)}</h1><div class="toc-sub">{_html.escape(subtitle)}</div></div>
+<table>{"".join(rows)}</table></div>
+{"".join(sections)}
+</body></html>"""
+
+
+def write_packet(reports, html_path, pdf_path, renderer, title, subtitle="", pdf_paths=None):
+    """
+    Write the packet HTML and print it through `renderer` (a PdfRenderer).
+    `pdf_paths` are the reports' standalone PDFs; they are used only for TOC
+    page numbers. Returns the PDF path, or None when no PDF could be printed.
+    """
+    counts = [pdf_page_count(p) if p else None for p in pdf_paths] if pdf_paths else None
+    os.makedirs(os.path.dirname(html_path), exist_ok=True)
+    with open(html_path, "w") as f:
+        f.write(build_packet(reports, title, subtitle, counts))
+    return pdf_path if renderer and renderer.render(html_path, pdf_path) else None
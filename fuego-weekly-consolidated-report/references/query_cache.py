@@ -0,0 +1,286 @@
+"""
+On-disk cache for Chabi Analytics `run_query` results.
+
+Results are keyed by normalized SQL (comments stripped, whitespace collapsed
+outside quoted text) plus the template parameters, and stored column-wise:
+Parquet when pyarrow is installed, otherwise columnar JSON. Each entry records
+the tables it read and stays fresh for the shortest of their TTLs
+(`TABLE_TTLS`).
+
+File-ingested tables (every schema outside CHABI_DBT: Seven Shifts, MarginEdge,
+AGM hours, guidelines, menu map, restaurant mapping) also carry a
+`_MODIFIED`/`_FILE` watermark. When such an entry's TTL lapses, one cheap
+watermark query decides whether to keep it or re-run the query, so static
+tables are fetched once and only re-validated afterwards.
+
+The query runner is any callable `runner(sql) -> list of row dicts`;
+`StaticRunner` stands in for Snowflake offline.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # columnar JSON fallback
+    pa = pq = None
+
+HOUR = 3600
+DAY = 24 * HOUR
+DEFAULT_TTL = HOUR
+TABLE_TTLS = {
+    "CHABI_DBT.ORDER_METRICS": 6 * HOUR,
+    "CHABI_DBT.LABOR_METRICS": 6 * HOUR,
+    "CHABI_DBT.DISCOUNT_METRICS": 6 * HOUR,
+    "CHABI_DBT.ORDERS_REPORTS": 6 * HOUR,
+    "CHABI_DBT.ITEM_SELECTION_REPORTS": 6 * HOUR,
+    "CHABI_DBT.GOOGLE_REVIEWS": 6 * HOUR,
+    "CHABI_DBT.OVATION_SURVEY_REPORTS": 6 * HOUR,
+    "CHABI_DBT.YELP_REVIEWS": 6 * HOUR,
+    "CHABI_DBT.LOCATIONS": 7 * DAY,
+    "SEVEN_SHIFTS_DATA_FUEGO_TORTILLA_GRILL.SCHEDULED_HOURS_WAGES": HOUR,
+    "MARGIN_EDGE_FUEGO_TORTILLA_GRILL.MARGIN_EDGE_FUEGO_TORTILLA_GRILL_TABLE": DAY,
+    "LABOR_AGM_HOURS.LABOR_AGM_HOURS_TABLE": DAY,
+    "RESTAURANT_MAPPING.RESTAURANT_MAPPING_TABLE": 7 * DAY,
+    "LABOR_GUIDELINES.LABOR_GUIDELINES_TABLE": 30 * DAY,
+    "MENU_MAP.MENU_MAP_TABLE": 30 * DAY,
+}
+WATERMARK_SQL = "SELECT MAX(_MODIFIED) AS modified, COUNT(DISTINCT _FILE) AS files FROM {table}"
+DEFAULT_ROOT = os.environ.get("CHABI_QUERY_CACHE", os.path.expanduser("~/.cache/chabi-queries"))
+
+_LEX = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|--[^\n]*|/\*.*?\*/|\s+", re.S)
+_TABLE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_][\w$]*(?:\.[A-Za-z_][\w$]*){1,2})", re.I)
+
+
+def normalize_sql(sql):
+    """Strip comments, collapse whitespace outside quotes, drop a trailing ';'."""
+    out, pos = [], 0
+    for m in _LEX.finditer(sql):
+        out.append(sql[pos:m.start()])
+        out.append(m.group(1) or " ")
+        pos = m.end()
+    out.append(sql[pos:])
+    parts = []
+    for p in out:
+        if p == " " and (not parts or parts[-1] == " "): continue
+        if p: parts.append(p)
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def referenced_tables(sql):
+    """Qualified SCHEMA.TABLE names after FROM/JOIN (CTE names are unqualified and skipped)."""
+    bare = _LEX.sub(lambda m: "''" if m.group(1) else " ", sql)
+    return sorted({".".join(t.upper().split(".")[-2:]) for t in _TABLE.findall(bare)})
+
+
+def is_file_ingested(table):
+    """Tables loaded from files carry _MODIFIED/_FILE; the dbt models in CHABI_DBT do not."""
+    return not table.startswith("CHABI_DBT.")
+
+
+def cache_key(sql, params=None):
+    payload = json.dumps([normalize_sql(sql), params or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# ============================================================
+# COLUMNAR STORAGE
+# ============================================================
+def _col_type(values):
+    for v in values:
+        if v is None: continue
+        if isinstance(v, bool): return "bool"
+        if isinstance(v, datetime): return "datetime"
+        if isinstance(v, date): return "date"
+        if isinstance(v, int): return "int"
+        if isinstance(v, float): return "float"
+        if isinstance(v, Decimal): return "decimal"  # Snowflake NUMBER columns
+        return "str"
+    return "null"
+
+
+_DECODE = {"date": date.fromisoformat, "datetime": datetime.fromisoformat, "decimal": Decimal}
+
+
+def to_columns(rows):
+    """[{col: v}] -> {"columns": [...], "types": [...], "data": [[v, ...] per column]}."""
+    names = list(rows[0]) if rows else []
+    data = [[r.get(c) for r in rows] for c in names]
+    types = [_col_type(col) for col in data]
+    for i, t in enumerate(types):
+        if t in ("date", "datetime"):
+            data[i] = [None if v is None else v.isoformat() for v in data[i]]
+        elif t in ("str", "decimal"):  # decimals as exact strings
+            data[i] = [None if v is None else str(v) for v in data[i]]
+    return {"columns": names, "types": types, "data": data}
+
+
+def from_columns(cols):
+    data = []
+    for t, col in zip(cols["types"], cols["data"]):
+        dec = _DECODE.get(t)
+        data.append([None if v is None else dec(v) for v in col] if dec else col)
+    return [dict(zip(cols["columns"], vals)) for vals in zip(*data)] if data else []
+
+
+def _dump_json(obj, **kw):
+    """A `_write_atomic` writer: `obj` as JSON, closed before the rename."""
+    def write(p):
+        with open(p, "w") as f:
+            json.dump(obj, f, **kw)
+    return write
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.tmp{os.getpid()}"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+class LocalStore:
+    """Cache entries under `root`: <key>.meta.json plus <key>.parquet or <key>.json."""
+
+    def __init__(self, root=DEFAULT_ROOT, parquet=None):
+        self.root = root
+        self.parquet = (pa is not None) if parquet is None else parquet
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, f"{key}.{ext}")
+
+    def read_meta(self, key):
+        try:
+            with open(self._path(key, "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_meta(self, key, meta):
+        _write_atomic(self._path(key, "meta.json"), _dump_json(meta, indent=1))
+
+    def read_rows(self, key, meta):
+        if meta["format"] == "parquet":
+            return pq.read_table(self._path(key, "parquet")).to_pylist()
+        with open(self._path(key, "json")) as f:
+            return from_columns(json.load(f))
+
+    def write(self, key, rows, meta):
+        if self.parquet and rows:
+            _write_atomic(self._path(key, "parquet"), lambda p: pq.write_table(pa.Table.from_pylist(rows), p))
+            meta["format"] = "parquet"
+        else:
+            _write_atomic(self._path(key, "json"), _dump_json(to_columns(rows)))
+            meta["format"] = "json"
+        self.write_meta(key, meta)
+
+    def keys(self):
+        return [f[:-len(".meta.json")] for f in os.listdir(self.root) if f.endswith(".meta.json")]
+
+    def delete(self, key):
+        for ext in ("meta.json", "parquet", "json"):
+            try: os.remove(self._path(key, ext))
+            except OSError: pass
+
+
+# ============================================================
+# CACHE
+# ============================================================
+class QueryCache:
+    """
+    Read-through cache in front of `runner(sql) -> rows`.
+
+        cache = QueryCache(run_query)
+        rows = cache.query(SQL_TEMPLATE, earliest_monday="2026-01-26", latest_sunday="2026-02-22")
+
+    Parameters fill `{name}` placeholders in the template and are part of the key.
+    """
+
+    def __init__(self, runner, store=None, ttls=None, default_ttl=DEFAULT_TTL, clock=time.time):
+        self.runner = runner
+        self.store = store if store is not None else LocalStore()
+        self.ttls = dict(TABLE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0}
+        self._marks = {}  # watermarks already read this run: {table: value}
+
+    def ttl(self, tables):
+        """Freshness of an entry: the shortest TTL among the tables it read."""
+        return min((self.ttls.get(t, self.default_ttl) for t in tables), default=self.default_ttl)
+
+    def watermark(self, table):
+        """(_MODIFIED max, _FILE count) as text, read once per run; None if the table has neither."""
+        if table not in self._marks:
+            try:
+                rows = self.runner(WATERMARK_SQL.format(table=table))
+                self._marks[table] = json.dumps(list(rows[0].values()) if rows else [], default=str)
+            except Exception:
+                self._marks[table] = None
+        return self._marks[table]
+
+    def _watermarks(self, tables):
+        return {t: self.watermark(t) for t in tables if is_file_ingested(t)}
+
+    def query(self, sql, **params):
+        key = cache_key(sql, params)
+        meta = self.store.read_meta(key)
+        now = self.clock()
+        if meta is not None:
+            if now - meta["fetched"] < self.ttl(meta["tables"]):
+                self.stats["hits"] += 1
+                return self.store.read_rows(key, meta)
+            marks = meta.get("watermarks")
+            if marks and None not in marks.values() and self._watermarks(meta["tables"]) == marks:
+                meta["fetched"] = now
+                self.store.write_meta(key, meta)
+                self.stats["revalidated"] += 1
+                return self.store.read_rows(key, meta)
+
+        self.stats["misses"] += 1
+        tables = referenced_tables(sql)
+        marks = self._watermarks(tables)  # read before the data so a later file load invalidates
+        rows = self.runner(sql.format(**params) if params else sql)
+        self.store.write(key, rows, {"sql": normalize_sql(sql), "params": params, "tables": tables,
+                                     "fetched": now, "watermarks": marks, "n_rows": len(rows)})
+        return rows
+
+    def invalidate(self, table=None):
+        """Drop every entry (or those reading `table`); returns the number removed."""
+        n = 0
+        for key in self.store.keys():
+            meta = self.store.read_meta(key)
+            if table is None or (meta and table.upper() in meta["tables"]):
+                self.store.delete(key)
+                n += 1
+        self._marks.clear()
+        return n
+
+
+class StaticRunner:
+    """
+    Offline stand-in for `run_query`: canned rows by normalized SQL, optional
+    `default(sql)` fallback, and a log of every SQL string it was asked to run.
+    """
+
+    def __init__(self, responses=None, default=None):
+        self.responses = {normalize_sql(sql): rows for sql, rows in (responses or {}).items()}
+        self.default = default
+        self.calls = []
+
+    def add(self, sql, rows):
+        self.responses[normalize_sql(sql)] = rows
+
+    def __call__(self, sql):
+        self.calls.append(sql)
+        rows = self.responses.get(normalize_sql(sql))
+        if rows is not None:
+            return [dict(r) for r in rows]
+        if self.default is not None:
+            return self.default(sql)
+        raise KeyError(f"no canned result for: {normalize_sql(sql)[:120]}")
@@ -0,0 +1,160 @@
+"""
+Concurrent query executor (asyncio).
+
+Runs a report's independent queries at the same time, with a bounded number in
+flight, a per-query timeout and retries with exponential backoff, so wall-clock
+time to data-ready is roughly the slowest query instead of the sum of all of
+them.
+
+The runner is the same `runner(sql) -> list of row dicts` callable that
+`QueryCache` takes: plain functions run in worker threads, coroutine functions
+are awaited directly. A thread cannot be cancelled, so when a threaded call
+times out its slot stays taken until the thread returns, and only then is the
+query retried; `concurrency` therefore bounds the queries really running on the
+backend, not just the ones being waited on. Each `QuerySpec` can carry a `shape` function that turns
+the rows into the typed tuples the fact store loads. `FakeBackend` answers
+with canned rows after a configurable latency for offline runs and benchmarks.
+"""
+
+import asyncio
+import inspect
+import random
+import time
+from collections import namedtuple
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 120  # seconds per attempt
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5  # seconds; doubles per retry
+
+QueryResult = namedtuple("QueryResult", "name data n_rows elapsed attempts error")
+
+
+class QueryError(RuntimeError):
+    """One or more queries failed after all retries."""
+
+    def __init__(self, failed):
+        self.failed = failed
+        super().__init__("; ".join(f"{r.name}: {type(r.error).__name__}: {r.error}" for r in failed))
+
+
+class QuerySpec:
+    """One named query: SQL template (`{param}` placeholders) plus an optional row shaper."""
+
+    def __init__(self, name, sql, shape=None, timeout=None, retries=None):
+        self.name = name
+        self.sql = sql
+        self.shape = shape
+        self.timeout = timeout
+        self.retries = retries
+
+    def render(self, params=None):
+        return self.sql.format(**params) if params else self.sql
+
+    def __repr__(self):
+        return f"QuerySpec({self.name!r})"
+
+
+async def run_queries_async(specs, runner, params=None, concurrency=DEFAULT_CONCURRENCY,
+                            timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """Run every spec concurrently; returns {name: QueryResult} in spec order."""
+    sem = asyncio.Semaphore(concurrency)
+    threaded = not (inspect.iscoroutinefunction(runner) or inspect.iscoroutinefunction(getattr(runner, "__call__", None)))
+    call = (lambda sql: asyncio.to_thread(runner, sql)) if threaded else runner
+
+    async def attempt_call(sql, limit):
+        if not threaded:
+            return await asyncio.wait_for(call(sql), limit)
+        task = asyncio.ensure_future(call(sql))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), limit)
+        except asyncio.TimeoutError:
+            await asyncio.gather(task, return_exceptions=True)  # the thread runs on: keep its slot until it returns
+            raise
+
+    async def one(spec):
+        sql = spec.render(params)
+        n_retries = retries if spec.retries is None else spec.retries
+        t0 = time.perf_counter()
+        error = None
+        for attempt in range(1, n_retries + 2):
+            async with sem:  # held for the call only, not the backoff
+                try:
+                    rows = await attempt_call(sql, spec.timeout or timeout)
+                    break
+                except Exception as e:  # TimeoutError included
+                    error = e
+            if attempt <= n_retries:
+                await asyncio.sleep(backoff * 2 ** (attempt - 1))
+        else:
+            return QueryResult(spec.name, None, 0, time.perf_counter() - t0, attempt, error)
+        try:
+            data = spec.shape(rows) if spec.shape else rows
+        except Exception as e:  # bad rows: retrying would not help
+            return QueryResult(spec.name, None, len(rows), time.perf_counter() - t0, attempt, e)
+        return QueryResult(spec.name, data, len(rows), time.perf_counter() - t0, attempt, None)
+
+    results = await asyncio.gather(*(one(s) for s in specs))
+    return {r.name: r for r in results}
+
+
+def run_queries(specs, runner, params=None, **kw):
+    """Blocking wrapper around `run_queries_async` (one event loop per call)."""
+    return asyncio.run(run_queries_async(specs, runner, params, **kw))
+
+
+def unwrap(results):
+    """{name: data} from `run_queries`; raises QueryError if any query failed."""
+    failed = [r for r in results.values() if r.error is not None]
+    if failed:
+        raise QueryError(failed)
+    return {name: r.data for name, r in results.items()}
+
+
+class FakeBackend:
+    """
+    Offline stand-in for Snowflake. `responses` maps an SQL substring (e.g. a table
+    name) to canned rows; the first match wins, otherwise `[]`. `latency` is seconds
+    per call, or {substring: seconds} with `default_latency` as the fallback.
+    `failures` = {substring: n} makes the first n matching calls raise ConnectionError.
+    """
+
+    def __init__(self, responses=None, latency=0.05, default_latency=0.05, jitter=0.0,
+                 failures=None, seed=0):
+        self.responses = dict(responses or {})
+        self.latency = latency
+        self.default_latency = default_latency
+        self.jitter = jitter
+        self.failures = dict(failures or {})
+        self.rng = random.Random(seed)
+        self.calls = []
+
+    def _match(self, table, sql, default):
+        for key, value in table.items():
+            if key in sql: return key, value
+        return None, default
+
+    def delay(self, sql):
+        if isinstance(self.latency, dict):
+            base = self._match(self.latency, sql, self.default_latency)[1]
+        else:
+            base = self.latency
+        return base + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+
+    def _respond(self, sql):
+        key, left = self._match(self.failures, sql, 0)
+        if left:
+            self.failures[key] = left - 1
+            raise ConnectionError(f"fake backend failure ({key})")
+        return [dict(r) for r in self._match(self.responses, sql, [])[1]]
+
+    async def __call__(self, sql):
+        self.calls.append(sql)
+        await asyncio.sleep(self.delay(sql))
+        return self._respond(sql)
+
+    def run(self, sql):
+        """Blocking variant, for the thread-pool path and serial baselines."""
+        self.calls.append(sql)
+        time.sleep(self.delay(sql))
+        return self._respond(sql)
@@ -0,0 +1,565 @@
+"""
+Query consolidation planner.
+
+The location flashes, the consolidated flash and the period-end rack & stack
+pull the same ORDER_METRICS / LABOR_METRICS / review rows over overlapping
+dates and locations. Each report here declares what it needs as `Need`s
+(source, locations, date range); `QueryPlanner` unions the needs per source —
+locations into one IN list, date ranges merged into as few BETWEENs as possible
+— runs one day-grain query per source through the concurrent executor, and
+slices every report's rows back out of the shared results with bisect. Each
+report's `build()` then shapes its slices into the raw inputs that report's
+code already consumes, so per-report numbers are unchanged.
+
+    plan = QueryPlanner([consolidated_report(WEEK_STARTS)] +
+                        [flash_report(loc, WEEK_STARTS[0]) for loc in LOCATIONS])
+    inputs = plan.run(cache.query)    # {report name: raw inputs}
+    plan.stats(len(LOCATIONS))        # queries / location-days, naive vs merged
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from query_executor import FakeBackend, QuerySpec, run_queries, unwrap
+from report_queries import (AGM_SQL, PY_SHIFT, SCHEDULED_HOURS_SQL, UPSELL_ITEMS, _day, _int, _monday, _num,
+                            _reviews, _upper, _weekly_catering, shape_agm, shape_catering, shape_catering_py,
+                            shape_daily, shape_guidelines, shape_upsell_checks, shape_upsell_items,
+                            shape_weekly_sales)
+
+Need = namedtuple("Need", "key source locations start end")  # locations None = all; start/end None = undated
+Source = namedtuple("Source", "name sql date_col")
+
+REVIEW_SOURCES = (("reviews_google", "google", "REVIEW_DATE"), ("reviews_ovation", "ovation", "SURVEY_DATE"),
+                  ("reviews_yelp", "yelp", "REVIEW_DATE"))
+
+
+# ============================================================
+# FILTERS
+# ============================================================
+def merge_ranges(ranges):
+    """Sorted, disjoint (start, end) date ranges; overlapping or adjacent ranges are joined."""
+    out = []
+    for a, b in sorted(ranges):
+        if out and a <= out[-1][1] + timedelta(days=1):
+            out[-1] = (out[-1][0], max(out[-1][1], b))
+        else:
+            out.append((a, b))
+    return out
+
+
+def _quote(s):
+    return "'" + str(s).replace("'", "''") + "'"
+
+
+class DateRanges:
+    """Formats as a predicate on the column named in the format spec: `{dates:TIME_PERIOD_VALUE}`."""
+
+    def __init__(self, ranges):
+        self.ranges = merge_ranges(ranges)
+
+    def __format__(self, col):
+        terms = [f"{col} BETWEEN '{a.isoformat()}' AND '{b.isoformat()}'" for a, b in self.ranges]
+        return terms[0] if len(terms) == 1 else "(" + " OR ".join(terms) + ")"
+
+
+class LocationSet:
+    """`{locs:RESTAURANT_LOCATION}` -> `RESTAURANT_LOCATION IN (...)`, or TRUE when all locations are needed."""
+
+    def __init__(self, locations):
+        self.locations = None if locations is None else sorted(locations)
+
+    def __format__(self, col):
+        if self.locations is None: return "TRUE"
+        return f"{col} IN ({', '.join(map(_quote, self.locations))})"
+
+
+def _sub(sql, old, new):
+    if old not in sql:
+        raise ValueError(f"template text not found: {old!r}")
+    return sql.replace(old, new)
+
+
+# ============================================================
+# SOURCES (one day-grain query per table)
+# ============================================================
+ORDER_METRICS_WEEK_SQL = """
+SELECT
+  RESTAURANT_LOCATION, TIME_PERIOD_VALUE, TIME_PERIOD_TO_DATE,
+  SUM(AMOUNT) AS amount, SUM(AMOUNT_PREV_YEAR) AS amount_prev_year, SUM(NET_AMOUNT) AS net_amount,
+  SUM(ORDER_COUNT) AS order_count, SUM(ORDER_COUNT_PREV_YEAR) AS order_count_prev_year,
+  SUM(DISCOUNT_AMOUNT) AS discount_amount
+FROM CHABI_DBT.ORDER_METRICS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND TIME_PERIOD_TYPE = 'week'
+  AND {dates:TIME_PERIOD_VALUE}
+  AND {locs:RESTAURANT_LOCATION}
+  AND VOIDED = false
+GROUP BY 1, 2, 3
+ORDER BY 1, 2
+"""
+
+ORDER_METRICS_DAY_SQL = """
+SELECT
+  RESTAURANT_LOCATION, TIME_PERIOD_VALUE,
+  SUM(AMOUNT) AS amount, SUM(AMOUNT_PREV_YEAR) AS amount_py, SUM(NET_AMOUNT) AS net_amount,
+  SUM(ORDER_COUNT) AS orders, SUM(ORDER_COUNT_PREV_YEAR) AS orders_py, SUM(DISCOUNT_AMOUNT) AS discount,
+  SUM(IFF(DINING_CATEGORY = 'Catering', AMOUNT, 0)) AS cat_amount,
+  SUM(IFF(DINING_CATEGORY = 'Catering', ORDER_COUNT, 0)) AS cat_orders,
+  COUNT_IF(DINING_CATEGORY = 'Catering') AS cat_rows
+FROM CHABI_DBT.ORDER_METRICS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND TIME_PERIOD_TYPE = 'day_dow'
+  AND {dates:TIME_PERIOD_VALUE}
+  AND {locs:RESTAURANT_LOCATION}
+  AND VOIDED = false
+GROUP BY 1, 2
+ORDER BY 1, 2
+"""
+
+LABOR_METRICS_DAY_SQL = """
+SELECT
+  RESTAURANT_LOCATION, TIME_PERIOD_VALUE,
+  SUM(PAYABLE_HOURS) AS hours, SUM(TOTAL_PAY) AS pay
+FROM CHABI_DBT.LABOR_METRICS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND TIME_PERIOD_TYPE = 'day_dow'
+  AND {dates:TIME_PERIOD_VALUE}
+  AND {locs:RESTAURANT_LOCATION}
+GROUP BY 1, 2
+ORDER BY 1, 2
+"""
+
+DISCOUNT_METRICS_DAY_SQL = """
+SELECT
+  RESTAURANT_LOCATION, TIME_PERIOD_VALUE,
+  SUM(ORDER_COUNT) AS discount_count, SUM(DISCOUNT_AMOUNT) AS discount_amount
+FROM CHABI_DBT.DISCOUNT_METRICS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND TIME_PERIOD_TYPE = 'day_dow'
+  AND {dates:TIME_PERIOD_VALUE}
+  AND {locs:RESTAURANT_LOCATION}
+GROUP BY 1, 2
+ORDER BY 1, 2
+"""
+
+REVIEWS_DAY_SQL = """
+SELECT RESTAURANT_LOCATION, {date_col}, AVG({rating_col}) AS avg_rating, COUNT(*) AS cnt
+FROM CHABI_DBT.{table}
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND {{dates:{date_col}}}
+  AND {{locs:RESTAURANT_LOCATION}}
+GROUP BY 1, 2
+"""
+
+# Consolidated definition: in/out times split at the 6 AM business-day boundary
+SCHEDULED_HOURS_DAY_SQL = _sub(_sub(
+    SCHEDULED_HOURS_SQL,
+    "d.date BETWEEN '{earliest_monday}' AND '{latest_sunday}'", "{dates:d.date}"),
+    "WHERE report_date BETWEEN '{earliest_monday}' AND '{latest_sunday}'",
+    "WHERE {dates:report_date}\n  AND {locs:restaurant_location}")
+
+# Location-flash definition: REGULAR_HOURS + OT_HOURS by shift date
+SCHEDULED_PAID_HOURS_DAY_SQL = """
+WITH base AS (
+  SELECT d._file, d._modified, d.date, d.regular_hours, COALESCE(d.ot_hours, 0) AS ot_hours,
+         m.RESTAURANT_NUMBER, l.RESTAURANT_LOCATION
+  FROM SEVEN_SHIFTS_DATA_FUEGO_TORTILLA_GRILL.SCHEDULED_HOURS_WAGES d
+  JOIN RESTAURANT_MAPPING.RESTAURANT_MAPPING_TABLE m
+    ON d.location = m.SEVEN_SHIFTS_LOCATION
+  JOIN CHABI_DBT.LOCATIONS l
+    ON m.RESTAURANT_NUMBER = l.RESTAURANT_NUMBER
+  WHERE {dates:d.date}
+    AND {locs:l.RESTAURANT_LOCATION}
+    AND d.role NOT IN ('General Manager','Assistant Manager','Kitchen Manager')
+),
+latest_files AS (
+  SELECT RESTAURANT_NUMBER, date, MAX_BY(_file, _modified) AS _file
+  FROM base GROUP BY 1, 2
+)
+SELECT b.RESTAURANT_LOCATION, b.date AS report_date,
+  SUM(b.regular_hours) + SUM(b.ot_hours) AS scheduled_hours
+FROM base b
+INNER JOIN latest_files lf
+  ON lf.RESTAURANT_NUMBER = b.RESTAURANT_NUMBER
+ AND lf.date = b.date
+ AND lf._file = b._file
+GROUP BY 1, 2 ORDER BY 1, 2
+"""
+
+_UPSELL_SERVER_FILTER = """
+  AND {t}.DINING_CATEGORY NOT IN ('Catering')
+  AND {t}.SERVER NOT IN ('default online ordering','Default Online Ordering','Online Order','Online  Order ','Online  Host Village')
+  AND {t}.SERVER IS NOT NULL AND LENGTH(TRIM({t}.SERVER)) > 0"""
+
+UPSELL_CHECKS_DAY_SQL = """
+SELECT o.RESTAURANT_LOCATION, o.REPORT_DATE, SUM(o.CHECK_COUNT) AS checks, SUM(o.AMOUNT) AS amount
+FROM CHABI_DBT.ORDERS_REPORTS o
+WHERE o.BRAND = 'fuego-tortilla-grill'
+  AND {dates:o.REPORT_DATE}
+  AND {locs:o.RESTAURANT_LOCATION}
+  AND o.VOIDED = false""" + _UPSELL_SERVER_FILTER.replace("{t}", "o") + """
+GROUP BY 1, 2
+"""
+
+UPSELL_ITEMS_DAY_SQL = """
+SELECT
+  isr.RESTAURANT_LOCATION, isr.REPORT_DATE,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Queso' THEN isr.qty ELSE 0 END) AS queso,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Guacamole' THEN isr.qty ELSE 0 END) AS guac,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Chips and Salsa' THEN isr.qty ELSE 0 END) AS chips,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Sides' THEN isr.qty ELSE 0 END) AS sides,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Drinks' THEN isr.qty ELSE 0 END) AS drinks,
+  SUM(CASE WHEN m.mapped_menu_subgroup IN ('Margaritas and Beer') THEN isr.qty ELSE 0 END) AS alcohol,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Desserts' THEN isr.qty ELSE 0 END) AS desserts
+FROM CHABI_DBT.ITEM_SELECTION_REPORTS isr
+INNER JOIN MENU_MAP.MENU_MAP_TABLE m
+  ON m.toast_menu_group = isr.menu_group AND m.toast_menu = isr.menu AND m.toast_menu_item = isr.menu_item
+WHERE isr.BRAND = 'fuego-tortilla-grill'
+  AND {dates:isr.REPORT_DATE}
+  AND {locs:isr.RESTAURANT_LOCATION}""" + _UPSELL_SERVER_FILTER.replace("{t}", "isr") + """
+GROUP BY 1, 2
+"""
+
+# Latest version of every threshold; the location flash applies its own row filter
+GUIDELINES_LATEST_SQL = """
+SELECT WEEKLY_NET_SALES_THRESHOLD, WEEKLY_TOTAL_HOURS
+FROM LABOR_GUIDELINES.LABOR_GUIDELINES_TABLE
+WHERE BRAND = 'Fuego Tortilla Grill'
+QUALIFY ROW_NUMBER() OVER (PARTITION BY WEEKLY_NET_SALES_THRESHOLD ORDER BY START_DATE DESC) = 1
+ORDER BY WEEKLY_NET_SALES_THRESHOLD
+"""
+
+SOURCES = {s.name: s for s in [
+    Source("order_metrics_week", ORDER_METRICS_WEEK_SQL, "TIME_PERIOD_VALUE"),
+    Source("order_metrics_day", ORDER_METRICS_DAY_SQL, "TIME_PERIOD_VALUE"),
+    Source("labor_metrics_day", LABOR_METRICS_DAY_SQL, "TIME_PERIOD_VALUE"),
+    Source("discount_metrics_day", DISCOUNT_METRICS_DAY_SQL, "TIME_PERIOD_VALUE"),
+    Source("reviews_google", REVIEWS_DAY_SQL.format(table="GOOGLE_REVIEWS", date_col="REVIEW_DATE", rating_col="STARS"), "REVIEW_DATE"),
+    Source("reviews_ovation", REVIEWS_DAY_SQL.format(table="OVATION_SURVEY_REPORTS", date_col="SURVEY_DATE", rating_col="SURVEY_RATING"), "SURVEY_DATE"),
+    Source("reviews_yelp", REVIEWS_DAY_SQL.format(table="YELP_REVIEWS", date_col="REVIEW_DATE", rating_col="STARS"), "REVIEW_DATE"),
+    Source("scheduled", SCHEDULED_HOURS_DAY_SQL, "REPORT_DATE"),
+    Source("scheduled_paid", SCHEDULED_PAID_HOURS_DAY_SQL, "REPORT_DATE"),
+    Source("upsell_checks", UPSELL_CHECKS_DAY_SQL, "REPORT_DATE"),
+    Source("upsell_items", UPSELL_ITEMS_DAY_SQL, "REPORT_DATE"),
+    Source("agm", AGM_SQL, None),
+    Source("guidelines", GUIDELINES_LATEST_SQL, None),
+]}
+
+
+# ============================================================
+# SHARED RESULTS
+# ============================================================
+class RowIndex:
+    """One source's rows grouped by location and sorted by date, for bisect slicing."""
+
+    def __init__(self, rows, date_col):
+        self.n_rows = len(rows)
+        by_loc = defaultdict(list)
+        for r in map(_upper, rows):
+            key = _day(r[date_col]).toordinal() if date_col else 0
+            by_loc[r.get("RESTAURANT_LOCATION")].append((key, r))  # None for brand-wide tables
+        self._index = {}
+        for loc, items in by_loc.items():
+            items.sort(key=lambda x: x[0])
+            self._index[loc] = ([k for k, _ in items], [r for _, r in items])
+
+    def slice(self, locations=None, start=None, end=None):
+        """Rows for `locations` (all when None) with dates in [start, end] (all when undated)."""
+        out = []
+        for loc in sorted(self._index) if locations is None else locations:
+            keys, rows = self._index.get(loc, ((), ()))
+            if start is None:
+                out.extend(rows)
+            else:
+                out.extend(rows[bisect_left(keys, start.toordinal()):bisect_right(keys, end.toordinal())])
+        return out
+
+
+class Report:
+    """A requested report: its `Need`s and `build({need key: rows}) -> raw inputs`."""
+
+    def __init__(self, name, needs, build):
+        self.name = name
+        self.needs = list(needs)
+        self.build = build
+
+    def __repr__(self):
+        return f"Report({self.name!r}, {len(self.needs)} needs)"
+
+
+class QueryPlanner:
+    """Merge a batch of reports' needs into one query per source, then slice per report."""
+
+    def __init__(self, reports):
+        self.reports = list(reports)
+        names = [r.name for r in self.reports]
+        if len(set(names)) != len(names):
+            raise ValueError(f"duplicate report names: {names}")
+
+    def plan(self):
+        """{source: (LocationSet, DateRanges or None)} — the union of every report's needs."""
+        locs, ranges = {}, defaultdict(list)
+        for rep in self.reports:
+            for n in rep.needs:
+                if n.source not in SOURCES:
+                    raise KeyError(f"{rep.name}: unknown source {n.source!r}")
+                if n.locations is None or locs.get(n.source, ()) is None:
+                    locs[n.source] = None
+                else:
+                    locs[n.source] = locs.get(n.source, frozenset()) | frozenset(n.locations)
+                if n.start is not None:
+                    ranges[n.source].append((n.start, n.end))
+        return {s: (LocationSet(locs[s]), DateRanges(ranges[s]) if ranges[s] else None) for s in locs}
+
+    def specs(self):
+        """One QuerySpec per source, SQL fully rendered."""
+        out = []
+        for name, (locs, dates) in self.plan().items():
+            src = SOURCES[name]
+            sql = src.sql.format(dates=dates, locs=locs) if src.date_col else src.sql
+            out.append(QuerySpec(name, sql, lambda rows, col=src.date_col: RowIndex(rows, col)))
+        return out
+
+    def slices(self, indexes):
+        """{report name: {need key: rows}} from {source: RowIndex}; needs sharing a key are concatenated."""
+        out = {}
+        for rep in self.reports:
+            got = defaultdict(list)
+            for n in rep.needs:
+                got[n.key].extend(indexes[n.source].slice(n.locations, n.start, n.end))
+            out[rep.name] = dict(got)
+        return out
+
+    def run(self, runner, **kw):
+        """Run the merged queries concurrently; returns {report name: built inputs} (raises QueryError)."""
+        indexes = unwrap(run_queries(self.specs(), runner, **kw))
+        return {rep.name: rep.build(s) for rep, s in zip(self.reports, self.slices(indexes).values())}
+
+    def stats(self, n_locations):
+        """Queries and location-days requested, per-report vs merged (`n_locations` = size of "all")."""
+        def loc_days(locations, ranges):
+            n_locs = n_locations if locations is None else len(locations)
+            return n_locs * sum((b - a).days + 1 for a, b in ranges) if ranges else n_locs
+        naive = sum(loc_days(n.locations, [(n.start, n.end)] if n.start else None)
+                    for rep in self.reports for n in rep.needs)
+        merged = sum(loc_days(locs.locations, dates.ranges if dates else None)
+                     for locs, dates in self.plan().values())
+        return {"reports": len(self.reports), "queries_naive": sum(len(r.needs) for r in self.reports),
+                "queries_merged": len(self.plan()), "loc_days_naive": naive, "loc_days_merged": merged}
+
+
+# ============================================================
+# SLICE SHAPERS
+# ============================================================
+def _flag(v):
+    return str(v).lower() in ("true", "1")
+
+
+def _catering_rows(rows):
+    """Merged day rows -> the catering query's rows (only days that had catering rows)."""
+    return [{"RESTAURANT_LOCATION": r["RESTAURANT_LOCATION"], "TIME_PERIOD_VALUE": r["TIME_PERIOD_VALUE"],
+             "AMOUNT": r["CAT_AMOUNT"], "ORDERS": r["CAT_ORDERS"]} for r in rows if _int(r["CAT_ROWS"])]
+
+
+def _sum_weeks(rows, cols, ints=()):
+    """Sum merged rows per (location, week Monday): [(loc, week_start, *cols)] sorted."""
+    agg = defaultdict(lambda: [0.0] * len(cols))
+    for r in rows:
+        a = agg[(r["RESTAURANT_LOCATION"], _monday(r["TIME_PERIOD_VALUE"]))]
+        for i, c in enumerate(cols):
+            a[i] += _num(r[c])
+    return [(loc, ws.isoformat(), *(round(v) if c in ints else v for c, v in zip(cols, vals)))
+            for (loc, ws), vals in sorted(agg.items())]
+
+
+def _review_totals(rows, source):
+    """(loc, source, avg_rating, count) over the whole slice, count-weighted."""
+    agg = defaultdict(lambda: [0.0, 0])
+    for r in rows:
+        a = agg[r["RESTAURANT_LOCATION"]]
+        n = _int(r["CNT"]); a[0] += _num(r["AVG_RATING"]) * n; a[1] += n
+    return [(loc, source, total / n, n) for loc, (total, n) in sorted(agg.items()) if n]
+
+
+def _upsell_checks(rows):
+    """Per-location checks and ROUND(amount / checks, 2), as the 14-day query computes them."""
+    agg = defaultdict(lambda: [0, Decimal(0)])
+    for r in rows:
+        a = agg[r["RESTAURANT_LOCATION"]]
+        a[0] += _int(r["CHECKS"]); a[1] += Decimal(str(r["AMOUNT"] or 0))
+    return shape_upsell_checks([
+        {"RESTAURANT_LOCATION": loc, "CHECKS": n,
+         "AVG_CHECK": float((amt / n).quantize(Decimal("0.01"), ROUND_HALF_UP)) if n else None}
+        for loc, (n, amt) in agg.items()])
+
+
+def _upsell_items(rows):
+    agg = defaultdict(lambda: dict.fromkeys(UPSELL_ITEMS, 0))
+    for r in rows:
+        a = agg[r["RESTAURANT_LOCATION"]]
+        for k in UPSELL_ITEMS:
+            a[k] += _int(r[k.upper()])
+    return shape_upsell_items([{"RESTAURANT_LOCATION": loc, **{k.upper(): v for k, v in a.items()}}
+                               for loc, a in agg.items()])
+
+
+# ============================================================
+# REPORTS
+# ============================================================
+FLASH_HISTORY_WEEKS = 26  # Query 11: ~6 months of weekly sales for the GM message
+
+
+def _span(week_starts):
+    return min(week_starts), max(week_starts) + timedelta(days=6)
+
+
+def consolidated_report(week_starts, local_py=False, name="consolidated", flash=False):
+    """
+    Weekly consolidated flash (all locations); builds the same dict as `report_queries.assemble()`.
+    `flash=True` adds what the location flashes render on top of it, for every location:
+    `discounts_raw` (loc, ws, count, amount) and ~6 months of `history_raw` (loc, ws, amount, orders).
+    """
+    first, last = _span(week_starts)
+    weeks = {ws.isoformat() for ws in week_starts}
+    cy = lambda key, source: Need(key, source, None, first, last)
+    needs = [Need("weekly_sales", "order_metrics_week", None, min(week_starts), max(week_starts)),
+             cy("order_day", "order_metrics_day"), cy("daily_labor", "labor_metrics_day"),
+             cy("scheduled", "scheduled"),
+             Need("agm", "agm", None, None, None), Need("guidelines", "guidelines", None, None, None),
+             Need("upsell_checks", "upsell_checks", None, last - timedelta(days=13), last),
+             Need("upsell_items", "upsell_items", None, last - timedelta(days=13), last)]
+    needs += [cy(key, key) for key, _, _ in REVIEW_SOURCES]
+    if not local_py:
+        needs.append(Need("order_day_py", "order_metrics_day", None, first - PY_SHIFT, last - PY_SHIFT))
+    if flash:
+        needs += [cy("discounts", "discount_metrics_day"),
+                  Need("history", "order_metrics_week", None, first - timedelta(weeks=FLASH_HISTORY_WEEKS), max(week_starts))]
+    counts = ("ORDER_COUNT", "DISCOUNT_COUNT")
+
+    def build(s):
+        upselling_checks, upselling_items = _upsell_checks(s.get("upsell_checks", [])), _upsell_items(s.get("upsell_items", []))
+        extras = {"discounts_raw": _sum_weeks(s.get("discounts", []), ("DISCOUNT_COUNT", "DISCOUNT_AMOUNT"), counts),
+                  "history_raw": _sum_weeks(s.get("history", []), ("AMOUNT", "ORDER_COUNT"), counts)} if flash else {}
+        return {
+            "weekly_sales_raw": shape_weekly_sales([r for r in s.get("weekly_sales", []) if not _flag(r["TIME_PERIOD_TO_DATE"])
+                                                    and _day(r["TIME_PERIOD_VALUE"]).isoformat() in weeks]),
+            "catering_cy_raw": shape_catering(_catering_rows(s.get("order_day", []))),
+            "catering_py_raw": shape_catering_py(_catering_rows(s.get("order_day_py", []))),
+            "reviews_raw": [x for key, src, col in REVIEW_SOURCES for x in _reviews(src, col)(s.get(key, []))],
+            "daily_labor_raw": shape_daily("TIME_PERIOD_VALUE", "HOURS", "PAY")(s.get("daily_labor", [])),
+            "daily_sales_raw": shape_daily("TIME_PERIOD_VALUE", "NET_AMOUNT")(s.get("order_day", [])),
+            "scheduled_raw": shape_daily("REPORT_DATE", "SCHEDULED_HOURS")(s.get("scheduled", [])),
+            "agm_raw": shape_agm(s.get("agm", [])),
+            "GUIDELINES_TABLE": shape_guidelines(s.get("guidelines", [])),
+            "upselling_raw": {loc: {**c, **upselling_items.get(loc, dict.fromkeys(UPSELL_ITEMS, 0))}
+                              for loc, c in upselling_checks.items()},
+            **extras,
+        }
+    return Report(name, needs, build)
+
+
+def _flash_guidelines(rows):
+    """Query 9's filter: positive hours at $5K steps plus the 2,100 / 18,800 knees."""
+    table = shape_guidelines(rows)
+    return {t: h for t, h in table.items() if h > 0 and (t % 5000 == 0 or t in (2100, 18800))}
+
+
+def flash_report(location, week_start, name=None):
+    """
+    Single-location weekly flash (weekly-flash-report-skill Queries 1–11) for the
+    4 weeks ending with `week_start`. Rows drop the location column; weekly rows
+    sum both TIME_PERIOD_TO_DATE halves as that skill requires.
+    """
+    first, last = week_start - timedelta(weeks=3), week_start + timedelta(days=6)
+    cy = lambda key, source: Need(key, source, [location], first, last)
+    needs = [Need("weekly", "order_metrics_week", [location], first, week_start),
+             Need("history", "order_metrics_week", [location], first - timedelta(weeks=FLASH_HISTORY_WEEKS), week_start),
+             cy("order_day", "order_metrics_day"),
+             Need("order_day_py", "order_metrics_day", [location], first - PY_SHIFT, last - PY_SHIFT),
+             cy("daily_labor", "labor_metrics_day"), cy("discounts", "discount_metrics_day"),
+             cy("scheduled", "scheduled_paid"),
+             Need("agm", "agm", [location], None, None), Need("guidelines", "guidelines", None, None, None)]
+    needs += [cy(key, key) for key, _, _ in REVIEW_SOURCES]
+    weekly_cols = ("AMOUNT", "AMOUNT_PREV_YEAR", "NET_AMOUNT", "ORDER_COUNT", "ORDER_COUNT_PREV_YEAR", "DISCOUNT_AMOUNT")
+    counts = ("ORDER_COUNT", "ORDER_COUNT_PREV_YEAR", "DISCOUNT_COUNT")
+    drop_loc = lambda rows: [r[1:] for r in rows]
+
+    def build(s):
+        return {
+            "weekly_raw": drop_loc(_sum_weeks(s.get("weekly", []), weekly_cols, counts))[::-1],
+            "history_raw": [(location, ws, amt, n) for _, ws, amt, n in
+                            _sum_weeks(s.get("history", []), ("AMOUNT", "ORDER_COUNT"), counts)],
+            "catering_cy_raw": drop_loc(_weekly_catering(_catering_rows(s.get("order_day", []))))[::-1],
+            "catering_py_raw": drop_loc(_weekly_catering(_catering_rows(s.get("order_day_py", [])), PY_SHIFT))[::-1],
+            "reviews_raw": [x[1:] for key, src, col in REVIEW_SOURCES for x in _reviews(src, col)(s.get(key, []))],
+            "daily_labor_raw": drop_loc(shape_daily("TIME_PERIOD_VALUE", "HOURS", "PAY")(s.get("daily_labor", []))),
+            "daily_sales_raw": drop_loc(shape_daily("TIME_PERIOD_VALUE", "NET_AMOUNT")(s.get("order_day", []))),
+            "scheduled_raw": drop_loc(shape_daily("REPORT_DATE", "SCHEDULED_HOURS")(s.get("scheduled", []))),
+            "discounts_raw": drop_loc(_sum_weeks(s.get("discounts", []), ("DISCOUNT_COUNT", "DISCOUNT_AMOUNT"), counts))[::-1],
+            "agm_raw": shape_agm(s.get("agm", [])),
+            "GUIDELINES_TABLE": _flash_guidelines(s.get("guidelines", [])),
+        }
+    return Report(name or f"flash {location}", needs, build)
+
+
+def period_report(week_starts, locations=None, local_py=False, name="period"):
+    """
+    Period-end rack & stack over `week_starts` (its Queries 1–7): one 2N-week
+    history pull (a further 364 days back with `local_py`), reviews for the
+    period only. Builds that reference implementation's `*_raw` inputs.
+    """
+    first, last = _span(week_starts)
+    history_start = first - timedelta(weeks=len(week_starts))
+    if local_py:
+        history_start -= PY_SHIFT
+    hist = lambda key, source: Need(key, source, locations, history_start, last)
+    needs = [hist("order_day", "order_metrics_day"), hist("daily_labor", "labor_metrics_day"),
+             hist("scheduled", "scheduled"),
+             Need("agm", "agm", locations, None, None), Need("guidelines", "guidelines", None, None, None)]
+    needs += [Need(key, key, locations, first, last) for key, _, _ in REVIEW_SOURCES]
+    if not local_py:
+        needs.append(Need("order_day_py", "order_metrics_day", locations, history_start - PY_SHIFT, last - PY_SHIFT))
+
+    def build(s):
+        return {
+            "weekly_sales_raw": _sum_weeks(s.get("order_day", []), ("AMOUNT", "AMOUNT_PY", "ORDERS", "ORDERS_PY", "DISCOUNT"),
+                                           ("ORDERS", "ORDERS_PY")),
+            "daily_sales_raw": shape_daily("TIME_PERIOD_VALUE", "NET_AMOUNT")(s.get("order_day", [])),
+            "daily_labor_raw": shape_daily("TIME_PERIOD_VALUE", "HOURS", "PAY")(s.get("daily_labor", [])),
+            "scheduled_raw": shape_daily("REPORT_DATE", "SCHEDULED_HOURS")(s.get("scheduled", [])),
+            "catering_cy_raw": shape_catering(_catering_rows(s.get("order_day", []))),
+            "catering_py_raw": shape_catering_py(_catering_rows(s.get("order_day_py", []))),
+            "reviews_raw": [x for key, src, _ in REVIEW_SOURCES for x in _review_totals(s.get(key, []), src)],
+            "agm_raw": shape_agm(s.get("agm", [])),
+            "GUIDELINES_TABLE": shape_guidelines(s.get("guidelines", [])),
+        }
+    return Report(name, needs, build)
+
+
+if __name__ == "__main__":
+    # 6 location flashes + the consolidated flash + a 4-week rack & stack:
+    # per-report query load vs the merged plan, and wall-clock against the fake backend
+    import time
+    from datetime import date
+    LOCATIONS = ["Burleson", "College Station", "Fayetteville", "San Antonio", "San Marcos", "Waco"]
+    weeks = [date(2026, 2, 16) - timedelta(weeks=i) for i in range(4)]
+    reports = ([flash_report(loc, weeks[0]) for loc in LOCATIONS]
+               + [consolidated_report(weeks), period_report(weeks, name="rack & stack")])
+    plan = QueryPlanner(reports)
+    s = plan.stats(len(LOCATIONS))
+    print(f"{s['reports']} reports: {s['queries_naive']} queries -> {s['queries_merged']}, "
+          f"{s['loc_days_naive']} location-days -> {s['loc_days_merged']} "
+          f"({s['loc_days_naive'] / s['loc_days_merged']:.1f}x less warehouse work)")
+    latency = {"SCHEDULED_HOURS_WAGES": 0.2, "ITEM_SELECTION_REPORTS": 0.15, "ORDERS_REPORTS": 0.1,
+               "LABOR_METRICS": 0.08, "ORDER_METRICS": 0.06}
+    t0 = time.perf_counter()
+    for rep in reports:
+        QueryPlanner([rep]).run(FakeBackend(latency=latency, default_latency=0.03))
+    per_report = time.perf_counter() - t0
+    backend = FakeBackend(latency=latency, default_latency=0.03)
+    t0 = time.perf_counter()
+    plan.run(backend)
+    print(f"wall: {per_report:.2f}s report by report, {time.perf_counter() - t0:.2f}s merged "
+          f"({len(backend.calls)} queries)")
@@ -5,9 +5,17 @@ Week of Feb 9–15, 2026
 Includes AI Insight verification loop.
 """
 
-import re, json, subprocess, shutil, os
+import shutil
+from operator import sub
 from datetime import datetime, timedelta, date
-from collections import defaultdict
+from functools import cached_property
+from assets import localize_css
+from callout_numbers import Callout, CalloutNumbers
+from html_stream import HtmlWriter, PageTemplate, RowTemplate
+from known_values import KnownValues
+from pdf_renderer import PdfRenderer
+from tracing import span, summary
+from weekly_kpis import WeeklyKpis
 
 # ============================================================
 # CONFIGURATION
@@ -17,6 +25,9 @@ WEEK_START = date(2026, 2, 16)
 WEEK_END = date(2026, 2, 22)
 WEEK_STARTS = [date(2026, 2, 16), date(2026, 2, 9), date(2026, 2, 2), date(2026, 1, 26)]
 TODAY_STR = "February 17, 2026"
+# True: history pull starts 52 weeks earlier and PY sales/orders/catering come from a
+# 364-day shift of CY history (no PREV_YEAR columns, no Query 3). False: use the query PY columns.
+LOCAL_PY = False
 
 # ============================================================
 # HELPERS
@@ -55,7 +66,7 @@ def pill_rating(v):
     cls = "pill-green" if v >= 4 else ("pill-yellow" if v >= 3 else "pill-red")
     return f'<span class="pill {cls}">{v:.1f}</span>'
 def rank_items(loc_data, key, reverse=True):
-    items = [(loc, loc_data[loc].get(key, 0) or 0) for loc in LOCATIONS]
+    items = [(loc, v.get(key, 0) or 0) for loc, v in loc_data.items()]
     items.sort(key=lambda x: x[1], reverse=reverse)
     return [(loc, val, i+1) for i, (loc, val) in enumerate(items)]
 def rank_suffix(r):
@@ -397,441 +408,211 @@ upselling_raw = {
 }
 
 # ============================================================
-# ORGANIZE DATA
+# ORGANIZE + COMPUTE (shared KPI structures — see weekly_kpis.py)
 # ============================================================
-weekly_sales = defaultdict(dict)
-for loc,ws,amt,amt_py,net,orders,orders_py,disc in weekly_sales_raw:
-    weekly_sales[loc][d(ws)] = {"amount":amt,"amount_py":amt_py,"net_amount":net,"orders":orders,"orders_py":orders_py,"discount":disc}
-
-catering_cy = defaultdict(dict)
-for loc,ws,amt,orders in catering_cy_raw:
-    catering_cy[loc][d(ws)] = {"amount":amt,"orders":orders}
-catering_py = defaultdict(dict)
-for loc,ws,amt,orders in catering_py_raw:
-    catering_py[loc][d(ws)] = {"amount":amt,"orders":orders}
-
-reviews_dict = defaultdict(lambda: defaultdict(dict))
-for loc,ws,source,avg_r,cnt in reviews_raw:
-    reviews_dict[loc][d(ws)][source] = {"avg":avg_r,"count":cnt}
-
-daily_labor = defaultdict(dict)
-for loc,dt,hrs,pay in daily_labor_raw:
-    daily_labor[loc][d(dt)] = {"hours":hrs,"pay":pay}
-daily_sales_d = defaultdict(dict)
-for loc,dt,amt in daily_sales_raw:
-    daily_sales_d[loc][d(dt)] = amt
-sched = defaultdict(dict)
-for loc,dt,hrs in scheduled_raw:
-    sched[loc][d(dt)] = hrs
-
-# Compute upselling rates
-upselling = {}
-for loc, u in upselling_raw.items():
-    c = u["checks"]
-    food = u["queso"]+u["guac"]+u["chips"]+u["sides"]+u["desserts"]
-    bev = u["drinks"]+u["alcohol"]
-    upselling[loc] = {
-        "checks":c, "avg_check":u["avg_check"],
-        "queso_rate":u["queso"]/c*100, "guac_rate":u["guac"]/c*100,
-        "food_addon_rate":food/c*100, "bev_rate":bev/c*100,
-        "drinks_rate":u["drinks"]/c*100, "alcohol_rate":u["alcohol"]/c*100,
-    }
-
-# ============================================================
-# GUIDELINE FUNCTIONS
-# ============================================================
-def lookup_guide(net_sales):
-    thresholds = sorted(GUIDELINES_TABLE.items())
-    if net_sales <= 0: return 0
-    lower_t,lower_h = thresholds[0]
-    for i,(t,h) in enumerate(thresholds):
-        if t > net_sales:
-            lower_t,lower_h = thresholds[i-1]; frac = (net_sales-lower_t)/(t-lower_t)
-            return lower_h + frac*(h-lower_h)
-        lower_t,lower_h = t,h
-    return thresholds[-1][1]
-
-def get_agm_daily(location, day):
-    for loc,start,end,daily_h,weekly_h in agm_raw:
-        if loc == location and d(start) <= day <= d(end): return weekly_h/6
-    return 0
-
-def compute_daily_guideline(week_start_dt, ds, location):
-    DAYS_OPEN=6; DOW_ADJ={0:0,1:8,2:3,3:3,4:3,5:3,6:-20}; rate=54/3000
-    days = [week_start_dt+timedelta(days=i) for i in range(7)]
-    dws = sum(1 for dd in days if ds.get(dd,0)>0)
-    is_partial = dws < DAYS_OPEN; result = {}
-    if is_partial:
-        for dd in days:
-            s = ds.get(dd,0)
-            if dd.weekday()==0 or s<=0: result[dd]=0
-            else:
-                proj=s*DAYS_OPEN; lkp=lookup_guide(proj)
-                if lkp<=0: result[dd]=0
-                else:
-                    agm=get_agm_daily(location,dd)
-                    result[dd]=lkp/DAYS_OPEN+DOW_ADJ.get(dd.weekday(),0)+agm
-    else:
-        wn = sum(ds.get(dd,0) for dd in days); tg=lookup_guide(wn); raw=[]
-        for dd in days:
-            if dd.weekday()==0: raw.append(0)
-            else:
-                s=ds.get(dd,0)
-                if s<=0: raw.append(0)
-                elif s<=9000: raw.append(s*rate)
-                else: raw.append(9000*rate+(s-9000)*rate*0.80)
-        tr = sum(raw) or 1
-        for i,dd in enumerate(days):
-            s=ds.get(dd,0)
-            if dd.weekday()==0 or s<=0: result[dd]=0
-            else:
-                agm=get_agm_daily(location,dd)
-                result[dd]=(raw[i]/tr)*tg+DOW_ADJ.get(dd.weekday(),0)+agm
-    return result, sum(result.values()), sum(ds.get(dd,0) for dd in days)
-
-# ============================================================
-# COMPUTE PER-LOCATION KPIs + 4-WEEK HISTORY
-# ============================================================
-ws = WEEK_START
-loc_data = {}
-loc_weekly = defaultdict(dict)  # loc_weekly[loc][week_idx] = {...}
-
-for loc in LOCATIONS:
-    for wi, ws_i in enumerate(WEEK_STARTS):
-        cw = weekly_sales[loc].get(ws_i, {})
-        amt = cw.get("amount",0); amt_py = cw.get("amount_py",0)
-        ords = cw.get("orders",0); ords_py = cw.get("orders_py",0)
-        has_py = amt_py > 0
-        sss_v = pct_chg(amt, amt_py) if has_py else None
-        sst_v = pct_chg(ords, ords_py) if has_py else None
-        avg_tkt = amt/ords if ords else 0
-        avg_tkt_py = amt_py/ords_py if (has_py and ords_py) else 0
-        tkt_chg = pct_chg(avg_tkt, avg_tkt_py) if has_py else None
-
-        hrs = sum(daily_labor[loc].get(ws_i+timedelta(days=j),{}).get("hours",0) for j in range(7))
-        pay = sum(daily_labor[loc].get(ws_i+timedelta(days=j),{}).get("pay",0) for j in range(7))
-        sch_hrs = sum(sched[loc].get(ws_i+timedelta(days=j),0) for j in range(7))
-        lp = (pay/amt*100) if amt else 0
-        ds = {ws_i+timedelta(days=j):daily_sales_d[loc].get(ws_i+timedelta(days=j),0) for j in range(7)}
-        _,guide_total,_ = compute_daily_guideline(ws_i, ds, loc)
-        vs_guide_n = hrs - guide_total
-        vs_guide_pct = (hrs/guide_total*100) if guide_total else 0
-        splh = amt/hrs if hrs else 0
-
-        cat = catering_cy[loc].get(ws_i,{}); cat_amt=cat.get("amount",0); cat_ords=cat.get("orders",0)
-        cat_py_amt = catering_py[loc].get(ws_i,{}).get("amount",0)
-
-        rev = reviews_dict[loc].get(ws_i,{})
-        google_r=rev.get("google",{}).get("avg"); google_n=rev.get("google",{}).get("count",0)
-        ovation_r=rev.get("ovation",{}).get("avg"); ovation_n=rev.get("ovation",{}).get("count",0)
-        yelp_r=rev.get("yelp",{}).get("avg"); yelp_n=rev.get("yelp",{}).get("count",0)
-        total_rev_n=google_n+ovation_n+yelp_n
-        wavg = ((google_r or 0)*google_n+(ovation_r or 0)*ovation_n+(yelp_r or 0)*yelp_n)/total_rev_n if total_rev_n else None
-
-        week_data = {
-            "amount":amt,"amount_py":amt_py,"orders":ords,"orders_py":ords_py,
-            "has_py":has_py,"sss":sss_v,"sst":sst_v,"avg_tkt":avg_tkt,"tkt_chg":tkt_chg,
-            "suffix":"vs PY" if has_py else "Non-Comp",
-            "labor_hrs":hrs,"labor_pay":pay,"labor_pct":lp,
-            "guide_total":guide_total,"vs_guide_n":vs_guide_n,"vs_guide_pct":vs_guide_pct,
-            "sch_hrs":sch_hrs,"splh":splh,
-            "cat_amt":cat_amt,"cat_ords":cat_ords,"cat_py_amt":cat_py_amt,
-            "google_r":google_r,"google_n":google_n,"ovation_r":ovation_r,"ovation_n":ovation_n,
-            "yelp_r":yelp_r,"yelp_n":yelp_n,"wavg_rating":wavg,"total_rev_n":total_rev_n,
-            "discount":cw.get("discount",0),
-        }
-        loc_weekly[loc][wi] = week_data
-        if wi == 0:
-            loc_data[loc] = week_data
-
-# Comp stores
-comp_locs = [loc for loc in LOCATIONS if loc_data[loc]["has_py"]]
-
-# System totals
-sys_amt = sum(v["amount"] for v in loc_data.values())
-comp_amt = sum(loc_data[loc]["amount"] for loc in comp_locs)
-comp_amt_py = sum(loc_data[loc]["amount_py"] for loc in comp_locs)
-comp_ords = sum(loc_data[loc]["orders"] for loc in comp_locs)
-comp_ords_py = sum(loc_data[loc]["orders_py"] for loc in comp_locs)
-sys_sss = pct_chg(comp_amt, comp_amt_py) if comp_amt_py else None
-sys_sst = pct_chg(comp_ords, comp_ords_py) if comp_ords_py else None
-sys_ords = sum(v["orders"] for v in loc_data.values())
-sys_tkt = sys_amt/sys_ords if sys_ords else 0
-comp_tkt = comp_amt/comp_ords if comp_ords else 0
-comp_tkt_py = comp_amt_py/comp_ords_py if comp_ords_py else 0
-sys_tkt_chg = pct_chg(comp_tkt, comp_tkt_py) if comp_tkt_py else None
-sys_hrs = sum(v["labor_hrs"] for v in loc_data.values())
-sys_pay = sum(v["labor_pay"] for v in loc_data.values())
-sys_lp = (sys_pay/sys_amt*100) if sys_amt else 0
-sys_guide = sum(v["guide_total"] for v in loc_data.values())
-sys_cat = sum(v["cat_amt"] for v in loc_data.values())
-sys_cat_ords = sum(v["cat_ords"] for v in loc_data.values())
-
-# Prior week system labor %
-pw = WEEK_STARTS[1]
-pw_sys_amt = sum(loc_weekly[loc][1]["amount"] for loc in LOCATIONS)
-pw_sys_pay = sum(loc_weekly[loc][1]["labor_pay"] for loc in LOCATIONS)
-pw_sys_lp = (pw_sys_pay/pw_sys_amt*100) if pw_sys_amt else 0
-sys_lp_chg = sys_lp - pw_sys_lp
-
-# ============================================================
-# VERIFICATION DATA DICTIONARY
-# ============================================================
-verify_data = {}
-for loc in LOCATIONS:
-    dd = loc_data[loc]
-    verify_data[f"{loc}_sales"] = dd["amount"]
-    verify_data[f"{loc}_sss"] = dd["sss"]
-    verify_data[f"{loc}_sst"] = dd["sst"]
-    verify_data[f"{loc}_labor_pct"] = dd["labor_pct"]
-    verify_data[f"{loc}_vs_guide_pct"] = dd["vs_guide_pct"]
-    verify_data[f"{loc}_avg_tkt"] = dd["avg_tkt"]
-    verify_data[f"{loc}_labor_hrs"] = dd["labor_hrs"]
-    verify_data[f"{loc}_guide_hrs"] = dd["guide_total"]
-    verify_data[f"{loc}_splh"] = dd["splh"]
-    verify_data[f"{loc}_cat_amt"] = dd["cat_amt"]
-    verify_data[f"{loc}_cat_py_amt"] = dd["cat_py_amt"]
-    verify_data[f"{loc}_food_addon_rate"] = upselling[loc]["food_addon_rate"]
-    verify_data[f"{loc}_queso_rate"] = upselling[loc]["queso_rate"]
-    verify_data[f"{loc}_bev_rate"] = upselling[loc]["bev_rate"]
-    for wi in range(4):
-        wd = loc_weekly[loc][wi]
-        verify_data[f"{loc}_w{wi}_sales"] = wd["amount"]
-        verify_data[f"{loc}_w{wi}_labor_pct"] = wd["labor_pct"]
-        verify_data[f"{loc}_w{wi}_cat_amt"] = wd.get("cat_amt", 0)
-        verify_data[f"{loc}_w{wi}_ovation_r"] = wd.get("ovation_r")
-        verify_data[f"{loc}_w{wi}_google_r"] = wd.get("google_r")
+# Keyed like report_queries.assemble() / query_planner.consolidated_report(), so live
+# query results drop in unchanged; WeeklyKpis(RAW, ...) builds FACTS, loc_weekly,
+# loc_data, comp_locs, the sys_* totals, sys_weekly and verify_data once.
+RAW = {"weekly_sales_raw":weekly_sales_raw,"catering_cy_raw":catering_cy_raw,"catering_py_raw":catering_py_raw,
+       "reviews_raw":reviews_raw,"daily_labor_raw":daily_labor_raw,"daily_sales_raw":daily_sales_raw,
+       "scheduled_raw":scheduled_raw,"agm_raw":agm_raw,"GUIDELINES_TABLE":GUIDELINES_TABLE,"upselling_raw":upselling_raw}
 
 # ============================================================
 # AI INSIGHT GENERATION — all from computed data
 # ============================================================
-def generate_callouts():
-    # Rankings
-    sales_ranks = rank_items(loc_data, "amount", reverse=True)
-    labor_ranks = rank_items(loc_data, "vs_guide_pct", reverse=False)
-    cat_ranks = rank_items(loc_data, "cat_amt", reverse=True)
-
-    # Comp SSS sorted
-    comp_sss = sorted([(l, loc_data[l]["sss"]) for l in comp_locs if loc_data[l]["sss"] is not None], key=lambda x: x[1])
-    best_sss_loc, best_sss_val = comp_sss[-1]
-    worst_sss_loc, worst_sss_val = comp_sss[0]
-
-    # 4-week trajectories from loc_weekly
-    def traj_sales(loc): return [loc_weekly[loc][wi]["amount"] for wi in [3,2,1,0]]
-    def traj_lp(loc): return [loc_weekly[loc][wi]["labor_pct"] for wi in [3,2,1,0]]
-    def traj_cat(loc): return [loc_weekly[loc][wi]["cat_amt"] for wi in [3,2,1,0]]
-    def traj_ovation(loc): return [loc_weekly[loc][wi].get("ovation_r") for wi in [3,2,1,0]]
-
-    # System avg food addon rate
-    sys_food_addon = sum(upselling[l]["food_addon_rate"]*upselling[l]["checks"] for l in LOCATIONS) / sum(upselling[l]["checks"] for l in LOCATIONS)
-
-    # --- SALES CALLOUT ---
-    burl_traj = traj_sales("Burleson")
-    fay_traj = traj_sales("Fayetteville")
-    waco_traj = traj_sales("Waco")
-    sa_sst = loc_data["San Antonio"]["sst"]
-
-    sales_callout = (
+# One function per callout, all reading one CalloutInputs: the rankings, comp SSS order,
+# schedule gaps and every tagged number are computed once per report and reused when the
+# verification loop regenerates a single failing section.
+k = lambda x: x / 1000
+share = lambda part, whole: part / whole * 100
+abs_diff = lambda a, b: abs(a - b)
+abs_pct_chg = lambda a, b: abs(pct_chg(a, b))
+weighted = lambda *rc: sum(r * c for r, c in zip(rc[::2], rc[1::2])) / sum(rc[1::2])  # rate, weight, rate, weight...
+
+class CalloutInputs:
+    """Memoized inputs shared by the callout sections of one WeeklyKpis."""
+
+    def __init__(self, K):
+        self.K = K
+        self.number_cache = {}  # every section's tagged numbers (see CalloutNumbers)
+
+    def numbers(self):
+        """A CalloutNumbers builder for one section; every number is looked up once per report."""
+        return CalloutNumbers(self.K.verify_data, self.number_cache)
+
+    @cached_property
+    def ranks(self):
+        loc_data = self.K.loc_data
+        with span("rank"):
+            return (rank_items(loc_data, "amount", reverse=True), rank_items(loc_data, "vs_guide_pct", reverse=False),
+                    rank_items(loc_data, "cat_amt", reverse=True))
+
+    @cached_property
+    def comp_sss(self):
+        loc_data = self.K.loc_data
+        return sorted([(l, loc_data[l]["sss"]) for l in self.K.comp_locs if loc_data[l]["sss"] is not None], key=lambda x: x[1])
+
+    @cached_property
+    def sch_vs(self):
+        """(location, actual - scheduled hours), most under schedule first."""
+        loc_data = self.K.loc_data
+        return sorted([(l, loc_data[l]["labor_hrs"] - loc_data[l]["sch_hrs"]) for l in self.K.locations], key=lambda x: x[1])
+
+    @cached_property
+    def food_addon_keys(self):
+        """System food add-on rate, weighted by checks: (rate, checks) keys per location."""
+        return [f"{l}_{m}" for l in self.K.locations for m in ("food_addon_rate", "checks")]
+
+
+def sales_section(C):
+    n = C.numbers()
+    def v(fmt, loc, key, calc=None): return n(fmt, f"{loc}_{key}", calc=calc)
+    def w(fmt, loc, wi, key, calc=None): return n(fmt, f"{loc}_w{wi}_{key}", calc=calc)  # wi 3 = 4 weeks ago
+    best_sss_loc, worst_sss_loc = C.comp_sss[-1][0], C.comp_sss[0][0]
+    return n.text("sales",
         f"<strong>{best_sss_loc}</strong> has posted 3 consecutive weeks of sales growth "
-        f"(${traj_sales(best_sss_loc)[0]/1000:.0f}K → ${traj_sales(best_sss_loc)[1]/1000:.0f}K → "
-        f"${traj_sales(best_sss_loc)[2]/1000:.0f}K → ${traj_sales(best_sss_loc)[3]/1000:.0f}K) and is the only "
-        f"comp store with positive SSS this week (+{best_sss_val:.1f}%) — momentum worth studying. "
-        f"<strong>{worst_sss_loc}'s</strong> {sa_sst:.1f}% transaction decline is the system's biggest concern and has persisted "
+        f"(${w('.0f', best_sss_loc, 3, 'sales', k)}K → ${w('.0f', best_sss_loc, 2, 'sales', k)}K → "
+        f"${w('.0f', best_sss_loc, 1, 'sales', k)}K → ${w('.0f', best_sss_loc, 0, 'sales', k)}K) and is the only "
+        f"comp store with positive SSS this week (+{v('.1f', best_sss_loc, 'sss')}%) — momentum worth studying. "
+        f"<strong>{worst_sss_loc}'s</strong> {v('.1f', 'San Antonio', 'sst')}% transaction decline is the system's biggest concern and has persisted "
         f"across all 4 trailing weeks — this is a traffic problem, not a ticket problem. "
-        f"The ${loc_data['Burleson']['avg_tkt'] - loc_data['San Antonio']['avg_tkt']:.2f} ticket gap between "
-        f"Burleson (${loc_data['Burleson']['avg_tkt']:.2f}) and {worst_sss_loc} (${loc_data[worst_sss_loc]['avg_tkt']:.2f}) "
+        f"The ${n('.2f', 'Burleson_avg_tkt', 'San Antonio_avg_tkt', calc=sub)} ticket gap between "
+        f"Burleson (${v('.2f', 'Burleson', 'avg_tkt')}) and {worst_sss_loc} (${v('.2f', worst_sss_loc, 'avg_tkt')}) "
         f"is explained by real attachment data: {worst_sss_loc}'s food add-on rate is just "
-        f"{upselling[worst_sss_loc]['food_addon_rate']:.1f}% vs the system average of ~{sys_food_addon:.0f}%, "
-        f"and their queso attach is only {upselling[worst_sss_loc]['queso_rate']:.1f}% "
-        f"(less than half of Burleson's {upselling['Burleson']['queso_rate']:.1f}%). This is a specific, coachable opportunity. "
-        f"<strong>Burleson</strong> has doubled sales in 4 weeks (${burl_traj[0]/1000:.0f}K → ${burl_traj[3]/1000:.0f}K) "
-        f"and leads the system in beverage attachment at {upselling['Burleson']['bev_rate']:.1f}% — "
+        f"{v('.1f', worst_sss_loc, 'food_addon_rate')}% vs the system average of ~{n('.0f', *C.food_addon_keys, calc=weighted)}%, "
+        f"and their queso attach is only {v('.1f', worst_sss_loc, 'queso_rate')}% "
+        f"(less than half of Burleson's {v('.1f', 'Burleson', 'queso_rate')}%). This is a specific, coachable opportunity. "
+        f"<strong>Burleson</strong> has doubled sales in 4 weeks (${w('.0f', 'Burleson', 3, 'sales', k)}K → ${w('.0f', 'Burleson', 0, 'sales', k)}K) "
+        f"and leads the system in beverage attachment at {v('.1f', 'Burleson', 'bev_rate')}% — "
         f"evidence their team was well-trained from day one. "
-        f"<strong>Fayetteville</strong> has stabilized around ${fay_traj[2]/1000:.0f}-{fay_traj[3]/1000:.0f}K for 3 straight weeks after its opening ramp."
+        f"<strong>Fayetteville</strong> has stabilized around ${w('.0f', 'Fayetteville', 1, 'sales', k)}-{w('.0f', 'Fayetteville', 0, 'sales', k)}K for 3 straight weeks after its opening ramp."
     )
 
-    # --- LABOR CALLOUT ---
-    best_guide_loc = labor_ranks[0][0]
-    worst_guide_loc = labor_ranks[-1][0]
-    burl_lp_traj = traj_lp("Burleson")
-    sa_lp_traj = traj_lp("San Antonio")
 
-    # Schedule vs actual
-    sch_vs = [(l, loc_data[l]["labor_hrs"] - loc_data[l]["sch_hrs"]) for l in LOCATIONS]
-    sch_vs.sort(key=lambda x: x[1])
-    most_under_sch_loc, most_under_sch = sch_vs[0]
-    most_over_sch_loc, most_over_sch = sch_vs[-1]
-
-    labor_callout = (
+def labor_section(C):
+    n = C.numbers()
+    def v(fmt, loc, key, calc=None): return n(fmt, f"{loc}_{key}", calc=calc)
+    def w(fmt, loc, wi, key, calc=None): return n(fmt, f"{loc}_w{wi}_{key}", calc=calc)
+    def sch_gap(loc): return n(".0f", f"{loc}_labor_hrs", f"{loc}_sch_hrs", calc=abs_diff)
+    best_guide_loc = C.ranks[1][0][0]
+    most_under_sch_loc, most_over_sch_loc = C.sch_vs[0][0], C.sch_vs[-1][0]
+    return n.text("labor",
         f"<strong>Burleson's</strong> labor % trajectory is the standout story: "
-        f"{burl_lp_traj[0]:.1f}% → {burl_lp_traj[1]:.1f}% → {burl_lp_traj[2]:.1f}% → {burl_lp_traj[3]:.1f}% over 4 weeks. "
+        f"{w('.1f', 'Burleson', 3, 'labor_pct')}% → {w('.1f', 'Burleson', 2, 'labor_pct')}% → "
+        f"{w('.1f', 'Burleson', 1, 'labor_pct')}% → {w('.1f', 'Burleson', 0, 'labor_pct')}% over 4 weeks. "
         f"As volume doubled, their team scaled efficiently rather than adding proportional hours — textbook new-store execution. "
-        f"<strong>{best_guide_loc}</strong> ran tightest to guide at {loc_data[best_guide_loc]['vs_guide_pct']:.1f}%, "
-        f"but with a {loc_data[best_guide_loc]['sst']:.1f}% transaction decline, "
+        f"<strong>{best_guide_loc}</strong> ran tightest to guide at {v('.1f', best_guide_loc, 'vs_guide_pct')}%, "
+        f"but with a {v('.1f', best_guide_loc, 'sst')}% transaction decline, "
         f"it's worth asking whether understaffing during peak hours is contributing to the traffic drop — "
         f"sometimes running under guide costs more in lost sales than it saves in labor. "
-        f"<strong>Fayetteville</strong> is at {loc_data['Fayetteville']['vs_guide_pct']:.1f}% of guide, but context matters: "
+        f"<strong>Fayetteville</strong> is at {v('.1f', 'Fayetteville', 'vs_guide_pct')}% of guide, but context matters: "
         f"their AGM allowance has ramped down from 350 → 200 hrs/wk over 4 weeks. "
-        f"The team came in {abs(most_under_sch):.0f} hours under their own schedule, "
+        f"The team came in {sch_gap(most_under_sch_loc)} hours under their own schedule, "
         f"showing active cost management even during the opening period. "
-        f"<strong>{most_over_sch_loc}</strong> ran {abs(most_over_sch):.0f} hours over schedule this week."
+        f"<strong>{most_over_sch_loc}</strong> ran {sch_gap(most_over_sch_loc)} hours over schedule this week."
     )
 
-    # --- REVIEWS CALLOUT ---
-    waco_ov_traj = traj_ovation("Waco")
-    fay_ov_traj = traj_ovation("Fayetteville")
 
-    reviews_callout = (
-        f"<strong>San Marcos</strong> posted a perfect {loc_data['San Marcos']['ovation_r']:.1f} on Ovation "
-        f"({loc_data['San Marcos']['ovation_n']} surveys) alongside a {loc_data['San Marcos']['google_r']:.1f} Google average — "
+def reviews_section(C):
+    n = C.numbers()
+    def v(fmt, loc, key, calc=None): return n(fmt, f"{loc}_{key}", calc=calc)
+    def w(fmt, loc, wi, key, calc=None): return n(fmt, f"{loc}_w{wi}_{key}", calc=calc)
+    return n.text("reviews",
+        f"<strong>San Marcos</strong> posted a perfect {v('.1f', 'San Marcos', 'ovation_r')} on Ovation "
+        f"({v('', 'San Marcos', 'ovation_n')} surveys) alongside a {v('.1f', 'San Marcos', 'google_r')} Google average — "
         f"they've been the most consistently top-rated store across all 4 weeks. "
         f"<strong>Waco's</strong> Ovation score has declined for 4 straight weeks "
-        f"({waco_ov_traj[0]:.1f} → {waco_ov_traj[1]:.1f} → {waco_ov_traj[2]:.1f} → {waco_ov_traj[3]:.1f}), "
+        f"({w('.1f', 'Waco', 3, 'ovation_r')} → {w('.1f', 'Waco', 2, 'ovation_r')} → "
+        f"{w('.1f', 'Waco', 1, 'ovation_r')} → {w('.1f', 'Waco', 0, 'ovation_r')}), "
         f"suggesting a worsening trend, not a one-week blip. Meanwhile their Google reviews remain at "
-        f"{loc_data['Waco']['google_r']:.1f}, which means the in-store experience (captured by Ovation) may be slipping "
+        f"{v('.1f', 'Waco', 'google_r')}, which means the in-store experience (captured by Ovation) may be slipping "
         f"while online perception lags — an early warning sign that needs on-the-ground investigation. "
         f"<strong>Fayetteville</strong> recovered from a dip in Week 3 "
-        f"({fay_ov_traj[1]:.1f} Ovation) back to {fay_ov_traj[3]:.1f} this week — "
+        f"({w('.1f', 'Fayetteville', 2, 'ovation_r')} Ovation) back to {w('.1f', 'Fayetteville', 0, 'ovation_r')} this week — "
         f"showing the team can course-correct when issues arise. "
         f"Stores averaging fewer than 10 Ovation surveys per week should push for higher participation to make the data actionable."
     )
 
-    # --- CATERING CALLOUT ---
-    waco_cat_traj = traj_cat("Waco")
-    burl_cat_traj = traj_cat("Burleson")
-    cstat_cat = loc_data["College Station"]["cat_amt"]
-    cstat_cat_py = loc_data["College Station"]["cat_py_amt"]
-    cstat_cat_chg = pct_chg(cstat_cat, cstat_cat_py)
-    zero_cat = [l for l in LOCATIONS if loc_data[l]["cat_amt"] == 0]
-    waco_cat_py = loc_data["Waco"]["cat_py_amt"]
-    waco_cat_vs = pct_chg(loc_data["Waco"]["cat_amt"], waco_cat_py)
-    waco_penetration = loc_data["Waco"]["cat_amt"] / loc_data["Waco"]["amount"] * 100
-
-    catering_callout = (
+
+def catering_section(C):
+    n = C.numbers()
+    def v(fmt, loc, key, calc=None): return n(fmt, f"{loc}_{key}", calc=calc)
+    def w(fmt, loc, wi, key, calc=None): return n(fmt, f"{loc}_w{wi}_{key}", calc=calc)
+    loc_data = C.K.loc_data
+    cstat_cat_chg = pct_chg(loc_data["College Station"]["cat_amt"], loc_data["College Station"]["cat_py_amt"])
+    zero_cat = [l for l in C.K.locations if loc_data[l]["cat_amt"] == 0]
+    return n.text("catering",
         f"<strong>Waco</strong> has built clear catering momentum over 4 weeks: "
-        f"${waco_cat_traj[0]/1000:.1f}K → ${waco_cat_traj[1]/1000:.1f}K → ${waco_cat_traj[2]/1000:.1f}K → ${waco_cat_traj[3]/1000:.1f}K, "
-        f"with order counts growing from {loc_weekly['Waco'][3]['cat_ords']} to {loc_data['Waco']['cat_ords']} — "
+        f"${w('.1f', 'Waco', 3, 'cat_amt', k)}K → ${w('.1f', 'Waco', 2, 'cat_amt', k)}K → "
+        f"${w('.1f', 'Waco', 1, 'cat_amt', k)}K → ${w('.1f', 'Waco', 0, 'cat_amt', k)}K, "
+        f"with order counts growing from {w('', 'Waco', 3, 'cat_ords')} to {v('', 'Waco', 'cat_ords')} — "
         f"suggesting they're building a repeat customer pipeline. "
-        f"They're up {waco_cat_vs:.0f}% vs prior year this week. "
+        f"They're up {n('.0f', 'Waco_cat_amt', 'Waco_cat_py_amt', calc=pct_chg)}% vs prior year this week. "
         f"<strong>Burleson</strong> is a new-store bright spot, going from zero catering to "
-        f"${burl_cat_traj[3]:,.0f} ({loc_data['Burleson']['cat_ords']} orders) in just 4 weeks. "
+        f"${w(',.0f', 'Burleson', 0, 'cat_amt')} ({v('', 'Burleson', 'cat_ords')} orders) in just 4 weeks. "
         f"<strong>College Station</strong> is {'up' if cstat_cat_chg and cstat_cat_chg > 0 else 'down'} "
-        f"{abs(cstat_cat_chg):.0f}% vs PY this week ({fm(cstat_cat)} vs {fm(cstat_cat_py)}). "
+        f"{n('.0f', 'College Station_cat_amt', 'College Station_cat_py_amt', calc=abs_pct_chg)}% vs PY this week "
+        f"({v(fm, 'College Station', 'cat_amt')} vs {v(fm, 'College Station', 'cat_py_amt')}). "
         + (f"<strong>{', '.join(zero_cat)}</strong> had zero catering this week. " if zero_cat else "")
-        + f"System catering at {fm(sys_cat)} represents just {sys_cat/sys_amt*100:.1f}% of total sales — "
-        f"if every store matched Waco's penetration rate ({waco_penetration:.1f}% of store sales), "
+        + f"System catering at {n(fm, 'sys_cat')} represents just {n('.1f', 'sys_cat', 'sys_amt', calc=share)}% of total sales — "
+        f"if every store matched Waco's penetration rate ({n('.1f', 'Waco_cat_amt', 'Waco_sales', calc=share)}% of store sales), "
         f"the system would add meaningful incremental revenue with minimal labor impact."
     )
 
-    return sales_callout, labor_callout, reviews_callout, catering_callout, sales_ranks, labor_ranks, cat_ranks
+
+SECTIONS = {"sales": sales_section, "labor": labor_section, "reviews": reviews_section, "catering": catering_section}
 
 # ============================================================
 # VERIFICATION LOOP
 # ============================================================
-def verify_callout(name, text, verify_data):
+def verify_callout(name, text, known, verify_data):
     """
     Verify numerical claims in a callout against all known data.
-    Cross-location comparisons are valid — check ANY location's data, not just nearby.
-    System-level values also checked.
+    Tagged numbers (a Callout from CalloutNumbers) are recomputed from their verify_data keys;
+    anything typed into the prose is searched in the KnownValues index — cross-location
+    comparisons are valid, so ANY location's data counts, and system-level values too.
     """
-    errors = []
-
-    # Build a flat set of ALL known percentage and dollar values
-    all_known_pcts = set()
-    all_known_dollars = set()
-
-    for loc in LOCATIONS:
-        for key in ["labor_pct","vs_guide_pct","sss","sst","food_addon_rate","queso_rate","bev_rate"]:
-            v = verify_data.get(f"{loc}_{key}")
-            if v is not None: all_known_pcts.add(round(abs(v), 1))
-        for wi in range(4):
-            v = verify_data.get(f"{loc}_w{wi}_labor_pct")
-            if v is not None: all_known_pcts.add(round(abs(v), 1))
-            v = verify_data.get(f"{loc}_w{wi}_ovation_r")
-            if v is not None: all_known_pcts.add(round(abs(v), 1))
-        # Cat penetration
-        s = verify_data.get(f"{loc}_sales", 0)
-        c = verify_data.get(f"{loc}_cat_amt", 0)
-        if s > 0: all_known_pcts.add(round(c / s * 100, 1))
-
-        for key in ["sales","cat_amt","cat_py_amt"]:
-            v = verify_data.get(f"{loc}_{key}")
-            if v: all_known_dollars.add(v)
-        for wi in range(4):
-            for key in ["sales","cat_amt"]:
-                v = verify_data.get(f"{loc}_w{wi}_{key}")
-                if v: all_known_dollars.add(v)
-
-    # System-level values
-    all_known_pcts.add(round(abs(sys_sss), 1) if sys_sss else 0)
-    all_known_pcts.add(round(abs(sys_sst), 1) if sys_sst else 0)
-    all_known_pcts.add(round(sys_lp, 1))
-    # System catering % of sales
-    all_known_pcts.add(round(sys_cat / sys_amt * 100, 1) if sys_amt else 0)
-    all_known_dollars.add(sys_amt)
-    all_known_dollars.add(sys_cat)
-    all_known_dollars.add(sys_pay)
-
-    # Check all percentages in the callout
-    pct_matches = re.findall(r'(\d+\.\d+)%', text)
-    for pct_str in pct_matches:
-        pct_val = round(float(pct_str), 1)
-        if pct_val < 1.0: continue  # ignore trivial
-        if not any(abs(pct_val - kv) < 0.2 for kv in all_known_pcts):
-            errors.append(f"[{name}] {pct_val}% not found in any known metric")
-
-    # Check dollar amounts > $100
-    dollar_matches = re.findall(r'\$([0-9,]+(?:\.\d+)?)', text)
-    for d_str in dollar_matches:
-        d_val = float(d_str.replace(',', ''))
-        if d_val < 100: continue
-        if not any(abs(d_val - kv) / max(kv, 1) < 0.06 for kv in all_known_dollars if kv > 0):
-            errors.append(f"[{name}] ${d_val:,.0f} not found in any known value")
-
+    if isinstance(text, Callout):
+        errors = text.check(verify_data) + known.check(name, text.residue)
+    else:
+        errors = known.check(name, text)
     return len(errors) == 0, errors
 
 MAX_ROUNDS = 3
-for round_num in range(MAX_ROUNDS):
-    sales_callout, labor_callout, reviews_callout, catering_callout, sales_ranks, labor_ranks, cat_ranks = generate_callouts()
-    all_valid = True
-    all_errors = []
-    for name, text in [("sales",sales_callout),("labor",labor_callout),("reviews",reviews_callout),("catering",catering_callout)]:
-        valid, errors = verify_callout(name, text, verify_data)
-        if not valid:
-            all_valid = False
-            all_errors.extend(errors)
-    if all_valid:
-        print(f"✓ All AI insights verified on round {round_num+1}")
-        break
-    else:
-        print(f"✗ Round {round_num+1}: {len(all_errors)} errors:")
-        for e in all_errors: print(f"  {e}")
-        print("  → Regenerating...")
 
-if not all_valid:
-    print(f"⚠ {len(all_errors)} unresolved after {MAX_ROUNDS} rounds (may be cross-location refs or derived values)")
-
-# ============================================================
-# SYSTEM TRENDS
-# ============================================================
-sys_weekly = {}
-for wi, ws_i in enumerate(WEEK_STARTS):
-    t_amt = sum(loc_weekly[loc][wi]["amount"] for loc in LOCATIONS)
-    t_comp_amt = sum(loc_weekly[loc][wi]["amount"] for loc in comp_locs)
-    t_comp_amt_py = sum(loc_weekly[loc][wi]["amount_py"] for loc in comp_locs)
-    t_comp_ords = sum(loc_weekly[loc][wi]["orders"] for loc in comp_locs)
-    t_comp_ords_py = sum(loc_weekly[loc][wi]["orders_py"] for loc in comp_locs)
-    t_ords = sum(loc_weekly[loc][wi]["orders"] for loc in LOCATIONS)
-    t_hrs = sum(loc_weekly[loc][wi]["labor_hrs"] for loc in LOCATIONS)
-    t_pay = sum(loc_weekly[loc][wi]["labor_pay"] for loc in LOCATIONS)
-    t_sch = sum(loc_weekly[loc][wi]["sch_hrs"] for loc in LOCATIONS)
-    t_guide = sum(loc_weekly[loc][wi]["guide_total"] for loc in LOCATIONS)
-    t_cat = sum(loc_weekly[loc][wi]["cat_amt"] for loc in LOCATIONS)
-    t_cat_py = sum(loc_weekly[loc][wi].get("cat_py_amt",0) for loc in LOCATIONS)
-    sys_weekly[ws_i] = {"amount":t_amt,"comp_amt":t_comp_amt,"comp_amt_py":t_comp_amt_py,
-        "orders":t_ords,"comp_ords":t_comp_ords,"comp_ords_py":t_comp_ords_py,
-        "labor_hrs":t_hrs,"labor_pay":t_pay,"sch_hrs":t_sch,"guide":t_guide,
-        "cat_amt":t_cat,"cat_amt_py":t_cat_py}
+def verified_callouts(K, max_rounds=MAX_ROUNDS, sections=SECTIONS):
+    """
+    Every callout section, regenerated until its numbers check out against K.verify_data.
+    Only failing sections are regenerated, from the same memoized CalloutInputs; a section
+    writer that can do better on a retry (an LLM) plugs in through `sections`.
+    """
+    C = CalloutInputs(K)
+    with span("verify", index=True):
+        known = KnownValues.from_kpis(K)  # once per report, shared by every callout and round
+    callouts, pending = {}, list(sections)
+    for round_num in range(max_rounds):
+        with span("callouts", round=round_num+1, sections=len(pending)):
+            for name in pending: callouts[name] = sections[name](C)
+        failed, all_errors = [], []
+        with span("verify", round=round_num+1) as trace:
+            for name in pending:
+                valid, errors = verify_callout(name, callouts[name], known, K.verify_data)
+                if not valid:
+                    failed.append(name)
+                    all_errors.extend(errors)
+            trace["errors"] = len(all_errors)
+        pending = failed
+        if not pending:
+            print(f"✓ All AI insights verified on round {round_num+1}")
+            break
+        else:
+            print(f"✗ Round {round_num+1}: {len(all_errors)} errors:")
+            for e in all_errors: print(f"  {e}")
+            print(f"  → Regenerating {', '.join(pending)}...")
+
+    if pending:
+        print(f"⚠ {len(all_errors)} unresolved after {max_rounds} rounds in {', '.join(pending)} (may be cross-location refs or derived values)")
+    return tuple(callouts[name] for name in sections) + C.ranks
 
 # ============================================================
 # BUILD HTML (using template from references/html_template.md)
@@ -894,98 +675,152 @@ tbody tr.highlight{background:#f5efe9;}
 .footer{text-align:center;padding:4px;font-size:8px;color:var(--text-secondary);}
 @media print{body{background:var(--bg);-webkit-print-color-adjust:exact;print-color-adjust:exact;}.report-container{max-width:100%;padding:4px;}.section{break-inside:avoid;}.kpi-row{break-inside:avoid;}}"""
 
-# --- R&S rows ---
-sales_rs_rows = ""
-for loc,val,rk in sales_ranks:
-    ld = loc_data[loc]
-    sales_rs_rows += f'<tr><td><span class="rank {rank_cls(rk)}">{rank_suffix(rk)}</span></td><td>{loc}</td><td>{fm(ld["amount"])}</td><td>{pill_sss(ld["sss"])}</td><td>{fn(ld["orders"])}</td><td>{pill_sss(ld["sst"])}</td><td>{fm(ld["avg_tkt"],2)}</td><td>{pill_sss(ld["tkt_chg"])}</td><td>{fm(ld["cat_amt"])}</td><td><span class="pill pill-neutral">{ld["suffix"]}</span></td></tr>'
-sales_rs_rows += f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fm(sys_amt)}</td><td>{pill_sss(sys_sss)}</td><td>{fn(sys_ords)}</td><td>{pill_sss(sys_sst)}</td><td>{fm(sys_tkt,2)}</td><td>{pill_sss(sys_tkt_chg)}</td><td>{fm(sys_cat)}</td><td><span class="pill pill-neutral">Comp Only</span></td></tr>'
-
-labor_rs_rows = ""
-for loc,val,rk in labor_ranks:
-    ld = loc_data[loc]
-    labor_rs_rows += f'<tr><td><span class="rank {rank_cls(rk)}">{rank_suffix(rk)}</span></td><td>{loc}</td><td>{fm(ld["amount"])}</td><td>{fn(ld["guide_total"],0)}</td><td>{fn(ld["sch_hrs"],0)}</td><td>{fn(ld["labor_hrs"],0)}</td><td>{pill_labor_diff(ld["vs_guide_n"])}</td><td>{pill_labor_ratio(ld["labor_hrs"],ld["guide_total"])}</td><td>{pill_labor_pct(ld["labor_pct"])}</td><td>{fm(ld["splh"],2)}</td></tr>'
-sys_vs_guide = sys_hrs - sys_guide
-sys_splh = sys_amt/sys_hrs if sys_hrs else 0
-labor_rs_rows += f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fm(sys_amt)}</td><td>{fn(sys_guide,0)}</td><td>{fn(sum(v["sch_hrs"] for v in loc_data.values()),0)}</td><td>{fn(sys_hrs,0)}</td><td>{pill_labor_diff(sys_vs_guide)}</td><td>{pill_labor_ratio(sys_hrs,sys_guide)}</td><td>{pill_labor_pct(sys_lp)}</td><td>{fm(sys_splh,2)}</td></tr>'
-
-reviews_ranks = rank_items(loc_data, "wavg_rating", reverse=True)
-reviews_rs_rows = ""
-for loc,val,rk in reviews_ranks:
-    ld = loc_data[loc]
-    yelp_cell = pill_rating(ld["yelp_r"]) if ld["yelp_r"] else '<span class="pill pill-neutral">—</span>'
-    yelp_n_cell = fn(ld["yelp_n"]) if ld["yelp_n"] else "—"
-    reviews_rs_rows += f'<tr><td><span class="rank {rank_cls(rk)}">{rank_suffix(rk)}</span></td><td>{loc}</td><td>{pill_rating(ld["google_r"])}</td><td>{fn(ld["google_n"])}</td><td>{pill_rating(ld["ovation_r"])}</td><td>{fn(ld["ovation_n"])}</td><td>{yelp_cell}</td><td>{yelp_n_cell}</td><td>{pill_rating(ld["wavg_rating"])}</td><td>{fn(ld["total_rev_n"])}</td></tr>'
-
-cat_rs_rows = ""
-for loc,val,rk in cat_ranks:
-    ld = loc_data[loc]
-    cat_vs = pct_chg(ld["cat_amt"], ld["cat_py_amt"]) if ld["cat_py_amt"] else None
-    cat_rs_rows += f'<tr><td><span class="rank {rank_cls(rk)}">{rank_suffix(rk)}</span></td><td>{loc}</td><td>{fn(ld["cat_ords"])}</td><td>{fm(ld["cat_amt"])}</td><td>{fm(ld["cat_py_amt"])}</td><td>{pill_sss(cat_vs)}</td></tr>'
-sys_cat_py = sum(loc_data[l]["cat_py_amt"] for l in LOCATIONS)
-cat_rs_rows += f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fn(sys_cat_ords)}</td><td>{fm(sys_cat)}</td><td>{fm(sys_cat_py)}</td><td>{pill_sss(pct_chg(sys_cat,sys_cat_py) if sys_cat_py else None)}</td></tr>'
-
-# Trends
-trends_rows = ""
-for ws_i in WEEK_STARTS:
-    sw = sys_weekly[ws_i]
-    sss_w = pct_chg(sw["comp_amt"],sw["comp_amt_py"]) if sw["comp_amt_py"] else None
-    sst_w = pct_chg(sw["comp_ords"],sw["comp_ords_py"]) if sw["comp_ords_py"] else None
-    tkt_w = sw["amount"]/sw["orders"] if sw["orders"] else 0
-    lp_w = (sw["labor_pay"]/sw["amount"]*100) if sw["amount"] else 0
-    splh_w = sw["amount"]/sw["labor_hrs"] if sw["labor_hrs"] else 0
-    vs_guide_w = sw["labor_hrs"]-sw["guide"]
-    is_cw = ws_i == ws
-    style = ' class="highlight"' if is_cw else ''
-    b = lambda x: f"<strong>{x}</strong>" if is_cw else x
-    trends_rows += f'<tr{style}><td>{b(wk_short(ws_i))}</td><td>{b(fm(sw["amount"]))}</td><td>{pill_sss(sss_w)}</td><td>{b(fn(sw["orders"]))}</td><td>{pill_sss(sst_w)}</td><td>{b(fm(tkt_w,2))}</td><td>{b(fn(sw["guide"],0))}</td><td>{b(fn(sw["labor_hrs"],0))}</td><td>{pill_labor_diff(vs_guide_w)}</td><td>{pill_labor_ratio(sw["labor_hrs"],sw["guide"])}</td><td>{pill_labor_pct(lp_w)}</td><td>{b(fm(splh_w,2))}</td><td>{b(fm(sw["cat_amt"]))}</td><td>{b(fm(sw["cat_amt_py"]))}</td></tr>'
-
-# GM message
-labor_cls = "positive" if sys_lp_chg <= 0 else "negative"
-labor_arrow = "&#9650;" if sys_lp_chg > 0 else "&#9660;"
-labor_sign = "+" if sys_lp_chg >= 0 else ""
-
-gm_msg = (
-    f"Fuego Tortilla Grill generated {fm(sys_amt)} across 6 locations for the week of {wk_long(ws)}. "
-    f"Comparable stores were {'up' if sys_sss and sys_sss>=0 else 'down'} {abs(sys_sss):.1f}% in same-store sales and "
-    f"{'up' if sys_sst and sys_sst>=0 else 'down'} {abs(sys_sst):.1f}% in same-store transactions vs prior year. "
-    f"System-wide order count was {fn(sys_ords,0)} with a {fm(sys_tkt,2)} average ticket. "
-    f"Labor came in at {sys_lp:.1f}% system-wide ({fm(sys_pay)} on {fn(sys_hrs,1)} hours), "
-    f"{'improving' if sys_lp_chg<0 else 'up'} {abs(sys_lp_chg):.1f}pp vs prior week. "
-    f"The system ran {fn(abs(sys_vs_guide),1)} hours {'over' if sys_vs_guide>0 else 'under'} the combined guideline. "
-    f"Catering was {fm(sys_cat)} ({fn(sys_cat_ords,0)} orders)."
-)
-
-html = f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">
-<title>Fuego System Weekly Flash – {wk_long(ws)}</title>
-<style>@page{{size:A4 portrait;margin:0.3in;}}{CSS}</style></head><body>
+# ============================================================
+# ROW TEMPLATES (see html_stream.py)
+# ============================================================
+RANK_CELLS = '<tr><td><span class="rank {rank_cls}">{rank}</span></td><td>{loc}</td>'
+SALES_RS_ROW = RowTemplate(RANK_CELLS + '<td>{amount}</td><td>{sss}</td><td>{orders}</td><td>{sst}</td><td>{avg_tkt}</td><td>{tkt_chg}</td><td>{cat_amt}</td><td><span class="pill pill-neutral">{suffix}</span></td></tr>')
+LABOR_RS_ROW = RowTemplate(RANK_CELLS + '<td>{amount}</td><td>{guide}</td><td>{sch}</td><td>{hrs}</td><td>{vs_guide}</td><td>{vs_guide_pct}</td><td>{labor_pct}</td><td>{splh}</td></tr>')
+REVIEWS_RS_ROW = RowTemplate(RANK_CELLS + '<td>{google}</td><td>{google_n}</td><td>{ovation}</td><td>{ovation_n}</td><td>{yelp}</td><td>{yelp_n}</td><td>{wavg}</td><td>{total_n}</td></tr>')
+CAT_RS_ROW = RowTemplate(RANK_CELLS + '<td>{orders}</td><td>{cat_amt}</td><td>{cat_py}</td><td>{vs_py}</td></tr>')
+TRENDS_ROW = RowTemplate('<tr{style}><td>{week}</td><td>{amount}</td><td>{sss}</td><td>{orders}</td><td>{sst}</td><td>{avg_tkt}</td><td>{guide}</td><td>{hrs}</td><td>{vs_guide}</td><td>{vs_guide_pct}</td><td>{labor_pct}</td><td>{splh}</td><td>{cat_amt}</td><td>{cat_py}</td></tr>')
+
+def rank_fields(loc, rk):
+    return {"rank_cls": rank_cls(rk), "rank": rank_suffix(rk), "loc": loc}
+
+def sales_rs_rows(loc_data, ranks):
+    for loc,val,rk in ranks:
+        ld = loc_data[loc]
+        yield {**rank_fields(loc, rk), "amount": fm(ld["amount"]), "sss": pill_sss(ld["sss"]), "orders": fn(ld["orders"]), "sst": pill_sss(ld["sst"]),
+               "avg_tkt": fm(ld["avg_tkt"],2), "tkt_chg": pill_sss(ld["tkt_chg"]), "cat_amt": fm(ld["cat_amt"]), "suffix": ld["suffix"]}
+
+def labor_rs_rows(loc_data, ranks):
+    for loc,val,rk in ranks:
+        ld = loc_data[loc]
+        yield {**rank_fields(loc, rk), "amount": fm(ld["amount"]), "guide": fn(ld["guide_total"],0), "sch": fn(ld["sch_hrs"],0), "hrs": fn(ld["labor_hrs"],0),
+               "vs_guide": pill_labor_diff(ld["vs_guide_n"]), "vs_guide_pct": pill_labor_ratio(ld["labor_hrs"],ld["guide_total"]),
+               "labor_pct": pill_labor_pct(ld["labor_pct"]), "splh": fm(ld["splh"],2)}
+
+def reviews_rs_rows(loc_data, ranks):
+    for loc,val,rk in ranks:
+        ld = loc_data[loc]
+        yield {**rank_fields(loc, rk), "google": pill_rating(ld["google_r"]), "google_n": fn(ld["google_n"]),
+               "ovation": pill_rating(ld["ovation_r"]), "ovation_n": fn(ld["ovation_n"]),
+               "yelp": pill_rating(ld["yelp_r"]) if ld["yelp_r"] else '<span class="pill pill-neutral">—</span>',
+               "yelp_n": fn(ld["yelp_n"]) if ld["yelp_n"] else "—", "wavg": pill_rating(ld["wavg_rating"]), "total_n": fn(ld["total_rev_n"])}
+
+def cat_rs_rows(loc_data, ranks):
+    for loc,val,rk in ranks:
+        ld = loc_data[loc]
+        cat_vs = pct_chg(ld["cat_amt"], ld["cat_py_amt"]) if ld["cat_py_amt"] else None
+        yield {**rank_fields(loc, rk), "orders": fn(ld["cat_ords"]), "cat_amt": fm(ld["cat_amt"]), "cat_py": fm(ld["cat_py_amt"]), "vs_py": pill_sss(cat_vs)}
+
+def trends_rows(sys_weekly, week_starts, ws):
+    for ws_i in week_starts:
+        sw = sys_weekly[ws_i]
+        sss_w = pct_chg(sw["comp_amt"],sw["comp_amt_py"]) if sw["comp_amt_py"] else None
+        sst_w = pct_chg(sw["comp_ords"],sw["comp_ords_py"]) if sw["comp_ords_py"] else None
+        tkt_w = sw["amount"]/sw["orders"] if sw["orders"] else 0
+        lp_w = (sw["labor_pay"]/sw["amount"]*100) if sw["amount"] else 0
+        splh_w = sw["amount"]/sw["labor_hrs"] if sw["labor_hrs"] else 0
+        vs_guide_w = sw["labor_hrs"]-sw["guide"]
+        is_cw = ws_i == ws
+        b = lambda x: f"<strong>{x}</strong>" if is_cw else x
+        yield {"style": ' class="highlight"' if is_cw else '', "week": b(wk_short(ws_i)), "amount": b(fm(sw["amount"])), "sss": pill_sss(sss_w),
+               "orders": b(fn(sw["orders"])), "sst": pill_sss(sst_w), "avg_tkt": b(fm(tkt_w,2)), "guide": b(fn(sw["guide"],0)),
+               "hrs": b(fn(sw["labor_hrs"],0)), "vs_guide": pill_labor_diff(vs_guide_w), "vs_guide_pct": pill_labor_ratio(sw["labor_hrs"],sw["guide"]),
+               "labor_pct": pill_labor_pct(lp_w), "splh": b(fm(splh_w,2)), "cat_amt": b(fm(sw["cat_amt"])), "cat_py": b(fm(sw["cat_amt_py"]))}
+
+# ============================================================
+# PAGE TEMPLATE (compiled once, with the stylesheet and local fonts bound in)
+# ============================================================
+SYSTEM_PAGE = PageTemplate("""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">
+<title>Fuego System Weekly Flash – {week}</title>
+<style>@page{{size:A4 portrait;margin:0.3in;}}{css}</style></head><body>
 <div class="report-container">
-<div class="header header-b3 b3-v5"><div class="b3-bar-top"></div><div class="header-b-inner"><div class="header-b3-tag">SYSTEM WEEKLY FLASH REPORT</div><h1>Fuego Tortilla Grill</h1><div class="header-b3-meta"><span class="header-b3-pill">All 6 Locations</span><span class="header-b3-dot">&bull;</span><span>{wk_long(ws)}</span></div></div><div class="b3-bar-bottom"></div></div>
+<div class="header header-b3 b3-v5"><div class="b3-bar-top"></div><div class="header-b-inner"><div class="header-b3-tag">SYSTEM WEEKLY FLASH REPORT</div><h1>Fuego Tortilla Grill</h1><div class="header-b3-meta"><span class="header-b3-pill">All 6 Locations</span><span class="header-b3-dot">&bull;</span><span>{week}</span></div></div><div class="b3-bar-bottom"></div></div>
 <div class="kpi-row">
-<div class="kpi-card"><div class="kpi-label">System Sales</div><div class="kpi-value">{fm(sys_amt)}</div>{kpi_badge(sys_sss,"vs PY Comps")}</div>
-<div class="kpi-card"><div class="kpi-label">System Orders</div><div class="kpi-value">{fn(sys_ords)}</div>{kpi_badge(sys_sst,"vs PY Comps")}</div>
-<div class="kpi-card"><div class="kpi-label">Avg Ticket</div><div class="kpi-value">{fm(sys_tkt,2)}</div>{kpi_badge(sys_tkt_chg,"vs PY Comps")}</div>
-<div class="kpi-card"><div class="kpi-label">System Labor %</div><div class="kpi-value">{sys_lp:.1f}%</div><div class="kpi-change {labor_cls}">{labor_arrow} {labor_sign}{sys_lp_chg:.1f}pp vs PW</div></div>
-<div class="kpi-card"><div class="kpi-label">Catering</div><div class="kpi-value">{fm(sys_cat)}</div><div class="kpi-change neutral">{fn(sys_cat_ords,0)} orders</div></div>
+<div class="kpi-card"><div class="kpi-label">System Sales</div><div class="kpi-value">{sales}</div>{sales_badge}</div>
+<div class="kpi-card"><div class="kpi-label">System Orders</div><div class="kpi-value">{orders}</div>{orders_badge}</div>
+<div class="kpi-card"><div class="kpi-label">Avg Ticket</div><div class="kpi-value">{avg_tkt}</div>{avg_tkt_badge}</div>
+<div class="kpi-card"><div class="kpi-label">System Labor %</div><div class="kpi-value">{labor_pct}%</div><div class="kpi-change {labor_cls}">{labor_arrow} {labor_chg}pp vs PW</div></div>
+<div class="kpi-card"><div class="kpi-label">Catering</div><div class="kpi-value">{catering}</div><div class="kpi-change neutral">{cat_orders} orders</div></div>
 </div>
 <div class="gm-message"><div class="gm-label">System Summary</div>{gm_msg}</div>
-<div class="section"><div class="section-header"><div class="icon icon-sales">&#128202;</div><h2>System Performance Trends</h2><div class="section-sub">Last 4 Weeks – All Locations Combined</div></div><table><thead><tr><th>Week</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Tkt</th><th>Guide Hrs</th><th>Actual Hrs</th><th>vs Guide #</th><th>vs Guide %</th><th>Labor %</th><th>SPLH</th><th>Catering</th><th>Cat PY</th></tr></thead><tbody>{trends_rows}</tbody></table></div>
-<div class="section"><div class="section-header"><div class="icon icon-sales">&#128176;</div><h2>Sales Rack &amp; Stack</h2><div class="section-sub">{wk_long(ws)} – Ranked by Sales</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Ticket</th><th>Tkt Chg</th><th>Catering</th><th>Basis</th></tr></thead><tbody>{sales_rs_rows}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{sales_callout}</div></div>
-<div class="section"><div class="section-header"><div class="icon icon-labor">&#128101;</div><h2>Labor Rack &amp; Stack</h2><div class="section-sub">{wk_long(ws)} – Ranked by vs Guide %</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Sales</th><th>Guide Hrs</th><th>Sch Hrs</th><th>Actual Hrs</th><th>vs Guide #</th><th>vs Guide %</th><th>Labor %</th><th>SPLH</th></tr></thead><tbody>{labor_rs_rows}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{labor_callout}</div></div>
-<div class="section"><div class="section-header"><div class="icon icon-reviews">&#11088;</div><h2>Reviews Rack &amp; Stack</h2><div class="section-sub">{wk_long(ws)} – Ranked by Weighted Avg Rating</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Google</th><th>#</th><th>Ovation</th><th>#</th><th>Yelp</th><th>#</th><th>Wtd Avg</th><th>Total #</th></tr></thead><tbody>{reviews_rs_rows}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{reviews_callout}</div></div>
-<div class="section"><div class="section-header"><div class="icon icon-catering">&#127919;</div><h2>Catering Rack &amp; Stack</h2><div class="section-sub">{wk_long(ws)} – Ranked by Catering $</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Orders</th><th>Cat $</th><th>Cat $ PY</th><th>vs PY</th></tr></thead><tbody>{cat_rs_rows}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{catering_callout}</div></div>
-<div class="footer">Generated on {TODAY_STR} &middot; Fuego Tortilla Grill – System Report &middot; Data sourced from Chabi Analytics</div>
-</div></body></html>"""
-
-# Write and convert
-html_path = "/home/claude/weekly_flash_system_v2.html"
-with open(html_path, "w") as f: f.write(html)
-pdf_path = "/home/claude/system_flash_v2.pdf"
-output_path = "/mnt/user-data/outputs/Weekly Flash - Fuego System - Feb 9 – 15, 2026.pdf"
-result = subprocess.run(["google-chrome","--headless","--no-sandbox","--disable-gpu",f"--print-to-pdf={pdf_path}","--print-to-pdf-no-header","--no-pdf-header-footer",f"file://{html_path}"],capture_output=True,text=True,timeout=30)
-if os.path.exists(pdf_path):
-    shutil.copy(pdf_path, output_path)
-    shutil.copy(html_path, output_path.replace(".pdf",".html"))
-    print(f"✓ Saved: {output_path}")
-else:
-    print(f"✗ Failed: {result.stderr[:300]}")
+<div class="section"><div class="section-header"><div class="icon icon-sales">&#128202;</div><h2>System Performance Trends</h2><div class="section-sub">Last 4 Weeks – All Locations Combined</div></div><table><thead><tr><th>Week</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Tkt</th><th>Guide Hrs</th><th>Actual Hrs</th><th>vs Guide #</th><th>vs Guide %</th><th>Labor %</th><th>SPLH</th><th>Catering</th><th>Cat PY</th></tr></thead><tbody>{*trends}</tbody></table></div>
+<div class="section"><div class="section-header"><div class="icon icon-sales">&#128176;</div><h2>Sales Rack &amp; Stack</h2><div class="section-sub">{week} – Ranked by Sales</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Ticket</th><th>Tkt Chg</th><th>Catering</th><th>Basis</th></tr></thead><tbody>{*sales_rs}{sales_total}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{sales_callout}</div></div>
+<div class="section"><div class="section-header"><div class="icon icon-labor">&#128101;</div><h2>Labor Rack &amp; Stack</h2><div class="section-sub">{week} – Ranked by vs Guide %</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Sales</th><th>Guide Hrs</th><th>Sch Hrs</th><th>Actual Hrs</th><th>vs Guide #</th><th>vs Guide %</th><th>Labor %</th><th>SPLH</th></tr></thead><tbody>{*labor_rs}{labor_total}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{labor_callout}</div></div>
+<div class="section"><div class="section-header"><div class="icon icon-reviews">&#11088;</div><h2>Reviews Rack &amp; Stack</h2><div class="section-sub">{week} – Ranked by Weighted Avg Rating</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Google</th><th>#</th><th>Ovation</th><th>#</th><th>Yelp</th><th>#</th><th>Wtd Avg</th><th>Total #</th></tr></thead><tbody>{*reviews_rs}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{reviews_callout}</div></div>
+<div class="section"><div class="section-header"><div class="icon icon-catering">&#127919;</div><h2>Catering Rack &amp; Stack</h2><div class="section-sub">{week} – Ranked by Catering $</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Orders</th><th>Cat $</th><th>Cat $ PY</th><th>vs PY</th></tr></thead><tbody>{*cat_rs}{cat_total}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{catering_callout}</div></div>
+<div class="footer">Generated on {today} &middot; Fuego Tortilla Grill – System Report &middot; Data sourced from Chabi Analytics</div>
+</div></body></html>""", css=localize_css(CSS))
+
+def render_system_flash(K, today_str=TODAY_STR, out=None):
+    """
+    System flash HTML from one WeeklyKpis: {"html", "gm_msg", "<section>_callout", ...}.
+    With `out` (an open text file) the document streams there and "html" is None.
+    """
+    sales_callout, labor_callout, reviews_callout, catering_callout, sales_ranks, labor_ranks, cat_ranks = verified_callouts(K)
+    loc_data, sys_weekly, ws = K.loc_data, K.sys_weekly, K.ws
+    sys_amt, sys_sss, sys_sst, sys_ords, sys_tkt, sys_tkt_chg = K.sys_amt, K.sys_sss, K.sys_sst, K.sys_ords, K.sys_tkt, K.sys_tkt_chg
+    sys_hrs, sys_pay, sys_lp, sys_lp_chg, sys_guide = K.sys_hrs, K.sys_pay, K.sys_lp, K.sys_lp_chg, K.sys_guide
+    sys_cat, sys_cat_ords = K.sys_cat, K.sys_cat_ords
+    sys_vs_guide = sys_hrs - sys_guide
+    sys_splh = sys_amt/sys_hrs if sys_hrs else 0
+    sys_cat_py = sum(loc_data[l]["cat_py_amt"] for l in K.locations)
+
+    # GM message
+    labor_cls = "positive" if sys_lp_chg <= 0 else "negative"
+    labor_arrow = "&#9650;" if sys_lp_chg > 0 else "&#9660;"
+    labor_sign = "+" if sys_lp_chg >= 0 else ""
+
+    gm_msg = (
+        f"Fuego Tortilla Grill generated {fm(sys_amt)} across 6 locations for the week of {wk_long(ws)}. "
+        f"Comparable stores were {'up' if sys_sss and sys_sss>=0 else 'down'} {abs(sys_sss):.1f}% in same-store sales and "
+        f"{'up' if sys_sst and sys_sst>=0 else 'down'} {abs(sys_sst):.1f}% in same-store transactions vs prior year. "
+        f"System-wide order count was {fn(sys_ords,0)} with a {fm(sys_tkt,2)} average ticket. "
+        f"Labor came in at {sys_lp:.1f}% system-wide ({fm(sys_pay)} on {fn(sys_hrs,1)} hours), "
+        f"{'improving' if sys_lp_chg<0 else 'up'} {abs(sys_lp_chg):.1f}pp vs prior week. "
+        f"The system ran {fn(abs(sys_vs_guide),1)} hours {'over' if sys_vs_guide>0 else 'under'} the combined guideline. "
+        f"Catering was {fm(sys_cat)} ({fn(sys_cat_ords,0)} orders)."
+    )
+
+    # Document: the compiled page with this week's values; table rows stream from the generators
+    doc = HtmlWriter(out)
+    SYSTEM_PAGE.write(doc, {
+        "week": wk_long(ws), "today": today_str, "gm_msg": gm_msg,
+        "sales": fm(sys_amt), "sales_badge": kpi_badge(sys_sss,"vs PY Comps"), "orders": fn(sys_ords), "orders_badge": kpi_badge(sys_sst,"vs PY Comps"),
+        "avg_tkt": fm(sys_tkt,2), "avg_tkt_badge": kpi_badge(sys_tkt_chg,"vs PY Comps"),
+        "labor_pct": f"{sys_lp:.1f}", "labor_cls": labor_cls, "labor_arrow": labor_arrow, "labor_chg": f"{labor_sign}{sys_lp_chg:.1f}",
+        "catering": fm(sys_cat), "cat_orders": fn(sys_cat_ords,0),
+        "sales_total": f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fm(sys_amt)}</td><td>{pill_sss(sys_sss)}</td><td>{fn(sys_ords)}</td><td>{pill_sss(sys_sst)}</td><td>{fm(sys_tkt,2)}</td><td>{pill_sss(sys_tkt_chg)}</td><td>{fm(sys_cat)}</td><td><span class="pill pill-neutral">Comp Only</span></td></tr>',
+        "labor_total": f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fm(sys_amt)}</td><td>{fn(sys_guide,0)}</td><td>{fn(sum(v["sch_hrs"] for v in loc_data.values()),0)}</td><td>{fn(sys_hrs,0)}</td><td>{pill_labor_diff(sys_vs_guide)}</td><td>{pill_labor_ratio(sys_hrs,sys_guide)}</td><td>{pill_labor_pct(sys_lp)}</td><td>{fm(sys_splh,2)}</td></tr>',
+        "cat_total": f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fn(sys_cat_ords)}</td><td>{fm(sys_cat)}</td><td>{fm(sys_cat_py)}</td><td>{pill_sss(pct_chg(sys_cat,sys_cat_py) if sys_cat_py else None)}</td></tr>',
+        "sales_callout": sales_callout, "labor_callout": labor_callout, "reviews_callout": reviews_callout, "catering_callout": catering_callout,
+    }, {"trends": (TRENDS_ROW, trends_rows(sys_weekly, K.week_starts, ws)),
+        "sales_rs": (SALES_RS_ROW, sales_rs_rows(loc_data, sales_ranks)),
+        "labor_rs": (LABOR_RS_ROW, labor_rs_rows(loc_data, labor_ranks)),
+        "reviews_rs": (REVIEWS_RS_ROW, reviews_rs_rows(loc_data, rank_items(loc_data, "wavg_rating", reverse=True))),
+        "cat_rs": (CAT_RS_ROW, cat_rs_rows(loc_data, cat_ranks))})
+    return {"html":doc.getvalue(),"gm_msg":gm_msg,"sales_callout":sales_callout,"labor_callout":labor_callout,
+            "reviews_callout":reviews_callout,"catering_callout":catering_callout}
+
+if __name__ == "__main__":
+    K = WeeklyKpis(RAW, LOCATIONS, WEEK_STARTS, local_py=LOCAL_PY)
+    with span("html", report="System"):
+        report = render_system_flash(K, TODAY_STR)
+
+    # Write and convert
+    html_path = "/home/claude/weekly_flash_system_v2.html"
+    with open(html_path, "w") as f: f.write(report["html"])
+    pdf_path = "/home/claude/system_flash_v2.pdf"
+    output_path = "/mnt/user-data/outputs/Weekly Flash - Fuego System - Feb 9 – 15, 2026.pdf"
+    with PdfRenderer() as renderer:  # warm Playwright Chromium, else the google-chrome CLI
+        ok = renderer.render(html_path, pdf_path)
+    if ok:
+        shutil.copy(pdf_path, output_path)
+        shutil.copy(html_path, output_path.replace(".pdf",".html"))
+        print(f"✓ Saved: {output_path}")
+    else:
+        print(f"✗ Failed: {renderer.error or 'no PDF converter available'}")
+    print(summary())
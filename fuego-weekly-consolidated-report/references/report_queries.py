@@ -0,0 +1,384 @@
+"""
+Query set for the weekly consolidated flash (SKILL.md Queries 1–10).
+
+`report_specs()` returns one `QuerySpec` per statement. Each shaper converts the
+warehouse rows into the raw shapes `reference_implementation.py` works with:
+the `*_raw` tuples the fact store loads, the AGM rows, the guideline table and
+the upselling dict. `fetch_report_data()` runs them all concurrently and
+assembles those inputs in one call.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from query_executor import FakeBackend, QuerySpec, run_queries, unwrap
+
+PY_SHIFT = timedelta(days=364)  # Query 3: same weekday 52 weeks back
+
+# ============================================================
+# SQL (verbatim from SKILL.md; {14_days_ago} is spelled {days_14_ago})
+# ============================================================
+WEEKLY_SALES_SQL = """
+SELECT
+  RESTAURANT_LOCATION, TIME_PERIOD_VALUE,
+  AMOUNT, AMOUNT_PREV_YEAR, NET_AMOUNT,
+  ORDER_COUNT, ORDER_COUNT_PREV_YEAR, DISCOUNT_AMOUNT
+FROM CHABI_DBT.ORDER_METRICS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND TIME_PERIOD_TYPE = 'week'
+  AND TIME_PERIOD_VALUE IN ({week_starts_csv})
+  AND TIME_PERIOD_TO_DATE = false
+  AND VOIDED = false
+ORDER BY RESTAURANT_LOCATION, TIME_PERIOD_VALUE
+"""
+
+CATERING_SQL = """
+SELECT
+  RESTAURANT_LOCATION, TIME_PERIOD_VALUE,
+  SUM(AMOUNT) AS amount, SUM(ORDER_COUNT) AS orders
+FROM CHABI_DBT.ORDER_METRICS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND TIME_PERIOD_TYPE = 'day_dow'
+  AND TIME_PERIOD_VALUE BETWEEN '{earliest_monday}' AND '{latest_sunday}'
+  AND DINING_CATEGORY = 'Catering'
+  AND VOIDED = false
+GROUP BY 1, 2
+"""
+
+GOOGLE_REVIEWS_SQL = """
+SELECT RESTAURANT_LOCATION, REVIEW_DATE, AVG(STARS) AS avg_rating, COUNT(*) AS cnt
+FROM CHABI_DBT.GOOGLE_REVIEWS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND REVIEW_DATE BETWEEN '{earliest_monday}' AND '{latest_sunday}'
+GROUP BY 1, 2
+"""
+
+OVATION_SQL = """
+SELECT RESTAURANT_LOCATION, SURVEY_DATE, AVG(SURVEY_RATING) AS avg_rating, COUNT(*) AS cnt
+FROM CHABI_DBT.OVATION_SURVEY_REPORTS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND SURVEY_DATE BETWEEN '{earliest_monday}' AND '{latest_sunday}'
+GROUP BY 1, 2
+"""
+
+YELP_REVIEWS_SQL = """
+SELECT RESTAURANT_LOCATION, REVIEW_DATE, AVG(STARS) AS avg_rating, COUNT(*) AS cnt
+FROM CHABI_DBT.YELP_REVIEWS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND REVIEW_DATE BETWEEN '{earliest_monday}' AND '{latest_sunday}'
+GROUP BY 1, 2
+"""
+
+DAILY_LABOR_SQL = """
+SELECT
+  RESTAURANT_LOCATION, TIME_PERIOD_VALUE,
+  SUM(PAYABLE_HOURS) AS hours, SUM(TOTAL_PAY) AS pay
+FROM CHABI_DBT.LABOR_METRICS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND TIME_PERIOD_TYPE = 'day_dow'
+  AND TIME_PERIOD_VALUE BETWEEN '{earliest_monday}' AND '{latest_sunday}'
+GROUP BY 1, 2
+ORDER BY 1, 2
+"""
+
+DAILY_SALES_SQL = """
+SELECT
+  RESTAURANT_LOCATION, TIME_PERIOD_VALUE, SUM(NET_AMOUNT) AS net_amount
+FROM CHABI_DBT.ORDER_METRICS
+WHERE BRAND = 'fuego-tortilla-grill'
+  AND TIME_PERIOD_TYPE = 'day_dow'
+  AND TIME_PERIOD_VALUE BETWEEN '{earliest_monday}' AND '{latest_sunday}'
+  AND VOIDED = false
+GROUP BY 1, 2
+ORDER BY 1, 2
+"""
+
+SCHEDULED_HOURS_SQL = """
+WITH locations AS (
+  SELECT SEVEN_SHIFTS_LOCATION, RESTAURANT_NUMBER, LOCATION AS restaurant_location
+  FROM RESTAURANT_MAPPING.RESTAURANT_MAPPING_TABLE
+),
+joined AS (
+  SELECT loc.RESTAURANT_NUMBER AS restaurant_number, loc.restaurant_location,
+    d.date AS shift_date, d.in_time, d.out_time, d.role, d._modified, d._file
+  FROM SEVEN_SHIFTS_DATA_FUEGO_TORTILLA_GRILL.SCHEDULED_HOURS_WAGES d
+  LEFT JOIN locations loc ON d.location = loc.SEVEN_SHIFTS_LOCATION
+  WHERE d.date BETWEEN '{earliest_monday}' AND '{latest_sunday}'
+),
+latest_files AS (
+  SELECT restaurant_number, shift_date, MAX_BY(_file, _modified) AS _file
+  FROM joined GROUP BY 1, 2
+),
+scheduled_labor_table AS (
+  SELECT j.restaurant_number, j.restaurant_location, j.shift_date,
+    TIMESTAMP_NTZ_FROM_PARTS(j.shift_date, TO_TIME(j.in_time, 'HH12:MI AM')) AS in_date,
+    CASE
+      WHEN TIMESTAMP_NTZ_FROM_PARTS(j.shift_date, TO_TIME(j.out_time, 'HH12:MI AM'))
+           >= TIMESTAMP_NTZ_FROM_PARTS(j.shift_date, TO_TIME(j.in_time, 'HH12:MI AM'))
+      THEN TIMESTAMP_NTZ_FROM_PARTS(j.shift_date, TO_TIME(j.out_time, 'HH12:MI AM'))
+      ELSE DATEADD('day', 1, TIMESTAMP_NTZ_FROM_PARTS(j.shift_date, TO_TIME(j.out_time, 'HH12:MI AM')))
+    END AS out_date
+  FROM joined j
+  INNER JOIN latest_files lf
+    ON j.restaurant_number = lf.restaurant_number
+   AND j.shift_date = lf.shift_date AND j._file = lf._file
+  WHERE j.role NOT IN ('General Manager','Assistant Manager','Kitchen Manager')
+),
+shifts AS (
+  SELECT *, TO_DATE(DATEADD('hour',-6,in_date)) AS report_date_1,
+            TO_DATE(DATEADD('hour',-6,out_date)) AS report_date_2
+  FROM scheduled_labor_table
+),
+day1 AS (
+  SELECT report_date_1 AS report_date, restaurant_number, restaurant_location,
+    SUM(GREATEST(DATEDIFF('second',
+      GREATEST(in_date, TIMESTAMP_NTZ_FROM_PARTS(report_date_1, TO_TIME('06:00:00'))),
+      LEAST(out_date, DATEADD('day',1,TIMESTAMP_NTZ_FROM_PARTS(report_date_1, TO_TIME('06:00:00'))))
+    ),0)/3600.0) AS scheduled_hours
+  FROM shifts GROUP BY 1,2,3
+),
+day2 AS (
+  SELECT report_date_2 AS report_date, restaurant_number, restaurant_location,
+    SUM(GREATEST(DATEDIFF('second',
+      GREATEST(in_date, TIMESTAMP_NTZ_FROM_PARTS(report_date_2, TO_TIME('06:00:00'))),
+      LEAST(out_date, DATEADD('day',1,TIMESTAMP_NTZ_FROM_PARTS(report_date_2, TO_TIME('06:00:00'))))
+    ),0)/3600.0) AS scheduled_hours
+  FROM shifts WHERE report_date_2 <> report_date_1 GROUP BY 1,2,3
+),
+daily_scheduled AS (
+  SELECT * FROM day1 UNION ALL SELECT * FROM day2
+)
+SELECT restaurant_location, report_date, SUM(scheduled_hours) AS scheduled_hours
+FROM daily_scheduled
+WHERE report_date BETWEEN '{earliest_monday}' AND '{latest_sunday}'
+GROUP BY 1, 2
+ORDER BY 1, 2
+"""
+
+AGM_SQL = """
+SELECT STORE_LISTING AS RESTAURANT_LOCATION,
+       START_DATE, END_DATE, DAILY_HOURS, WEEKLY_HOURS
+FROM LABOR_AGM_HOURS.LABOR_AGM_HOURS_TABLE
+WHERE BRAND = 'Fuego Tortilla Grill'
+ORDER BY STORE_LISTING, START_DATE
+"""
+
+GUIDELINES_SQL = """
+SELECT WEEKLY_NET_SALES_THRESHOLD, WEEKLY_TOTAL_HOURS
+FROM LABOR_GUIDELINES.LABOR_GUIDELINES_TABLE
+WHERE BRAND = 'Fuego Tortilla Grill'
+ORDER BY WEEKLY_NET_SALES_THRESHOLD
+"""
+
+UPSELL_CHECKS_SQL = """
+SELECT
+  o.RESTAURANT_LOCATION,
+  SUM(o.CHECK_COUNT) AS checks,
+  ROUND(SUM(o.AMOUNT) / NULLIF(SUM(o.CHECK_COUNT), 0), 2) AS avg_check
+FROM CHABI_DBT.ORDERS_REPORTS o
+WHERE o.BRAND = 'fuego-tortilla-grill'
+  AND o.REPORT_DATE BETWEEN '{days_14_ago}' AND '{latest_sunday}'
+  AND o.VOIDED = false
+  AND o.DINING_CATEGORY NOT IN ('Catering')
+  AND o.SERVER NOT IN ('default online ordering','Default Online Ordering','Online Order','Online  Order ','Online  Host Village')
+  AND o.SERVER IS NOT NULL AND LENGTH(TRIM(o.SERVER)) > 0
+GROUP BY 1
+"""
+
+UPSELL_ITEMS_SQL = """
+SELECT
+  isr.RESTAURANT_LOCATION,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Queso' THEN isr.qty ELSE 0 END) AS queso,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Guacamole' THEN isr.qty ELSE 0 END) AS guac,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Chips and Salsa' THEN isr.qty ELSE 0 END) AS chips,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Sides' THEN isr.qty ELSE 0 END) AS sides,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Drinks' THEN isr.qty ELSE 0 END) AS drinks,
+  SUM(CASE WHEN m.mapped_menu_subgroup IN ('Margaritas and Beer') THEN isr.qty ELSE 0 END) AS alcohol,
+  SUM(CASE WHEN m.mapped_menu_subgroup = 'Desserts' THEN isr.qty ELSE 0 END) AS desserts
+FROM CHABI_DBT.ITEM_SELECTION_REPORTS isr
+INNER JOIN MENU_MAP.MENU_MAP_TABLE m
+  ON m.toast_menu_group = isr.menu_group AND m.toast_menu = isr.menu AND m.toast_menu_item = isr.menu_item
+WHERE isr.BRAND = 'fuego-tortilla-grill'
+  AND isr.REPORT_DATE BETWEEN '{days_14_ago}' AND '{latest_sunday}'
+  AND isr.DINING_CATEGORY NOT IN ('Catering')
+  AND isr.SERVER NOT IN ('default online ordering','Default Online Ordering','Online Order','Online  Order ','Online  Host Village')
+  AND isr.SERVER IS NOT NULL AND LENGTH(TRIM(isr.SERVER)) > 0
+GROUP BY 1
+"""
+
+CATERING_PY_SQL = CATERING_SQL.replace("{earliest_monday}", "{py_earliest_monday}").replace(
+    "{latest_sunday}", "{py_latest_sunday}")
+
+
+def report_params(week_starts):
+    """Template parameters for the report weeks (Mondays, any order)."""
+    first, last = min(week_starts), max(week_starts) + timedelta(days=6)
+    return {
+        "earliest_monday": first.isoformat(), "latest_sunday": last.isoformat(),
+        "py_earliest_monday": (first - PY_SHIFT).isoformat(), "py_latest_sunday": (last - PY_SHIFT).isoformat(),
+        "week_starts_csv": ",".join(f"'{ws.isoformat()}'" for ws in sorted(week_starts)),
+        "days_14_ago": (last - timedelta(days=13)).isoformat(),
+    }
+
+
+# ============================================================
+# ROW SHAPERS
+# ============================================================
+def _upper(row):
+    return {k.upper(): v for k, v in row.items()}
+
+
+def _day(v):
+    if isinstance(v, datetime): return v.date()
+    if isinstance(v, date): return v
+    return date.fromisoformat(str(v)[:10])
+
+
+def _monday(v):
+    d = _day(v)
+    return d - timedelta(days=d.weekday())
+
+
+def _num(v):
+    return float(v) if v is not None else 0.0
+
+
+def _int(v):
+    return int(v) if v is not None else 0
+
+
+def shape_weekly_sales(rows):
+    """(loc, week_start, amount, amount_py, net, orders, orders_py, discount)"""
+    out = []
+    for r in map(_upper, rows):
+        out.append((r["RESTAURANT_LOCATION"], _day(r["TIME_PERIOD_VALUE"]).isoformat(),
+                    _num(r["AMOUNT"]), _num(r["AMOUNT_PREV_YEAR"]), _num(r["NET_AMOUNT"]),
+                    _int(r["ORDER_COUNT"]), _int(r["ORDER_COUNT_PREV_YEAR"]), _num(r["DISCOUNT_AMOUNT"])))
+    return out
+
+
+def _weekly_catering(rows, shift=timedelta(0)):
+    agg = defaultdict(lambda: [0.0, 0])
+    for r in map(_upper, rows):
+        a = agg[(r["RESTAURANT_LOCATION"], _monday(_day(r["TIME_PERIOD_VALUE"]) + shift))]
+        a[0] += _num(r["AMOUNT"]); a[1] += _int(r["ORDERS"])
+    return [(loc, ws.isoformat(), amt, n) for (loc, ws), (amt, n) in sorted(agg.items())]
+
+
+def shape_catering(rows):
+    """(loc, week_start, amount, orders) aggregated from daily rows."""
+    return _weekly_catering(rows)
+
+
+def shape_catering_py(rows):
+    """Like `shape_catering`, keyed to the CY week 364 days later."""
+    return _weekly_catering(rows, PY_SHIFT)
+
+
+def _reviews(source, date_col):
+    def shape(rows):
+        """(loc, week_start, source, avg_rating, count) — count-weighted over the week's days."""
+        agg = defaultdict(lambda: [0.0, 0])
+        for r in map(_upper, rows):
+            a = agg[(r["RESTAURANT_LOCATION"], _monday(r[date_col]))]
+            n = _int(r["CNT"]); a[0] += _num(r["AVG_RATING"]) * n; a[1] += n
+        return [(loc, ws.isoformat(), source, total / n, n) for (loc, ws), (total, n) in sorted(agg.items()) if n]
+    return shape
+
+
+def shape_daily(date_col, *cols):
+    def shape(rows):
+        """(loc, date, value, ...)"""
+        return [(r["RESTAURANT_LOCATION"], _day(r[date_col]).isoformat(), *(_num(r[c]) for c in cols))
+                for r in map(_upper, rows)]
+    return shape
+
+
+def shape_agm(rows):
+    """(loc, start, end, daily_hours, weekly_hours); dates stay text for `AgmIndex`."""
+    return [(r["RESTAURANT_LOCATION"], r["START_DATE"], r["END_DATE"], _num(r["DAILY_HOURS"]), _num(r["WEEKLY_HOURS"]))
+            for r in map(_upper, rows)]
+
+
+def shape_guidelines(rows):
+    """{weekly net sales threshold: weekly hours}"""
+    return {_num(r["WEEKLY_NET_SALES_THRESHOLD"]): _num(r["WEEKLY_TOTAL_HOURS"]) for r in map(_upper, rows)}
+
+
+def shape_upsell_checks(rows):
+    return {r["RESTAURANT_LOCATION"]: {"checks": _int(r["CHECKS"]), "avg_check": _num(r["AVG_CHECK"])}
+            for r in map(_upper, rows)}
+
+
+UPSELL_ITEMS = ("queso", "guac", "chips", "sides", "drinks", "alcohol", "desserts")
+
+
+def shape_upsell_items(rows):
+    return {r["RESTAURANT_LOCATION"]: {k: _int(r[k.upper()]) for k in UPSELL_ITEMS} for r in map(_upper, rows)}
+
+
+# ============================================================
+# QUERY SET
+# ============================================================
+def report_specs(local_py=False):
+    """QuerySpecs for Queries 1–10 (Query 4 and 10 are several statements each)."""
+    specs = [
+        QuerySpec("weekly_sales", WEEKLY_SALES_SQL, shape_weekly_sales),
+        QuerySpec("catering_cy", CATERING_SQL, shape_catering),
+        QuerySpec("reviews_google", GOOGLE_REVIEWS_SQL, _reviews("google", "REVIEW_DATE")),
+        QuerySpec("reviews_ovation", OVATION_SQL, _reviews("ovation", "SURVEY_DATE")),
+        QuerySpec("reviews_yelp", YELP_REVIEWS_SQL, _reviews("yelp", "REVIEW_DATE")),
+        QuerySpec("daily_labor", DAILY_LABOR_SQL, shape_daily("TIME_PERIOD_VALUE", "HOURS", "PAY")),
+        QuerySpec("daily_sales", DAILY_SALES_SQL, shape_daily("TIME_PERIOD_VALUE", "NET_AMOUNT")),
+        QuerySpec("scheduled", SCHEDULED_HOURS_SQL, shape_daily("REPORT_DATE", "SCHEDULED_HOURS")),
+        QuerySpec("agm", AGM_SQL, shape_agm),
+        QuerySpec("guidelines", GUIDELINES_SQL, shape_guidelines),
+        QuerySpec("upsell_checks", UPSELL_CHECKS_SQL, shape_upsell_checks),
+        QuerySpec("upsell_items", UPSELL_ITEMS_SQL, shape_upsell_items),
+    ]
+    if not local_py:  # LOCAL_PY derives catering PY by index shift instead
+        specs.insert(2, QuerySpec("catering_py", CATERING_PY_SQL, shape_catering_py))
+    return specs
+
+
+def assemble(data):
+    """{spec name: shaped data} -> the reference implementation's raw inputs."""
+    upselling = {loc: {**c, **data["upsell_items"].get(loc, dict.fromkeys(UPSELL_ITEMS, 0))}
+                 for loc, c in data["upsell_checks"].items()}
+    return {
+        "weekly_sales_raw": data["weekly_sales"],
+        "catering_cy_raw": data["catering_cy"],
+        "catering_py_raw": data.get("catering_py", []),
+        "reviews_raw": data["reviews_google"] + data["reviews_ovation"] + data["reviews_yelp"],
+        "daily_labor_raw": data["daily_labor"],
+        "daily_sales_raw": data["daily_sales"],
+        "scheduled_raw": data["scheduled"],
+        "agm_raw": data["agm"],
+        "GUIDELINES_TABLE": data["guidelines"],
+        "upselling_raw": upselling,
+    }
+
+
+def fetch_report_data(runner, week_starts, local_py=False, **kw):
+    """Run Queries 1–10 concurrently and return the assembled raw inputs (raises QueryError)."""
+    return assemble(unwrap(run_queries(report_specs(local_py), runner, report_params(week_starts), **kw)))
+
+
+if __name__ == "__main__":
+    # Benchmark against the fake backend: concurrent wall-clock vs the serial sum
+    import sys, time
+    latency = {"SCHEDULED_HOURS_WAGES": 2.0, "ITEM_SELECTION_REPORTS": 1.5, "ORDERS_REPORTS": 1.0,
+               "LABOR_METRICS": 0.8, "ORDER_METRICS": 0.6}
+    scale = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+    latency = {k: v * scale for k, v in latency.items()}
+    weeks = [date(2026, 2, 16) - timedelta(weeks=i) for i in range(4)]
+    specs, params = report_specs(), report_params(weeks)
+    serial = sum(FakeBackend(latency=latency, default_latency=0.3 * scale).delay(s.render(params)) for s in specs)
+    for conc in (1, 4, len(specs)):
+        backend = FakeBackend(latency=latency, default_latency=0.3 * scale)
+        t0 = time.perf_counter()
+        results = run_queries(specs, backend, params, concurrency=conc)
+        wall = time.perf_counter() - t0
+        assert all(r.error is None for r in results.values())
+        print(f"concurrency={conc:2d}  queries={len(specs)}  wall={wall:.3f}s  serial sum={serial:.3f}s  "
+              f"last done={max(r.elapsed for r in results.values()):.3f}s")
@@ -0,0 +1,232 @@
+"""
+Seeded synthetic chain: report inputs for any number of stores and weeks.
+
+The only real data in the skills is the inline `*_raw` sample: 6 stores over 4
+to 8 weeks. `SyntheticChain(n_locations, seed)` invents a chain of that shape at
+any size and emits the same raw inputs the query plan returns:
+- `weekly_inputs(week_starts)`: the `consolidated_report(..., flash=True)` shape,
+  which `WeeklyKpis` and the location flash read;
+- `period_inputs(period)`: the `period_report()` shape, which `PeriodKpis` reads;
+- `inputs(week_starts, period)`: both, keyed the way `batch_reports.run_batch`
+  expects.
+
+Each store gets a profile: sales level, average ticket, labor productivity, wage,
+review and catering habits, and upsell rates. Mature stores opened years ago; about
+one in six opened within the last 40 weeks. A new store has no PY sales, ramps up
+over its first months, and carries AGM training hours that step down from
+350 to 200 hours a week. Days follow one model: a store closed on Mondays, a
+weekend-heavy weekday profile, annual seasonality, a yearly growth trend and daily
+noise. Noise is a hash of (seed, store, day), not a stream. A day therefore has
+the same value whichever window asks for it, and PY columns are simply the
+model 364 days earlier.
+
+The first six stores carry the sample's names, because the reference callouts
+mention them; the rest are "Store 007", "Store 008", …. The same seed always
+gives the same chain, and 500 stores × 104 weeks generates in seconds.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+
+SEED = 7
+SAMPLE_LOCATIONS = ["Burleson", "College Station", "Fayetteville", "San Antonio", "San Marcos", "Waco"]
+PY_DAYS = 364
+EPOCH = date(1970, 1, 1).toordinal()
+DOW = np.array([0.0, 0.92, 0.98, 1.04, 1.30, 1.34, 0.98])  # Mon (closed) .. Sun
+AGM_RAMP = (350, 300, 250, 200)  # training hours per week, first weeks after opening
+# The reference callouts tell the sample's story (two new stores, Burleson and Fayetteville, ramping up),
+# so the sample stores keep their real ages in weeks before `today`
+SAMPLE_AGES = {"Burleson": 11, "College Station": 300, "Fayetteville": 5, "San Antonio": 150, "San Marcos": 90, "Waco": 200}
+HISTORY_WEEKS = 26  # history_raw depth for the location flash GM message
+# Shaped like LABOR_GUIDELINES_TABLE: weekly sales -> guideline hours
+GUIDELINES_TABLE = {0: 0, 2100: 326, 18800: 328, **{s: round(345 + (s - 20000) * 0.014125) for s in range(20000, 200001, 5000)}}
+
+
+def location_names(n):
+    return SAMPLE_LOCATIONS[:n] + [f"Store {i:03d}" for i in range(len(SAMPLE_LOCATIONS) + 1, n + 1)]
+
+
+def _iso(days):
+    return [d.isoformat() for d in days]  # built once per window and shared by every store's rows
+
+
+class SyntheticChain:
+    """`n_locations` store profiles (see module docstring), all drawn from `seed`."""
+
+    def __init__(self, n_locations=6, seed=SEED, today=date(2026, 2, 23)):
+        self.locations = location_names(n_locations)
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        n = n_locations
+        self.base = rng.lognormal(np.log(48000), 0.35, n) / DOW.sum()  # average-day sales of a mature store
+        self.ticket = rng.normal(14.8, 1.1, n).clip(11, 19)
+        self.splh = rng.normal(64, 6, n).clip(45, 85)
+        self.wage = rng.normal(15.2, 0.9, n).clip(12.5, 19)
+        self.growth = rng.normal(0.03, 0.06, n)  # per year
+        self.sched_bias = rng.normal(0, 0.03, n)
+        age_weeks = np.where(rng.random(n) < 1 / 6, rng.integers(2, 40, n), rng.integers(60, 520, n))
+        age_weeks = [SAMPLE_AGES.get(loc, a) for loc, a in zip(self.locations, age_weeks.tolist())]
+        self.open_date = [today - timedelta(weeks=int(w), days=today.weekday()) for w in age_weeks]
+        self.open_ord = np.array([d.toordinal() for d in self.open_date])
+        self.rating = {"google": rng.normal(4.3, 0.3, n).clip(3.2, 5), "ovation": rng.normal(4.4, 0.25, n).clip(3.4, 5),
+                       "yelp": rng.normal(3.9, 0.4, n).clip(2.5, 5)}
+        self.reviews = {"google": rng.uniform(2, 12, n), "ovation": rng.uniform(8, 35, n), "yelp": rng.uniform(0, 2, n)}
+        self.cat_rate = rng.gamma(2.0, 3.0, n)  # catering orders per week
+        self.cat_ticket = rng.lognormal(np.log(260), 0.5, n)
+        self.upsell = {k: rng.normal(m, m * 0.25, n).clip(m * 0.2, None) for k, m in
+                       (("queso", 0.17), ("guac", 0.025), ("chips", 0.01), ("sides", 0.08), ("drinks", 0.38),
+                        ("alcohol", 0.06), ("desserts", 0.02))}
+        self.upsell["alcohol"][1] = 0  # College Station has no liquor license in the sample either
+
+    # ============================================================
+    # DAILY MODEL
+    # ============================================================
+    def _noise(self, li, o, salt):
+        """Roughly standard-normal noise, a pure function of (seed, store, day ordinal, salt)."""
+        o = np.asarray(o, dtype=np.float64)
+        u = [np.modf(np.abs(np.sin(o * 12.9898 + li * 78.233 + (salt * 3 + k) * 37.719 + self.seed * 0.7071) * 43758.5453))[0]
+             for k in range(3)]
+        return (u[0] + u[1] + u[2] - 1.5) * 2
+
+    def _weeks_open(self, li, o):
+        return (o - self.open_ord[li]) / 7
+
+    def sales(self, li, o):
+        """Net sales on the days with ordinals `o`; 0 before opening and on Mondays."""
+        weeks_open = self._weeks_open(li, o)
+        d = (o - EPOCH).astype("datetime64[D]")
+        doy = (d - d.astype("datetime64[Y]")).astype(int)
+        season = 1 + 0.08 * np.sin((doy - 80) / 365.25 * 2 * np.pi)
+        w = np.clip(weeks_open, 0, 26)
+        ramp = np.where(weeks_open < 26, 0.55 + 0.45 * w / 26 + 0.2 * np.exp(-w / 2), 1)
+        trend = (1 + self.growth[li]) ** (weeks_open / 52 - 2)
+        s = self.base[li] * DOW[(o - 1) % 7] * season * ramp * trend * (1 + 0.09 * self._noise(li, o, 1))
+        return np.where(weeks_open >= 0, s.clip(0), 0).round(2)
+
+    def agm_weekly(self, li, weeks_open):
+        """AGM hours allowed in each store week `weeks_open` (whole weeks since opening; < 0 before it)."""
+        steady = 50 if li % 3 == 1 else 0
+        ramp = np.array(AGM_RAMP + (steady,))
+        return np.where(weeks_open < 0, 0, ramp[np.clip(weeks_open, 0, len(AGM_RAMP))])
+
+    def labor(self, li, o, sales):
+        """(hours, pay, scheduled) per day: productivity-driven crew plus AGM hours; Mondays only boundary hours."""
+        weeks_open = self._weeks_open(li, o)
+        agm = self.agm_weekly(li, np.floor(weeks_open).astype(int)) / 6
+        hours = np.where(sales > 0, 6 + sales / self.splh[li] * (1 + 0.05 * self._noise(li, o, 2)) + agm, 0)
+        hours = np.where(((o - 1) % 7 == 0) & (weeks_open >= 0), 1.2, hours).round(2)
+        pay = (hours * self.wage[li] * (1 + 0.02 * self._noise(li, o, 3))).round(2)
+        scheduled = (np.round(hours * (1 + self.sched_bias[li] + 0.04 * self._noise(li, o, 4)) * 2) / 2).clip(0)
+        return hours, pay, scheduled
+
+    def weeks(self, li, week_ords):
+        """Weekly totals for the weeks starting on ordinals `week_ords`: {measure: array}."""
+        w = np.asarray(week_ords)
+        amt = self.sales(li, (w[:, None] + np.arange(7)).ravel()).reshape(-1, 7).sum(axis=1).round(2)
+        open_ = amt > 0
+        orders = np.where(open_, np.round(amt / self.ticket[li] * (1 + 0.02 * self._noise(li, w, 5))), 0).astype(int)
+        cat_n = np.where(open_, np.maximum(1, np.round(self.cat_rate[li] * (self._noise(li, w, 6) + 3) / 3)), 0).astype(int)
+        cat_amt = (cat_n * self.cat_ticket[li] * (0.7 + 0.1 * (self._noise(li, w, 7) + 3))).round(2)
+        return {"amount": amt, "orders": orders, "discount": (amt * 0.031).round(2), "disc_count": np.round(orders * 0.045).astype(int),
+                "cat_amt": cat_amt, "cat_ords": cat_n}
+
+    def week_reviews(self, li, week_ords):
+        """{source: (average rating, review count) arrays} per week; Google and Ovation never go a week without one."""
+        out = {}
+        for k, source in enumerate(("google", "ovation", "yelp")):
+            z = self._noise(li, week_ords, 10 + k)
+            cnt = np.maximum(source != "yelp", np.round(self.reviews[source][li] * (1 + 0.3 * z))).astype(int)
+            out[source] = (np.clip(self.rating[source][li] + 0.25 * z, 1, 5).round(3), cnt)
+        return out
+
+    # ============================================================
+    # RAW INPUTS (query shapes)
+    # ============================================================
+    def _daily_rows(self, start, end):
+        """daily_sales_raw, daily_labor_raw and scheduled_raw rows for every store, `start`..`end`."""
+        o = np.arange(start.toordinal(), end.toordinal() + 1)
+        iso = _iso(date.fromordinal(int(d)) for d in o)
+        sales_rows, labor_rows, sched_rows = [], [], []
+        for li, loc in enumerate(self.locations):
+            sales = self.sales(li, o)
+            hours, pay, sched = self.labor(li, o, sales)
+            open_ = (sales > 0).tolist()
+            sales_rows += [(loc, d, v) for d, v, k in zip(iso, sales.tolist(), open_) if k]
+            labor_rows += [(loc, d, h, p) for d, h, p in zip(iso, hours.tolist(), pay.tolist()) if h]
+            sched_rows += [(loc, d, h) for d, h, k in zip(iso, sched.tolist(), open_) if k]
+        return sales_rows, labor_rows, sched_rows
+
+    def _week_table(self, li, week_ords):
+        """Per week (ordinals `week_ords`): CY and PY totals as lists of Python scalars."""
+        cy, py = self.weeks(li, week_ords), self.weeks(li, week_ords - PY_DAYS)
+        return {k: v.tolist() for k, v in cy.items()}, {k: v.tolist() for k, v in py.items()}
+
+    def agm_rows(self):
+        """agm_raw: the opening ramp week by week, then the steady allowance."""
+        rows = []
+        for li, loc in enumerate(self.locations):
+            opened = self.open_date[li]
+            for k, hrs in enumerate(AGM_RAMP):
+                ws = opened + timedelta(weeks=k)
+                rows.append((loc, ws.isoformat(), (ws + timedelta(days=6)).isoformat(), hrs / 6, hrs))
+            steady = int(self.agm_weekly(li, len(AGM_RAMP)))
+            rows.append((loc, (opened + timedelta(weeks=len(AGM_RAMP))).isoformat(), "2030-12-31", steady / 6, steady))
+        return rows
+
+    def _catering_rows(self, raw, loc, iso, cy, py):
+        for i, w in enumerate(iso):
+            if cy["cat_ords"][i]: raw["catering_cy_raw"].append((loc, w, cy["cat_amt"][i], cy["cat_ords"][i]))
+            if py["cat_ords"][i]: raw["catering_py_raw"].append((loc, w, py["cat_amt"][i], py["cat_ords"][i]))
+
+    def weekly_inputs(self, week_starts):
+        """`consolidated_report(week_starts, flash=True)` raw inputs."""
+        week_starts = sorted(week_starts, reverse=True)
+        sales_rows, labor_rows, sched_rows = self._daily_rows(week_starts[-1], week_starts[0] + timedelta(days=6))
+        w_ord = np.array([ws.toordinal() for ws in week_starts])
+        h_ord = w_ord[0] - 7 * np.arange(1, HISTORY_WEEKS + 1)
+        iso, h_iso = _iso(week_starts), _iso(date.fromordinal(int(d)) for d in h_ord)
+        raw = {"weekly_sales_raw": [], "catering_cy_raw": [], "catering_py_raw": [], "reviews_raw": [], "discounts_raw": [],
+               "daily_sales_raw": sales_rows, "daily_labor_raw": labor_rows, "scheduled_raw": sched_rows,
+               "agm_raw": self.agm_rows(), "GUIDELINES_TABLE": GUIDELINES_TABLE, "upselling_raw": {}, "history_raw": []}
+        for li, loc in enumerate(self.locations):
+            cy, py = self._week_table(li, w_ord)
+            for i, w in enumerate(iso):
+                if not cy["amount"][i]: continue
+                raw["weekly_sales_raw"].append((loc, w, cy["amount"][i], py["amount"][i], cy["amount"][i],
+                                                cy["orders"][i], py["orders"][i], cy["discount"][i]))
+                raw["discounts_raw"].append((loc, w, cy["disc_count"][i], cy["discount"][i]))
+            self._catering_rows(raw, loc, iso, cy, py)
+            for source, (avg, cnt) in self.week_reviews(li, w_ord).items():
+                raw["reviews_raw"] += [(loc, w, source, a, n) for w, a, n, amt in zip(iso, avg.tolist(), cnt.tolist(), cy["amount"]) if n and amt]
+            h = self.weeks(li, h_ord)
+            raw["history_raw"] += [(loc, w, a, n) for w, a, n in zip(h_iso, h["amount"].tolist(), h["orders"].tolist()) if a]
+            checks = max(cy["orders"][0], 1)
+            raw["upselling_raw"][loc] = {"checks": checks, "avg_check": round(float(self.ticket[li]), 2),
+                                         **{k: int(round(checks * r[li])) for k, r in self.upsell.items()}}
+        return raw
+
+    def period_inputs(self, period):
+        """`period_report(period.weeks)` raw inputs: the period and the N weeks before it, at day and week grain."""
+        weeks = sorted(set(period.weeks) | set(period.prior().weeks), reverse=True)
+        sales_rows, labor_rows, sched_rows = self._daily_rows(weeks[-1], period.end)
+        w_ord = np.array([ws.toordinal() for ws in weeks])
+        in_period = np.array([ws in period.weeks for ws in weeks])
+        iso = _iso(weeks)
+        raw = {"weekly_sales_raw": [], "catering_cy_raw": [], "catering_py_raw": [], "reviews_raw": [],
+               "daily_sales_raw": sales_rows, "daily_labor_raw": labor_rows, "scheduled_raw": sched_rows,
+               "agm_raw": self.agm_rows(), "prior_window_raw": [], "GUIDELINES_TABLE": GUIDELINES_TABLE}
+        for li, loc in enumerate(self.locations):
+            cy, py = self._week_table(li, w_ord)
+            raw["weekly_sales_raw"] += [(loc, w, cy["amount"][i], py["amount"][i], cy["orders"][i], py["orders"][i], cy["discount"][i])
+                                        for i, w in enumerate(iso) if cy["amount"][i]]
+            self._catering_rows(raw, loc, iso, cy, py)
+            live = in_period & (np.array(cy["amount"]) > 0)
+            for source, (avg, cnt) in self.week_reviews(li, w_ord).items():
+                n = int(cnt[live].sum())
+                if n: raw["reviews_raw"].append((loc, source, round(float((avg * cnt)[live].sum()) / n, 2), n))
+        return raw
+
+    def inputs(self, week_starts, period):
+        """{"weekly": ..., "period": ...}: the `batch_reports.fetch_inputs` result."""
+        return {"weekly": self.weekly_inputs(week_starts), "period": self.period_inputs(period)}
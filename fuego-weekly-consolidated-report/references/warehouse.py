@@ -0,0 +1,464 @@
+"""
+Local warehouse: the Snowflake tables the skills query, in an embedded DuckDB.
+
+`LocalWarehouse` creates every table the SKILL.md queries read, with the columns
+they use and the same schema and table names:
+- CHABI_DBT.ORDER_METRICS and its siblings;
+- the Seven Shifts schedule and restaurant mapping;
+- the AGM, guideline and menu-map tables;
+- MarginEdge.
+
+DuckDB macros stand in for the Snowflake functions the queries call: IFF,
+DATEADD, TO_TIME, TO_DATE and TIMESTAMP_NTZ_FROM_PARTS. With those, the query
+text runs unchanged. The warehouse object is itself a runner,
+`runner(sql) -> list of row dicts`, like the Snowflake tool and `FakeBackend`.
+Row keys are upper-case, as Snowflake returns unquoted names. `QueryCache`, the
+executor, `QueryPlanner` and `fetch_inputs` therefore take it as is, and the
+whole pipeline runs offline: no warehouse credits, no network latency in the
+timings.
+
+    wh = LocalWarehouse()                 # in memory; LocalWarehouse("fuego.duckdb") keeps it on disk
+    wh.load_chain(SyntheticChain(60), start, end, history_start=start - timedelta(days=364))
+    inputs = fetch_inputs(wh, week_starts, period)     # batch_reports.fetch_inputs
+    wh.dump("fixtures/")                  # one SCHEMA.TABLE.parquet per table
+    LocalWarehouse().load_fixtures("fixtures/")        # ...and back (CSV works too)
+
+`load_chain` writes a synthetic chain (see synthetic.py) at warehouse grain:
+- day_dow order rows split into dine-in and catering, with a voided row each week;
+- week rows;
+- labor days and Seven Shifts shifts;
+- one row per review;
+- server-level checks and item selections with their menu map;
+- AGM rows, guidelines, and MarginEdge product counts (two file versions per week,
+  so the latest-file logic has something to pick).
+
+The chain's own `inputs()` and a `fetch_inputs` run against this warehouse agree
+on sales, orders, labor, schedules, AGM and catering. Review averages come from
+whole-star ratings and upselling from server-level rows, so those two are close
+rather than equal. Not modelled: the TIME_PERIOD_TO_DATE split of week rows
+(every week row is `false`) and the `'day'` period type.
+
+    python warehouse.py              # 6-store chain: run every SKILL.md query, print rows and ms
+    python warehouse.py --stores 60
+"""
+
+import csv
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from synthetic import GUIDELINES_TABLE, PY_DAYS
+
+try:
+    import duckdb
+except ImportError:  # pip install duckdb
+    duckdb = None
+
+BRAND = "fuego-tortilla-grill"
+BRAND_NAME = "Fuego Tortilla Grill"  # the AGM, guideline and MarginEdge tables spell it this way
+UPSELL_DAYS = 28  # server-level check and item rows: the last 4 weeks of the loaded range
+SCHEDULE_START = 10 * 60  # shifts start 10:00 AM, inside the 6 AM business day
+MAX_SHIFT = 12 * 60  # minutes
+HERE = os.path.dirname(os.path.abspath(__file__))
+SKILLS_DIR = os.path.dirname(os.path.dirname(HERE))
+
+# ============================================================
+# SCHEMA (every column the skills' queries reference)
+# ============================================================
+SCHEMA = {
+    "CHABI_DBT.ORDER_METRICS": "BRAND VARCHAR, RESTAURANT_LOCATION VARCHAR, TIME_PERIOD_TYPE VARCHAR, TIME_PERIOD_VALUE DATE, "
+                               "TIME_PERIOD_TO_DATE BOOLEAN, DINING_CATEGORY VARCHAR, VOIDED BOOLEAN, AMOUNT DOUBLE, "
+                               "AMOUNT_PREV_YEAR DOUBLE, NET_AMOUNT DOUBLE, ORDER_COUNT BIGINT, ORDER_COUNT_PREV_YEAR BIGINT, "
+                               "DISCOUNT_AMOUNT DOUBLE",
+    "CHABI_DBT.DISCOUNT_METRICS": "BRAND VARCHAR, RESTAURANT_LOCATION VARCHAR, TIME_PERIOD_TYPE VARCHAR, TIME_PERIOD_VALUE DATE, "
+                                  "ORDER_COUNT BIGINT, DISCOUNT_AMOUNT DOUBLE",
+    "CHABI_DBT.LABOR_METRICS": "BRAND VARCHAR, RESTAURANT_LOCATION VARCHAR, TIME_PERIOD_TYPE VARCHAR, TIME_PERIOD_VALUE DATE, "
+                               "PAYABLE_HOURS DOUBLE, TOTAL_PAY DOUBLE",
+    "CHABI_DBT.GOOGLE_REVIEWS": "BRAND VARCHAR, RESTAURANT_LOCATION VARCHAR, REVIEW_DATE DATE, FEEDBACK_DATE DATE, STARS DOUBLE",
+    "CHABI_DBT.OVATION_SURVEY_REPORTS": "BRAND VARCHAR, RESTAURANT_LOCATION VARCHAR, SURVEY_DATE DATE, FEEDBACK_DATE DATE, "
+                                        "SURVEY_RATING DOUBLE, STARS DOUBLE",
+    "CHABI_DBT.YELP_REVIEWS": "BRAND VARCHAR, RESTAURANT_LOCATION VARCHAR, REVIEW_DATE DATE, FEEDBACK_DATE DATE, STARS DOUBLE",
+    "CHABI_DBT.ORDERS_REPORTS": "BRAND VARCHAR, RESTAURANT_LOCATION VARCHAR, REPORT_DATE DATE, SERVER VARCHAR, "
+                                "DINING_CATEGORY VARCHAR, SERVICE VARCHAR, VOIDED BOOLEAN, CHECK_COUNT BIGINT, AMOUNT DOUBLE",
+    "CHABI_DBT.ITEM_SELECTION_REPORTS": "BRAND VARCHAR, RESTAURANT_LOCATION VARCHAR, REPORT_DATE DATE, SERVER VARCHAR, "
+                                        "DINING_CATEGORY VARCHAR, SERVICE VARCHAR, MENU_GROUP VARCHAR, MENU VARCHAR, "
+                                        "MENU_ITEM VARCHAR, QTY BIGINT",
+    "CHABI_DBT.LOCATIONS": "RESTAURANT_NUMBER BIGINT, RESTAURANT_LOCATION VARCHAR",
+    "MENU_MAP.MENU_MAP_TABLE": "TOAST_MENU_GROUP VARCHAR, TOAST_MENU VARCHAR, TOAST_MENU_ITEM VARCHAR, MAPPED_MENU_SUBGROUP VARCHAR",
+    "RESTAURANT_MAPPING.RESTAURANT_MAPPING_TABLE": "SEVEN_SHIFTS_LOCATION VARCHAR, RESTAURANT_NUMBER BIGINT, LOCATION VARCHAR",
+    "SEVEN_SHIFTS_DATA_FUEGO_TORTILLA_GRILL.SCHEDULED_HOURS_WAGES": "LOCATION VARCHAR, DATE DATE, IN_TIME VARCHAR, OUT_TIME VARCHAR, "
+                                                                   "ROLE VARCHAR, REGULAR_HOURS DOUBLE, OT_HOURS DOUBLE, "
+                                                                   "_FILE VARCHAR, _MODIFIED TIMESTAMP",
+    # Dates are text in these two (the queries cast them; AgmIndex parses them)
+    "LABOR_AGM_HOURS.LABOR_AGM_HOURS_TABLE": "BRAND VARCHAR, STORE_LISTING VARCHAR, START_DATE VARCHAR, END_DATE VARCHAR, "
+                                             "DAILY_HOURS DOUBLE, WEEKLY_HOURS DOUBLE",
+    "LABOR_GUIDELINES.LABOR_GUIDELINES_TABLE": "BRAND VARCHAR, WEEKLY_NET_SALES_THRESHOLD DOUBLE, WEEKLY_TOTAL_HOURS DOUBLE, "
+                                               "START_DATE VARCHAR",
+    "MARGIN_EDGE_FUEGO_TORTILLA_GRILL.MARGIN_EDGE_FUEGO_TORTILLA_GRILL_TABLE":
+        "RESTAURANT_NAME VARCHAR, PERIOD_START_DATE DATE, PERIOD_END_DATE DATE, CATEGORY_TYPE VARCHAR, CATEGORY_NAME VARCHAR, "
+        "PRODUCT_NAME VARCHAR, PRODUCT_UNIT_UNIT VARCHAR, UNIT_PRICE DOUBLE, ACTUAL_COST_PERCENT DOUBLE, "
+        "TARGET_COST_PERCENT DOUBLE, STARTING_COUNT DOUBLE, STARTING_VALUE DOUBLE, PURCHASED_UNITS DOUBLE, "
+        "PURCHASED_VALUE DOUBLE, USED_UNITS DOUBLE, USED_VALUE DOUBLE, SOLD_UNITS DOUBLE, SOLD_REVENUE DOUBLE, "
+        "ENDING_COUNT DOUBLE, ENDING_VALUE DOUBLE, VARIANCE_UNITS DOUBLE, VARIANCE_VALUE DOUBLE, WASTED_UNITS DOUBLE, "
+        "WASTED_VALUE DOUBLE, _FILE VARCHAR, _MODIFIED TIMESTAMP",
+}
+
+# Snowflake functions the queries call, as DuckDB macros (DATEDIFF, MAX_BY, COUNT_IF and QUALIFY are native).
+# TO_TIME accepts the formats the queries use ('HH12:MI AM', 'HH24:MI:SS'); DATEADD returns a timestamp.
+_TIME_FORMATS = "['%I:%M %p', '%H:%M:%S', '%H:%M']"
+MACROS = [
+    "IFF(cond, a, b) AS CASE WHEN cond THEN a ELSE b END",
+    f"TO_TIME(s) AS CAST(strptime(s, {_TIME_FORMATS}) AS TIME), (s, fmt) AS CAST(strptime(s, {_TIME_FORMATS}) AS TIME)",
+    "TO_DATE(x) AS CAST(x AS DATE)",
+    "TIMESTAMP_NTZ_FROM_PARTS(d, t) AS CAST(d AS DATE) + CAST(t AS TIME)",
+    "DATEADD(part, n, x) AS CAST(x AS TIMESTAMP) + CASE lower(part) WHEN 'second' THEN to_seconds(n) "
+    "WHEN 'minute' THEN to_minutes(n) WHEN 'hour' THEN to_hours(n) WHEN 'day' THEN to_days(n) "
+    "WHEN 'week' THEN to_weeks(n) WHEN 'month' THEN to_months(n) WHEN 'year' THEN to_years(n) END",
+]
+
+# Toast items behind each upsell subgroup (plus one unmapped entree), and per-check attach of the entree
+MENU = [("Sides", "Main Menu", "Queso Blanco", "Queso", "queso"), ("Sides", "Main Menu", "Guacamole", "Guacamole", "guac"),
+        ("Sides", "Main Menu", "Chips & Salsa", "Chips and Salsa", "chips"), ("Sides", "Main Menu", "Rice & Beans", "Sides", "sides"),
+        ("Beverages", "Main Menu", "Fountain Drink", "Drinks", "drinks"), ("Bar", "Bar Menu", "House Margarita", "Margaritas and Beer", "alcohol"),
+        ("Desserts", "Main Menu", "Churros", "Desserts", "desserts"), ("Tacos", "Main Menu", "Street Taco", "Tacos", None)]
+# Servers per store: (name, dining category, service, share of checks); the online row is filtered out by every query
+SERVERS = [("Alex R", "Dine In", "Lunch", 0.2), ("Bri M", "Dine In", "Dinner", 0.22), ("Carlos D", "Dine In", "Dinner", 0.18),
+           ("Dana K", "Drive Thru", "Lunch", 0.13), ("Eli T", "Drive Thru", "Dinner", 0.12), ("Online Order", "Online", None, 0.15)]
+# MarginEdge products: (category type, category, product, unit, unit price, share of sales, target cost %)
+PRODUCTS = [("Food", "Protein", "Chicken Thigh", "lb", 3.1, 0.09, 0.30), ("Food", "Protein", "Brisket", "lb", 6.4, 0.06, 0.34),
+            ("Food", "Produce", "Avocado", "case", 52.0, 0.05, 0.28), ("Food", "Produce", "Lime", "case", 38.0, 0.02, 0.22),
+            ("Food", "Dairy", "Queso Base", "lb", 4.2, 0.05, 0.24), ("Food", "Dairy", "Shredded Cheese", "lb", 3.6, 0.03, 0.26),
+            ("Food", "Tortillas", "Flour Tortilla", "dozen", 2.9, 0.08, 0.18), ("Food", "Dry Goods", "Rice", "lb", 0.8, 0.04, 0.12),
+            ("Beverage", "Bar", "Tequila", "bottle", 21.0, 0.03, 0.22), ("Beverage", "Bar", "Beer Keg", "keg", 145.0, 0.02, 0.25),
+            ("Beverage", "Fountain", "Syrup BIB", "box", 96.0, 0.04, 0.10), ("Paper", "Paper", "To-Go Bags", "case", 44.0, 0.02, 0.15)]
+
+
+def seven_shifts_name(loc):
+    return f"Fuego - {loc}"
+
+
+def margin_edge_name(loc):
+    return f"{BRAND_NAME} - {loc}"
+
+
+def columns(table):
+    return [c.split()[0] for c in SCHEMA[table].split(", ")]
+
+
+# ============================================================
+# WAREHOUSE
+# ============================================================
+class LocalWarehouse:
+    """DuckDB database with the Snowflake schema; call it with SQL like any runner (see module docstring)."""
+
+    def __init__(self, path=":memory:"):
+        if duckdb is None:
+            raise ImportError("the local warehouse needs duckdb (pip install duckdb)")
+        self.con = duckdb.connect(path)
+        self.calls = []  # SQL of every query, like FakeBackend.calls
+        self._lock = threading.Lock()
+        for schema in sorted({t.split(".")[0] for t in SCHEMA}):
+            self.con.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        for table, cols in SCHEMA.items():
+            self.con.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+        for macro in MACROS:
+            self.con.execute(f"CREATE OR REPLACE MACRO {macro}")
+
+    def query(self, sql):
+        """Rows as dicts keyed by upper-case column name. Safe from executor threads (one cursor per call)."""
+        with self._lock:
+            self.calls.append(sql)
+        cur = self.con.cursor()
+        try:
+            cur.execute(sql)
+            names = [d[0].upper() for d in cur.description]
+            return [dict(zip(names, row)) for row in cur.fetchall()]
+        finally:
+            cur.close()
+
+    __call__ = query
+
+    def insert(self, table, rows):
+        """Append `rows` (tuples in SCHEMA column order) through a CSV bulk load; returns the row count."""
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        try:
+            with os.fdopen(fd, "w", newline="") as f:
+                writer = csv.writer(f)
+                n = 0
+                for n, row in enumerate(rows, 1):
+                    writer.writerow(row)
+            if n: self.con.execute(f"COPY {table} FROM '{path}' (HEADER false)")
+            return n
+        finally:
+            os.unlink(path)
+
+    def load_fixtures(self, directory):
+        """Append every `SCHEMA.TABLE.csv` / `.parquet` file in `directory` (columns matched by name); {table: rows}."""
+        known = {t.upper(): t for t in SCHEMA}
+        out = {}
+        for name in sorted(os.listdir(directory)):
+            stem, ext = os.path.splitext(name)
+            if ext not in (".csv", ".parquet") or stem.upper() not in known: continue
+            table = known[stem.upper()]
+            before = self.count(table)
+            path = os.path.join(directory, name).replace("'", "''")
+            self.con.execute(f"INSERT INTO {table} BY NAME SELECT * FROM '{path}'")
+            out[table] = self.count(table) - before
+        return out
+
+    def dump(self, directory, fmt="parquet"):
+        """Write every non-empty table to `directory/SCHEMA.TABLE.<fmt>` (parquet or csv); returns the paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for table in SCHEMA:
+            if not self.count(table): continue
+            path = os.path.join(directory, f"{table}.{fmt}")
+            self.con.execute(f"COPY {table} TO '{path.replace(chr(39), chr(39) * 2)}' "
+                             + ("(FORMAT parquet)" if fmt == "parquet" else "(HEADER true)"))
+            paths.append(path)
+        return paths
+
+    def count(self, table):
+        return self.con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def counts(self):
+        return {t: self.count(t) for t in SCHEMA}
+
+    def load_chain(self, chain, start, end, history_start=None):
+        """Load `chain` (a synthetic.SyntheticChain) for the weeks touching `start`..`end`; {table: rows added}."""
+        return {table: self.insert(table, rows) for table, rows in chain_tables(chain, start, end, history_start).items()}
+
+    def close(self):
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================
+# SYNTHETIC CHAIN -> WAREHOUSE ROWS
+# ============================================================
+def _weeks(start, end):
+    """Week-start ordinals (Mondays) of every week touching start..end."""
+    first = start - timedelta(days=start.weekday())
+    return first.toordinal() + 7 * np.arange((end - first).days // 7 + 1)
+
+
+def _spread(totals, weights):
+    """Split each week's integer total over its days in proportion to `weights`; every row sums exactly."""
+    w = weights.sum(axis=1, keepdims=True)
+    share = np.cumsum(weights, axis=1) / np.where(w > 0, w, 1)
+    cum = np.round(share * np.asarray(totals)[:, None])
+    return np.diff(cum, axis=1, prepend=0).astype(int)
+
+
+def _ratings(avg, n):
+    """`n` whole-star ratings averaging as close to `avg` as whole stars allow."""
+    lo = math.floor(avg)
+    k = min(n, round((avg - lo) * n))
+    return [min(lo + 1, 5)] * k + [lo] * (n - k)
+
+
+def _clock(minutes):
+    return f"{(minutes // 60 - 1) % 12 + 1:02d}:{minutes % 60:02d} {'AM' if minutes % 1440 < 720 else 'PM'}"
+
+
+def _order_rows(chain, li, loc, w_ord, with_weeks=True):
+    """ORDER_METRICS day_dow rows (dine-in, catering, one voided row a week) and week rows; also the per-day arrays."""
+    d_ord = (w_ord[:, None] + np.arange(7)).ravel()
+    sales = chain.sales(li, d_ord).reshape(-1, 7)
+    sales_py = chain.sales(li, d_ord - PY_DAYS).reshape(-1, 7)
+    cy, py = chain.weeks(li, w_ord), chain.weeks(li, w_ord - PY_DAYS)
+    orders, orders_py = _spread(cy["orders"], sales), _spread(py["orders"], sales_py)
+    cat_day = sales.argmax(axis=1).tolist()  # each week's catering lands on its busiest day
+    disc = (sales * 0.031).round(2).tolist()
+    iso = [date.fromordinal(o).isoformat() for o in d_ord.tolist()]
+    sales_l, sales_py_l, orders_l, orders_py_l = (a.tolist() for a in (sales, sales_py, orders, orders_py))
+    cy_l, py_l = ({k: v.tolist() for k, v in x.items()} for x in (cy, py))
+    rows = []
+    for wi in range(len(w_ord)):
+        cat_amt = min(cy_l["cat_amt"][wi], sales_l[wi][cat_day[wi]])
+        cat_n = min(cy_l["cat_ords"][wi], orders_l[wi][cat_day[wi]])
+        for d in range(7):
+            amt = sales_l[wi][d]
+            if not amt: continue
+            day = iso[wi * 7 + d]
+            c_amt, c_n = (cat_amt, cat_n) if d == cat_day[wi] and cat_n else (0.0, 0)
+            rows.append((BRAND, loc, "day_dow", day, False, "Dine In", False, round(amt - c_amt, 2), sales_py_l[wi][d],
+                         round(amt - c_amt, 2), orders_l[wi][d] - c_n, orders_py_l[wi][d], disc[wi][d]))
+            if c_n:
+                rows.append((BRAND, loc, "day_dow", day, False, "Catering", False, c_amt, 0.0, c_amt, c_n, 0, 0.0))
+                rows.append((BRAND, loc, "day_dow", day, False, "Dine In", True, 0.0, 0.0, 0.0, max(1, c_n // 2), 0, 0.0))
+        if with_weeks and cy_l["amount"][wi]:
+            ws = iso[wi * 7]
+            rows.append((BRAND, loc, "week", ws, False, None, False, cy_l["amount"][wi], py_l["amount"][wi], cy_l["amount"][wi],
+                         cy_l["orders"][wi], py_l["orders"][wi], cy_l["discount"][wi]))
+            rows.append((BRAND, loc, "week", ws, False, None, True, 0.0, 0.0, 0.0, max(1, cy_l["orders"][wi] // 250), 0, 0.0))
+    return rows, d_ord, sales, orders, cy_l, iso
+
+
+def chain_tables(chain, start, end, history_start=None):
+    """
+    {table: rows} for every store of `chain` over the weeks touching `start`..`end`.
+    Weeks from `history_start` up to `start` get ORDER_METRICS rows only: what the PY,
+    history and prior-window queries read.
+    """
+    out = {t: [] for t in SCHEMA}
+    w_ord = _weeks(start, end)
+    h_ord = _weeks(history_start, start - timedelta(days=1)) if history_start and history_start < start else w_ord[:0]
+    h_ord = h_ord[h_ord < w_ord[0]]
+    upsell_from = end.toordinal() - UPSELL_DAYS + 1
+    start_clock = _clock(SCHEDULE_START)
+    for li, loc in enumerate(chain.locations):
+        rng = np.random.default_rng([chain.seed, li])
+        store = li + 101
+        out["CHABI_DBT.LOCATIONS"].append((store, loc))
+        out["RESTAURANT_MAPPING.RESTAURANT_MAPPING_TABLE"].append((seven_shifts_name(loc), store, loc))
+        if len(h_ord):
+            out["CHABI_DBT.ORDER_METRICS"] += _order_rows(chain, li, loc, h_ord)[0]
+        rows, d_ord, sales, orders, cy, iso = _order_rows(chain, li, loc, w_ord)
+        out["CHABI_DBT.ORDER_METRICS"] += rows
+        disc_n = _spread(np.array(cy["disc_count"]), sales).ravel().tolist()
+        hours, pay, sched = (a.tolist() for a in chain.labor(li, d_ord, sales.ravel()))
+        sales, orders, ticket = sales.ravel().tolist(), orders.ravel().tolist(), float(chain.ticket[li])
+        upsell = {key: min(float(chain.upsell[key][li]), 1.0) for *_, key in MENU if key}
+
+        d_ord = d_ord.tolist()
+        for i, day in enumerate(iso):
+            if hours[i]:
+                out["CHABI_DBT.LABOR_METRICS"].append((BRAND, loc, "day_dow", day, hours[i], pay[i]))
+            if not sales[i]: continue
+            out["CHABI_DBT.DISCOUNT_METRICS"].append((BRAND, loc, "day_dow", day, disc_n[i], round(sales[i] * 0.031, 2)))
+            # Seven Shifts: the day's scheduled hours as equal crew shifts from 10 AM, plus an excluded GM shift
+            ws = date.fromisoformat(iso[i - i % 7])
+            file, modified = f"{seven_shifts_name(loc)}/schedule_{ws.isoformat()}.csv", datetime.combine(ws - timedelta(days=3), datetime.min.time())
+            minutes = int(round(sched[i] * 60))
+            k = -(-minutes // MAX_SHIFT)
+            for j in range(k):
+                m = minutes // k + (j < minutes % k)
+                out["SEVEN_SHIFTS_DATA_FUEGO_TORTILLA_GRILL.SCHEDULED_HOURS_WAGES"].append(
+                    (seven_shifts_name(loc), day, start_clock, _clock(SCHEDULE_START + m), "Crew", m / 60, None, file, modified))
+            out["SEVEN_SHIFTS_DATA_FUEGO_TORTILLA_GRILL.SCHEDULED_HOURS_WAGES"].append(
+                (seven_shifts_name(loc), day, "09:00 AM", "07:00 PM", "General Manager", 10.0, None, file, modified))
+            # Server-level checks and item selections for the last UPSELL_DAYS
+            if d_ord[i] >= upsell_from:
+                for server, dining, service, share in SERVERS:
+                    checks = int(round(orders[i] * share))
+                    if not checks: continue
+                    out["CHABI_DBT.ORDERS_REPORTS"].append((BRAND, loc, day, server, dining, service, False, checks,
+                                                            round(checks * ticket, 2)))
+                    for group, menu, item, _, key in MENU:
+                        qty = int(rng.binomial(checks, upsell[key])) if key else checks
+                        if qty:
+                            out["CHABI_DBT.ITEM_SELECTION_REPORTS"].append((BRAND, loc, day, server, dining, service, group, menu, item, qty))
+
+        # Reviews: one row per rating, spread over the week
+        for source, (avg, cnt) in chain.week_reviews(li, w_ord).items():
+            for wi in range(len(w_ord)):
+                if not cy["amount"][wi]: continue
+                for j, stars in enumerate(_ratings(float(avg[wi]), int(cnt[wi]))):
+                    day = iso[wi * 7 + 1 + j % 6]  # Tuesday..Sunday
+                    if source == "ovation":
+                        out["CHABI_DBT.OVATION_SURVEY_REPORTS"].append((BRAND, loc, day, day, stars, stars))
+                    else:
+                        out[f"CHABI_DBT.{source.upper()}_REVIEWS"].append((BRAND, loc, day, day, stars))
+
+        # MarginEdge: product counts per week, an early file and the corrected latest one
+        for wi in range(len(w_ord)):
+            week_sales = sum(sales[wi * 7:wi * 7 + 7])
+            if not week_sales: continue
+            ws, we = iso[wi * 7], iso[wi * 7 + 6]
+            for version in (1, 2):
+                file = f"{margin_edge_name(loc)}/{ws}_v{version}.csv"
+                modified = datetime.fromisoformat(we) + timedelta(days=version)
+                drift = rng.normal(0.04, 0.12 if version == 2 else 0.3, len(PRODUCTS)).tolist()
+                on_hand, restock = rng.uniform(0.3, 0.8, len(PRODUCTS)).tolist(), rng.uniform(0.9, 1.1, len(PRODUCTS)).tolist()
+                for p, (ctype, cname, product, unit, price, share, target) in enumerate(PRODUCTS):
+                    revenue = round(week_sales * share, 2)
+                    actual = target * (1 + drift[p])
+                    used_units = round(revenue * actual / price, 1)
+                    sold_units = round(revenue * target / price, 1)
+                    start_units = round(used_units * on_hand[p], 1)
+                    bought = round(used_units * restock[p], 1)
+                    end_units = round(max(start_units + bought - used_units, 0), 1)
+                    wasted = round(used_units * 0.01, 1) if cname == "Produce" else 0.0
+                    out["MARGIN_EDGE_FUEGO_TORTILLA_GRILL.MARGIN_EDGE_FUEGO_TORTILLA_GRILL_TABLE"].append(
+                        (margin_edge_name(loc), ws, we, ctype, cname, product, unit, price, round(actual, 4), target,
+                         start_units, round(start_units * price, 2), bought, round(bought * price, 2), used_units,
+                         round(used_units * price, 2), sold_units, revenue, end_units, round(end_units * price, 2),
+                         round(used_units - sold_units, 1), round((used_units - sold_units) * price, 2), wasted, round(wasted * price, 2),
+                         file, modified))
+
+    out["LABOR_AGM_HOURS.LABOR_AGM_HOURS_TABLE"] = [(BRAND_NAME, *r) for r in chain.agm_rows()]
+    out["LABOR_GUIDELINES.LABOR_GUIDELINES_TABLE"] = [(BRAND_NAME, t, h, "2024-01-01") for t, h in sorted(GUIDELINES_TABLE.items())]
+    out["MENU_MAP.MENU_MAP_TABLE"] = [(g, m, item, sub) for g, m, item, sub, _ in MENU]
+    return out
+
+
+# ============================================================
+# SKILL.md QUERIES
+# ============================================================
+def skill_queries(skills_dir=SKILLS_DIR):
+    """[(skill, line, sql template)] for every ```sql block in every skill's SKILL.md (one per statement)."""
+    out = []
+    for skill in sorted(os.listdir(skills_dir)):
+        path = os.path.join(skills_dir, skill, "SKILL.md")
+        if not os.path.exists(path): continue
+        with open(path) as f:
+            text = f.read()
+        for m in re.finditer(r"```sql\n(.*?)```", text, re.S):
+            line = text.count("\n", 0, m.start()) + 2
+            for stmt in re.split(r"\n\s*\n(?=--)", m.group(1)):  # "-- Google" / "-- Ovation" blocks hold several
+                if re.search(r"^\s*(SELECT|WITH)\b", re.sub(r"^--.*$", "", stmt, flags=re.M).strip(), re.I):
+                    out.append((skill, line, stmt))
+    return out
+
+
+def skill_params(chain, last_week, n_weeks=4):
+    """Placeholder values for the SKILL.md templates: the chain's first store and the 4 weeks ending `last_week`."""
+    first = last_week - timedelta(weeks=n_weeks - 1)
+    sunday = last_week + timedelta(days=6)
+    return {"location": chain.locations[0], "locations_csv": ", ".join(f"'{l}'" for l in chain.locations),
+            "week_starts_csv": ",".join(f"'{first + timedelta(weeks=i)}'" for i in range(n_weeks)),
+            "earliest_monday": first.isoformat(), "latest_sunday": sunday.isoformat(),
+            "history_start": (first - timedelta(weeks=n_weeks)).isoformat(),
+            "ws_minus_21": first.isoformat(), "ws_plus_6": sunday.isoformat(),
+            "14_days_ago": (sunday - timedelta(days=13)).isoformat(),
+            "start_date": (sunday - timedelta(days=13)).isoformat(), "end_date": sunday.isoformat(),
+            "restaurant_name": margin_edge_name(chain.locations[0]), "period_start": last_week.isoformat()}
+
+
+def _fill(template, params):
+    return re.sub(r"\{([a-z_0-9]+)\}", lambda m: params[m.group(1)], template)
+
+
+if __name__ == "__main__":
+    import sys
+    from synthetic import SyntheticChain  # noqa: E402
+    n = int(sys.argv[sys.argv.index("--stores") + 1]) if "--stores" in sys.argv else 6
+    last_week = date(2026, 2, 16)
+    chain = SyntheticChain(n, today=last_week + timedelta(weeks=1))
+    t0 = time.perf_counter()
+    wh = LocalWarehouse()
+    added = wh.load_chain(chain, last_week - timedelta(weeks=7), last_week + timedelta(days=6),
+                          history_start=last_week - timedelta(weeks=7 + 26, days=PY_DAYS))
+    print(f"✓ {n} stores loaded: {sum(added.values()):,} rows in {time.perf_counter() - t0:.2f}s")
+    params, failed = skill_params(chain, last_week), 0
+    for skill, line, sql in skill_queries():
+        t = time.perf_counter()
+        try:
+            rows = wh(_fill(sql, params))
+            print(f"  {skill}/SKILL.md:{line:<4} {len(rows):>6} rows  {(time.perf_counter() - t) * 1000:7.1f} ms")
+        except Exception as e:  # report every failing query, not just the first
+            failed += 1
+            print(f"✗ {skill}/SKILL.md:{line:<4} {type(e).__name__}: {str(e).splitlines()[0]}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,255 @@
+"""
+Shared weekly KPI structures.
+
+`WeeklyKpis` turns one set of raw query inputs (the `*_raw` rows, AGM rows,
+guideline table and upselling dict — `report_queries.assemble()` /
+`query_planner.consolidated_report()` shape) into everything the weekly reports
+render from: the daily fact store with guideline hours, `loc_weekly`,
+`loc_data`, the comp set, system totals, `sys_weekly` and the verification
+dictionary. Built once, it serves the system flash and every location flash.
+"""
+
+import copy
+from collections import defaultdict
+from datetime import date, timedelta
+
+from fact_store import PY_SHIFT_DAYS, DailyFacts, RollingWindows
+from labor_guidelines import AgmIndex, GuidelineTable, compute_guidelines
+from tracing import span
+
+
+def pct_chg(current, prior):
+    return ((current - prior) / prior) * 100 if prior else None
+
+
+class WeeklyKpis:
+    """Per-location and system KPIs for `week_starts` (most recent first)."""
+
+    def __init__(self, raw, locations, week_starts, local_py=False):
+        self.locations = list(locations)
+        self.week_starts = list(week_starts)
+        self.ws = self.week_starts[0]
+        self.local_py = local_py
+        self.history_start = min(week_starts) - timedelta(days=PY_SHIFT_DAYS) if local_py else min(week_starts)
+        with span("organize", kpis="weekly"): self._organize(raw)
+        with span("guidelines", kpis="weekly"): self._guidelines(raw)
+        with span("kpis", kpis="weekly"):
+            self._location_kpis()
+            self._system_totals()
+            self._verify_data()
+            self._system_weekly()
+
+    # ============================================================
+    # ORGANIZE DATA
+    # ============================================================
+    def _organize(self, raw):
+        self.reviews_dict = defaultdict(lambda: defaultdict(dict))
+        for loc,ws,source,avg_r,cnt in raw["reviews_raw"]:
+            self.reviews_dict[loc][date.fromisoformat(ws)][source] = {"avg":avg_r,"count":cnt}
+
+        # Daily facts: one (location x day) float64 array per measure (see fact_store.py)
+        FACTS = self.FACTS = DailyFacts(self.locations, self.history_start, max(self.week_starts)+timedelta(days=6))
+        FACTS.load(raw["daily_sales_raw"], "sales")
+        FACTS.load(raw["daily_labor_raw"], "hours", "pay")
+        FACTS.load(raw["scheduled_raw"], "scheduled")
+        # Weekly-grain rows sit on their week's Monday; read them through week-aligned windows only
+        FACTS.load([(loc,ws,amt,amt_py,orders,orders_py,disc) for loc,ws,amt,amt_py,net,orders,orders_py,disc in raw["weekly_sales_raw"]],
+                   "amount","amount_py","orders","orders_py","discount")
+        FACTS.load(raw["catering_cy_raw"], "cat_amt", "cat_ords")
+        if self.local_py:
+            FACTS.add_prior_year({"amount":"amount_py","orders":"orders_py","cat_amt":"cat_py_amt","cat_ords":"cat_py_ords"})
+        else:
+            FACTS.load(raw["catering_py_raw"], "cat_py_amt", "cat_py_ords")
+        if raw.get("discounts_raw"):  # location flash Disc # (DISCOUNT_METRICS order counts)
+            FACTS.load([(loc,ws,n) for loc,ws,n,amt in raw["discounts_raw"]], "disc_count")
+        self.history = defaultdict(dict)  # loc -> {week_start: amount}, ~6 months for the location flash GM message
+        for loc,ws,amt,orders in raw.get("history_raw", []):
+            self.history[loc][date.fromisoformat(ws)] = amt
+
+        # Compute upselling rates
+        self.upselling = {}
+        for loc, u in raw["upselling_raw"].items():
+            c = u["checks"]
+            food = u["queso"]+u["guac"]+u["chips"]+u["sides"]+u["desserts"]
+            bev = u["drinks"]+u["alcohol"]
+            self.upselling[loc] = {
+                "checks":c, "avg_check":u["avg_check"],
+                "queso_rate":u["queso"]/c*100, "guac_rate":u["guac"]/c*100,
+                "food_addon_rate":food/c*100, "bev_rate":bev/c*100,
+                "drinks_rate":u["drinks"]/c*100, "alcohol_rate":u["alcohol"]/c*100,
+            }
+
+    # ============================================================
+    # GUIDELINES
+    # ============================================================
+    def _guidelines(self, raw):
+        self.GUIDE = GuidelineTable(raw["GUIDELINES_TABLE"])  # compiled once; GUIDE.lookup(x) for a single week
+        self.AGM = AgmIndex(raw["agm_raw"])  # parsed once; AGM.daily(loc, day) for a single day
+
+        # Batch guidelines for every location-week at once (see labor_guidelines.py)
+        FACTS = self.FACTS
+        agm_mx = self.AGM.matrix(self.locations, FACTS.start, FACTS.n_days)
+        guide_daily, _, _ = compute_guidelines(FACTS.data["sales"], FACTS.start, self.GUIDE.lookup_many, agm_mx)
+        FACTS.add("guide", guide_daily)
+        self.RW = RollingWindows(FACTS)  # prefix sums: any window total in O(1)
+
+    # ============================================================
+    # PER-LOCATION KPIs + N-WEEK HISTORY
+    # ============================================================
+    def _location_kpis(self):
+        FACTS, RW = self.FACTS, self.RW
+        self.loc_data = loc_data = {}
+        self.loc_weekly = loc_weekly = defaultdict(dict)  # loc_weekly[loc][week_idx] = {...}
+        self.week_facts = week_facts = {ws_i: RW.totals(ws_i, 7) for ws_i in self.week_starts}  # {ws: {measure: (L,) sums}}
+
+        for loc in self.locations:
+            for wi, ws_i in enumerate(self.week_starts):
+                wk = week_facts[ws_i]; li = FACTS.loc_index[loc]
+                amt = wk["amount"][li].item(); amt_py = wk["amount_py"][li].item()
+                ords = round(wk["orders"][li].item()); ords_py = round(wk["orders_py"][li].item())  # counts stay ints
+                has_py = amt_py > 0
+                sss_v = pct_chg(amt, amt_py) if has_py else None
+                sst_v = pct_chg(ords, ords_py) if has_py else None
+                avg_tkt = amt/ords if ords else 0
+                avg_tkt_py = amt_py/ords_py if (has_py and ords_py) else 0
+                tkt_chg = pct_chg(avg_tkt, avg_tkt_py) if has_py else None
+
+                hrs = wk["hours"][li].item(); pay = wk["pay"][li].item(); sch_hrs = wk["scheduled"][li].item()
+                lp = (pay/amt*100) if amt else 0
+                guide_total = wk["guide"][li].item()
+                vs_guide_n = hrs - guide_total
+                vs_guide_pct = (hrs/guide_total*100) if guide_total else 0
+                splh = amt/hrs if hrs else 0
+
+                cat_amt = wk["cat_amt"][li].item(); cat_ords = round(wk["cat_ords"][li].item())
+                cat_py_amt = wk["cat_py_amt"][li].item()
+
+                rev = self.reviews_dict[loc].get(ws_i,{})
+                google_r=rev.get("google",{}).get("avg"); google_n=rev.get("google",{}).get("count",0)
+                ovation_r=rev.get("ovation",{}).get("avg"); ovation_n=rev.get("ovation",{}).get("count",0)
+                yelp_r=rev.get("yelp",{}).get("avg"); yelp_n=rev.get("yelp",{}).get("count",0)
+                total_rev_n=google_n+ovation_n+yelp_n
+                wavg = ((google_r or 0)*google_n+(ovation_r or 0)*ovation_n+(yelp_r or 0)*yelp_n)/total_rev_n if total_rev_n else None
+
+                week_data = {
+                    "amount":amt,"amount_py":amt_py,"orders":ords,"orders_py":ords_py,
+                    "has_py":has_py,"sss":sss_v,"sst":sst_v,"avg_tkt":avg_tkt,"tkt_chg":tkt_chg,
+                    "suffix":"vs PY" if has_py else "Non-Comp",
+                    "labor_hrs":hrs,"labor_pay":pay,"labor_pct":lp,
+                    "guide_total":guide_total,"vs_guide_n":vs_guide_n,"vs_guide_pct":vs_guide_pct,
+                    "sch_hrs":sch_hrs,"splh":splh,
+                    "cat_amt":cat_amt,"cat_ords":cat_ords,"cat_py_amt":cat_py_amt,
+                    "google_r":google_r,"google_n":google_n,"ovation_r":ovation_r,"ovation_n":ovation_n,
+                    "yelp_r":yelp_r,"yelp_n":yelp_n,"wavg_rating":wavg,"total_rev_n":total_rev_n,
+                    "discount":wk["discount"][li].item(),
+                }
+                if "disc_count" in wk:
+                    week_data["disc_count"] = round(wk["disc_count"][li].item())
+                loc_weekly[loc][wi] = week_data
+                if wi == 0:
+                    loc_data[loc] = week_data
+
+    # ============================================================
+    # SYSTEM TOTALS
+    # ============================================================
+    def _system_totals(self):
+        loc_data, loc_weekly = self.loc_data, self.loc_weekly
+        # Comp stores
+        self.comp_locs = comp_locs = [loc for loc in self.locations if loc_data[loc]["has_py"]]
+
+        self.sys_amt = sys_amt = sum(v["amount"] for v in loc_data.values())
+        comp_amt = sum(loc_data[loc]["amount"] for loc in comp_locs)
+        comp_amt_py = sum(loc_data[loc]["amount_py"] for loc in comp_locs)
+        comp_ords = sum(loc_data[loc]["orders"] for loc in comp_locs)
+        comp_ords_py = sum(loc_data[loc]["orders_py"] for loc in comp_locs)
+        self.sys_sss = pct_chg(comp_amt, comp_amt_py) if comp_amt_py else None
+        self.sys_sst = pct_chg(comp_ords, comp_ords_py) if comp_ords_py else None
+        self.sys_ords = sys_ords = sum(v["orders"] for v in loc_data.values())
+        self.sys_tkt = sys_amt/sys_ords if sys_ords else 0
+        comp_tkt = comp_amt/comp_ords if comp_ords else 0
+        comp_tkt_py = comp_amt_py/comp_ords_py if comp_ords_py else 0
+        self.sys_tkt_chg = pct_chg(comp_tkt, comp_tkt_py) if comp_tkt_py else None
+        self.sys_hrs = sum(v["labor_hrs"] for v in loc_data.values())
+        self.sys_pay = sys_pay = sum(v["labor_pay"] for v in loc_data.values())
+        self.sys_lp = sys_lp = (sys_pay/sys_amt*100) if sys_amt else 0
+        self.sys_guide = sum(v["guide_total"] for v in loc_data.values())
+        self.sys_cat = sum(v["cat_amt"] for v in loc_data.values())
+        self.sys_cat_ords = sum(v["cat_ords"] for v in loc_data.values())
+
+        # Prior week system labor %
+        pw_sys_amt = sum(loc_weekly[loc][1]["amount"] for loc in self.locations)
+        pw_sys_pay = sum(loc_weekly[loc][1]["labor_pay"] for loc in self.locations)
+        self.pw_sys_lp = pw_sys_lp = (pw_sys_pay/pw_sys_amt*100) if pw_sys_amt else 0
+        self.sys_lp_chg = sys_lp - pw_sys_lp
+
+    # ============================================================
+    # VERIFICATION DATA DICTIONARY
+    # ============================================================
+    def _verify_data(self):
+        self.verify_data = verify_data = {}
+        upselling = self.upselling
+        for loc in self.locations:
+            dd = self.loc_data[loc]
+            verify_data[f"{loc}_sales"] = dd["amount"]
+            verify_data[f"{loc}_sss"] = dd["sss"]
+            verify_data[f"{loc}_sst"] = dd["sst"]
+            verify_data[f"{loc}_labor_pct"] = dd["labor_pct"]
+            verify_data[f"{loc}_vs_guide_pct"] = dd["vs_guide_pct"]
+            verify_data[f"{loc}_avg_tkt"] = dd["avg_tkt"]
+            verify_data[f"{loc}_labor_hrs"] = dd["labor_hrs"]
+            verify_data[f"{loc}_guide_hrs"] = dd["guide_total"]
+            verify_data[f"{loc}_splh"] = dd["splh"]
+            verify_data[f"{loc}_cat_amt"] = dd["cat_amt"]
+            verify_data[f"{loc}_cat_py_amt"] = dd["cat_py_amt"]
+            verify_data[f"{loc}_cat_ords"] = dd["cat_ords"]
+            verify_data[f"{loc}_sch_hrs"] = dd["sch_hrs"]
+            verify_data[f"{loc}_google_r"] = dd["google_r"]
+            verify_data[f"{loc}_ovation_r"] = dd["ovation_r"]
+            verify_data[f"{loc}_ovation_n"] = dd["ovation_n"]
+            verify_data[f"{loc}_checks"] = upselling[loc]["checks"]
+            verify_data[f"{loc}_food_addon_rate"] = upselling[loc]["food_addon_rate"]
+            verify_data[f"{loc}_queso_rate"] = upselling[loc]["queso_rate"]
+            verify_data[f"{loc}_bev_rate"] = upselling[loc]["bev_rate"]
+            for wi in range(len(self.week_starts)):
+                wd = self.loc_weekly[loc][wi]
+                verify_data[f"{loc}_w{wi}_sales"] = wd["amount"]
+                verify_data[f"{loc}_w{wi}_labor_pct"] = wd["labor_pct"]
+                verify_data[f"{loc}_w{wi}_cat_amt"] = wd.get("cat_amt", 0)
+                verify_data[f"{loc}_w{wi}_cat_ords"] = wd.get("cat_ords", 0)
+                verify_data[f"{loc}_w{wi}_ovation_r"] = wd.get("ovation_r")
+                verify_data[f"{loc}_w{wi}_google_r"] = wd.get("google_r")
+        for key in ("amt", "cat", "pay", "sss", "sst", "lp"):
+            verify_data[f"sys_{key}"] = getattr(self, f"sys_{key}")
+
+    # ============================================================
+    # SYSTEM TRENDS
+    # ============================================================
+    def _system_weekly(self):
+        self.sys_weekly = sys_weekly = {}
+        for ws_i in self.week_starts:
+            sw = lambda m, locs=None: self.RW.system(m, ws_i, 7, locs)
+            comp_locs = self.comp_locs
+            sys_weekly[ws_i] = {"amount":sw("amount"),"comp_amt":sw("amount",comp_locs),"comp_amt_py":sw("amount_py",comp_locs),
+                "orders":sw("orders"),"comp_ords":sw("orders",comp_locs),"comp_ords_py":sw("orders_py",comp_locs),
+                "labor_hrs":sw("hours"),"labor_pay":sw("pay"),"sch_hrs":sw("scheduled"),"guide":sw("guide"),
+                "cat_amt":sw("cat_amt"),"cat_amt_py":sw("cat_py_amt")}
+
+    def detached(self):
+        """
+        Picklable copy for worker processes: the rendered KPI dicts without the fact
+        store, prefix sums or guideline/AGM indexes. `attach()` a memory-mapped
+        `DailyFacts.open()` store in the worker to read daily values again.
+        """
+        k = copy.copy(self)
+        k.FACTS = k.RW = k.GUIDE = k.AGM = None
+        k.reviews_dict = {loc: dict(v) for loc, v in self.reviews_dict.items()}
+        return k
+
+    def attach(self, facts):
+        self.FACTS = facts
+        return self
+
+    def daily(self, loc, measure, week_start=None):
+        """One location's 7 daily values (Mon..Sun) for a report week, as Python floats."""
+        li = self.FACTS.loc_index[loc]
+        return self.FACTS.week(measure, week_start or self.ws)[li].tolist()
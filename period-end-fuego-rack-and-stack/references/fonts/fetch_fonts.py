@@ -0,0 +1,99 @@
+"""
+Build the local font bundle (see ../assets.py): download Google Fonts families as static TTFs into this folder.
+
+    python3 fetch_fonts.py                                 # Source Sans 3, as the report CSS imports it
+    python3 fetch_fonts.py "DM Sans" "JetBrains Mono"      # food-cost report
+    python3 fetch_fonts.py "Lato:ital,wght@0,400;0,700"    # any css2 family spec
+
+Run it once on a host with internet; the files then travel with the skill. Each
+spec is requested from fonts.googleapis.com/css2 without a browser User-Agent, so
+Google answers with one TrueType file per face. Files are saved under the names
+`assets.bundle()` reads (`SourceSans3-SemiBold.ttf`, `SourceSans3-Italic.ttf`, …).
+Existing files are kept unless `--force`. The fonts are under the SIL Open Font
+License, which allows bundling them with the reports.
+"""
+
+import argparse
+import os
+import re
+import sys
+import urllib.request
+from urllib.error import URLError
+from urllib.parse import quote
+
+CSS2 = "https://fonts.googleapis.com/css2?family={}&display=swap"
+REPORT_SPEC = "Source Sans 3:ital,wght@0,300;0,400;0,500;0,600;0,700;0,800;1,400"  # the reports' @import
+DEFAULT_AXES = "ital,wght@0,400;0,500;0,600;0,700;1,400"  # for a bare family name
+NAMES = {100: "Thin", 200: "ExtraLight", 300: "Light", 400: "Regular", 500: "Medium",
+         600: "SemiBold", 700: "Bold", 800: "ExtraBold", 900: "Black"}
+TIMEOUT = 30  # seconds per request
+
+_FACE = re.compile(r"@font-face\s*{([^}]*)}")
+_PROP = re.compile(r"([\w-]+)\s*:\s*([^;]+);")
+_URL = re.compile(r"""url\(\s*['"]?([^'")]+)""")
+
+
+def _get(url):
+    req = urllib.request.Request(url, headers={"User-Agent": "fetch_fonts"})  # not a browser: TrueType, not WOFF2 subsets
+    with urllib.request.urlopen(req, timeout=TIMEOUT) as r:
+        return r.read()
+
+
+def css2_url(spec):
+    """css2 stylesheet URL for a family spec; a bare family name gets DEFAULT_AXES."""
+    if ":" not in spec: spec = f"{spec}:{DEFAULT_AXES}"
+    return CSS2.format(quote(spec, safe=":,;@"))
+
+
+def faces(css):
+    """[(family, weight, style, url)] for every @font-face in a css2 stylesheet."""
+    out = []
+    for block in _FACE.findall(css):
+        props = {k.lower(): v.strip() for k, v in _PROP.findall(block)}
+        url = _URL.search(props.get("src", ""))
+        if url:
+            out.append((props["font-family"].strip("'\""), int(props.get("font-weight", "400").split()[0]),
+                        props.get("font-style", "normal"), url.group(1)))
+    return out
+
+
+def file_name(family, weight, style, url):
+    """`SourceSans3-SemiBoldItalic.ttf` style name, as assets.bundle() parses it."""
+    italic = style == "italic"
+    variant = ("" if italic and weight == 400 else NAMES.get(weight, str(weight))) + ("Italic" if italic else "")
+    ext = os.path.splitext(url.split("?")[0])[1] or ".ttf"
+    return f"{re.sub(r'[^A-Za-z0-9]', '', family)}-{variant}{ext}"
+
+
+def fetch(specs, font_dir, force=False):
+    """Download every face of every spec into `font_dir`; returns the paths written."""
+    os.makedirs(font_dir, exist_ok=True)
+    written = []
+    for spec in specs:
+        found = faces(_get(css2_url(spec)).decode())
+        names = [file_name(*f) for f in found]
+        if len(set(names)) != len(names):
+            raise ValueError(f"{spec}: more than one file per face (unicode-range subsets?)")
+        for (family, weight, style, url), name in zip(found, names):
+            path = os.path.join(font_dir, name)
+            if os.path.exists(path) and not force: continue
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(_get(url))
+            os.replace(tmp, path)
+            written.append(path)
+    return written
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Download Google Fonts families into the local font bundle")
+    ap.add_argument("specs", nargs="*", default=[REPORT_SPEC], help="family names or css2 family specs (default: Source Sans 3)")
+    ap.add_argument("--dir", default=os.path.dirname(os.path.abspath(__file__)), help="bundle folder (default: this one)")
+    ap.add_argument("--force", action="store_true", help="re-download files that already exist")
+    args = ap.parse_args()
+    try:
+        paths = fetch(args.specs, args.dir, args.force)
+    except (URLError, ValueError) as e:
+        sys.exit(f"✗ {e}")
+    for p in paths: print(f"✓ {os.path.basename(p)}")
+    print(f"✓ {len(paths)} font files written to {args.dir}")
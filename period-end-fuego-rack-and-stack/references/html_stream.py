@@ -0,0 +1,110 @@
+"""
+Streaming HTML output for the report renderers.
+
+Table bodies used to grow by repeated `rows += f'<tr>...'`, and then everything
+was interpolated into one document f-string. Both steps copy the whole
+accumulated text again and again. Two pieces replace them:
+- `RowTemplate`: a `<tr>` pattern with named `{field}` slots. It is parsed and
+  checked once, at import; each row is one C-level `format_map`.
+- `HtmlWriter`: the document sink. By default it collects chunks in a list and
+  joins them once. Given an open text file, it writes straight to disk.
+
+`writer.rows(template, fields)` streams rows from any iterable of field dicts.
+With a generator, only one row exists at a time, so a rack & stack with
+hundreds of locations, or a server table with thousands of rows, builds in
+linear time and bounded memory.
+
+`PageTemplate` is the whole document: markup with `{name}` value slots and
+`{*name}` row slots (one per table body). It is compiled once, at import.
+Constants such as the stylesheet and fixed table heads are bound in at that
+point, so the head and every run of static markup become ready-made strings.
+Each render then writes those strings, formats the few value slots, and
+streams rows into the row slots; nothing is re-parsed and the CSS is never
+copied into a new string.
+
+This file is shared: keep it identical in both skills' references/.
+"""
+
+import string
+
+
+class RowTemplate:
+    """One row pattern with `{name}` slots ({{ and }} for literal braces); values arrive pre-formatted."""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.fields = []
+        for _, name, spec, conv in string.Formatter().parse(pattern):
+            if name is None: continue
+            if not name.isidentifier() or spec or conv:
+                raise ValueError(f"row template slots are plain names, got {{{name}{'!' + conv if conv else ''}{':' + spec if spec else ''}}}")
+            if name not in self.fields: self.fields.append(name)
+        self.render = pattern.format_map  # render({"field": value, ...}) -> str
+
+    def __call__(self, **fields):
+        return self.render(fields)
+
+    def __repr__(self):
+        return f"RowTemplate({', '.join(self.fields)})"
+
+
+class HtmlWriter:
+    """Write-only HTML sink: an in-memory chunk list (`getvalue()`), or `out`, an open text file."""
+
+    def __init__(self, out=None):
+        self._chunks = [] if out is None else None
+        self.write = self._chunks.append if out is None else out.write
+
+    def rows(self, template, items):
+        """Write one `template` row per field dict in `items` (any iterable; generators stream)."""
+        write, render = self.write, template.render
+        for fields in items:
+            write(render(fields))
+
+    def getvalue(self):
+        """The whole document (None when streaming to a file)."""
+        return "".join(self._chunks) if self._chunks is not None else None
+
+
+
+class PageTemplate:
+    """
+    A document pattern compiled into parts: static strings, `{name}` value slots
+    and `{*name}` row slots. `constants` fill their slots at compile time.
+    """
+
+    def __init__(self, pattern, **constants):
+        self.parts = []  # (None, static text) | ("field", name) | ("rows", name)
+        self.fields, self.row_slots = [], []
+        static = []
+        for text, name, spec, conv in string.Formatter().parse(pattern):
+            static.append(text)
+            if name is None: continue
+            if spec or conv:
+                raise ValueError(f"page template slots are plain names, got {{{name}{'!' + conv if conv else ''}{':' + spec if spec else ''}}}")
+            if name in constants:
+                static.append(str(constants[name]))
+                continue
+            kind, slot = ("rows", name[1:]) if name.startswith("*") else ("field", name)
+            if not slot.isidentifier():
+                raise ValueError(f"page template slots are plain names, got {{{name}}}")
+            if any(static): self.parts.append((None, "".join(static)))
+            static.clear()
+            self.parts.append((kind, slot))
+            (self.row_slots if kind == "rows" else self.fields).append(slot)
+        if any(static): self.parts.append((None, "".join(static)))
+
+    def write(self, doc, fields, rows=None):
+        """
+        Stream the page into `doc` (an HtmlWriter). `fields` maps each value slot to
+        its pre-formatted text; `rows` maps each row slot to (RowTemplate, iterable
+        of field dicts).
+        """
+        write = doc.write
+        for kind, value in self.parts:
+            if kind is None: write(value)
+            elif kind == "field": write(fields[value])
+            else: doc.rows(*rows[value])
+
+    def __repr__(self):
+        return f"PageTemplate(fields={', '.join(self.fields)}; rows={', '.join(self.row_slots)})"
@@ -0,0 +1,183 @@
+"""
+Batch labor-guideline engine (NumPy).
+
+Computes daily and weekly guideline hours for every location-week in one call
+from a (location x day) net-sales matrix. Produces the same numbers as the
+per-week `compute_daily_guideline()` in helpers.md — partial-week projection
+and full-week proportional allocation with the $9K knee — without re-deriving
+the week, weights and adjustments once per location-week.
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+DAYS_OPEN = 6  # Fuego is closed Mondays
+DOW_ADJ = np.array([0, 8, 3, 3, 3, 3, -20], dtype=float)  # Mon..Sun
+RATE = 54 / 3000  # proportional hours per dollar
+KNEE = 9000  # daily sales above this are weighted at KNEE_FACTOR
+KNEE_FACTOR = 0.80
+
+
+class GuidelineTable:
+    """
+    LABOR_GUIDELINES_TABLE (Query 9) compiled once into sorted threshold/hours arrays.
+
+    `lookup()` prices one weekly sales figure with bisect; `lookup_many()` prices a
+    whole array. Both use the same linear interpolation and top-of-table clamp as
+    `lookup_guide()` in helpers.md and return bit-identical values.
+    """
+
+    def __init__(self, table):
+        items = sorted(dict(table).items())
+        if len(items) < 2:
+            raise ValueError("guideline table needs at least two thresholds")
+        self.thresholds = [t for t, _ in items]
+        self.hours = [h for _, h in items]
+        self._t = np.array(self.thresholds, dtype=float)
+        self._h = np.array(self.hours, dtype=float)
+
+    def lookup(self, net_sales):
+        """Interpolated guideline hours for one weekly net sales value."""
+        if net_sales <= 0: return 0
+        i = bisect_right(self.thresholds, net_sales)
+        if i == len(self.thresholds): return self.hours[-1]  # cap at max
+        lt, lh = self.thresholds[i - 1], self.hours[i - 1]
+        t, h = self.thresholds[i], self.hours[i]
+        frac = (net_sales - lt) / (t - lt)
+        return lh + frac * (h - lh)
+
+    def lookup_many(self, net_sales):
+        """Vectorized `lookup()` over an array of weekly net sales."""
+        x = np.asarray(net_sales, dtype=float)
+        n = len(self._t)
+        i = np.searchsorted(self._t, x, side="right")
+        j = np.clip(i, 1, n - 1)
+        lt, lh = self._t[j - 1], self._h[j - 1]
+        t, h = self._t[j], self._h[j]
+        # Same operation order as lookup(); np.interp computes the slope first and
+        # can differ in the last bit.
+        out = lh + ((x - lt) / (t - lt)) * (h - lh)
+        out = np.where(i >= n, self._h[-1], out)
+        return np.where(x <= 0, 0.0, out)
+
+
+def parse_agm_date(v):
+    """AGM dates arrive as date objects, ISO strings or M/D/YYYY text (Query 8)."""
+    if isinstance(v, datetime): return v.date()
+    if isinstance(v, date): return v
+    v = v.strip()
+    if "/" in v: return datetime.strptime(v, "%m/%d/%Y").date()
+    return date.fromisoformat(v)
+
+
+class AgmIndex:
+    """
+    AGM allowance rows (Query 8, LABOR_AGM_HOURS_TABLE) parsed once into a sorted
+    per-location interval index.
+
+    Rows are (location, start, end, daily_hours, weekly_hours) with inclusive
+    dates. Like `get_agm_daily_hours()` in helpers.md, the first listed row that
+    covers a day wins and the daily allowance is weekly_hours / DAYS_OPEN.
+    """
+
+    def __init__(self, rows, days_open=DAYS_OPEN):
+        by_loc = {}
+        for loc, start, end, _daily_h, weekly_h in rows:
+            lo = parse_agm_date(start).toordinal()
+            hi = parse_agm_date(end).toordinal() + 1  # half-open
+            if hi > lo: by_loc.setdefault(loc, []).append((lo, hi, weekly_h / days_open))
+        # Split overlapping rows into disjoint segments so one bisect answers a lookup
+        self._index = {}
+        for loc, spans in by_loc.items():
+            cuts = sorted({b for lo, hi, _ in spans for b in (lo, hi)})
+            starts, ends, values = [], [], []
+            for lo, hi in zip(cuts, cuts[1:]):
+                for s_lo, s_hi, v in spans:
+                    if s_lo <= lo and hi <= s_hi:
+                        if ends and ends[-1] == lo and values[-1] == v:
+                            ends[-1] = hi  # merge with the previous segment
+                        else:
+                            starts.append(lo); ends.append(hi); values.append(v)
+                        break
+            self._index[loc] = (starts, ends, values)
+
+    def daily(self, location, day):
+        """AGM hours for one location-day (0 when no row covers the day)."""
+        starts, ends, values = self._index.get(location, ((), (), ()))
+        i = bisect_right(starts, day.toordinal()) - 1
+        if i >= 0 and day.toordinal() < ends[i]: return values[i]
+        return 0
+
+    def vector(self, location, start, n_days):
+        """Dense per-day AGM hours for `n_days` days beginning at `start`."""
+        out = np.zeros(n_days)
+        lo, hi = start.toordinal(), start.toordinal() + n_days
+        starts, ends, values = self._index.get(location, ((), (), ()))
+        for i in range(max(bisect_right(starts, lo) - 1, 0), bisect_right(starts, hi - 1)):
+            a, b = max(starts[i], lo), min(ends[i], hi)
+            if a < b: out[a - lo:b - lo] = values[i]
+        return out
+
+    def matrix(self, locations, start, n_days):
+        """(location x day) AGM matrix aligned with a sales matrix for `compute_guidelines`."""
+        return np.array([self.vector(loc, start, n_days) for loc in locations]).reshape(len(locations), n_days)
+
+
+def _week_sum(x):
+    """Sum consecutive 7-day blocks left to right, matching Python's sum()."""
+    w = x.reshape(x.shape[0], -1, 7)
+    total = np.zeros(w.shape[:2])
+    for j in range(7):
+        total = total + w[:, :, j]
+    return total
+
+
+def day_range(start, n_days):
+    """List of dates covered by a matrix whose column 0 is `start`."""
+    return [start + timedelta(days=i) for i in range(n_days)]
+
+
+def compute_guidelines(sales, start, lookup_many, agm=None):
+    """
+    Compute guideline hours for all locations and weeks at once.
+
+    sales       (L, D) array of daily net sales, D a multiple of 7; column 0 is
+                the first day of the first week (normally a Monday).
+    start       date of column 0.
+    lookup_many vectorized guideline lookup, normally `GuidelineTable.lookup_many`.
+    agm         optional (L, D) array of daily AGM hours.
+
+    Returns: (daily (L, D), weekly (L, W), week_net (L, W))
+    """
+    sales = np.asarray(sales, dtype=float)
+    n_locs, n_days = sales.shape
+    if n_days % 7:
+        raise ValueError(f"sales matrix must cover whole weeks, got {n_days} days")
+    n_weeks = n_days // 7
+    agm = np.zeros_like(sales) if agm is None else np.asarray(agm, dtype=float)
+
+    dow = (start.weekday() + np.arange(n_days)) % 7
+    adj = DOW_ADJ[dow]
+    open_day = (dow != 0) & (sales > 0)
+
+    week_net = _week_sum(sales)
+    days_with_sales = (sales > 0).reshape(n_locs, n_weeks, 7).sum(axis=2)
+    is_partial = np.repeat(days_with_sales < DAYS_OPEN, 7, axis=1)
+
+    # Partial week: each day projected to a full week and looked up independently
+    lkp = lookup_many(sales * DAYS_OPEN)
+    partial = np.where(open_day & (lkp > 0), lkp / DAYS_OPEN + adj + agm, 0.0)
+
+    # Full week: weekly guideline split by knee-weighted daily sales
+    raw = np.where(sales <= KNEE, sales * RATE, KNEE * RATE + (sales - KNEE) * RATE * KNEE_FACTOR)
+    raw = np.where(open_day, raw, 0.0)
+    total_raw = _week_sum(raw)
+    total_raw[total_raw == 0] = 1
+    total_guide = lookup_many(week_net)
+    full = (raw / np.repeat(total_raw, 7, axis=1)) * np.repeat(total_guide, 7, axis=1) + adj + agm
+    full = np.where(open_day, full, 0.0)
+
+    daily = np.where(is_partial, partial, full)
+    return daily, _week_sum(daily), week_net
@@ -0,0 +1,239 @@
+"""
+Warm headless Chromium pool for HTML → PDF.
+
+Launching Chromium costs far more than printing one report, so `PdfRenderer`
+launches Playwright Chromium once (one or more browsers) and keeps a fixed set of
+open pages. Each conversion borrows a page, loads the HTML file, calls
+`page.pdf()` and returns the page to the pool. The pool size bounds how many PDFs
+print at once. `render_many()` submits a whole batch concurrently.
+
+The browsers run on a private asyncio loop in a daemon thread, so callers stay
+synchronous. Any thread may call `render()`.
+
+Printing fetches nothing remote except Google Fonts. Pool pages abort every
+request that is not a local `file:`/`data:` URL or on `FONT_HOSTS`; the Chrome CLI
+gets a host map that resolves only those hosts, and WeasyPrint gets a fetcher that
+refuses every other remote URL. Fonts in the local bundle are embedded by
+assets.localize_css, which removes their `@import`, so with a bundle nothing is
+fetched at all; without one (fonts/fetch_fonts.py builds it) the reports still load
+Source Sans 3 from Google Fonts. A page is ready at `load` plus
+`document.fonts.ready`, without networkidle's 500 ms quiet period.
+
+Fallbacks, in order: the `google-chrome --headless --print-to-pdf` CLI (one cold
+start per PDF), then WeasyPrint. If none of them is available, `render()` returns
+False and the caller keeps the HTML. A renderer whose browser fails to launch goes
+straight to the fallbacks. A page that errors mid-batch is replaced, and only
+that one report falls back.
+
+Every PDF is a "pdf" span in the trace (see tracing.py), tagged with the
+converter that printed it (or tried to) and that converter's timeout.
+
+    with PdfRenderer(browsers=1, pages=4) as pdf:
+        ok = pdf.render_many([(html_path, pdf_path), ...])
+"""
+
+import asyncio
+import os
+import subprocess
+import threading
+import time
+
+import tracing
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:  # pip install playwright && python3 -m playwright install chromium
+    async_playwright = None
+
+DEFAULT_BROWSERS = 1
+DEFAULT_PAGES = 4  # open pages (= concurrent page.pdf() calls) per browser
+DEFAULT_TIMEOUT = 30  # seconds per PDF
+LAUNCH_ARGS = ["--no-sandbox", "--disable-gpu"]
+PDF_OPTIONS = {"print_background": True, "prefer_css_page_size": True}  # the CSS @page sets size and margins
+LOCAL_SCHEMES = ("file:", "data:", "about:", "blob:")
+FONT_HOSTS = ("fonts.googleapis.com", "fonts.gstatic.com")  # a family missing from the bundle keeps its @import
+ALLOWED = LOCAL_SCHEMES + tuple(f"https://{h}/" for h in FONT_HOSTS)  # everything else is blocked while printing
+OFFLINE_ARGS = ["--host-resolver-rules=MAP * ~NOTFOUND, " + ", ".join(f"EXCLUDE {h}" for h in FONT_HOSTS)]  # Chrome CLI
+
+
+# ============================================================
+# FALLBACKS (no warm browser)
+# ============================================================
+def chrome_cli_pdf(html_path, pdf_path, timeout=DEFAULT_TIMEOUT):
+    """One headless Chrome process per PDF; True when the PDF was written."""
+    try:
+        subprocess.run(["google-chrome","--headless","--no-sandbox","--disable-gpu",*OFFLINE_ARGS,f"--print-to-pdf={pdf_path}",
+                        "--print-to-pdf-no-header","--no-pdf-header-footer",f"file://{html_path}"],capture_output=True,text=True,timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return os.path.exists(pdf_path)
+
+
+def weasyprint_pdf(html_path, pdf_path, timeout=None):
+    try:
+        from weasyprint import HTML, default_url_fetcher
+        def local_only(url, *args, **kwargs):
+            if not url.startswith(ALLOWED): raise ValueError(f"blocked remote fetch: {url}")
+            return default_url_fetcher(url, *args, **kwargs)
+        HTML(filename=html_path, url_fetcher=local_only).write_pdf(pdf_path)
+    except Exception:
+        return False
+    return os.path.exists(pdf_path)
+
+
+FALLBACKS = (chrome_cli_pdf, weasyprint_pdf)
+
+
+async def _local_only(route):
+    if route.request.url.startswith(ALLOWED):
+        await route.continue_()
+    else:
+        await route.abort("blockedbyclient")
+
+
+# ============================================================
+# WARM POOL
+# ============================================================
+class PdfRenderer:
+    """
+    `browsers` Chromium instances with `pages` open pages each. The pool starts
+    lazily on the first render, or explicitly with `start()`. Call `close()` when
+    done; the context manager does it for you. `fallbacks` are tried in order
+    whenever the pool is unavailable or a page fails.
+    """
+
+    def __init__(self, browsers=DEFAULT_BROWSERS, pages=DEFAULT_PAGES, timeout=DEFAULT_TIMEOUT, fallbacks=FALLBACKS):
+        self.n_browsers = browsers
+        self.n_pages = pages
+        self.timeout = timeout
+        self.fallbacks = fallbacks
+        self.error = None  # why the pool is unavailable (launch failure, Playwright missing)
+        self.stats = {"pool": 0, "fallback": 0, "failed": 0}
+        self._loop = self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Launch the browsers (once); True when the warm pool is usable."""
+        with self._lock:
+            if self._loop is None and self.error is None:
+                if async_playwright is None:
+                    self.error = ImportError("playwright is not installed")
+                else:
+                    self._loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=self._loop.run_forever, name="pdf-renderer", daemon=True)
+                    self._thread.start()
+                    try:
+                        self._call(self._launch(), self.timeout * 2)
+                    except Exception as e:
+                        self.error = e
+                        self._stop_loop()
+            return self._loop is not None
+
+    def _call(self, coro, timeout):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _launch(self):
+        self._pw = await async_playwright().start()
+        self._browsers = []
+        self._pages = asyncio.Queue()  # (browser slot, page)
+        self._recover = asyncio.Lock()
+        try:
+            for slot in range(self.n_browsers):
+                self._browsers.append(await self._pw.chromium.launch(args=LAUNCH_ARGS))
+                for _ in range(self.n_pages):
+                    self._pages.put_nowait((slot, await self._new_page(self._browsers[slot])))
+        except BaseException:
+            await self._shutdown()
+            raise
+
+    async def _new_page(self, browser):
+        page = await browser.new_page()
+        await page.route("**/*", _local_only)
+        return page
+
+    async def _print(self, html_path, pdf_path):
+        slot, page = await self._pages.get()  # waits while every page is busy
+        t, ok = time.perf_counter_ns(), False
+        try:
+            await asyncio.wait_for(self._print_on(page, html_path, pdf_path), self.timeout)
+            ok = True
+        except BaseException:
+            page = await self._replace(slot, page)
+            raise
+        finally:
+            tracing.record("pdf", t, time.perf_counter_ns() - t, tid=id(page), converter="pool", timeout=self.timeout,
+                           file=os.path.basename(pdf_path), ok=ok)
+            self._pages.put_nowait((slot, page))  # the pool never shrinks, so waiting jobs cannot hang
+
+    async def _replace(self, slot, page):
+        """A fresh page for a failed one (mid-navigation, crashed renderer), relaunching a dead browser."""
+        try: await page.close()
+        except Exception: pass
+        async with self._recover:
+            try:
+                if not self._browsers[slot].is_connected():
+                    self._browsers[slot] = await self._pw.chromium.launch(args=LAUNCH_ARGS)
+                return await self._new_page(self._browsers[slot])
+            except Exception:
+                return page  # still broken: the next job on it fails fast and falls back
+
+    async def _print_on(self, page, html_path, pdf_path):
+        await page.goto(f"file://{os.path.abspath(html_path)}", wait_until="load")
+        await page.evaluate("document.fonts.ready.then(() => true)")
+        await page.pdf(path=pdf_path, **PDF_OPTIONS)
+
+    def _fallback(self, html_path, pdf_path):
+        for convert in self.fallbacks:
+            with tracing.span("pdf", converter=convert.__name__, timeout=self.timeout, file=os.path.basename(pdf_path)) as trace:
+                trace["ok"] = convert(html_path, pdf_path, timeout=self.timeout)
+            if trace["ok"]:
+                self.stats["fallback"] += 1
+                return True
+        self.stats["failed"] += 1
+        return False
+
+    def render(self, html_path, pdf_path):
+        """Print one HTML file to `pdf_path`; True when the PDF was written."""
+        return self.render_many([(html_path, pdf_path)])[0]
+
+    def render_many(self, jobs):
+        """Print every (html_path, pdf_path) concurrently through the pool; [True/False] in job order."""
+        jobs = list(jobs)
+        if not jobs: return []
+        if not self.start():
+            return [self._fallback(h, p) for h, p in jobs]
+        futures = [asyncio.run_coroutine_threadsafe(self._print(h, p), self._loop) for h, p in jobs]
+        out = []
+        for (h, p), fut in zip(jobs, futures):
+            try:
+                fut.result()
+                self.stats["pool"] += 1
+                out.append(True)
+            except Exception:
+                out.append(self._fallback(h, p))
+        return out
+
+    async def _shutdown(self):
+        for browser in self._browsers:
+            try: await browser.close()
+            except Exception: pass
+        await self._pw.stop()
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = self._thread = None
+
+    def close(self):
+        with self._lock:
+            if self._loop is not None:
+                try: self._call(self._shutdown(), self.timeout)
+                except Exception: pass
+                self._stop_loop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,183 @@
+"""
+Shared period KPI structures.
+
+`PeriodKpis` turns one set of raw query inputs (the `*_raw` rows, AGM rows and
+guideline table — `query_planner.period_report()` shape) into everything the
+rack & stack renders from: the 2N-week daily fact store with guideline hours,
+weekly and period aggregates per location (`loc_weekly`, `loc_data`), the comp
+set, system totals, the prior-period context and `sys_weekly`.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from fact_store import PY_SHIFT_DAYS, DailyFacts, RollingWindows
+from labor_guidelines import AgmIndex, GuidelineTable, compute_guidelines
+from periods import cell, kpis, period_totals, system_totals
+from tracing import span
+
+COMP_MIN_PY_WEEKLY = 500  # PY sales per week a location needs over the period to report as comp
+TOTAL_KEYS = {"amount": "amount", "amount_py": "amount_py", "orders": "orders", "orders_py": "orders_py",
+              "labor_hrs": "hours", "labor_pay": "pay", "guide_total": "guide", "sch_hrs": "scheduled",
+              "cat_amt": "cat_amt", "cat_ords": "cat_ords", "cat_py_amt": "cat_py_amt", "discount": "discount"}
+# Collapsed prior-window totals (`prior_window_raw`) load into their own measures and count
+# toward the prior column only, so a period that covers their date never reads them as sales
+PRIOR_ONLY = {"prior_amount": "amount", "prior_amount_py": "amount_py", "prior_hours": "hours",
+              "prior_pay": "pay", "prior_cat_amt": "cat_amt"}
+
+
+class PeriodKpis:
+    """Per-location and system KPIs for `period` (a periods.Period) and the N weeks before it."""
+
+    def __init__(self, raw, period, locations, local_py=False, comp_min_py_weekly=COMP_MIN_PY_WEEKLY):
+        self.period = period
+        self.prior = period.prior()  # prior-period context comes from the same 2N-week history pull
+        self.week_starts = period.weeks  # most recent first
+        self.n_weeks = period.n_weeks
+        self.ws = self.week_starts[0]
+        self.locations = list(locations)
+        self.local_py = local_py
+        self.comp_min_py_weekly = comp_min_py_weekly
+        self.history_start = self.prior.start - timedelta(days=PY_SHIFT_DAYS) if local_py else self.prior.start
+        with span("organize", kpis="period"): self._organize(raw)
+        with span("guidelines", kpis="period"): self._guidelines(raw)
+        with span("kpis", kpis="period"):
+            self._location_kpis()
+            self._system_totals()
+            self._prior_context()
+            self._system_weekly()
+
+    # ============================================================
+    # ORGANIZE DATA
+    # ============================================================
+    def _organize(self, raw):
+        # Daily facts: one (location x day) float64 array per measure (see fact_store.py),
+        # spanning the prior window and the report period (2N weeks; +52 with local_py)
+        FACTS = self.FACTS = DailyFacts(self.locations, self.history_start, self.period.end)
+        FACTS.load(raw["daily_sales_raw"], "sales")
+        FACTS.load(raw["daily_labor_raw"], "hours", "pay")
+        FACTS.load(raw["scheduled_raw"], "scheduled")
+        # Weekly-grain rows sit on their week's Monday; read them through week-aligned windows only
+        FACTS.load(raw["weekly_sales_raw"], "amount", "amount_py", "orders", "orders_py", "discount")
+        FACTS.load(raw["catering_cy_raw"], "cat_amt", "cat_ords")
+        FACTS.load(raw.get("prior_window_raw", []), *PRIOR_ONLY)
+        if self.local_py:
+            FACTS.add_prior_year({"amount": "amount_py", "orders": "orders_py", "cat_amt": "cat_py_amt", "cat_ords": "cat_py_ords"})
+        else:
+            FACTS.load(raw["catering_py_raw"], "cat_py_amt", "cat_py_ords")
+
+        self.reviews_dict = reviews_dict = {}
+        for loc,source,avg_r,cnt in raw["reviews_raw"]:
+            if loc not in reviews_dict: reviews_dict[loc] = {}
+            reviews_dict[loc][source] = {"avg":avg_r,"count":cnt}
+
+    # ============================================================
+    # GUIDELINES
+    # ============================================================
+    def _guidelines(self, raw):
+        self.GUIDE = GuidelineTable(raw["GUIDELINES_TABLE"])  # compiled once; GUIDE.lookup(x) for a single week
+        self.AGM = AgmIndex(raw["agm_raw"])  # parsed once; AGM.daily(loc, day) for a single day
+
+        # Batch guidelines for every location-week at once (see labor_guidelines.py)
+        FACTS = self.FACTS
+        agm_mx = self.AGM.matrix(self.locations, FACTS.start, FACTS.n_days)
+        guide_daily, _, _ = compute_guidelines(FACTS.data["sales"], FACTS.start, self.GUIDE.lookup_many, agm_mx)
+        FACTS.add("guide", guide_daily)
+        self.RW = RollingWindows(FACTS)  # prefix sums: any window total in O(1)
+
+    # ============================================================
+    # PER-LOCATION PER-WEEK AND PERIOD AGGREGATES
+    # ============================================================
+    def _location_kpis(self):
+        # One vectorized pass over every location: weekly (L x W) and period (L x 1)
+        # totals from the prefix sums, then ratios for all cells at once (see periods.py)
+        RW, N_WEEKS = self.RW, self.n_weeks
+        measures = [m for m in RW.measures if m not in PRIOR_ONLY]
+        week_t = self.week_t = {m: RW.windows(m, self.week_starts, 7) for m in measures}  # column wi = week_starts[wi]
+        week_k = self.week_k = kpis(week_t)
+        period_t = self.period_t = period_totals(RW, [self.period, self.prior], measures)  # column 0 = period, 1 = prior
+        for pm, m in PRIOR_ONLY.items():
+            period_t[m][:, 1] += period_totals(RW, [self.prior], [pm])[pm][:, 0]
+        period_k = self.period_k = kpis(period_t, self.comp_min_py_weekly * N_WEEKS)
+
+        self.loc_weekly = loc_weekly = defaultdict(dict)
+        self.loc_data = loc_data = {}  # period aggregates
+
+        for loc in self.locations:
+            li = self.FACTS.loc_index[loc]
+            for wi in range(N_WEEKS):
+                wk = {k: week_t[m][li, wi].item() for k, m in TOTAL_KEYS.items()}
+                wk.update(cell(week_k, li, wi))
+                del wk["cat_vs_py"]
+                loc_weekly[loc][wi] = wk
+
+            # Reviews
+            rev = self.reviews_dict.get(loc, {})
+            google_r = rev.get("google", {}).get("avg"); google_n = rev.get("google", {}).get("count", 0)
+            ovation_r = rev.get("ovation", {}).get("avg"); ovation_n = rev.get("ovation", {}).get("count", 0)
+            yelp_r = rev.get("yelp", {}).get("avg"); yelp_n = rev.get("yelp", {}).get("count", 0)
+            total_rev_n = google_n + ovation_n + yelp_n
+            wavg = ((google_r or 0)*google_n + (ovation_r or 0)*ovation_n + (yelp_r or 0)*yelp_n) / total_rev_n if total_rev_n else None
+
+            ld = {k: period_t[m][li, 0].item() for k, m in TOTAL_KEYS.items()}
+            ld.update(cell(period_k, li, 0))
+            ld.update({
+                "avg_weekly": ld["amount"] / N_WEEKS,
+                "google_r": google_r, "google_n": google_n, "ovation_r": ovation_r, "ovation_n": ovation_n,
+                "yelp_r": yelp_r, "yelp_n": yelp_n, "wavg_rating": wavg, "total_rev_n": total_rev_n,
+                "suffix": "Comp" if ld["has_py"] else "New",
+            })
+            loc_data[loc] = ld
+
+    # ============================================================
+    # SYSTEM TOTALS
+    # ============================================================
+    def _system_totals(self):
+        self.comp_mask = comp_mask = self.period_k["has_py"][:, 0]
+        self.comp_locs = [l for l in self.locations if self.loc_data[l]["has_py"]]
+        sys_all, sys_comp = self.sys_all, self.sys_comp = system_totals(self.period_t), system_totals(self.period_t, comp_mask)  # (P,) per measure
+        sys_pk, comp_pk = cell(kpis(sys_all), 0), cell(kpis(sys_comp), 0)
+        sys_p, comp_p = cell(sys_all, 0), cell(sys_comp, 0)
+        self.sys_amt, self.sys_ords = sys_p["amount"], sys_p["orders"]
+        self.sys_sss, self.sys_sst, self.sys_tkt_chg = comp_pk["sss"], comp_pk["sst"], comp_pk["tkt_chg"]
+        self.sys_tkt = sys_pk["avg_tkt"]
+        self.sys_hrs, self.sys_pay, self.sys_guide, self.sys_sch = sys_p["hours"], sys_p["pay"], sys_p["guide"], sys_p["scheduled"]
+        self.sys_lp, self.sys_splh = sys_pk["labor_pct"], sys_pk["splh"]
+        self.sys_cat, self.sys_cat_ords, self.sys_cat_py = sys_p["cat_amt"], sys_p["cat_ords"], sys_p["cat_py_amt"]
+
+    # ============================================================
+    # PRIOR PERIOD CONTEXT (the N weeks before the period) for AI Insights
+    # ============================================================
+    def _prior_context(self):
+        # Same pass as the current period: column 1 of period_t / period_k
+        self.prior_sales, self.prior_labor, self.prior_catering = {}, {}, {}
+        self.prior_loc_sss, self.prior_loc_lp = {}, {}
+        for loc in self.locations:
+            li = self.FACTS.loc_index[loc]
+            pt, pk = cell(self.period_t, li, 1), cell(self.period_k, li, 1)
+            self.prior_sales[loc] = {"cy": pt["amount"], "py": pt["amount_py"]}
+            self.prior_labor[loc] = {"hours": pt["hours"], "pay": pt["pay"]}
+            self.prior_catering[loc] = pt["cat_amt"]
+            if loc in self.comp_locs: self.prior_loc_sss[loc] = pk["sss"]
+            self.prior_loc_lp[loc] = pk["labor_pct"]
+
+        # Prior system metrics (comp set = this period's comp stores)
+        sys_all = self.sys_all
+        prior_pk, prior_comp_pk = cell(kpis(sys_all), 1), cell(kpis(self.sys_comp), 1)
+        self.prior_sys_sss = prior_comp_pk["sss"]
+        self.prior_sys_amt, self.prior_sys_pay, self.prior_sys_hrs = sys_all["amount"][1].item(), sys_all["pay"][1].item(), sys_all["hours"][1].item()
+        self.prior_sys_lp = prior_pk["labor_pct"]
+        self.prior_sys_cat = sys_all["cat_amt"][1].item()
+
+    # ============================================================
+    # SYSTEM TRENDS (weekly)
+    # ============================================================
+    def _system_weekly(self):
+        sys_w, comp_w = self.sys_w, self.comp_w = system_totals(self.week_t), system_totals(self.week_t, self.comp_mask)
+        self.sys_wk, self.comp_wk = kpis(sys_w), kpis(comp_w)
+        self.sys_weekly = sys_weekly = {}
+        for wi, ws_i in enumerate(self.week_starts):
+            sw = lambda m: sys_w[m][wi].item()
+            sys_weekly[ws_i] = {"amount":sw("amount"),"comp_amt_py":comp_w["amount_py"][wi].item(),"orders":sw("orders"),"comp_ords_py":comp_w["orders_py"][wi].item(),
+                                "labor_hrs":sw("hours"),"labor_pay":sw("pay"),
+                                "guide":sw("guide"),"sch_hrs":sw("scheduled"),"cat_amt":sw("cat_amt"),"cat_py":sw("cat_py_amt")}
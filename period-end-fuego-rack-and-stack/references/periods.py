@@ -0,0 +1,168 @@
+"""
+Report periods and vectorized period aggregates.
+
+A `Period` is a named set of Monday week-starts: a trailing N-week window, a
+fiscal period or quarter on a 4-4-5 (or 4-5-4 / 5-4-4) calendar, or
+year-to-date. `period_totals()` sums every measure for every location and every
+requested period in one pass over the weekly prefix sums, and `kpis()` derives
+the report ratios (SSS, SST, ticket, labor %, SPLH, vs guide) for all of those
+cells at once using the same formulas as the per-location code.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+
+FISCAL_PATTERNS = {"4-4-5": (4, 4, 5), "4-5-4": (4, 5, 4), "5-4-4": (5, 4, 4)}
+
+
+def span_label(start, end):
+    """'Jan 26 – Feb 22, 2026' (both years shown when the span crosses a year)."""
+    s = f"{start:%b} {start.day}" + (f", {start.year}" if start.year != end.year else "")
+    return f"{s} – {end:%b} {end.day}, {end.year}"
+
+
+class Period:
+    """Named set of report weeks; `weeks` is most recent first, like WEEK_STARTS."""
+
+    def __init__(self, weeks, name=None):
+        self.weeks = sorted(set(weeks), reverse=True)
+        if not self.weeks:
+            raise ValueError("a period needs at least one week")
+        for ws in self.weeks:
+            if ws.weekday() != 0:
+                raise ValueError(f"week start {ws} is not a Monday")
+        self.name = name or f"{len(self.weeks)}-Week"
+
+    @property
+    def n_weeks(self):
+        return len(self.weeks)
+
+    @property
+    def start(self):
+        return self.weeks[-1]
+
+    @property
+    def end(self):
+        return self.weeks[0] + timedelta(days=6)
+
+    @property
+    def span(self):
+        return span_label(self.start, self.end)
+
+    def shifted(self, n_weeks, name=None):
+        """The same weeks moved `n_weeks` earlier."""
+        return Period([ws - timedelta(weeks=n_weeks) for ws in self.weeks], name)
+
+    def prior(self):
+        """The equally long window immediately before this one (prior-period context)."""
+        return self.shifted(self.n_weeks, f"Prior {self.name}")
+
+    def __repr__(self):
+        return f"Period({self.name!r}, {self.span}, {self.n_weeks} weeks)"
+
+
+def trailing_weeks(last_week, n_weeks, name=None):
+    """The `n_weeks` weeks ending with the week starting `last_week`."""
+    return Period([last_week - timedelta(weeks=i) for i in range(n_weeks)], name)
+
+
+def _fiscal_year(year_start, n_weeks):
+    return (year_start + timedelta(weeks=n_weeks, days=-1)).year
+
+
+def fiscal_periods(year_start, pattern="4-4-5", n_weeks=52):
+    """
+    P1..P12 of a fiscal year starting on Monday `year_start`. `pattern` repeats
+    once per quarter; in a 53-week year the extra week joins P12.
+    """
+    lengths = list(FISCAL_PATTERNS[pattern]) * 4
+    lengths[-1] += n_weeks - sum(lengths)
+    fy = _fiscal_year(year_start, n_weeks)
+    out, ws = [], year_start
+    for i, n in enumerate(lengths, 1):
+        out.append(Period([ws + timedelta(weeks=k) for k in range(n)], f"P{i} FY{fy}"))
+        ws += timedelta(weeks=n)
+    return out
+
+
+def fiscal_quarters(year_start, pattern="4-4-5", n_weeks=52):
+    """Q1..Q4, each the union of three fiscal periods."""
+    periods = fiscal_periods(year_start, pattern, n_weeks)
+    fy = _fiscal_year(year_start, n_weeks)
+    return [Period([ws for p in periods[q * 3:q * 3 + 3] for ws in p.weeks], f"Q{q + 1} FY{fy}")
+            for q in range(4)]
+
+
+def year_to_date(year_start, last_week, n_weeks=52):
+    """Fiscal year-to-date through the week starting `last_week`."""
+    n = (last_week - year_start).days // 7 + 1
+    if n <= 0:
+        raise ValueError(f"{last_week} is before the fiscal year start {year_start}")
+    return Period(trailing_weeks(last_week, n).weeks, f"YTD FY{_fiscal_year(year_start, n_weeks)}")
+
+
+def period_totals(rw, periods, measures=None):
+    """
+    {measure: (L, P)} sums for every location and period: weekly windows over the
+    union of the periods' weeks from `RollingWindows` prefix sums, then one
+    week-by-period membership product.
+    """
+    weeks = sorted({ws for p in periods for ws in p.weeks})
+    col = {ws: i for i, ws in enumerate(weeks)}
+    member = np.zeros((len(weeks), len(periods)))
+    for j, p in enumerate(periods):
+        member[[col[ws] for ws in p.weeks], j] = 1
+    return {m: rw.windows(m, weeks, 7) @ member for m in (measures or rw.measures)}
+
+
+def system_totals(totals, mask=None):
+    """Sum (L, ...) totals over locations, optionally only where `mask` is set (comp stores)."""
+    return {m: (a if mask is None else a[mask]).sum(axis=0) for m, a in totals.items()}
+
+
+def _pct_chg(current, prior, ok):
+    return np.where(ok & (prior != 0), (current - prior) / np.where(prior != 0, prior, 1) * 100, np.nan)
+
+
+def _div(num, den, ok):
+    return np.where(ok, num / np.where(ok, den, 1), 0.0)
+
+
+def kpis(totals, comp_min_py=0):
+    """
+    Report ratios for every cell of `totals` ({measure: array}, any shape).
+
+    A cell is comp (`has_py`) when its PY sales exceed `comp_min_py`. Values the
+    scalar code reports as None (no PY, zero denominator) come back as NaN; use
+    `cell()` to read one location/period back as plain Python values.
+    """
+    amt, amt_py = totals["amount"], totals["amount_py"]
+    ords, ords_py = totals["orders"], totals["orders_py"]
+    hrs, pay, guide = totals["hours"], totals["pay"], totals["guide"]
+    has_py = amt_py > comp_min_py
+    avg_tkt = _div(amt, ords, ords != 0)
+    avg_tkt_py = _div(amt_py, ords_py, has_py & (ords_py != 0))
+    out = {
+        "has_py": has_py,
+        "sss": _pct_chg(amt, amt_py, has_py),
+        "sst": _pct_chg(ords, ords_py, has_py),
+        "avg_tkt": avg_tkt,
+        "tkt_chg": _pct_chg(avg_tkt, avg_tkt_py, has_py),
+        "labor_pct": _div(pay, amt, amt > 0) * 100,
+        "splh": _div(amt, hrs, hrs > 0),
+        "vs_guide_n": hrs - guide,
+        "vs_guide_pct": _div(hrs, guide, guide > 0) * 100,
+    }
+    if "cat_amt" in totals and "cat_py_amt" in totals:
+        out["cat_vs_py"] = _pct_chg(totals["cat_amt"], totals["cat_py_amt"], totals["cat_py_amt"] > 0)
+    return out
+
+
+def cell(arrays, *index):
+    """One cell of each array as Python values, NaN -> None."""
+    out = {}
+    for k, a in arrays.items():
+        v = a[index].item()
+        out[k] = None if v != v else v
+    return out
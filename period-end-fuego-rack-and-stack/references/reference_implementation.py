@@ -1,22 +1,39 @@
 #!/usr/bin/env python3
 """
-System Weekly Flash Report — 4-Week Consolidated Rack & Stack
+System Weekly Flash Report — N-Week Consolidated Rack & Stack
 Following fuego-weekly-consolidated-report skill exactly.
-Period: Jan 26 – Feb 22, 2026 (4 weeks)
+Period: Jan 26 – Feb 22, 2026 (4 weeks); see PERIOD for quarters, 4-4-5 periods and YTD
 """
 
-import re, json, subprocess, shutil, os
+import shutil
 from datetime import datetime, timedelta, date
-from collections import defaultdict
+from assets import localize_css
+from html_stream import HtmlWriter, PageTemplate, RowTemplate
+from labor_guidelines import DAYS_OPEN
+from pdf_renderer import PdfRenderer
+from period_kpis import COMP_MIN_PY_WEEKLY, PeriodKpis
+from periods import cell, fiscal_periods, fiscal_quarters, trailing_weeks, year_to_date
+from tracing import span, summary
 
 # ============================================================
 # CONFIGURATION
 # ============================================================
 LOCATIONS = ["Burleson", "College Station", "Fayetteville", "San Antonio", "San Marcos", "Waco"]
-WEEK_STARTS = [date(2026,2,16), date(2026,2,9), date(2026,2,2), date(2026,1,26)]
+FISCAL_YEAR_START = date(2025,12,29)  # Monday starting the fiscal year (4-4-5 calendar)
+PERIOD = trailing_weeks(date(2026,2,16), 4)
+# PERIOD = fiscal_periods(FISCAL_YEAR_START, "4-4-5")[1]     # P2
+# PERIOD = fiscal_quarters(FISCAL_YEAR_START, "4-4-5")[0]    # Q1
+# PERIOD = year_to_date(FISCAL_YEAR_START, date(2026,2,16))  # YTD
+WEEK_STARTS = PERIOD.weeks  # Most recent first
+N_WEEKS = PERIOD.n_weeks
+PRIOR = PERIOD.prior()  # prior-period context comes from the same 2N-week history pull
 WS = WEEK_STARTS[0]  # Most recent week
-TODAY_STR = "February 23, 2026"
-REPORT_PERIOD = "Jan 26 – Feb 22, 2026"
+_run_day = PERIOD.end + timedelta(days=1)
+TODAY_STR = f"{_run_day:%B} {_run_day.day}, {_run_day.year}"
+REPORT_PERIOD = PERIOD.span
+# True: history pull starts 52 weeks before PRIOR and PY sales/orders/catering come from a
+# 364-day shift of CY history (no PREV_YEAR columns, no Query 6). False: use the query PY columns.
+LOCAL_PY = False
 
 # ============================================================
 # HELPERS (from skill references/helpers.md)
@@ -55,7 +72,7 @@ def pill_rating(v):
     cls = "pill-green" if v >= 4.5 else ("pill-yellow" if v >= 4.0 else "pill-red")
     return f'<span class="pill {cls}">{v:.1f}</span>'
 def rank_items(data, key, reverse=True):
-    items = [(loc, data[loc].get(key, 0) or 0) for loc in LOCATIONS]
+    items = [(loc, v.get(key, 0) or 0) for loc, v in data.items()]
     items.sort(key=lambda x: x[1], reverse=reverse)
     return [(loc, val, i+1) for i, (loc, val) in enumerate(items)]
 def rank_suffix(r):
@@ -296,438 +313,32 @@ agm_raw = [
     ("Waco","2025-07-07","2030-12-31",0,0),
 ]
 
-GUIDELINES_TABLE = {0:0,2100:326,18800:328,20000:345,25000:416,30000:488,35000:559,40000:631,45000:702,50000:744,55000:786,60000:828,65000:870,70000:912,75000:953,80000:995,85000:1037,90000:1079,95000:1120,100000:1162,105000:1204,110000:1246,115000:1287,120000:1329,125000:1371,130000:1413,135000:1454,140000:1496,145000:1538,150000:1580,155000:1621,160000:1663,165000:1705,170000:1747,175000:1788,180000:1830,185000:1872,190000:1914,195000:1956,200000:1997}
-
-# ============================================================
-# ORGANIZE DATA
-# ============================================================
-daily_sales_d = defaultdict(dict)
-for loc,dt,amt in daily_sales_raw:
-    daily_sales_d[loc][d(dt)] = amt
-
-daily_labor = defaultdict(dict)
-for loc,dt,hrs,pay in daily_labor_raw:
-    daily_labor[loc][d(dt)] = {"hours":hrs,"pay":pay}
-
-sched = defaultdict(dict)
-for loc,dt,hrs in scheduled_raw:
-    sched[loc][d(dt)] = hrs
-
-weekly_sales = defaultdict(dict)
-for loc,ws_str,amt,amt_py,ords,ords_py,disc in weekly_sales_raw:
-    weekly_sales[loc][d(ws_str)] = {"amount":amt,"amount_py":amt_py,"orders":ords,"orders_py":ords_py,"discount":disc}
-
-catering_cy = defaultdict(dict)
-for loc,ws,amt,orders in catering_cy_raw:
-    catering_cy[loc][d(ws)] = {"amount":amt,"orders":orders}
-catering_py = defaultdict(dict)
-for loc,ws,amt,orders in catering_py_raw:
-    catering_py[loc][d(ws)] = {"amount":amt,"orders":orders}
-
-reviews_dict = {}
-for loc,source,avg_r,cnt in reviews_raw:
-    if loc not in reviews_dict: reviews_dict[loc] = {}
-    reviews_dict[loc][source] = {"avg":avg_r,"count":cnt}
-
-# ============================================================
-# GUIDELINE FUNCTIONS
-# ============================================================
-def lookup_guide(net_sales):
-    thresholds = sorted(GUIDELINES_TABLE.items())
-    if net_sales <= 0: return 0
-    for i,(t,h) in enumerate(thresholds):
-        if t > net_sales:
-            lt,lh = thresholds[i-1]; frac = (net_sales-lt)/(t-lt)
-            return lh + frac*(h-lh)
-    return thresholds[-1][1]
-
-def get_agm_daily(location, day):
-    for loc,start,end,daily_h,weekly_h in agm_raw:
-        if loc == location and d(start) <= day <= d(end): return weekly_h/6
-    return 0
-
-def compute_daily_guideline(week_start_dt, ds, location):
-    DAYS_OPEN=6; DOW_ADJ={0:0,1:8,2:3,3:3,4:3,5:3,6:-20}; rate=54/3000
-    days = [week_start_dt+timedelta(days=i) for i in range(7)]
-    dws = sum(1 for dd in days if ds.get(dd,0)>0)
-    is_partial = dws < DAYS_OPEN; result = {}
-    if is_partial:
-        for dd in days:
-            s = ds.get(dd,0)
-            if dd.weekday()==0 or s<=0: result[dd]=0
-            else:
-                proj=s*DAYS_OPEN; lkp=lookup_guide(proj)
-                if lkp<=0: result[dd]=0
-                else:
-                    agm=get_agm_daily(location,dd)
-                    result[dd]=lkp/DAYS_OPEN+DOW_ADJ.get(dd.weekday(),0)+agm
-    else:
-        wn=sum(ds.get(dd,0) for dd in days); tg=lookup_guide(wn); raw=[]
-        for dd in days:
-            if dd.weekday()==0: raw.append(0)
-            else:
-                s=ds.get(dd,0)
-                if s<=0: raw.append(0)
-                elif s<=9000: raw.append(s*rate)
-                else: raw.append(9000*rate+(s-9000)*rate*0.80)
-        tr = sum(raw) or 1
-        for i,dd in enumerate(days):
-            s=ds.get(dd,0)
-            if dd.weekday()==0 or s<=0: result[dd]=0
-            else:
-                agm=get_agm_daily(location,dd)
-                result[dd]=(raw[i]/tr)*tg+DOW_ADJ.get(dd.weekday(),0)+agm
-    return result, sum(result.values()), sum(ds.get(dd,0) for dd in days)
-
-# ============================================================
-# COMPUTE PER-LOCATION PER-WEEK AND 4-WEEK AGGREGATES
-# ============================================================
-loc_weekly = defaultdict(dict)
-loc_data = {}  # 4-week aggregates
-
-for loc in LOCATIONS:
-    total_amt = 0; total_amt_py = 0; total_ords = 0; total_ords_py = 0
-    total_hrs = 0; total_pay = 0; total_guide = 0; total_sch = 0
-    total_cat_amt = 0; total_cat_ords = 0; total_cat_py = 0; total_disc = 0
-
-    for wi, ws_i in enumerate(WEEK_STARTS):
-        # Sales from weekly aggregates
-        cw = weekly_sales[loc].get(ws_i, {})
-        amt = cw.get("amount", 0); amt_py = cw.get("amount_py", 0)
-        ords = cw.get("orders", 0); ords_py = cw.get("orders_py", 0)
-        disc = cw.get("discount", 0)
-        has_py = amt_py > 0
-        sss_v = pct_chg(amt, amt_py) if has_py else None
-        sst_v = pct_chg(ords, ords_py) if has_py else None
-        avg_tkt = amt / ords if ords else 0
-        avg_tkt_py = amt_py / ords_py if (has_py and ords_py) else 0
-        tkt_chg = pct_chg(avg_tkt, avg_tkt_py) if has_py else None
-
-        # Labor
-        week_days = [ws_i + timedelta(days=j) for j in range(7)]
-        hrs = sum(daily_labor[loc].get(dd, {}).get("hours", 0) for dd in week_days)
-        pay = sum(daily_labor[loc].get(dd, {}).get("pay", 0) for dd in week_days)
-        sch_hrs = sum(sched[loc].get(dd, 0) for dd in week_days)
-
-        # Guideline
-        ds = {dd: daily_sales_d[loc].get(dd, 0) for dd in week_days}
-        _, guide_total, _ = compute_daily_guideline(ws_i, ds, loc)
-
-        lp = (pay / amt * 100) if amt > 0 else 0
-        splh = amt / hrs if hrs > 0 else 0
-        vs_guide_n = hrs - guide_total
-        vs_guide_pct = (hrs / guide_total * 100) if guide_total > 0 else 0
-
-        # Catering
-        cat = catering_cy[loc].get(ws_i, {})
-        cat_amt = cat.get("amount", 0); cat_ords = cat.get("orders", 0)
-        cat_py_amt = catering_py[loc].get(ws_i, {}).get("amount", 0)
-
-        loc_weekly[loc][wi] = {
-            "amount": amt, "amount_py": amt_py, "orders": ords, "orders_py": ords_py,
-            "has_py": has_py, "sss": sss_v, "sst": sst_v,
-            "avg_tkt": avg_tkt, "tkt_chg": tkt_chg,
-            "labor_hrs": hrs, "labor_pay": pay, "labor_pct": lp,
-            "guide_total": guide_total, "vs_guide_n": vs_guide_n, "vs_guide_pct": vs_guide_pct,
-            "sch_hrs": sch_hrs, "splh": splh,
-            "cat_amt": cat_amt, "cat_ords": cat_ords, "cat_py_amt": cat_py_amt,
-            "discount": disc,
-        }
-
-        total_amt += amt; total_amt_py += amt_py; total_ords += ords; total_ords_py += ords_py
-        total_hrs += hrs; total_pay += pay; total_guide += guide_total
-        total_sch += sch_hrs; total_disc += disc
-        total_cat_amt += cat_amt; total_cat_ords += cat_ords; total_cat_py += cat_py_amt
-
-    # 4-week aggregates
-    has_py = total_amt_py > 2000
-    sss = pct_chg(total_amt, total_amt_py) if has_py else None
-    sst = pct_chg(total_ords, total_ords_py) if (has_py and total_ords_py) else None
-    avg_tkt_4wk = total_amt / total_ords if total_ords else 0
-    avg_tkt_py_4wk = total_amt_py / total_ords_py if (has_py and total_ords_py) else 0
-    tkt_chg_4wk = pct_chg(avg_tkt_4wk, avg_tkt_py_4wk) if has_py else None
-    lp_4wk = (total_pay / total_amt * 100) if total_amt > 0 else 0
-    splh_4wk = total_amt / total_hrs if total_hrs > 0 else 0
-    vs_guide_n = total_hrs - total_guide
-    vs_guide_pct = (total_hrs / total_guide * 100) if total_guide > 0 else 0
-
-    # Reviews
-    rev = reviews_dict.get(loc, {})
-    google_r = rev.get("google", {}).get("avg"); google_n = rev.get("google", {}).get("count", 0)
-    ovation_r = rev.get("ovation", {}).get("avg"); ovation_n = rev.get("ovation", {}).get("count", 0)
-    yelp_r = rev.get("yelp", {}).get("avg"); yelp_n = rev.get("yelp", {}).get("count", 0)
-    total_rev_n = google_n + ovation_n + yelp_n
-    wavg = ((google_r or 0)*google_n + (ovation_r or 0)*ovation_n + (yelp_r or 0)*yelp_n) / total_rev_n if total_rev_n else None
-
-    cat_vs_py = pct_chg(total_cat_amt, total_cat_py) if total_cat_py > 0 else None
-
-    loc_data[loc] = {
-        "amount": total_amt, "amount_py": total_amt_py, "orders": total_ords, "orders_py": total_ords_py,
-        "has_py": has_py, "sss": sss, "sst": sst,
-        "avg_tkt": avg_tkt_4wk, "tkt_chg": tkt_chg_4wk, "avg_weekly": total_amt / 4,
-        "labor_hrs": total_hrs, "labor_pay": total_pay, "labor_pct": lp_4wk,
-        "guide_total": total_guide, "vs_guide_n": vs_guide_n, "vs_guide_pct": vs_guide_pct,
-        "sch_hrs": total_sch, "splh": splh_4wk, "discount": total_disc,
-        "cat_amt": total_cat_amt, "cat_ords": total_cat_ords, "cat_py_amt": total_cat_py, "cat_vs_py": cat_vs_py,
-        "google_r": google_r, "google_n": google_n, "ovation_r": ovation_r, "ovation_n": ovation_n,
-        "yelp_r": yelp_r, "yelp_n": yelp_n, "wavg_rating": wavg, "total_rev_n": total_rev_n,
-        "suffix": "Comp" if has_py else "New",
-    }
-
-# ============================================================
-# SYSTEM TOTALS
-# ============================================================
-comp_locs = [l for l in LOCATIONS if loc_data[l]["has_py"]]
-sys_amt = sum(v["amount"] for v in loc_data.values())
-sys_ords = sum(v["orders"] for v in loc_data.values())
-comp_amt = sum(loc_data[l]["amount"] for l in comp_locs)
-comp_amt_py = sum(loc_data[l]["amount_py"] for l in comp_locs)
-comp_ords = sum(loc_data[l]["orders"] for l in comp_locs)
-comp_ords_py = sum(loc_data[l]["orders_py"] for l in comp_locs)
-sys_sss = pct_chg(comp_amt, comp_amt_py) if comp_amt_py else None
-sys_sst = pct_chg(comp_ords, comp_ords_py) if comp_ords_py else None
-sys_tkt = sys_amt / sys_ords if sys_ords else 0
-comp_tkt = comp_amt / comp_ords if comp_ords else 0
-comp_tkt_py = comp_amt_py / comp_ords_py if comp_ords_py else 0
-sys_tkt_chg = pct_chg(comp_tkt, comp_tkt_py) if comp_tkt_py else None
-sys_hrs = sum(v["labor_hrs"] for v in loc_data.values())
-sys_pay = sum(v["labor_pay"] for v in loc_data.values())
-sys_lp = (sys_pay / sys_amt * 100) if sys_amt else 0
-sys_guide = sum(v["guide_total"] for v in loc_data.values())
-sys_splh = sys_amt / sys_hrs if sys_hrs else 0
-sys_cat = sum(v["cat_amt"] for v in loc_data.values())
-sys_cat_ords = sum(v["cat_ords"] for v in loc_data.values())
-sys_cat_py = sum(v["cat_py_amt"] for v in loc_data.values())
-sys_sch = sum(v["sch_hrs"] for v in loc_data.values())
-
-# ============================================================
-# PRIOR PERIOD CONTEXT (Dec 29 – Jan 25) for AI Insights
-# ============================================================
-prior_sales = {
-    "Burleson": {"cy": 109715.37, "py": 0},
-    "College Station": {"cy": 416414.20, "py": 463986.86},
-    "Fayetteville": {"cy": 143846.99, "py": 0},
-    "San Antonio": {"cy": 163016.01, "py": 179578.35},
-    "San Marcos": {"cy": 179371.44, "py": 192841.30},
-    "Waco": {"cy": 150045.16, "py": 159812.03},
-}
-prior_labor = {
-    "Burleson": {"hours": 2563.39, "pay": 36127.17},
-    "College Station": {"hours": 5334.24, "pay": 76606.72},
-    "Fayetteville": {"hours": 4747.52, "pay": 58641.60},
-    "San Antonio": {"hours": 2538.44, "pay": 28235.11},
-    "San Marcos": {"hours": 3108.45, "pay": 48073.69},
-    "Waco": {"hours": 2601.69, "pay": 38079.12},
-}
-prior_catering = {
-    "Burleson": 470.83, "College Station": 11956.15, "Fayetteville": 1078.96,
-    "San Antonio": 1826.06, "San Marcos": 475.33, "Waco": 11397.57,
-}
-
-# Compute prior period metrics
-prior_comp_cy = sum(prior_sales[l]["cy"] for l in comp_locs)
-prior_comp_py = sum(prior_sales[l]["py"] for l in comp_locs)
-prior_sys_sss = pct_chg(prior_comp_cy, prior_comp_py) if prior_comp_py else None
-prior_sys_amt = sum(v["cy"] for v in prior_sales.values())
-prior_sys_pay = sum(v["pay"] for v in prior_labor.values())
-prior_sys_hrs = sum(v["hours"] for v in prior_labor.values())
-prior_sys_lp = (prior_sys_pay / prior_sys_amt * 100) if prior_sys_amt else 0
-prior_sys_cat = sum(prior_catering.values())
-
-# Per-location prior SSS
-prior_loc_sss = {}
-for loc in comp_locs:
-    ps = prior_sales[loc]
-    prior_loc_sss[loc] = pct_chg(ps["cy"], ps["py"]) if ps["py"] else None
-
-# Per-location prior labor %
-prior_loc_lp = {}
-for loc in LOCATIONS:
-    ps = prior_sales[loc]["cy"]
-    pp = prior_labor[loc]["pay"]
-    prior_loc_lp[loc] = (pp / ps * 100) if ps else 0
-sales_ranks = rank_items(loc_data, "amount", reverse=True)
-labor_ranks = rank_items(loc_data, "vs_guide_pct", reverse=False)
-cat_ranks = rank_items(loc_data, "cat_amt", reverse=True)
-reviews_ranks = rank_items(loc_data, "wavg_rating", reverse=True)
-
-# Comp SSS sorted
-comp_sss = sorted([(l, loc_data[l]["sss"]) for l in comp_locs if loc_data[l]["sss"] is not None], key=lambda x: x[1])
-best_sss_loc, best_sss_val = comp_sss[-1] if comp_sss else ("N/A", 0)
-worst_sss_loc, worst_sss_val = comp_sss[0] if comp_sss else ("N/A", 0)
-
-# Weekly trajectories
-def traj(loc, key):
-    return [loc_weekly[loc][wi].get(key, 0) for wi in [3,2,1,0]]
-
-sales_callout = (
-    f"System comp sales swung from <strong>{prior_sys_sss:+.1f}%</strong> in the prior 4-week window "
-    f"to <strong>{sys_sss:+.1f}%</strong> this period — a meaningful trajectory shift. "
-    f"<strong>College Station</strong> drove the turnaround, flipping from {prior_loc_sss.get('College Station',0):+.1f}% to "
-    f"{loc_data['College Station']['sss']:+.1f}%, with the Feb 16 week ({fm(traj('College Station','amount')[3])}) their strongest in the window. "
-    f"<strong>San Marcos</strong> improved from {prior_loc_sss.get('San Marcos',0):+.1f}% to {loc_data['San Marcos']['sss']:+.1f}% "
-    f"and posted an accelerating weekly trend — their Feb 16 week ({fm(traj('San Marcos','amount')[3])}) was the best of the trailing 8 weeks. "
-    f"<strong>San Antonio</strong> narrowed its comp gap from {prior_loc_sss.get('San Antonio',0):+.1f}% to {loc_data['San Antonio']['sss']:+.1f}%, "
-    f"but the transaction decline ({loc_data['San Antonio']['sst']:+.1f}% SST) flags a traffic problem — ticket growth is masking it. "
-    f"<strong>Burleson</strong> grew {pct_chg(loc_data['Burleson']['amount'], prior_sales['Burleson']['cy']):+.1f}% period-over-period as the ramp continues."
-)
-
-labor_callout = (
-    f"System labor tightened from <strong>{prior_sys_lp:.1f}%</strong> in the prior 4-week window to "
-    f"<strong>{sys_lp:.1f}%</strong> this period — a 3+ point improvement driven by both higher sales and better scheduling discipline. "
-    f"<strong>San Antonio</strong> dropped from {prior_loc_lp['San Antonio']:.1f}% to {loc_data['San Antonio']['labor_pct']:.1f}%, "
-    f"the tightest in the system — but verify this isn't understaffing given their negative transaction comps. "
-    f"<strong>Fayetteville</strong> improved from {prior_loc_lp['Fayetteville']:.1f}% to {loc_data['Fayetteville']['labor_pct']:.1f}% as AGM hours "
-    f"ramped down from 350 → 150 hrs/wk across the window. The gap to guideline ({loc_data['Fayetteville']['vs_guide_pct']:.1f}%) "
-    f"should continue narrowing as training hours phase out completely. "
-    f"<strong>Burleson</strong> cut from {prior_loc_lp['Burleson']:.1f}% to {loc_data['Burleson']['labor_pct']:.1f}% — "
-    f"a textbook new-store labor ramp. Sharing their scheduling approach with Fayetteville could accelerate that store's normalization."
-)
-
-reviews_callout = (
-    f"<strong>San Marcos</strong> leads with a {loc_data['San Marcos']['wavg_rating']:.2f} weighted average — "
-    f"their {loc_data['San Marcos']['google_r']:.1f} Google score stands out as system-best and a real competitive advantage for discovery. "
-    f"<strong>Waco's</strong> {loc_data['Waco']['wavg_rating']:.2f} weighted average (Ovation {loc_data['Waco']['ovation_r']:.2f}, "
-    f"Google {loc_data['Waco']['google_r']:.1f}) is the system floor — investigate whether this ties to the labor tightening "
-    f"(labor% dropped from {prior_loc_lp['Waco']:.1f}% → {loc_data['Waco']['labor_pct']:.1f}%) or specific service gaps. "
-    f"<strong>Fayetteville's</strong> Google score ({loc_data['Fayetteville']['google_r']:.2f}) pulls down an otherwise strong "
-    f"Ovation ({loc_data['Fayetteville']['ovation_r']:.2f}) — the {loc_data['Fayetteville']['google_n']} Google reviews likely include "
-    f"early growing-pains ratings that will dilute over time. "
-    f"Review volume system-wide ({sum(loc_data[l]['total_rev_n'] for l in LOCATIONS)} reviews over 4 weeks) is healthy — "
-    f"keep Ovation prompts consistent."
-)
-
-cat_dir = "up" if sys_cat > prior_sys_cat else "down"
-catering_callout = (
-    f"System catering came in at {fm(sys_cat)}, {cat_dir} from {fm(prior_sys_cat)} in the prior 4-week window"
-    f"{' — College Station drove the lift with ' + fm(loc_data['College Station']['cat_amt']) + ' vs ' + fm(prior_catering['College Station']) + ' prior.' if sys_cat > prior_sys_cat else '.'} "
-    f"<strong>Waco</strong> held steady ({fm(loc_data['Waco']['cat_amt'])} vs {fm(prior_catering['Waco'])} prior) and leads the system "
-    f"in catering consistency — their avg order size of "
-    f"{fm(loc_data['Waco']['cat_amt']/loc_data['Waco']['cat_ords'],2) if loc_data['Waco']['cat_ords'] else '$0'} "
-    f"suggests corporate/event-level business worth protecting with a dedicated contact. "
-    f"<strong>San Antonio</strong> grew catering from {fm(prior_catering['San Antonio'])} → {fm(loc_data['San Antonio']['cat_amt'])} — "
-    f"a potential offset to their declining dine-in traffic. "
-    f"<strong>San Marcos</strong> ({fm(loc_data['San Marcos']['cat_amt'])}) and <strong>Fayetteville</strong> "
-    f"({fm(loc_data['Fayetteville']['cat_amt'])}) remain underdeveloped — "
-    f"targeted local business outreach could unlock an incremental revenue stream at both."
-)
-
-# ============================================================
-# SYSTEM TRENDS TABLE (weekly)
-# ============================================================
-sys_weekly = {}
-for ws_i in WEEK_STARTS:
-    wi_idx = WEEK_STARTS.index(ws_i)
-    sw_amt = sum(loc_weekly[l][wi_idx]["amount"] for l in LOCATIONS)
-    sw_amt_py = sum(loc_weekly[l][wi_idx].get("amount_py",0) for l in comp_locs)
-    sw_ords = sum(loc_weekly[l][wi_idx].get("orders",0) for l in LOCATIONS)
-    sw_ords_py = sum(loc_weekly[l][wi_idx].get("orders_py",0) for l in comp_locs)
-    sw_hrs = sum(loc_weekly[l][wi_idx]["labor_hrs"] for l in LOCATIONS)
-    sw_pay = sum(loc_weekly[l][wi_idx]["labor_pay"] for l in LOCATIONS)
-    sw_guide = sum(loc_weekly[l][wi_idx]["guide_total"] for l in LOCATIONS)
-    sw_sch = sum(loc_weekly[l][wi_idx]["sch_hrs"] for l in LOCATIONS)
-    sw_cat = sum(loc_weekly[l][wi_idx]["cat_amt"] for l in LOCATIONS)
-    sw_cat_py = sum(loc_weekly[l][wi_idx]["cat_py_amt"] for l in LOCATIONS)
-    sys_weekly[ws_i] = {"amount":sw_amt,"comp_amt_py":sw_amt_py,"orders":sw_ords,"comp_ords_py":sw_ords_py,
-                        "labor_hrs":sw_hrs,"labor_pay":sw_pay,
-                        "guide":sw_guide,"sch_hrs":sw_sch,"cat_amt":sw_cat,"cat_py":sw_cat_py}
-
-trends_rows = ""
-for ws_i in WEEK_STARTS:
-    sw = sys_weekly[ws_i]
-    wi_idx = WEEK_STARTS.index(ws_i)
-    comp_amt_w = sum(loc_weekly[l][wi_idx]["amount"] for l in comp_locs)
-    sss_w = pct_chg(comp_amt_w, sw["comp_amt_py"]) if sw["comp_amt_py"] else None
-    comp_ords_w = sum(loc_weekly[l][wi_idx].get("orders",0) for l in comp_locs)
-    sst_w = pct_chg(comp_ords_w, sw["comp_ords_py"]) if sw["comp_ords_py"] else None
-    tkt_w = sw["amount"]/sw["orders"] if sw["orders"] else 0
-    lp_w = (sw["labor_pay"]/sw["amount"]*100) if sw["amount"] else 0
-    vs_g = sw["labor_hrs"]-sw["guide"]
-    is_cw = ws_i == WS
-    style = ' class="highlight"' if is_cw else ''
-    b = lambda x: f"<strong>{x}</strong>" if is_cw else x
-    trends_rows += (f'<tr{style}><td>{b(wk_short(ws_i))}</td><td>{b(fm(sw["amount"]))}</td>'
-        f'<td>{pill_sss(sss_w)}</td><td>{b(fn(sw["orders"]))}</td><td>{pill_sss(sst_w)}</td>'
-        f'<td>{b(fm(tkt_w,2))}</td>'
-        f'<td>{b(fn(sw["guide"],0))}</td>'
-        f'<td>{b(fn(sw["labor_hrs"],0))}</td><td>{pill_labor_diff(vs_g)}</td>'
-        f'<td>{pill_labor_ratio(sw["labor_hrs"],sw["guide"])}</td><td>{pill_labor_pct(lp_w)}</td>'
-        f'<td>{b(fm(sw["cat_amt"]))}</td></tr>')
-
-# 4-week total row
-trends_rows += (f'<tr class="total-row"><td><strong>Total</strong></td><td><strong>{fm(sys_amt)}</strong></td>'
-    f'<td>{pill_sss(sys_sss)}</td><td><strong>{fn(sys_ords)}</strong></td><td>{pill_sss(sys_sst)}</td>'
-    f'<td><strong>{fm(sys_tkt,2)}</strong></td>'
-    f'<td><strong>{fn(sys_guide,0)}</strong></td>'
-    f'<td><strong>{fn(sys_hrs,0)}</strong></td><td>{pill_labor_diff(sys_hrs-sys_guide)}</td>'
-    f'<td>{pill_labor_ratio(sys_hrs,sys_guide)}</td><td>{pill_labor_pct(sys_lp)}</td>'
-    f'<td><strong>{fm(sys_cat)}</strong></td></tr>')
+# Prior window (Dec 29 – Jan 25): the first half of the 8-week history pull. This sample
+# keeps it collapsed to one row per location on the window's first Monday, counted toward the
+# prior window only (PeriodKpis keeps it out of the period measures, even for a period that
+# covers that date); a live run loads that half's Query 1–6 rows alongside the current weeks
+# above and leaves this empty.
+# (location, period_start, amount, amount_py, hours, pay, cat_amt)
+prior_window_raw = [
+    ("Burleson","2025-12-29",109715.37,0,2563.39,36127.17,470.83),
+    ("College Station","2025-12-29",416414.20,463986.86,5334.24,76606.72,11956.15),
+    ("Fayetteville","2025-12-29",143846.99,0,4747.52,58641.60,1078.96),
+    ("San Antonio","2025-12-29",163016.01,179578.35,2538.44,28235.11,1826.06),
+    ("San Marcos","2025-12-29",179371.44,192841.30,3108.45,48073.69,475.33),
+    ("Waco","2025-12-29",150045.16,159812.03,2601.69,38079.12,11397.57),
+]
 
-# ============================================================
-# RACK & STACK ROWS
-# ============================================================
-# Sales R&S
-sales_rs_rows = ""
-for loc,val,rk in sales_ranks:
-    ld = loc_data[loc]
-    sales_rs_rows += (f'<tr><td><span class="rank {rank_cls(rk)}">{rank_suffix(rk)}</span></td>'
-        f'<td>{loc}</td><td>{fm(ld["amount"])}</td><td>{pill_sss(ld["sss"])}</td>'
-        f'<td>{fn(ld["orders"])}</td><td>{pill_sss(ld.get("sst"))}</td>'
-        f'<td>{fm(ld["avg_tkt"],2)}</td><td>{pill_sss(ld.get("tkt_chg"))}</td>'
-        f'<td>{fm(ld["cat_amt"])}</td>'
-        f'<td><span class="pill pill-neutral">{ld["suffix"]}</span></td></tr>')
-sales_rs_rows += (f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fm(sys_amt)}</td>'
-    f'<td>{pill_sss(sys_sss)}</td><td>{fn(sys_ords)}</td><td>{pill_sss(sys_sst)}</td>'
-    f'<td>{fm(sys_tkt,2)}</td><td>{pill_sss(sys_tkt_chg)}</td>'
-    f'<td>{fm(sys_cat)}</td><td><span class="pill pill-neutral">Comp</span></td></tr>')
-
-# Labor R&S
-labor_rs_rows = ""
-for loc,val,rk in labor_ranks:
-    ld = loc_data[loc]
-    labor_rs_rows += (f'<tr><td><span class="rank {rank_cls(rk)}">{rank_suffix(rk)}</span></td>'
-        f'<td>{loc}</td><td>{fm(ld["amount"])}</td><td>{fn(ld["guide_total"],0)}</td>'
-        f'<td>{fn(ld["sch_hrs"],0)}</td><td>{fn(ld["labor_hrs"],0)}</td>'
-        f'<td>{pill_labor_diff(ld["vs_guide_n"])}</td><td>{pill_labor_ratio(ld["labor_hrs"],ld["guide_total"])}</td>'
-        f'<td>{pill_labor_pct(ld["labor_pct"])}</td><td>{fm(ld["splh"],2)}</td></tr>')
-labor_rs_rows += (f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fm(sys_amt)}</td><td>{fn(sys_guide,0)}</td>'
-    f'<td>{fn(sys_sch,0)}</td><td>{fn(sys_hrs,0)}</td><td>{pill_labor_diff(sys_hrs-sys_guide)}</td>'
-    f'<td>{pill_labor_ratio(sys_hrs,sys_guide)}</td><td>{pill_labor_pct(sys_lp)}</td><td>{fm(sys_splh,2)}</td></tr>')
-
-# Reviews R&S
-reviews_rs_rows = ""
-for loc,val,rk in reviews_ranks:
-    ld = loc_data[loc]
-    yelp_cell = pill_rating(ld["yelp_r"]) if ld["yelp_r"] else '<span class="pill pill-neutral">—</span>'
-    yelp_n_cell = fn(ld["yelp_n"]) if ld["yelp_n"] else "—"
-    reviews_rs_rows += (f'<tr><td><span class="rank {rank_cls(rk)}">{rank_suffix(rk)}</span></td>'
-        f'<td>{loc}</td><td>{pill_rating(ld["google_r"])}</td><td>{fn(ld["google_n"])}</td>'
-        f'<td>{pill_rating(ld["ovation_r"])}</td><td>{fn(ld["ovation_n"])}</td>'
-        f'<td>{yelp_cell}</td><td>{yelp_n_cell}</td><td>{pill_rating(ld["wavg_rating"])}</td>'
-        f'<td>{fn(ld["total_rev_n"])}</td></tr>')
-
-# Catering R&S
-cat_rs_rows = ""
-for loc,val,rk in cat_ranks:
-    ld = loc_data[loc]
-    cat_rs_rows += (f'<tr><td><span class="rank {rank_cls(rk)}">{rank_suffix(rk)}</span></td>'
-        f'<td>{loc}</td><td>{fn(ld["cat_ords"])}</td><td>{fm(ld["cat_amt"])}</td>'
-        f'<td>{fm(ld["cat_py_amt"])}</td><td>{pill_sss(ld["cat_vs_py"])}</td></tr>')
-cat_rs_rows += (f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fn(sys_cat_ords)}</td>'
-    f'<td>{fm(sys_cat)}</td><td>{fm(sys_cat_py)}</td>'
-    f'<td>{pill_sss(pct_chg(sys_cat,sys_cat_py) if sys_cat_py else None)}</td></tr>')
+GUIDELINES_TABLE = {0:0,2100:326,18800:328,20000:345,25000:416,30000:488,35000:559,40000:631,45000:702,50000:744,55000:786,60000:828,65000:870,70000:912,75000:953,80000:995,85000:1037,90000:1079,95000:1120,100000:1162,105000:1204,110000:1246,115000:1287,120000:1329,125000:1371,130000:1413,135000:1454,140000:1496,145000:1538,150000:1580,155000:1621,160000:1663,165000:1705,170000:1747,175000:1788,180000:1830,185000:1872,190000:1914,195000:1956,200000:1997}
 
 # ============================================================
-# GM MESSAGE
+# ORGANIZE + COMPUTE (shared KPI structures — see period_kpis.py)
 # ============================================================
-gm_msg = (
-    f"Over the trailing 4-week period ({REPORT_PERIOD}), the Fuego system posted "
-    f"{fm(sys_amt)} across {fn(sys_ords,0)} orders ({fm(sys_tkt,2)} avg ticket). "
-    f"Comp same-store sales came in at {sys_sss:+.1f}%, a significant improvement from {prior_sys_sss:+.1f}% in the prior 4-week window. "
-    f"System labor tightened to {sys_lp:.1f}% (from {prior_sys_lp:.1f}% prior), "
-    f"running at {sys_hrs/sys_guide*100:.1f}% of guideline. "
-    f"Catering delivered {fm(sys_cat)} system-wide."
-)
+# Keyed like query_planner.period_report(), so live query results drop in unchanged;
+# PeriodKpis(RAW, ...) builds FACTS, loc_weekly, loc_data, the comp set, system totals,
+# the prior-period context and sys_weekly once.
+RAW = {"daily_sales_raw":daily_sales_raw,"weekly_sales_raw":weekly_sales_raw,"daily_labor_raw":daily_labor_raw,
+       "scheduled_raw":scheduled_raw,"catering_cy_raw":catering_cy_raw,"catering_py_raw":catering_py_raw,
+       "reviews_raw":reviews_raw,"agm_raw":agm_raw,"prior_window_raw":prior_window_raw,"GUIDELINES_TABLE":GUIDELINES_TABLE}
 
 # ============================================================
 # CSS (from html_template.md)
@@ -824,52 +435,269 @@ tbody tr.highlight { background: #f5efe9; }
 """
 
 # ============================================================
-# BUILD HTML
+# ROW TEMPLATES (see html_stream.py)
 # ============================================================
-html = f"""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">
-<title>Fuego System – 4-Week Consolidated Rack & Stack – {REPORT_PERIOD}</title>
-<style>@page{{size:A4 portrait;margin:0.25in;}}{CSS}</style></head><body>
+RANK_CELLS = '<tr><td><span class="rank {rank_cls}">{rank}</span></td><td>{loc}</td>'
+TRENDS_ROW = RowTemplate('<tr{style}><td>{week}</td><td>{amount}</td><td>{sss}</td><td>{orders}</td><td>{sst}</td><td>{avg_tkt}</td><td>{guide}</td>'
+                         '<td>{hrs}</td><td>{vs_guide}</td><td>{vs_guide_pct}</td><td>{labor_pct}</td><td>{cat_amt}</td></tr>')
+SALES_RS_ROW = RowTemplate(RANK_CELLS + '<td>{amount}</td><td>{sss}</td><td>{orders}</td><td>{sst}</td><td>{avg_tkt}</td><td>{tkt_chg}</td>'
+                           '<td>{cat_amt}</td><td><span class="pill pill-neutral">{suffix}</span></td></tr>')
+LABOR_RS_ROW = RowTemplate(RANK_CELLS + '<td>{amount}</td><td>{guide}</td><td>{sch}</td><td>{hrs}</td><td>{vs_guide}</td><td>{vs_guide_pct}</td>'
+                           '<td>{labor_pct}</td><td>{splh}</td></tr>')
+REVIEWS_RS_ROW = RowTemplate(RANK_CELLS + '<td>{google}</td><td>{google_n}</td><td>{ovation}</td><td>{ovation_n}</td><td>{yelp}</td><td>{yelp_n}</td>'
+                             '<td>{wavg}</td><td>{total_n}</td></tr>')
+CAT_RS_ROW = RowTemplate(RANK_CELLS + '<td>{orders}</td><td>{cat_amt}</td><td>{cat_py}</td><td>{vs_py}</td></tr>')
+
+def rank_fields(loc, rk):
+    return {"rank_cls": rank_cls(rk), "rank": rank_suffix(rk), "loc": loc}
+
+def trends_rows(P):
+    """System weekly rows, most recent first."""
+    for wi, ws_i in enumerate(P.week_starts):
+        sw = P.sys_weekly[ws_i]
+        cw = cell(P.comp_wk, wi)
+        vs_g = sw["labor_hrs"]-sw["guide"]
+        is_cw = ws_i == P.ws
+        b = lambda x: f"<strong>{x}</strong>" if is_cw else x
+        yield {"style": ' class="highlight"' if is_cw else '', "week": b(wk_short(ws_i)), "amount": b(fm(sw["amount"])),
+               "sss": pill_sss(cw["sss"]), "orders": b(fn(sw["orders"])), "sst": pill_sss(cw["sst"]),
+               "avg_tkt": b(fm(P.sys_wk["avg_tkt"][wi].item(),2)), "guide": b(fn(sw["guide"],0)),
+               "hrs": b(fn(sw["labor_hrs"],0)), "vs_guide": pill_labor_diff(vs_g),
+               "vs_guide_pct": pill_labor_ratio(sw["labor_hrs"],sw["guide"]), "labor_pct": pill_labor_pct(P.sys_wk["labor_pct"][wi].item()),
+               "cat_amt": b(fm(sw["cat_amt"]))}
+
+def sales_rs_rows(loc_data, ranks):
+    for loc,val,rk in ranks:
+        ld = loc_data[loc]
+        yield {**rank_fields(loc, rk), "amount": fm(ld["amount"]), "sss": pill_sss(ld["sss"]), "orders": fn(ld["orders"]),
+               "sst": pill_sss(ld.get("sst")), "avg_tkt": fm(ld["avg_tkt"],2), "tkt_chg": pill_sss(ld.get("tkt_chg")),
+               "cat_amt": fm(ld["cat_amt"]), "suffix": ld["suffix"]}
+
+def labor_rs_rows(loc_data, ranks):
+    for loc,val,rk in ranks:
+        ld = loc_data[loc]
+        yield {**rank_fields(loc, rk), "amount": fm(ld["amount"]), "guide": fn(ld["guide_total"],0), "sch": fn(ld["sch_hrs"],0),
+               "hrs": fn(ld["labor_hrs"],0), "vs_guide": pill_labor_diff(ld["vs_guide_n"]),
+               "vs_guide_pct": pill_labor_ratio(ld["labor_hrs"],ld["guide_total"]), "labor_pct": pill_labor_pct(ld["labor_pct"]),
+               "splh": fm(ld["splh"],2)}
+
+def reviews_rs_rows(loc_data, ranks):
+    for loc,val,rk in ranks:
+        ld = loc_data[loc]
+        yield {**rank_fields(loc, rk), "google": pill_rating(ld["google_r"]), "google_n": fn(ld["google_n"]),
+               "ovation": pill_rating(ld["ovation_r"]), "ovation_n": fn(ld["ovation_n"]),
+               "yelp": pill_rating(ld["yelp_r"]) if ld["yelp_r"] else '<span class="pill pill-neutral">—</span>',
+               "yelp_n": fn(ld["yelp_n"]) if ld["yelp_n"] else "—", "wavg": pill_rating(ld["wavg_rating"]), "total_n": fn(ld["total_rev_n"])}
+
+def cat_rs_rows(loc_data, ranks):
+    for loc,val,rk in ranks:
+        ld = loc_data[loc]
+        yield {**rank_fields(loc, rk), "orders": fn(ld["cat_ords"]), "cat_amt": fm(ld["cat_amt"]), "cat_py": fm(ld["cat_py_amt"]),
+               "vs_py": pill_sss(ld["cat_vs_py"])}
+
+# ============================================================
+# PAGE TEMPLATE (compiled once, with the stylesheet and local fonts bound in)
+# ============================================================
+PERIOD_PAGE = PageTemplate("""<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8">
+<title>Fuego System – {period_name} Consolidated Rack & Stack – {period}</title>
+<style>@page{{size:A4 portrait;margin:0.25in;}}{css}</style></head><body>
 <div class="report-container">
-<div class="header header-b3 b3-v5"><div class="b3-bar-top"></div><div class="header-b-inner"><div class="header-b3-tag">4-WEEK CONSOLIDATED RACK &amp; STACK</div><h1>Fuego Tortilla Grill</h1><div class="header-b3-meta"><span class="header-b3-pill">All 6 Locations</span><span class="header-b3-dot">&bull;</span><span>{REPORT_PERIOD}</span></div></div><div class="b3-bar-bottom"></div></div>
+<div class="header header-b3 b3-v5"><div class="b3-bar-top"></div><div class="header-b-inner"><div class="header-b3-tag">{period_tag} CONSOLIDATED RACK &amp; STACK</div><h1>Fuego Tortilla Grill</h1><div class="header-b3-meta"><span class="header-b3-pill">All 6 Locations</span><span class="header-b3-dot">&bull;</span><span>{period}</span></div></div><div class="b3-bar-bottom"></div></div>
 <div class="kpi-row">
-<div class="kpi-card"><div class="kpi-label">System Sales</div><div class="kpi-value">{fm(sys_amt)}</div>{kpi_badge(sys_sss,"SSS (Comp)")}</div>
-<div class="kpi-card"><div class="kpi-label">System Orders</div><div class="kpi-value">{fn(sys_ords)}</div>{kpi_badge(sys_sst,"SST (Comp)")}</div>
-<div class="kpi-card"><div class="kpi-label">Avg Ticket</div><div class="kpi-value">{fm(sys_tkt,2)}</div>{kpi_badge(sys_tkt_chg,"vs PY (Comp)")}</div>
-<div class="kpi-card"><div class="kpi-label">System Labor %</div><div class="kpi-value">{sys_lp:.1f}%</div>{kpi_badge_plain(f"{sys_hrs/sys_guide*100:.1f}% of Guide" if sys_guide else "—","positive" if sys_hrs<=sys_guide else "negative" if sys_hrs/sys_guide>1.05 else "neutral")}</div>
-<div class="kpi-card"><div class="kpi-label">Catering</div><div class="kpi-value">{fm(sys_cat)}</div>{kpi_badge_plain("System Total","neutral")}</div>
+<div class="kpi-card"><div class="kpi-label">System Sales</div><div class="kpi-value">{sales}</div>{sales_badge}</div>
+<div class="kpi-card"><div class="kpi-label">System Orders</div><div class="kpi-value">{orders}</div>{orders_badge}</div>
+<div class="kpi-card"><div class="kpi-label">Avg Ticket</div><div class="kpi-value">{avg_tkt}</div>{avg_tkt_badge}</div>
+<div class="kpi-card"><div class="kpi-label">System Labor %</div><div class="kpi-value">{labor_pct}%</div>{labor_badge}</div>
+<div class="kpi-card"><div class="kpi-label">Catering</div><div class="kpi-value">{catering}</div>{catering_badge}</div>
 </div>
 <div class="gm-message"><div class="gm-label">System Summary</div>{gm_msg}</div>
-<div class="section"><div class="section-header"><div class="icon icon-sales">&#128202;</div><h2>System Performance Trends</h2><div class="section-sub">Last 4 Weeks – All Locations Combined</div></div><table><thead><tr><th>Week</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Tkt</th><th>Guide Hrs</th><th>Hours</th><th>vs Guide #</th><th>vs Guide %</th><th>Labor %</th><th>Catering</th></tr></thead><tbody>{trends_rows}</tbody></table></div>
-<div class="section"><div class="section-header"><div class="icon icon-sales">&#128176;</div><h2>Sales Rack &amp; Stack</h2><div class="section-sub">{REPORT_PERIOD} – Ranked by Sales</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Ticket</th><th>Tkt Chg</th><th>Catering</th><th>Basis</th></tr></thead><tbody>{sales_rs_rows}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{sales_callout}</div></div>
-<div class="section"><div class="section-header"><div class="icon icon-labor">&#128101;</div><h2>Labor Rack &amp; Stack</h2><div class="section-sub">{REPORT_PERIOD} – Ranked by vs Guide %</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Sales</th><th>Guide Hrs</th><th>Sch Hrs</th><th>Hours</th><th>vs Guide #</th><th>vs Guide %</th><th>Labor %</th><th>SPLH</th></tr></thead><tbody>{labor_rs_rows}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{labor_callout}</div></div>
-<div class="section"><div class="section-header"><div class="icon icon-reviews">&#11088;</div><h2>Reviews Rack &amp; Stack</h2><div class="section-sub">{REPORT_PERIOD} – Ranked by Weighted Avg Rating</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Google</th><th>#</th><th>Ovation</th><th>#</th><th>Yelp</th><th>#</th><th>Wtd Avg</th><th>Total #</th></tr></thead><tbody>{reviews_rs_rows}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{reviews_callout}</div></div>
-<div class="section"><div class="section-header"><div class="icon icon-catering">&#127919;</div><h2>Catering Rack &amp; Stack</h2><div class="section-sub">{REPORT_PERIOD} – Ranked by Catering $</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Orders</th><th>Cat $</th><th>Cat $ PY</th><th>vs PY</th></tr></thead><tbody>{cat_rs_rows}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{catering_callout}</div></div>
-</div></body></html>"""
+<div class="section"><div class="section-header"><div class="icon icon-sales">&#128202;</div><h2>System Performance Trends</h2><div class="section-sub">Last {n_weeks} Weeks – All Locations Combined</div></div><table><thead><tr><th>Week</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Tkt</th><th>Guide Hrs</th><th>Hours</th><th>vs Guide #</th><th>vs Guide %</th><th>Labor %</th><th>Catering</th></tr></thead><tbody>{*trends}{trends_total}</tbody></table></div>
+<div class="section"><div class="section-header"><div class="icon icon-sales">&#128176;</div><h2>Sales Rack &amp; Stack</h2><div class="section-sub">{period} – Ranked by Sales</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Sales</th><th>SSS %</th><th>Orders</th><th>SST %</th><th>Avg Ticket</th><th>Tkt Chg</th><th>Catering</th><th>Basis</th></tr></thead><tbody>{*sales_rs}{sales_total}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{sales_callout}</div></div>
+<div class="section"><div class="section-header"><div class="icon icon-labor">&#128101;</div><h2>Labor Rack &amp; Stack</h2><div class="section-sub">{period} – Ranked by vs Guide %</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Sales</th><th>Guide Hrs</th><th>Sch Hrs</th><th>Hours</th><th>vs Guide #</th><th>vs Guide %</th><th>Labor %</th><th>SPLH</th></tr></thead><tbody>{*labor_rs}{labor_total}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{labor_callout}</div></div>
+<div class="section"><div class="section-header"><div class="icon icon-reviews">&#11088;</div><h2>Reviews Rack &amp; Stack</h2><div class="section-sub">{period} – Ranked by Weighted Avg Rating</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Google</th><th>#</th><th>Ovation</th><th>#</th><th>Yelp</th><th>#</th><th>Wtd Avg</th><th>Total #</th></tr></thead><tbody>{*reviews_rs}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{reviews_callout}</div></div>
+<div class="section"><div class="section-header"><div class="icon icon-catering">&#127919;</div><h2>Catering Rack &amp; Stack</h2><div class="section-sub">{period} – Ranked by Catering $</div></div><table><thead><tr><th>Rank</th><th>Location</th><th>Orders</th><th>Cat $</th><th>Cat $ PY</th><th>vs PY</th></tr></thead><tbody>{*cat_rs}{cat_total}</tbody></table><div class="ai-callout"><div class="ai-label">&#129302; AI Insight</div>{catering_callout}</div></div>
+</div></body></html>""", css=localize_css(CSS))
 
 # ============================================================
-# SAVE
+# AI INSIGHTS, TABLES AND GM MESSAGE
 # ============================================================
-html_path = "/home/claude/system_4wk_consolidated.html"
-with open(html_path, "w") as f:
-    f.write(html)
+def render_period_report(P, out=None):
+    """
+    Rack & stack HTML from one PeriodKpis: {"html", "gm_msg", "<section>_callout", "sales_ranks"}.
+    With `out` (an open text file) the document streams there and "html" is None.
+    """
+    period, n_weeks = P.period, P.n_weeks
+    report_period = period.span
+    loc_data, loc_weekly, comp_locs = P.loc_data, P.loc_weekly, P.comp_locs
+    sys_amt, sys_ords, sys_tkt, sys_sss, sys_sst, sys_tkt_chg = P.sys_amt, P.sys_ords, P.sys_tkt, P.sys_sss, P.sys_sst, P.sys_tkt_chg
+    sys_hrs, sys_pay, sys_guide, sys_sch, sys_lp, sys_splh = P.sys_hrs, P.sys_pay, P.sys_guide, P.sys_sch, P.sys_lp, P.sys_splh
+    sys_cat, sys_cat_ords, sys_cat_py = P.sys_cat, P.sys_cat_ords, P.sys_cat_py
+    prior_sales, prior_catering, prior_loc_sss, prior_loc_lp = P.prior_sales, P.prior_catering, P.prior_loc_sss, P.prior_loc_lp
+    prior_sys_sss, prior_sys_lp, prior_sys_cat = P.prior_sys_sss, P.prior_sys_lp, P.prior_sys_cat
+
+    with span("rank"):
+        sales_ranks = rank_items(loc_data, "amount", reverse=True)
+        labor_ranks = rank_items(loc_data, "vs_guide_pct", reverse=False)
+        cat_ranks = rank_items(loc_data, "cat_amt", reverse=True)
+        reviews_ranks = rank_items(loc_data, "wavg_rating", reverse=True)
+
+    # Comp SSS sorted
+    comp_sss = sorted([(l, loc_data[l]["sss"]) for l in comp_locs if loc_data[l]["sss"] is not None], key=lambda x: x[1])
+    best_sss_loc, best_sss_val = comp_sss[-1] if comp_sss else ("N/A", 0)
+    worst_sss_loc, worst_sss_val = comp_sss[0] if comp_sss else ("N/A", 0)
+
+    # Weekly trajectories
+    def traj(loc, key):
+        """Oldest → most recent week."""
+        return [loc_weekly[loc][wi].get(key, 0) for wi in reversed(range(n_weeks))]
+    def agm_weekly(loc, ws): return P.AGM.daily(loc, ws) * DAYS_OPEN
+
+    # Comp % is None without enough PY (new stores, a prior window before the store opened)
+    def sp(v): return f"{v:+.1f}%" if v is not None else "N/A"
+    last_wk = wk_short(period.weeks[0])
+    # "trailing 4-week period" for trailing windows, "P2 FY2026 period" for named fiscal periods
+    period_desc = f"trailing {n_weeks}-week period" if period.name == f"{n_weeks}-Week" else f"{period.name} period"
+    lp_drop = prior_sys_lp - sys_lp
+    lp_change = (f"tightened from <strong>{prior_sys_lp:.1f}%</strong> in the prior {n_weeks}-week window to "
+                 f"<strong>{sys_lp:.1f}%</strong> this period — a "
+                 + (f"{int(lp_drop)}+ point" if lp_drop >= 1 else f"{lp_drop:.1f}-point")
+                 + " improvement driven by both higher sales and better scheduling discipline. "
+                 if lp_drop >= 0 else
+                 f"ran at <strong>{sys_lp:.1f}%</strong> this period (no labor in the prior {n_weeks}-week window). "
+                 if not prior_sys_lp else
+                 f"rose from <strong>{prior_sys_lp:.1f}%</strong> in the prior {n_weeks}-week window to "
+                 f"<strong>{sys_lp:.1f}%</strong> this period — {-lp_drop:.1f} points that sales did not absorb. ")
+    fay_agm = (agm_weekly("Fayetteville", period.weeks[-1]), agm_weekly("Fayetteville", period.weeks[0]))
+
+    sales_callout = (
+        f"System comp sales swung from <strong>{sp(prior_sys_sss)}</strong> in the prior {n_weeks}-week window "
+        f"to <strong>{sp(sys_sss)}</strong> this period — a meaningful trajectory shift. "
+        f"<strong>College Station</strong> drove the turnaround, flipping from {sp(prior_loc_sss.get('College Station'))} to "
+        f"{sp(loc_data['College Station']['sss'])}, with the {last_wk} week ({fm(traj('College Station','amount')[-1])}) their strongest in the window. "
+        f"<strong>San Marcos</strong> improved from {sp(prior_loc_sss.get('San Marcos'))} to {sp(loc_data['San Marcos']['sss'])} "
+        f"and posted an accelerating weekly trend — their {last_wk} week ({fm(traj('San Marcos','amount')[-1])}) was the best of the trailing {2*n_weeks} weeks. "
+        f"<strong>San Antonio</strong> narrowed its comp gap from {sp(prior_loc_sss.get('San Antonio'))} to {sp(loc_data['San Antonio']['sss'])}, "
+        f"but the transaction decline ({sp(loc_data['San Antonio']['sst'])} SST) flags a traffic problem — ticket growth is masking it. "
+        f"<strong>Burleson</strong> grew {sp(pct_chg(loc_data['Burleson']['amount'], prior_sales['Burleson']['cy']))} period-over-period as the ramp continues."
+    )
+
+    labor_callout = (
+        f"System labor {lp_change}"
+        f"<strong>San Antonio</strong> dropped from {prior_loc_lp['San Antonio']:.1f}% to {loc_data['San Antonio']['labor_pct']:.1f}%, "
+        f"the tightest in the system — but verify this isn't understaffing given their negative transaction comps. "
+        f"<strong>Fayetteville</strong> improved from {prior_loc_lp['Fayetteville']:.1f}% to {loc_data['Fayetteville']['labor_pct']:.1f}% as AGM hours "
+        f"ramped down from {fay_agm[0]:.0f} → {fay_agm[1]:.0f} hrs/wk across the window. The gap to guideline ({loc_data['Fayetteville']['vs_guide_pct']:.1f}%) "
+        f"should continue narrowing as training hours phase out completely. "
+        f"<strong>Burleson</strong> cut from {prior_loc_lp['Burleson']:.1f}% to {loc_data['Burleson']['labor_pct']:.1f}% — "
+        f"a textbook new-store labor ramp. Sharing their scheduling approach with Fayetteville could accelerate that store's normalization."
+    )
+
+    reviews_callout = (
+        f"<strong>San Marcos</strong> leads with a {loc_data['San Marcos']['wavg_rating']:.2f} weighted average — "
+        f"their {loc_data['San Marcos']['google_r']:.1f} Google score stands out as system-best and a real competitive advantage for discovery. "
+        f"<strong>Waco's</strong> {loc_data['Waco']['wavg_rating']:.2f} weighted average (Ovation {loc_data['Waco']['ovation_r']:.2f}, "
+        f"Google {loc_data['Waco']['google_r']:.1f}) is the system floor — investigate whether this ties to the labor tightening "
+        f"(labor% dropped from {prior_loc_lp['Waco']:.1f}% → {loc_data['Waco']['labor_pct']:.1f}%) or specific service gaps. "
+        f"<strong>Fayetteville's</strong> Google score ({loc_data['Fayetteville']['google_r']:.2f}) pulls down an otherwise strong "
+        f"Ovation ({loc_data['Fayetteville']['ovation_r']:.2f}) — the {loc_data['Fayetteville']['google_n']} Google reviews likely include "
+        f"early growing-pains ratings that will dilute over time. "
+        f"Review volume system-wide ({sum(loc_data[l]['total_rev_n'] for l in P.locations)} reviews over {n_weeks} weeks) is healthy — "
+        f"keep Ovation prompts consistent."
+    )
+
+    cat_dir = "up" if sys_cat > prior_sys_cat else "down"
+    catering_callout = (
+        f"System catering came in at {fm(sys_cat)}, {cat_dir} from {fm(prior_sys_cat)} in the prior {n_weeks}-week window"
+        f"{' — College Station drove the lift with ' + fm(loc_data['College Station']['cat_amt']) + ' vs ' + fm(prior_catering['College Station']) + ' prior.' if sys_cat > prior_sys_cat else '.'} "
+        f"<strong>Waco</strong> held steady ({fm(loc_data['Waco']['cat_amt'])} vs {fm(prior_catering['Waco'])} prior) and leads the system "
+        f"in catering consistency — their avg order size of "
+        f"{fm(loc_data['Waco']['cat_amt']/loc_data['Waco']['cat_ords'],2) if loc_data['Waco']['cat_ords'] else '$0'} "
+        f"suggests corporate/event-level business worth protecting with a dedicated contact. "
+        f"<strong>San Antonio</strong> grew catering from {fm(prior_catering['San Antonio'])} → {fm(loc_data['San Antonio']['cat_amt'])} — "
+        f"a potential offset to their declining dine-in traffic. "
+        f"<strong>San Marcos</strong> ({fm(loc_data['San Marcos']['cat_amt'])}) and <strong>Fayetteville</strong> "
+        f"({fm(loc_data['Fayetteville']['cat_amt'])}) remain underdeveloped — "
+        f"targeted local business outreach could unlock an incremental revenue stream at both."
+    )
+
+    # GM message
+    gm_msg = (
+        f"Over the {period_desc} ({report_period}), the Fuego system posted "
+        f"{fm(sys_amt)} across {fn(sys_ords,0)} orders ({fm(sys_tkt,2)} avg ticket). "
+        f"Comp same-store sales came in at {sp(sys_sss)}, "
+        + (f"a significant improvement from {sp(prior_sys_sss)}" if sys_sss is not None and prior_sys_sss is not None and sys_sss > prior_sys_sss
+           else f"against {sp(prior_sys_sss)}")
+        + f" in the prior {n_weeks}-week window. "
+        + (f"System labor {'tightened' if lp_drop >= 0 else 'rose'} to {sys_lp:.1f}% (from {prior_sys_lp:.1f}% prior), "
+           if prior_sys_lp else f"System labor came in at {sys_lp:.1f}%, ")
+        + (f"running at {sys_hrs/sys_guide*100:.1f}% of guideline. " if sys_guide else "with no guideline hours on record. ")
+        + f"Catering delivered {fm(sys_cat)} system-wide."
+    )
 
-output_pdf = f"/mnt/user-data/outputs/Weekly Flash - Fuego System - 4-Week Consolidated - Jan 26 – Feb 22, 2026.pdf"
-output_html = output_pdf.replace(".pdf", ".html")
-
-try:
-    from weasyprint import HTML
-    HTML(filename=html_path).write_pdf(output_pdf)
-    shutil.copy(html_path, output_html)
-    print(f"✓ Saved: {output_pdf}")
-    print(f"✓ Saved: {output_html}")
-except Exception as e:
+# ============================================================
+# BUILD HTML
+# ============================================================
+    doc = HtmlWriter(out)
+    PERIOD_PAGE.write(doc, {
+        "period": report_period, "period_name": period.name, "period_tag": period.name.upper(), "n_weeks": str(n_weeks), "gm_msg": gm_msg,
+        "sales": fm(sys_amt), "sales_badge": kpi_badge(sys_sss,"SSS (Comp)"), "orders": fn(sys_ords), "orders_badge": kpi_badge(sys_sst,"SST (Comp)"),
+        "avg_tkt": fm(sys_tkt,2), "avg_tkt_badge": kpi_badge(sys_tkt_chg,"vs PY (Comp)"), "labor_pct": f"{sys_lp:.1f}",
+        "labor_badge": kpi_badge_plain(f"{sys_hrs/sys_guide*100:.1f}% of Guide" if sys_guide else "—","positive" if sys_hrs<=sys_guide else "negative" if sys_hrs>sys_guide*1.05 else "neutral"),
+        "catering": fm(sys_cat), "catering_badge": kpi_badge_plain("System Total","neutral"),
+        "trends_total": (f'<tr class="total-row"><td><strong>Total</strong></td><td><strong>{fm(sys_amt)}</strong></td>'
+            f'<td>{pill_sss(sys_sss)}</td><td><strong>{fn(sys_ords)}</strong></td><td>{pill_sss(sys_sst)}</td>'
+            f'<td><strong>{fm(sys_tkt,2)}</strong></td>'
+            f'<td><strong>{fn(sys_guide,0)}</strong></td>'
+            f'<td><strong>{fn(sys_hrs,0)}</strong></td><td>{pill_labor_diff(sys_hrs-sys_guide)}</td>'
+            f'<td>{pill_labor_ratio(sys_hrs,sys_guide)}</td><td>{pill_labor_pct(sys_lp)}</td>'
+            f'<td><strong>{fm(sys_cat)}</strong></td></tr>'),  # period total
+        "sales_total": (f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fm(sys_amt)}</td>'
+            f'<td>{pill_sss(sys_sss)}</td><td>{fn(sys_ords)}</td><td>{pill_sss(sys_sst)}</td>'
+            f'<td>{fm(sys_tkt,2)}</td><td>{pill_sss(sys_tkt_chg)}</td>'
+            f'<td>{fm(sys_cat)}</td><td><span class="pill pill-neutral">Comp</span></td></tr>'),
+        "labor_total": (f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fm(sys_amt)}</td><td>{fn(sys_guide,0)}</td>'
+            f'<td>{fn(sys_sch,0)}</td><td>{fn(sys_hrs,0)}</td><td>{pill_labor_diff(sys_hrs-sys_guide)}</td>'
+            f'<td>{pill_labor_ratio(sys_hrs,sys_guide)}</td><td>{pill_labor_pct(sys_lp)}</td><td>{fm(sys_splh,2)}</td></tr>'),
+        "cat_total": (f'<tr class="total-row"><td></td><td>SYSTEM</td><td>{fn(sys_cat_ords)}</td>'
+            f'<td>{fm(sys_cat)}</td><td>{fm(sys_cat_py)}</td>'
+            f'<td>{pill_sss(pct_chg(sys_cat,sys_cat_py) if sys_cat_py else None)}</td></tr>'),
+        "sales_callout": sales_callout, "labor_callout": labor_callout, "reviews_callout": reviews_callout, "catering_callout": catering_callout,
+    }, {"trends": (TRENDS_ROW, trends_rows(P)),
+        "sales_rs": (SALES_RS_ROW, sales_rs_rows(loc_data, sales_ranks)),
+        "labor_rs": (LABOR_RS_ROW, labor_rs_rows(loc_data, labor_ranks)),
+        "reviews_rs": (REVIEWS_RS_ROW, reviews_rs_rows(loc_data, reviews_ranks)),
+        "cat_rs": (CAT_RS_ROW, cat_rs_rows(loc_data, cat_ranks))})
+    return {"html":doc.getvalue(),"gm_msg":gm_msg,"sales_callout":sales_callout,"labor_callout":labor_callout,
+            "reviews_callout":reviews_callout,"catering_callout":catering_callout,"sales_ranks":sales_ranks}
+
+
+if __name__ == "__main__":
+    P = PeriodKpis(RAW, PERIOD, LOCATIONS, local_py=LOCAL_PY, comp_min_py_weekly=COMP_MIN_PY_WEEKLY)
+    with span("html", report=PERIOD.name):
+        report = render_period_report(P)
+
+    # Save
+    html_path = f"/home/claude/system_{N_WEEKS}wk_consolidated.html"
+    with open(html_path, "w") as f:
+        f.write(report["html"])
+
+    output_pdf = f"/mnt/user-data/outputs/Weekly Flash - Fuego System - {PERIOD.name} Consolidated - {REPORT_PERIOD}.pdf"
+    output_html = output_pdf.replace(".pdf", ".html")
+
+    with PdfRenderer() as renderer:  # warm Playwright Chromium, else the google-chrome CLI, else WeasyPrint
+        ok = renderer.render(html_path, output_pdf)
     shutil.copy(html_path, output_html)
-    print(f"✗ PDF failed: {e}")
-    print(f"✓ HTML saved: {output_html}")
-
-# Print summary
-print("\n=== 4-WEEK RACK & STACK ===")
-for loc,val,rk in sales_ranks:
-    ld = loc_data[loc]
-    sss_str = f"{ld['sss']:+.1f}%" if ld['sss'] else "N/A"
-    print(f"#{rk} {loc:20s} | Sales: {fm(ld['amount']):>10s} | SSS: {sss_str:>8s} | Labor%: {ld['labor_pct']:.1f}% | SPLH: {fm(ld['splh'],2)} | Reviews: {ld['wavg_rating']:.2f}★")
+    if ok:
+        print(f"✓ Saved: {output_pdf}")
+        print(f"✓ Saved: {output_html}")
+    else:
+        print(f"✗ PDF failed: {renderer.error or 'no PDF converter available'}")
+        print(f"✓ HTML saved: {output_html}")
+    print(summary())
+
+    # Print summary
+    print(f"\n=== {PERIOD.name.upper()} RACK & STACK ===")
+    for loc,val,rk in report["sales_ranks"]:
+        ld = P.loc_data[loc]
+        sss_str = f"{ld['sss']:+.1f}%" if ld['sss'] else "N/A"
+        print(f"#{rk} {loc:20s} | Sales: {fm(ld['amount']):>10s} | SSS: {sss_str:>8s} | Labor%: {ld['labor_pct']:.1f}% | SPLH: {fm(ld['splh'],2)} | Reviews: {ld['wavg_rating']:.2f}★")
@@ -0,0 +1,142 @@
+"""
+Stage timing for the report pipeline, in Chrome trace-event format.
+
+`with span("html", report="Waco"):` times one stage. It records wall time and
+the calling thread's CPU time. A span costs a few clock reads and one list
+append (a few µs), and a batch records a few dozen, so tracing is always on.
+
+    fetch       QueryPlanner run (fetch_inputs)
+    organize    raw rows -> fact store, reviews, catering   (WeeklyKpis / PeriodKpis)
+    guidelines  guideline hours from the fact store
+    kpis        loc_weekly, loc_data, system totals, sys_weekly
+    rank        rack & stack rankings (sales, labor vs guide, catering, reviews)
+    callouts    AI insight text
+    verify      callout numbers checked against the KPIs
+    html        one report rendered and written
+    pdf         one PDF printed (pool page or fallback converter)
+    packet      Monday packet built and printed
+
+`write(path)` saves the spans as trace-event JSON, which chrome://tracing and
+ui.perfetto.dev load as-is. `summary()` returns the one-line version: each
+stage's own time (nested stages are subtracted from their parent), plus the
+slowest PDF against its converter's timeout. When that PDF passes
+`WARN_FRACTION` of the timeout, the line starts with ⚠, so a Chrome subprocess
+creeping toward its 30 s limit shows up before it fails.
+
+Spans recorded in worker processes travel back to the parent with `drain()`
+and `extend()`.
+
+This file is shared: keep it identical in both skills' references/.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+STAGES = ("fetch", "organize", "guidelines", "kpis", "rank", "callouts", "verify", "html", "pdf", "packet")
+WARN_FRACTION = 0.5  # of a converter's timeout
+
+
+class Tracer:
+    """Recorded spans: (stage, start_ns, dur_ns, cpu_ns or None, pid, tid, args)."""
+
+    def __init__(self):
+        self.events = []
+
+    @contextmanager
+    def span(self, stage, **args):
+        """Time the block as `stage`; the yielded `args` dict may be filled in while it runs."""
+        t, c = time.perf_counter_ns(), time.thread_time_ns()
+        try:
+            yield args
+        finally:
+            self.events.append((stage, t, time.perf_counter_ns() - t, time.thread_time_ns() - c,
+                                os.getpid(), threading.get_ident(), args))
+
+    def record(self, stage, start_ns, dur_ns, tid=None, **args):
+        """A span timed by the caller (async work, where thread CPU time means nothing)."""
+        self.events.append((stage, start_ns, dur_ns, None, os.getpid(), tid or threading.get_ident(), args))
+
+    def drain(self):
+        """Remove and return every recorded span."""
+        events, self.events = self.events, []
+        return events
+
+    def extend(self, events):
+        self.events.extend(events)
+
+
+TRACE = Tracer()
+span, record, drain, extend = TRACE.span, TRACE.record, TRACE.drain, TRACE.extend
+
+
+def trace_events(events):
+    """Chrome trace-event JSON object ("X" complete events, microseconds)."""
+    out = []
+    for stage, t, dur, cpu, pid, tid, args in events:
+        a = dict(args)
+        if cpu is not None: a["cpu_ms"] = round(cpu / 1e6, 3)
+        out.append({"name": f"{stage} {args['report']}" if "report" in args else stage, "cat": stage, "ph": "X",
+                    "ts": t / 1000, "dur": dur / 1000, "pid": pid, "tid": tid, "args": a})
+    return {"traceEvents": out, "displayTimeUnit": "ms"}
+
+
+def write(path, events=None):
+    """Save `events` (default: everything recorded so far) as a trace file."""
+    with open(path, "w") as f:
+        json.dump(trace_events(TRACE.events if events is None else events), f, default=str)
+    return path
+
+
+def self_times(events):
+    """{stage: [wall ns, cpu ns]} with each span's directly nested spans (same thread) subtracted."""
+    totals = {}
+    by_thread = {}
+    for e in events:
+        by_thread.setdefault((e[4], e[5]), []).append(e)
+    for spans in by_thread.values():
+        spans.sort(key=lambda e: (e[1], -e[2]))
+        stack = []  # [end_ns, stage, wall, cpu]
+        def close(frame):
+            tot = totals.setdefault(frame[1], [0, 0])
+            tot[0] += frame[2]; tot[1] += frame[3]
+        for stage, t, dur, cpu, *_ in spans:
+            while stack and stack[-1][0] <= t: close(stack.pop())
+            if stack:
+                stack[-1][2] -= dur; stack[-1][3] -= cpu or 0
+            stack.append([t + dur, stage, dur, cpu or 0])
+        while stack: close(stack.pop())
+    return totals
+
+
+def _ms(ns):
+    return f"{ns / 1e9:.1f} s" if ns >= 1e10 else f"{ns / 1e6:.0f} ms" if ns >= 1e7 else f"{ns / 1e6:.1f} ms"
+
+
+def summary(events=None):
+    """One line: wall time, each stage's own time (CPU when it differs a lot), slowest successful PDF vs its timeout, PDFs no converter produced."""
+    events = TRACE.events if events is None else events
+    if not events: return "trace: no spans"
+    totals = self_times(events)
+    main = [e for e in events if e[4] == os.getpid()] or events
+    wall = max(t + d for _, t, d, *_ in main) - min(t for _, t, *_ in main)
+    parts = []
+    for stage in STAGES + tuple(sorted(set(totals) - set(STAGES))):
+        if stage not in totals: continue
+        w, c = totals[stage]
+        n = sum(1 for e in events if e[0] == stage)
+        parts.append(f"{stage}{f' ×{n}' if n > 1 else ''} {_ms(w)}" + (f" (cpu {_ms(c)})" if c and c < w / 2 and stage != "pdf" else ""))
+    pdfs = [e for e in events if e[0] == "pdf"]
+    ok = [e for e in pdfs if e[6].get("ok") is not False]
+    last = {e[6].get("file", i): e for i, e in enumerate(pdfs)}  # a PDF fails only if its final converter attempt did
+    failed = sum(1 for e in last.values() if e[6].get("ok") is False)
+    warn = "⚠ " if failed else ""
+    if ok:
+        slow = max(ok, key=lambda e: e[2])
+        timeout = slow[6].get("timeout")
+        parts.append(f"slowest PDF {_ms(slow[2])} via {slow[6].get('converter', '?')}" + (f" of {timeout} s timeout" if timeout else ""))
+        if timeout and slow[2] > WARN_FRACTION * timeout * 1e9: warn = "⚠ "
+    if failed: parts.append(f"✗ {failed} PDF{'s' if failed > 1 else ''} failed")
+    return f"{warn}trace: {_ms(wall)} · " + " · ".join(parts)